@@ -0,0 +1,96 @@
+"""Backfill legacy project_id values and add UPPER(nome) index on projetos
+
+Revision ID: f6g7h8i9j0k1
+Revises: e5f6g7h8i9j0
+Create Date: 2026-02-02 10:00:00.000000
+
+Converte em lotes os apontamentos que ainda possuem project_id no formato
+antigo (nome do projeto, ex: "DEV") para o UUID do projeto (external_id).
+Depois disso o timesheet consulta apenas por igualdade de UUID, sem o
+filtro `project_id = uuid OR project_id = nome`.
+
+Também cria o índice funcional UPPER(nome) em projetos, usado pela
+resolução nome -> UUID de normalize_project_id().
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6g7h8i9j0k1'
+down_revision: Union[str, None] = 'e5f6g7h8i9j0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+# Registros atualizados por lote (cada lote é commitado separadamente)
+BATCH_SIZE = 5000
+
+# project_id no formato oficial; qualquer outro valor é um nome legado
+# (nomes de projeto também podem conter hífen, ex: "SEFAZ-DEV")
+UUID_PATTERN = '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_projetos_nome_upper',
+        'projetos',
+        [sa.text('UPPER(nome)')],
+        unique=False,
+        schema=DB_SCHEMA,
+    )
+
+    # Backfill em lotes fora da transação da migração, para não manter
+    # locks sobre toda a tabela apontamentos durante a conversão
+    migrated_count = 0
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        while True:
+            result = conn.execute(text(f"""
+                UPDATE {DB_SCHEMA}.apontamentos AS a
+                SET project_id = CAST(p.external_id AS TEXT)
+                FROM {DB_SCHEMA}.projetos AS p
+                WHERE UPPER(p.nome) = UPPER(a.project_id)
+                AND a.id IN (
+                    SELECT a2.id
+                    FROM {DB_SCHEMA}.apontamentos AS a2
+                    JOIN {DB_SCHEMA}.projetos AS p2
+                        ON UPPER(p2.nome) = UPPER(a2.project_id)
+                    WHERE a2.project_id !~* :uuid_pattern
+                    LIMIT :batch_size
+                )
+            """), {"batch_size": BATCH_SIZE, "uuid_pattern": UUID_PATTERN})
+
+            if not result.rowcount:
+                break
+
+            migrated_count += result.rowcount
+            print(f"✓ Lote convertido: {result.rowcount} registros (total: {migrated_count})")
+
+    remaining = op.get_bind().execute(text(f"""
+        SELECT DISTINCT project_id
+        FROM {DB_SCHEMA}.apontamentos
+        WHERE project_id !~* :uuid_pattern
+    """), {"uuid_pattern": UUID_PATTERN}).fetchall()
+
+    print(f"Total de registros migrados para UUID: {migrated_count}")
+    if remaining:
+        print(f"⚠ {len(remaining)} project_id(s) sem projeto correspondente em 'projetos':")
+        for row in remaining:
+            print(f"  - {row[0]}")
+
+
+def downgrade() -> None:
+    # A conversão nome -> UUID não é revertida (o UUID é o formato oficial)
+    op.drop_index('ix_projetos_nome_upper', table_name='projetos', schema=DB_SCHEMA)
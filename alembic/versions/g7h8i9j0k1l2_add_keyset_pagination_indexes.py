@@ -0,0 +1,61 @@
+"""Add keyset pagination indexes on apontamentos and atividades
+
+Revision ID: g7h8i9j0k1l2
+Revises: f6g7h8i9j0k1
+Create Date: 2026-02-03 09:00:00.000000
+
+Índices compostos que cobrem a ordenação e o filtro da paginação por cursor:
+- apontamentos: (data_apontamento, criado_em, id)
+- apontamentos por work item: (work_item_id, organization_name, project_id,
+  data_apontamento, criado_em, id)
+- atividades: (criado_em, id)
+"""
+from typing import Sequence, Union
+from alembic import op
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'g7h8i9j0k1l2'
+down_revision: Union[str, None] = 'f6g7h8i9j0k1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_apontamentos_keyset',
+        'apontamentos',
+        ['data_apontamento', 'criado_em', 'id'],
+        unique=False,
+        schema=DB_SCHEMA,
+    )
+    op.create_index(
+        'ix_apontamentos_work_item_keyset',
+        'apontamentos',
+        ['work_item_id', 'organization_name', 'project_id', 'data_apontamento', 'criado_em', 'id'],
+        unique=False,
+        schema=DB_SCHEMA,
+    )
+    op.create_index(
+        'ix_atividades_keyset',
+        'atividades',
+        ['criado_em', 'id'],
+        unique=False,
+        schema=DB_SCHEMA,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_atividades_keyset', table_name='atividades', schema=DB_SCHEMA)
+    op.drop_index('ix_apontamentos_work_item_keyset', table_name='apontamentos', schema=DB_SCHEMA)
+    op.drop_index('ix_apontamentos_keyset', table_name='apontamentos', schema=DB_SCHEMA)
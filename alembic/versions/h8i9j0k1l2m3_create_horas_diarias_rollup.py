@@ -0,0 +1,86 @@
+"""Create horas_diarias rollup tables for reporting
+
+Revision ID: h8i9j0k1l2m3
+Revises: g7h8i9j0k1l2
+Create Date: 2026-02-04 09:00:00.000000
+
+Rollup de horas por (organização, dia, projeto, usuário, atividade) usado por
+GET /api/v1/relatorios/horas:
+- horas_diarias: totais agregados
+- horas_diarias_pendencias: partições (organização, dia) a recalcular
+- rollup_watermarks: último atualizado_em processado
+- índice em apontamentos.atualizado_em para o refresh incremental
+
+O rollup é preenchido na primeira chamada do relatório (ou por
+POST /api/v1/relatorios/horas/refresh?full=true).
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'h8i9j0k1l2m3'
+down_revision: Union[str, None] = 'g7h8i9j0k1l2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+
+def upgrade() -> None:
+    op.create_table(
+        'horas_diarias',
+        sa.Column('organization_name', sa.String(255), nullable=False),
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('project_id', sa.String(255), nullable=False),
+        sa.Column('usuario_id', sa.String(255), nullable=False),
+        sa.Column('id_atividade', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('usuario_nome', sa.String(255), nullable=True),
+        sa.Column('total_minutos', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('total_apontamentos', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('atualizado_em', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('organization_name', 'dia', 'project_id', 'usuario_id', 'id_atividade'),
+        schema=DB_SCHEMA
+    )
+
+    op.create_table(
+        'horas_diarias_pendencias',
+        sa.Column('organization_name', sa.String(255), nullable=False),
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('organization_name', 'dia'),
+        schema=DB_SCHEMA
+    )
+
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('nome', sa.String(100), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=True),
+        sa.Column('atualizado_em', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('nome'),
+        schema=DB_SCHEMA
+    )
+
+    op.create_index(
+        'ix_apontamentos_atualizado_em',
+        'apontamentos',
+        ['atualizado_em'],
+        unique=False,
+        schema=DB_SCHEMA,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_apontamentos_atualizado_em', table_name='apontamentos', schema=DB_SCHEMA)
+    op.drop_table('rollup_watermarks', schema=DB_SCHEMA)
+    op.drop_table('horas_diarias_pendencias', schema=DB_SCHEMA)
+    op.drop_table('horas_diarias', schema=DB_SCHEMA)
@@ -0,0 +1,90 @@
+"""Create work_items table (local work item search index)
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-02-06 09:00:00.000000
+
+Cópia local dos work items já buscados no Azure DevOps (timesheet e busca),
+usada por GET /api/v1/work-items/search antes de consultar o Azure.
+
+O índice trigram do título requer a extensão pg_trgm. Se ela não puder ser
+criada (usuário sem permissão), a tabela é criada sem esse índice e a busca
+por título faz varredura sequencial.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import logging
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'i9j0k1l2m3n4'
+down_revision: Union[str, None] = 'h8i9j0k1l2m3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'work_items',
+        sa.Column('organization_name', sa.String(255), nullable=False),
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('project_id', sa.String(255), nullable=True),
+        sa.Column('project_name', sa.String(255), nullable=True),
+        sa.Column('title', sa.String(512), nullable=False, server_default=''),
+        sa.Column('work_item_type', sa.String(100), nullable=True),
+        sa.Column('state', sa.String(100), nullable=True),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('assigned_to', sa.String(255), nullable=True),
+        sa.Column('original_estimate', sa.Float(), nullable=True),
+        sa.Column('completed_work', sa.Float(), nullable=True),
+        sa.Column('remaining_work', sa.Float(), nullable=True),
+        sa.Column('url', sa.String(500), nullable=True),
+        sa.Column('atualizado_em', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('organization_name', 'id'),
+        schema=DB_SCHEMA
+    )
+
+    op.create_index(
+        'ix_work_items_org_project',
+        'work_items',
+        ['organization_name', 'project_name'],
+        unique=False,
+        schema=DB_SCHEMA,
+    )
+
+    bind = op.get_bind()
+    savepoint = bind.begin_nested()
+    try:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            'ix_work_items_title_trgm',
+            'work_items',
+            ['title'],
+            unique=False,
+            schema=DB_SCHEMA,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+        )
+        savepoint.commit()
+    except sa.exc.DBAPIError as e:
+        savepoint.rollback()
+        logger.warning(f"pg_trgm indisponível; work_items sem índice trigram do título: {e}")
+
+
+def downgrade() -> None:
+    op.execute(f'DROP INDEX IF EXISTS "{DB_SCHEMA}".ix_work_items_title_trgm')
+    op.drop_index('ix_work_items_org_project', table_name='work_items', schema=DB_SCHEMA)
+    op.drop_table('work_items', schema=DB_SCHEMA)
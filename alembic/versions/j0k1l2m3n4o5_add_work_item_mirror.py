@@ -0,0 +1,64 @@
+"""Add work item mirror columns and status table
+
+Revision ID: j0k1l2m3n4o5
+Revises: i9j0k1l2m3n4
+Create Date: 2026-02-09 09:00:00.000000
+
+Espelho de work items alimentado por service hooks
+(POST /api/v1/hooks/azure-devops):
+- work_items: responsável (uniqueName), iteration path e revisão
+- work_item_mirror_status: última carga completa e último evento por projeto
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'j0k1l2m3n4o5'
+down_revision: Union[str, None] = 'i9j0k1l2m3n4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+
+def upgrade() -> None:
+    op.add_column('work_items', sa.Column('assigned_to_email', sa.String(255), nullable=True), schema=DB_SCHEMA)
+    op.add_column('work_items', sa.Column('iteration_path', sa.String(512), nullable=True), schema=DB_SCHEMA)
+    op.add_column('work_items', sa.Column('rev', sa.Integer(), nullable=True), schema=DB_SCHEMA)
+
+    op.create_table(
+        'work_item_mirror_status',
+        sa.Column('organization_name', sa.String(255), nullable=False),
+        sa.Column('project_id', sa.String(255), nullable=False),
+        sa.Column('carga_completa_em', sa.DateTime(), nullable=True),
+        sa.Column('ultimo_evento_em', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('organization_name', 'project_id'),
+        schema=DB_SCHEMA
+    )
+
+    # Leitura do espelho por projeto (timesheet)
+    op.create_index(
+        'ix_work_items_org_project_id',
+        'work_items',
+        ['organization_name', 'project_id'],
+        unique=False,
+        schema=DB_SCHEMA,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_work_items_org_project_id', table_name='work_items', schema=DB_SCHEMA)
+    op.drop_table('work_item_mirror_status', schema=DB_SCHEMA)
+    op.drop_column('work_items', 'rev', schema=DB_SCHEMA)
+    op.drop_column('work_items', 'iteration_path', schema=DB_SCHEMA)
+    op.drop_column('work_items', 'assigned_to_email', schema=DB_SCHEMA)
@@ -0,0 +1,40 @@
+"""Add reporting API watermarks to work_item_mirror_status
+
+Revision ID: k1l2m3n4o5p6
+Revises: j0k1l2m3n4o5
+Create Date: 2026-02-11 09:00:00.000000
+
+Continuation tokens das APIs reporting/workitemrevisions e
+reporting/workitemlinks por (organização, projeto), usados pelo poller
+incremental do espelho de work items.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'k1l2m3n4o5p6'
+down_revision: Union[str, None] = 'j0k1l2m3n4o5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+
+def upgrade() -> None:
+    op.add_column('work_item_mirror_status', sa.Column('revisions_token', sa.String(1000), nullable=True), schema=DB_SCHEMA)
+    op.add_column('work_item_mirror_status', sa.Column('links_token', sa.String(1000), nullable=True), schema=DB_SCHEMA)
+
+
+def downgrade() -> None:
+    op.drop_column('work_item_mirror_status', 'links_token', schema=DB_SCHEMA)
+    op.drop_column('work_item_mirror_status', 'revisions_token', schema=DB_SCHEMA)
@@ -0,0 +1,50 @@
+"""Create background_jobs table for the job scheduler
+
+Revision ID: l2m3n4o5p6q7
+Revises: k1l2m3n4o5p6
+Create Date: 2026-02-16 09:00:00.000000
+
+Estado compartilhado dos jobs em segundo plano (app/services/job_scheduler.py):
+última execução, duração, status e réplica que a executou. A eleição de
+líder usa pg_try_advisory_lock e não precisa de tabela.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'l2m3n4o5p6q7'
+down_revision: Union[str, None] = 'k1l2m3n4o5p6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+
+def upgrade() -> None:
+    op.create_table(
+        'background_jobs',
+        sa.Column('nome', sa.String(100), nullable=False),
+        sa.Column('holder', sa.String(255), nullable=True),
+        sa.Column('status', sa.String(20), nullable=True),
+        sa.Column('ultimo_inicio', sa.DateTime(), nullable=True),
+        sa.Column('ultimo_fim', sa.DateTime(), nullable=True),
+        sa.Column('ultima_duracao_ms', sa.Integer(), nullable=True),
+        sa.Column('ultimo_erro', sa.Text(), nullable=True),
+        sa.Column('execucoes', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.PrimaryKeyConstraint('nome'),
+        schema=DB_SCHEMA
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('background_jobs', schema=DB_SCHEMA)
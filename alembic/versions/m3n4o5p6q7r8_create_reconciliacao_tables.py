@@ -0,0 +1,83 @@
+"""Create reconciliacao report tables
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-02-18 09:00:00.000000
+
+Relatório da reconciliação noturna entre os totais apontados localmente e o
+CompletedWork dos work items no Azure DevOps:
+- reconciliacao_execucoes: resumo de cada execução
+- reconciliacao_itens: work items divergentes e a ação tomada
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'm3n4o5p6q7r8'
+down_revision: Union[str, None] = 'l2m3n4o5p6q7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reconciliacao_execucoes',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_name', sa.String(255), nullable=True),
+        sa.Column('dry_run', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+        sa.Column('status', sa.String(20), nullable=False, server_default='executando'),
+        sa.Column('iniciado_em', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('finalizado_em', sa.DateTime(), nullable=True),
+        sa.Column('total_work_items', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('divergentes', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('corrigidos', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('falhas', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('nao_encontrados', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        schema=DB_SCHEMA
+    )
+    op.create_index(
+        'ix_reconciliacao_execucoes_iniciado_em',
+        'reconciliacao_execucoes',
+        ['iniciado_em'],
+        unique=False,
+        schema=DB_SCHEMA,
+    )
+
+    op.create_table(
+        'reconciliacao_itens',
+        sa.Column('execucao_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_name', sa.String(255), nullable=False),
+        sa.Column('work_item_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.String(255), nullable=True),
+        sa.Column('horas_local', sa.Float(), nullable=False),
+        sa.Column('completed_work_azure', sa.Float(), nullable=True),
+        sa.Column('remaining_work_azure', sa.Float(), nullable=True),
+        sa.Column('original_estimate', sa.Float(), nullable=True),
+        sa.Column('remaining_work_novo', sa.Float(), nullable=True),
+        sa.Column('acao', sa.String(20), nullable=False),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['execucao_id'], [f'{DB_SCHEMA}.reconciliacao_execucoes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('execucao_id', 'organization_name', 'work_item_id'),
+        schema=DB_SCHEMA
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reconciliacao_itens', schema=DB_SCHEMA)
+    op.drop_index('ix_reconciliacao_execucoes_iniciado_em', table_name='reconciliacao_execucoes', schema=DB_SCHEMA)
+    op.drop_table('reconciliacao_execucoes', schema=DB_SCHEMA)
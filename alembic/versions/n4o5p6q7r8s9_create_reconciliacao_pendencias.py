@@ -0,0 +1,46 @@
+"""Create reconciliacao_pendencias
+
+Revision ID: n4o5p6q7r8s9
+Revises: m3n4o5p6q7r8
+Create Date: 2026-02-23 09:00:00.000000
+
+Work items com apontamentos excluídos. A reconciliação os inclui mesmo sem
+apontamentos restantes, com total 0, para corrigir o CompletedWork quando o
+recálculo da exclusão falhou.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sys
+import os
+
+# Adicionar o diretório raiz ao path para importar app.config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = 'n4o5p6q7r8s9'
+down_revision: Union[str, None] = 'm3n4o5p6q7r8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Obter o schema dinamicamente
+settings = get_settings()
+DB_SCHEMA = settings.database_schema
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reconciliacao_pendencias',
+        sa.Column('organization_name', sa.String(255), nullable=False),
+        sa.Column('work_item_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.String(255), nullable=True),
+        sa.Column('marcado_em', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('organization_name', 'work_item_id'),
+        schema=DB_SCHEMA
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reconciliacao_pendencias', schema=DB_SCHEMA)
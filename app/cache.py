@@ -0,0 +1,452 @@
+"""
+Subsistema de cache com backends plugáveis.
+
+Cada cache da aplicação é um namespace (Cache) sobre um backend:
+
+- memory (padrão): LRU em memória com TTL por entrada, limitado por
+  namespace e por processo.
+- redis: servidor compatível com o protocolo Redis (CACHE_REDIS_URL),
+  compartilhado entre os workers. Valores serializados com pickle.
+
+As chaves ficam como "<namespace>:<parte>:<parte>" (partes escapadas), de
+modo que invalidate(*prefixo) remove todas as chaves que começam pelas
+partes informadas. Namespaces criados com local=True ficam sempre em memória
+(ex: PATs descriptografados, que não devem sair do processo).
+
+get_or_set() e aget_or_set() fazem single-flight: chamadas concorrentes para
+a mesma chave no mesmo processo aguardam uma única carga. Valores None não
+são gravados.
+"""
+
+import asyncio
+import logging
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+from urllib.parse import quote
+
+from app.config import get_settings
+from app.utils.cache_stats import register_cache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DEFAULT_MAX_ENTRIES = 10000
+SEPARATOR = ":"
+LOCK_STRIPES = 64
+
+# Sentinela dos backends para chave ausente ou expirada
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Interface dos backends. As chaves recebidas já incluem o namespace."""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Valor da chave ou MISSING (ausente ou expirada)."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Grava o valor com validade de ttl segundos."""
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        """Grava apenas se a chave não existir. Retorna True se gravou."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove a chave. Retorna True se existia."""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove as chaves que começam por prefix. Retorna a quantidade removida."""
+
+    @abstractmethod
+    def keys(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Chaves válidas que começam por prefix."""
+
+    def count(self, prefix: str) -> int:
+        return len(self.keys(prefix))
+
+
+class MemoryBackend(CacheBackend):
+    """LRU em memória com TTL por entrada (descarta as menos usadas)."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _store(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def keys(self, prefix: str, limit: int | None = None) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            found = [key for key, (expires_at, _) in self._entries.items() if key.startswith(prefix) and expires_at >= now]
+        return found[:limit] if limit else found
+
+
+def _glob_escape(value: str) -> str:
+    """Escapa os caracteres especiais do padrão MATCH do SCAN."""
+    for char in "\\*?[]":
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend sobre um cliente compatível com redis-py (redis.Redis ou
+    fakeredis.FakeRedis), compartilhado entre os workers.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, prefix: str = "aponta:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        return MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.client.set(self.prefix + key, raw, px=max(1, int(ttl * 1000)))
+
+    def add(self, key: str, value: Any, ttl: float) -> bool:
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return bool(self.client.set(self.prefix + key, raw, px=max(1, int(ttl * 1000)), nx=True))
+
+    def delete(self, key: str) -> bool:
+        return bool(self.client.delete(self.prefix + key))
+
+    def _scan(self, prefix: str):
+        return self.client.scan_iter(match=_glob_escape(self.prefix + prefix) + "*", count=500)
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        batch: list[bytes] = []
+        for key in self._scan(prefix):
+            batch.append(key)
+            if len(batch) >= 500:
+                removed += self.client.unlink(*batch)
+                batch = []
+        if batch:
+            removed += self.client.unlink(*batch)
+        return removed
+
+    def keys(self, prefix: str, limit: int | None = None) -> list[str]:
+        found = []
+        for key in self._scan(prefix):
+            key = key.decode() if isinstance(key, bytes) else key
+            found.append(key[len(self.prefix):])
+            if limit and len(found) >= limit:
+                break
+        return found
+
+
+def create_redis_backend(url: str) -> RedisBackend:
+    """Backend Redis a partir de uma URL (redis://, rediss:// ou unix://)."""
+    try:
+        import redis
+    except ImportError as exc:
+        raise RuntimeError("CACHE_BACKEND=redis requer o pacote redis (pip install redis)") from exc
+    return RedisBackend(redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0))
+
+
+class Cache:
+    """Namespace de cache: chaves, TTL padrão, single-flight e estatísticas."""
+
+    def __init__(self, namespace: str, backend: CacheBackend, ttl: float | Callable[[], float]):
+        self.namespace = namespace
+        self.backend = backend
+        self._ttl = ttl if callable(ttl) else (lambda: ttl)
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def key(self, key: Hashable) -> str:
+        """Chave completa no backend: tuplas viram partes separadas."""
+        parts = key if isinstance(key, tuple) else (key,)
+        return SEPARATOR.join((self.namespace, *(quote(str(part), safe="") for part in parts)))
+
+    def _backend_error(self, action: str, e: Exception) -> None:
+        # Falha do backend compartilhado não derruba a requisição: é contada
+        # e registrada, e a operação segue como se o cache estivesse vazio
+        self.errors += 1
+        logger.warning(f"Cache {self.namespace}: falha na {action} ({type(e).__name__}: {e})")
+
+    def _backend_get(self, full_key: str) -> Any:
+        try:
+            return self.backend.get(full_key)
+        except Exception as e:
+            self._backend_error("leitura", e)
+            return MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Valor em cache ou default (ausente ou expirado)."""
+        value = self._backend_get(self.key(key))
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        """Indica se há valor válido, sem afetar as estatísticas."""
+        return self._backend_get(self.key(key)) is not MISSING
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> bool:
+        """
+        Grava um valor (None e TTL <= 0 são ignorados).
+
+        Returns:
+            True se o valor foi gravado.
+        """
+        ttl = self._ttl() if ttl is None else ttl
+        if value is None or ttl <= 0:
+            return False
+        try:
+            self.backend.set(self.key(key), value, ttl)
+        except Exception as e:
+            self._backend_error("gravação", e)
+            return False
+        self.sets += 1
+        return True
+
+    def add(self, key: Hashable, value: Any, ttl: float | None = None) -> bool:
+        """
+        Grava o valor apenas se a chave não existir (reserva entre workers
+        com o backend compartilhado).
+
+        Returns:
+            True se gravou. Falha do backend também retorna True: quem chama
+            segue sem a reserva, como a leitura que vira miss.
+        """
+        ttl = self._ttl() if ttl is None else ttl
+        try:
+            added = self.backend.add(self.key(key), value, ttl)
+        except Exception as e:
+            self._backend_error("reserva", e)
+            return True
+        if added:
+            self.sets += 1
+        return added
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a chave. Falha do backend é registrada e retorna False."""
+        try:
+            return self.backend.delete(self.key(key))
+        except Exception as e:
+            self._backend_error("remoção", e)
+            return False
+
+    def invalidate(self, *prefix: Any) -> int:
+        """
+        Remove a chave formada por prefix e todas as que começam por ela.
+        Sem argumentos, esvazia o namespace.
+
+        Chamado depois do commit das escritas: falha do backend é registrada
+        e não propagada (as entradas expiram pelo TTL), para que a escrita já
+        gravada não responda 500 e seja repetida pelo cliente.
+
+        Returns:
+            Quantidade de chaves removidas.
+        """
+        base = self.key(prefix) if prefix else self.namespace
+        try:
+            removed = self.backend.delete_prefix(base + SEPARATOR)
+            if prefix and self.backend.delete(base):
+                removed += 1
+        except Exception as e:
+            self._backend_error("invalidação", e)
+            return 0
+        self.invalidations += removed
+        return removed
+
+    def clear(self) -> int:
+        """Esvazia o namespace (as estatísticas são mantidas)."""
+        try:
+            return self.backend.delete_prefix(self.namespace + SEPARATOR)
+        except Exception as e:
+            self._backend_error("limpeza", e)
+            return 0
+
+    def keys(self, limit: int | None = None) -> list[str]:
+        """Chaves do namespace (sem o prefixo do namespace)."""
+        start = len(self.namespace) + len(SEPARATOR)
+        return [key[start:] for key in self.backend.keys(self.namespace + SEPARATOR, limit)]
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: float | None = None) -> Any:
+        """
+        Valor em cache ou carregado por loader() (uma carga por chave no processo).
+
+        Args:
+            key: Chave no namespace.
+            loader: Função chamada na ausência do valor.
+            ttl: Validade em segundos (padrão do namespace se None).
+        """
+        value = self.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        full_key = self.key(key)
+        with self._locks[hash(full_key) % LOCK_STRIPES]:
+            value = self._backend_get(full_key)
+            if value is not MISSING:
+                self.coalesced += 1
+                return value
+            value = loader()
+            self.loads += 1
+            self.set(key, value, ttl)
+            return value
+
+    async def aget_or_set(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float | None = None) -> Any:
+        """Versão assíncrona de get_or_set(): concorrentes aguardam a mesma carga."""
+        value = self.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        full_key = self.key(key)
+        inflight = self._inflight.get(full_key)
+        if inflight is not None and inflight.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await loader()
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # marca como consumida mesmo sem outros aguardando
+            raise
+        finally:
+            if self._inflight.get(full_key) is future:
+                del self._inflight[full_key]
+        self.loads += 1
+        self.set(key, value, ttl)
+        future.set_result(value)
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        """Contadores e taxa de acerto do namespace."""
+        lookups = self.hits + self.misses
+        try:
+            entries: int | None = self.backend.count(self.namespace + SEPARATOR)
+        except Exception:
+            entries = None
+        return {
+            "backend": self.backend.name,
+            "entradas": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "gravacoes": self.sets,
+            "cargas": self.loads,
+            "cargas_compartilhadas": self.coalesced,
+            "invalidacoes": self.invalidations,
+            "erros": self.errors,
+        }
+
+
+_CACHES: dict[str, Cache] = {}
+_shared_backend: CacheBackend | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_backend() -> CacheBackend | None:
+    """Backend compartilhado configurado em CACHE_BACKEND (None para memory)."""
+    global _shared_backend
+    if settings.cache_backend.lower() != "redis":
+        return None
+    with _shared_lock:
+        if _shared_backend is None:
+            _shared_backend = create_redis_backend(settings.cache_redis_url)
+            logger.info("Caches compartilhados via Redis")
+        return _shared_backend
+
+
+def get_cache(
+    namespace: str,
+    ttl: float | Callable[[], float],
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    local: bool = False,
+) -> Cache:
+    """
+    Retorna (criando na primeira chamada) o cache de um namespace.
+
+    Args:
+        namespace: Nome do namespace (também usado nas métricas).
+        ttl: Validade padrão em segundos, ou função que a retorna.
+        max_entries: Limite de entradas no backend em memória.
+        local: Sempre em memória, mesmo com CACHE_BACKEND=redis.
+    """
+    cache = _CACHES.get(namespace)
+    if cache is not None:
+        return cache
+    backend = None if local else shared_backend()
+    cache = Cache(namespace, backend or MemoryBackend(max_entries), ttl)
+    _CACHES[namespace] = cache
+    register_cache(namespace, lambda: (cache.hits, cache.misses))
+    return cache
+
+
+def registered_caches() -> dict[str, Cache]:
+    """Namespaces criados no processo, por nome."""
+    return dict(sorted(_CACHES.items()))
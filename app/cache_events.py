@@ -0,0 +1,211 @@
+"""
+Invalidação dos caches entre workers via LISTEN/NOTIFY do Postgres.
+
+As escritas chamam notify_invalidation(db, namespace, *chave) antes do
+commit: o pg_notify entra na mesma transação e só é entregue aos outros
+processos se ela for confirmada. Cada processo mantém um listener (iniciado
+no lifespan) em uma conexão dedicada, fora do pool, que aplica os eventos:
+
+- namespaces de app.cache ("semanas", "iterations", "pats"...):
+  invalidate(*chave) no cache do processo;
+- demais namespaces ("referencia", "projetos"): o handler registrado com
+  register_invalidation_handler().
+
+Eventos do próprio processo são ignorados (o cache local já foi invalidado
+pela escrita). Após uma reconexão os caches em memória do processo são
+esvaziados, já que notificações podem ter sido perdidas. Fora do Postgres
+(SQLite) tudo é no-op. Canal em CACHE_INVALIDATION_CHANNEL (vazio desativa).
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.cache import MemoryBackend, registered_caches
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Identifica os eventos emitidos por este processo
+ORIGIN = uuid.uuid4().hex
+
+# Sem notificações nesse intervalo, a conexão é testada (SELECT 1)
+KEEPALIVE_SECONDS = 30
+MAX_RECONNECT_DELAY_SECONDS = 60
+
+_HANDLERS: dict[str, Callable[..., Any]] = {}
+
+
+def register_invalidation_handler(namespace: str, handler: Callable[..., Any]) -> None:
+    """Registra a ação de um namespace que não é um cache de app.cache."""
+    _HANDLERS[namespace] = handler
+
+
+def notify_invalidation(db: Session, namespace: str, *key: Any) -> None:
+    """
+    Emite o evento de invalidação na transação da sessão (antes do commit).
+
+    Args:
+        db: Sessão da escrita.
+        namespace: Namespace do cache (ou de um handler registrado).
+        key: Partes iniciais das chaves a invalidar (nenhuma: o namespace todo).
+    """
+    channel = settings.cache_invalidation_channel
+    if not channel or db.get_bind().dialect.name != "postgresql":
+        return
+    payload = json.dumps({"o": ORIGIN, "ns": namespace, "k": [str(part) for part in key]})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def apply_invalidation(namespace: str, key: list[str]) -> bool:
+    """
+    Aplica um evento no processo.
+
+    Returns:
+        False se o namespace não é conhecido neste processo.
+    """
+    handler = _HANDLERS.get(namespace)
+    if handler is not None:
+        handler(*key)
+        return True
+    cache = registered_caches().get(namespace)
+    if cache is None:
+        return False
+    cache.invalidate(*key)
+    return True
+
+
+class CacheInvalidationListener:
+    """LISTEN no canal de invalidação, em uma task por processo."""
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self.connected = False
+        self.received = 0
+        self.applied = 0
+        self.ignored = 0
+        self.reconnects = 0
+
+    def handle(self, payload: str) -> bool:
+        """
+        Processa o payload de uma notificação.
+
+        Returns:
+            True se o evento foi aplicado.
+        """
+        self.received += 1
+        try:
+            event = json.loads(payload)
+            if event.get("o") == ORIGIN:
+                self.ignored += 1
+                return False
+            applied = apply_invalidation(event["ns"], event.get("k", []))
+        except Exception as e:
+            logger.warning(f"Evento de invalidação de cache ignorado ({payload[:200]}): {e}")
+            return False
+        if applied:
+            self.applied += 1
+        return applied
+
+    def flush_local(self) -> None:
+        """Esvazia os caches em memória e aciona os handlers (após reconexão)."""
+        for handler in _HANDLERS.values():
+            handler()
+        for cache in registered_caches().values():
+            # Backends compartilhados já recebem as invalidações diretamente
+            if isinstance(cache.backend, MemoryBackend):
+                cache.clear()
+
+    def _connect(self, engine: Engine, channel: str):
+        """Conexão DBAPI dedicada (fora do pool) em autocommit, já com LISTEN."""
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        conn = engine.dialect.loaded_dbapi.connect(*cargs, **cparams)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{channel}"')
+        return conn
+
+    async def _listen(self, conn) -> None:
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        loop.add_reader(conn.fileno(), readable.set)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(readable.wait(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                readable.clear()
+                conn.poll()
+                while conn.notifies:
+                    self.handle(conn.notifies.pop(0).payload)
+        finally:
+            loop.remove_reader(conn.fileno())
+
+    async def _loop(self, engine: Engine, channel: str) -> None:
+        delay = 1
+        first = True
+        while True:
+            try:
+                conn = await asyncio.to_thread(self._connect, engine, channel)
+            except Exception as e:
+                logger.warning(f"Listener de invalidação de cache sem conexão: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+                continue
+            if not first:
+                self.reconnects += 1
+                self.flush_local()
+            first = False
+            delay = 1
+            self.connected = True
+            try:
+                await self._listen(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Listener de invalidação de cache desconectado: {e}")
+            finally:
+                self.connected = False
+                conn.close()
+
+    def start(self, engine: Engine) -> None:
+        """Inicia o listener (no lifespan da aplicação); no-op fora do Postgres."""
+        channel = settings.cache_invalidation_channel
+        if not channel or engine.dialect.name != "postgresql":
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(engine, channel))
+            logger.info(f"Invalidação de cache entre workers no canal {channel}")
+
+    async def stop(self) -> None:
+        """Interrompe o listener."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "canal": settings.cache_invalidation_channel or None,
+            "conectado": self.connected,
+            "recebidos": self.received,
+            "aplicados": self.applied,
+            "proprios": self.ignored,
+            "reconexoes": self.reconnects,
+        }
+
+
+# Instância única por processo
+cache_invalidation_listener = CacheInvalidationListener()
@@ -62,6 +62,12 @@ class Settings(BaseSettings):
     azure_devops_org_pats: str = Field(
         "", validation_alias=AliasChoices("AZURE_DEVOPS_ORG_PATS", "azure_devops_org_pats")
     )
+
+    # Testes de carga: envia as chamadas ao Azure DevOps para um servidor local
+    # (ex: http://127.0.0.1:9000, ver loadtest/). Ignorado em produção
+    azure_devops_redirect_url: str = Field(
+        "", validation_alias=AliasChoices("AZURE_DEVOPS_REDIRECT_URL", "azure_devops_redirect_url")
+    )
     
     # Secret da extensão Azure DevOps (para validar App Tokens JWT)
     # Obter em: https://aka.ms/vsmarketplace-manage > Botão direito > Certificate
@@ -84,6 +90,165 @@ class Settings(BaseSettings):
         "560de67c-a2e8-408a-86ae-be7ea6bd0b7a",  # App ID da extensão
         validation_alias=AliasChoices("AZURE_EXTENSION_APP_ID", "azure_extension_app_id")
     )
+
+    # Sincronização de projetos: organizações buscadas em paralelo e
+    # tamanho da página ($top) da API de projetos do Azure DevOps
+    project_sync_concurrency: int = Field(
+        4, validation_alias=AliasChoices("PROJECT_SYNC_CONCURRENCY", "project_sync_concurrency")
+    )
+    project_sync_page_size: int = Field(
+        100, validation_alias=AliasChoices("PROJECT_SYNC_PAGE_SIZE", "project_sync_page_size")
+    )
+    # Intervalo da sincronização automática em segundos (0 desativa)
+    project_sync_interval_seconds: int = Field(
+        1800, validation_alias=AliasChoices("PROJECT_SYNC_INTERVAL_SECONDS", "project_sync_interval_seconds")
+    )
+    # Idade máxima dos projetos locais antes de sincronizar/consultar o Azure na leitura
+    project_sync_max_staleness_seconds: int = Field(
+        21600, validation_alias=AliasChoices("PROJECT_SYNC_MAX_STALENESS_SECONDS", "project_sync_max_staleness_seconds")
+    )
+
+    # Service hooks do Azure DevOps (POST /api/v1/hooks/azure-devops).
+    # Segredo enviado pela assinatura no header X-Webhook-Secret ou como senha
+    # da autenticação básica. Vazio desativa o endpoint e o espelho de work items.
+    azure_devops_webhook_secret: str = Field(
+        "", validation_alias=AliasChoices("AZURE_DEVOPS_WEBHOOK_SECRET", "azure_devops_webhook_secret")
+    )
+    # Idade máxima da última carga completa do espelho de um projeto para que
+    # o timesheet seja montado a partir dele
+    work_item_mirror_max_age_seconds: int = Field(
+        86400, validation_alias=AliasChoices("WORK_ITEM_MIRROR_MAX_AGE_SECONDS", "work_item_mirror_max_age_seconds")
+    )
+    # Poller incremental do espelho (APIs de reporting do Azure DevOps), para
+    # organizações que os service hooks não alcançam. Intervalo em segundos
+    # (0 desativa) e tamanho da página das APIs de reporting.
+    work_item_poll_interval_seconds: int = Field(
+        0, validation_alias=AliasChoices("WORK_ITEM_POLL_INTERVAL_SECONDS", "work_item_poll_interval_seconds")
+    )
+    work_item_poll_page_size: int = Field(
+        1000, validation_alias=AliasChoices("WORK_ITEM_POLL_PAGE_SIZE", "work_item_poll_page_size")
+    )
+    # Validade do cache de ancestrais usado pelo "show parents" do timesheet
+    work_item_ancestor_ttl_seconds: int = Field(
+        86400, validation_alias=AliasChoices("WORK_ITEM_ANCESTOR_TTL_SECONDS", "work_item_ancestor_ttl_seconds")
+    )
+
+    # Caches do timesheet (0 desativa): apontamentos da semana (invalidados
+    # pelas escritas do processo) e work items de iterations
+    timesheet_week_cache_ttl_seconds: int = Field(
+        120, validation_alias=AliasChoices("TIMESHEET_WEEK_CACHE_TTL_SECONDS", "timesheet_week_cache_ttl_seconds")
+    )
+    timesheet_iteration_cache_ttl_seconds: int = Field(
+        900, validation_alias=AliasChoices("TIMESHEET_ITERATION_CACHE_TTL_SECONDS", "timesheet_iteration_cache_ttl_seconds")
+    )
+    # Backend dos caches (app/cache.py): "memory" (LRU por processo) ou
+    # "redis" (servidor compatível com Redis, compartilhado entre workers)
+    cache_backend: str = Field(
+        "memory", validation_alias=AliasChoices("CACHE_BACKEND", "cache_backend")
+    )
+    cache_redis_url: str = Field(
+        "redis://localhost:6379/0", validation_alias=AliasChoices("CACHE_REDIS_URL", "cache_redis_url")
+    )
+    # Validade do PAT resolvido por organização (cache sempre local ao
+    # processo) e dos ícones dos tipos de work item
+    pat_cache_ttl_seconds: int = Field(
+        300, validation_alias=AliasChoices("PAT_CACHE_TTL_SECONDS", "pat_cache_ttl_seconds")
+    )
+    work_item_icon_cache_ttl_seconds: int = Field(
+        86400, validation_alias=AliasChoices("WORK_ITEM_ICON_CACHE_TTL_SECONDS", "work_item_icon_cache_ttl_seconds")
+    )
+    # Canal do LISTEN/NOTIFY (Postgres) que propaga as invalidações de cache
+    # entre os workers (vazio desativa)
+    cache_invalidation_channel: str = Field(
+        "aponta_cache", validation_alias=AliasChoices("CACHE_INVALIDATION_CHANNEL", "cache_invalidation_channel")
+    )
+    # Header Idempotency-Key nas escritas de apontamentos: validade da resposta
+    # gravada (0 desativa) e espera máxima de uma repetição enquanto a
+    # requisição original ainda executa
+    idempotency_ttl_seconds: int = Field(
+        86400, validation_alias=AliasChoices("IDEMPOTENCY_TTL_SECONDS", "idempotency_ttl_seconds")
+    )
+    idempotency_wait_seconds: float = Field(
+        10.0, validation_alias=AliasChoices("IDEMPOTENCY_WAIT_SECONDS", "idempotency_wait_seconds")
+    )
+    # Endpoint GET /metrics (Prometheus). Vazio: habilitado fora de produção
+    metrics_enabled: bool | None = Field(
+        None, validation_alias=AliasChoices("METRICS_ENABLED", "metrics_enabled")
+    )
+    # Tracing (OpenTelemetry): "" desativa, "console" (stdout) ou "file"
+    # (JSON Lines OTLP em TRACING_FILE)
+    tracing_exporter: str = Field(
+        "", validation_alias=AliasChoices("TRACING_EXPORTER", "tracing_exporter")
+    )
+    tracing_file: str = Field(
+        "traces.jsonl", validation_alias=AliasChoices("TRACING_FILE", "tracing_file")
+    )
+    # Contagem de SQL por requisição: headers X-DB-* (vazio: fora de produção)
+    # e warning acima do orçamento ou com o mesmo comando repetido (0 desliga)
+    query_stats_headers: bool | None = Field(
+        None, validation_alias=AliasChoices("QUERY_STATS_HEADERS", "query_stats_headers")
+    )
+    query_budget_per_request: int = Field(
+        50, validation_alias=AliasChoices("QUERY_BUDGET_PER_REQUEST", "query_budget_per_request")
+    )
+    query_repeat_threshold: int = Field(
+        10, validation_alias=AliasChoices("QUERY_REPEAT_THRESHOLD", "query_repeat_threshold")
+    )
+
+    # Compatibilidade: mantém o Data URI do ícone em cada work item do timesheet
+    # (icon_url) além do dicionário types. Desligar após a migração do frontend;
+    # o parâmetro include_icon_url da requisição tem precedência.
+    timesheet_include_icon_url: bool = Field(
+        True, validation_alias=AliasChoices("TIMESHEET_INCLUDE_ICON_URL", "timesheet_include_icon_url")
+    )
+    # Aquecimento: prefetch das semanas anterior/seguinte após cada timesheet,
+    # limitado por minuto no processo (0 desativa)
+    timesheet_prefetch_max_per_minute: int = Field(
+        60, validation_alias=AliasChoices("TIMESHEET_PREFETCH_MAX_PER_MINUTE", "timesheet_prefetch_max_per_minute")
+    )
+    # Aquecimento das iterations atuais dos times ativos em dias úteis no
+    # horário HH:MM (hora local do servidor; vazio desativa), limitado a
+    # TIMESHEET_WARM_MAX_ITERATIONS por execução. Times ativos são os dos
+    # projetos com apontamentos nos últimos TIMESHEET_WARM_ACTIVE_DAYS dias.
+    timesheet_warm_time: str = Field(
+        "", validation_alias=AliasChoices("TIMESHEET_WARM_TIME", "timesheet_warm_time")
+    )
+    timesheet_warm_max_iterations: int = Field(
+        50, validation_alias=AliasChoices("TIMESHEET_WARM_MAX_ITERATIONS", "timesheet_warm_max_iterations")
+    )
+    timesheet_warm_active_days: int = Field(
+        14, validation_alias=AliasChoices("TIMESHEET_WARM_ACTIVE_DAYS", "timesheet_warm_active_days")
+    )
+    # Reconciliação diária do CompletedWork no Azure DevOps com os totais
+    # locais, no horário HH:MM (hora local do servidor; vazio desativa).
+    # Considera os work items com apontamentos alterados nos últimos
+    # RECONCILIATION_LOOKBACK_DAYS dias (0: todos). Por organização, no
+    # máximo RECONCILIATION_MAX_REQUESTS_PER_SECOND chamadas ao Azure por
+    # segundo e RECONCILIATION_CONCURRENCY atualizações simultâneas.
+    # RECONCILIATION_DRY_RUN apenas registra as divergências.
+    reconciliation_time: str = Field(
+        "", validation_alias=AliasChoices("RECONCILIATION_TIME", "reconciliation_time")
+    )
+    reconciliation_lookback_days: int = Field(
+        90, validation_alias=AliasChoices("RECONCILIATION_LOOKBACK_DAYS", "reconciliation_lookback_days")
+    )
+    reconciliation_max_requests_per_second: float = Field(
+        5.0,
+        validation_alias=AliasChoices(
+            "RECONCILIATION_MAX_REQUESTS_PER_SECOND", "reconciliation_max_requests_per_second"
+        ),
+    )
+    reconciliation_concurrency: int = Field(
+        4, validation_alias=AliasChoices("RECONCILIATION_CONCURRENCY", "reconciliation_concurrency")
+    )
+    reconciliation_dry_run: bool = Field(
+        False, validation_alias=AliasChoices("RECONCILIATION_DRY_RUN", "reconciliation_dry_run")
+    )
+    # Intervalo em segundos da atualização do rollup horas_diarias em segundo
+    # plano (0 desativa; o relatório serve o rollup como estiver)
+    horas_rollup_interval_seconds: int = Field(
+        60, validation_alias=AliasChoices("HORAS_ROLLUP_INTERVAL_SECONDS", "horas_rollup_interval_seconds")
+    )
     
     def get_pat_for_org(self, org_name: str) -> str:
         """Retorna o PAT para uma organização específica."""
@@ -5,25 +5,39 @@ Configuração do banco de dados PostgreSQL com SQLAlchemy.
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import get_settings
+from app.metrics import TimedQueuePool, instrument_engine
+from app.query_stats import instrument_engine as instrument_engine_query_stats
+from app.tracing import instrument_engine as instrument_engine_tracing
 
 settings = get_settings()
 
 # Engine de conexão
-# Adicionamos search_path para garantir que o schema correto seja o padrão da conexão
-engine = create_engine(
-    settings.database_url_resolved,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    connect_args={"options": f"-c search_path=\"{settings.database_schema}\""},
-)
+if settings.database_url_resolved.startswith("sqlite"):
+    # SQLite (testes de carga locais, ver loadtest/): sem schema nem pool com tamanho
+    engine = create_engine(
+        settings.database_url_resolved,
+        connect_args={"check_same_thread": False},
+    )
+else:
+    # Adicionamos search_path para garantir que o schema correto seja o padrão da conexão
+    engine = create_engine(
+        settings.database_url_resolved,
+        poolclass=TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=10,
+        connect_args={"options": f"-c search_path=\"{settings.database_schema}\""},
+    )
+instrument_engine(engine)
+instrument_engine_query_stats(engine)
+instrument_engine_tracing(engine)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base para os modelos
 Base = declarative_base()
-Base.metadata.schema = settings.database_schema
+Base.metadata.schema = settings.database_schema or None
 
 
 def get_db():
@@ -36,3 +50,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    Dependency que fornece a fábrica de sessões.
+
+    Usada por respostas em streaming, que continuam lendo do banco depois
+    que as dependências com `yield` (como get_db) já foram finalizadas e
+    por isso precisam abrir e fechar a própria sessão.
+    """
+    return SessionLocal
@@ -0,0 +1,218 @@
+"""
+Chaves de idempotência (header Idempotency-Key) nas escritas de apontamentos.
+
+A extensão repete a requisição em timeouts, e as escritas de apontamentos
+aguardam chamadas lentas ao Azure DevOps: sem proteção, a repetição cria um
+apontamento duplicado e recalcula o work item de novo. Com o header
+Idempotency-Key, POST/PUT/PATCH/DELETE em /api/v1/apontamentos (e nas rotas
+abaixo dele) executam uma única vez por chave:
+
+- a primeira requisição reserva a chave (Cache.add no namespace
+  "idempotencia") e, ao terminar, grava status, headers e corpo da resposta
+  com o hash da requisição por IDEMPOTENCY_TTL_SECONDS;
+- repetições com a mesma chave e a mesma requisição recebem a resposta
+  gravada (header Idempotent-Replayed: true) sem acessar o banco nem o Azure;
+- repetições enquanto a original ainda executa aguardam o resultado por até
+  IDEMPOTENCY_WAIT_SECONDS (depois, 409);
+- a mesma chave com outra requisição (método, caminho ou corpo) recebe 422.
+
+A resposta gravada é repetida antes da autenticação da rota, por isso a
+chave vale por chamador: o cache e o hash incluem um hash do header
+Authorization. A mesma chave com outro token (ou sem token) executa de novo,
+sem acesso à resposta gravada para o token original.
+
+Respostas 5xx (e exceções) não são gravadas: a chave é liberada para uma nova
+tentativa. Com CACHE_BACKEND=redis as chaves valem entre os workers; em
+memória, apenas no processo. As chamadas ao cache rodam em threads
+(asyncio.to_thread), pois no Redis são I/O bloqueante.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import get_cache
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+HEADER = b"idempotency-key"
+AUTHORIZATION_HEADER = b"authorization"
+REPLAY_HEADER = b"idempotent-replayed"
+METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+PATH_PREFIXES = ("/api/v1/apontamentos",)
+MAX_KEY_LENGTH = 255
+
+# Validade da reserva: libera a chave se o processo morrer no meio da requisição
+LOCK_SECONDS = 120
+POLL_INTERVAL_SECONDS = 0.1
+
+PENDING = "pendente"
+DONE = "concluida"
+
+ERRORS = {
+    409: "Requisição com esta Idempotency-Key ainda em andamento",
+    422: "Idempotency-Key já usada com outra requisição",
+}
+
+idempotency_cache = get_cache("idempotencia", lambda: settings.idempotency_ttl_seconds)
+
+
+def caller_hash(scope: Scope) -> str:
+    """Hash do header Authorization: escopo da chave por chamador."""
+    authorization = next((value for name, value in scope["headers"] if name == AUTHORIZATION_HEADER), b"")
+    return hashlib.sha256(authorization).hexdigest()
+
+
+def request_hash(method: str, path: str, query: bytes, body: bytes, caller: str = "") -> str:
+    """Hash da requisição guardado com a chave (detecta reuso com outro conteúdo)."""
+    digest = hashlib.sha256()
+    for part in (caller.encode(), method.encode(), path.encode(), query, body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def _json_response(send: Send, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _release(key: tuple[str, str]) -> None:
+    """Libera a chave para uma nova tentativa (falhas do backend são registradas pelo Cache)."""
+    await asyncio.to_thread(idempotency_cache.delete, key)
+
+
+async def _replay(send: Send, record: dict[str, Any]) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": record["status"],
+            "headers": [*record["headers"], (REPLAY_HEADER, b"true")],
+        }
+    )
+    await send({"type": "http.response.body", "body": record["body"]})
+
+
+class IdempotencyMiddleware:
+    """Middleware ASGI que aplica o Idempotency-Key às rotas de PATH_PREFIXES."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def _reserve(self, key: tuple[str, str], fingerprint: str) -> dict[str, Any] | int | None:
+        """
+        Reserva a chave ou aguarda a requisição que a reservou.
+
+        Returns:
+            None se a reserva é desta requisição, o registro concluído a
+            repetir, ou o status de erro (409 ou 422).
+        """
+        deadline = time.monotonic() + settings.idempotency_wait_seconds
+        while True:
+            pending = {"estado": PENDING, "hash": fingerprint}
+            if await asyncio.to_thread(idempotency_cache.add, key, pending, ttl=LOCK_SECONDS):
+                return None
+            record = await asyncio.to_thread(idempotency_cache.get, key)
+            if record is None:
+                continue  # expirou entre o add e o get
+            if record["hash"] != fingerprint:
+                return 422
+            if record["estado"] == DONE:
+                return record
+            if time.monotonic() >= deadline:
+                return 409
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in METHODS
+            or not scope["path"].startswith(PATH_PREFIXES)
+            or settings.idempotency_ttl_seconds <= 0
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = next((value.decode("latin-1") for name, value in scope["headers"] if name == HEADER), "")
+        if not key:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            await _json_response(send, 400, f"Idempotency-Key deve ter no máximo {MAX_KEY_LENGTH} caracteres")
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        caller = caller_hash(scope)
+        fingerprint = request_hash(scope["method"], scope["path"], scope.get("query_string", b""), body, caller)
+        cache_key = (caller, key)
+
+        reserved = await self._reserve(cache_key, fingerprint)
+        if isinstance(reserved, int):
+            await _json_response(send, reserved, ERRORS[reserved])
+            return
+        if reserved is not None:
+            logger.info(f"Idempotency-Key repetida: {scope['method']} {scope['path']} (status {reserved['status']})")
+            await _replay(send, reserved)
+            return
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response: dict[str, Any] = {"status": 500, "headers": [], "body": []}
+
+        async def capture_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await _release(cache_key)
+            raise
+
+        if response["status"] >= 500:
+            await _release(cache_key)
+            return
+        await asyncio.to_thread(
+            idempotency_cache.set,
+            cache_key,
+            {
+                "estado": DONE,
+                "hash": fingerprint,
+                "status": response["status"],
+                "headers": response["headers"],
+                "body": b"".join(response["body"]),
+            },
+        )
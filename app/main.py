@@ -6,13 +6,30 @@ Aplicação FastAPI com documentação Swagger automática.
 
 import logging
 import traceback
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from contextlib import asynccontextmanager
 from app.config import get_settings
-from app.routers import atividades, apontamentos, integracao, projetos, user, work_items, timesheet, organization_pats, iterations
+from app.routers import atividades, apontamentos, integracao, projetos, user, work_items, timesheet, organization_pats, iterations, relatorios, hooks, cache, jobs, reconciliacao
+from app.cache_events import cache_invalidation_listener
+from app.database import engine
+from app.metrics import REGISTRY, MetricsMiddleware, instrument_httpx, metrics_enabled
+from app.idempotency import IdempotencyMiddleware
+from app.query_stats import QueryStatsMiddleware
+from app.services.job_scheduler import job_scheduler
 from app.services.seed import ensure_seed_data
+from app.services.project_sync_scheduler import project_sync_scheduler
+from app.services.reconciliacao_service import reconciliacao_scheduler
+from app.services.relatorio_service import rollup_scheduler
+from app.services.work_item_mirror import mirror_loads
+from app.services.timesheet_warmer import timesheet_warmer
+from app.services.work_item_poller import work_item_poller
+from app.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from app.tracing import instrument_httpx as instrument_httpx_tracing
+from app.utils.azure_redirect import install_azure_redirect
+from app.utils.schema_cache import warm_schema_cache
 
 # Configurar logging
 logging.basicConfig(
@@ -26,9 +43,27 @@ settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: as migrações são executadas pelo scripts/start.sh
+    # Startup: as migrações são executadas pelo scripts/start.sh, então o
+    # schema já está na versão final e pode ser introspectado uma única vez
+    configure_tracing()
+    warm_schema_cache(engine, settings.database_schema or None)
     ensure_seed_data()
+    cache_invalidation_listener.start(engine)
+    project_sync_scheduler.start()
+    work_item_poller.start()
+    timesheet_warmer.start()
+    reconciliacao_scheduler.start()
+    rollup_scheduler.start()
     yield
+    await project_sync_scheduler.stop()
+    await work_item_poller.stop()
+    await timesheet_warmer.stop()
+    await reconciliacao_scheduler.stop()
+    await rollup_scheduler.stop()
+    await job_scheduler.stop()
+    await mirror_loads.stop()
+    await cache_invalidation_listener.stop()
+    shutdown_tracing()
 
 
 __version__ = "0.1.0"
@@ -71,6 +106,10 @@ async def global_exception_handler(request: Request, exc: Exception):
         },
     )
 
+# Idempotency-Key nas escritas de apontamentos (dentro do CORS: as respostas
+# repetidas também recebem os headers CORS)
+app.add_middleware(IdempotencyMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -80,6 +119,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas (latência por rota e chamadas ao Azure DevOps)
+app.add_middleware(MetricsMiddleware)
+instrument_httpx()
+
+# Comandos SQL por requisição (headers X-DB-* e alerta de N+1)
+app.add_middleware(QueryStatsMiddleware)
+
+# Tracing (spans de requisições, chamadas HTTP e SQL; ver app/tracing.py)
+app.add_middleware(TracingMiddleware)
+instrument_httpx_tracing()
+
+# Testes de carga com o Azure DevOps simulado (AZURE_DEVOPS_REDIRECT_URL)
+install_azure_redirect()
+
 # Registrar routers
 app.include_router(atividades.router, prefix="/api/v1")
 
@@ -99,6 +152,16 @@ app.include_router(organization_pats.router, prefix="/api/v1")
 
 app.include_router(iterations.router, prefix="/api/v1")
 
+app.include_router(relatorios.router, prefix="/api/v1")
+
+app.include_router(hooks.router, prefix="/api/v1")
+
+app.include_router(cache.router, prefix="/api/v1")
+
+app.include_router(jobs.router, prefix="/api/v1")
+
+app.include_router(reconciliacao.router, prefix="/api/v1")
+
 
 @app.get(
     "/",
@@ -117,6 +180,14 @@ def health_check():
     }
 
 
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics():
+    """Métricas Prometheus do processo (desabilitado em produção por padrão)."""
+    if not metrics_enabled():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get(
     "/api/v1", tags=["Health"], summary="API Info", description="Informações da API."
 )
@@ -0,0 +1,225 @@
+"""
+Métricas Prometheus do processo, expostas em GET /metrics.
+
+- aponta_http_request_duration_seconds{method, route, status}: latência por
+  template de rota (ex: /api/v1/apontamentos/{apontamento_id})
+- aponta_azure_requests_total / aponta_azure_request_duration_seconds
+  {org, endpoint, status}: chamadas ao Azure DevOps por família de endpoint
+- aponta_db_pool_*: checkouts, conexões em uso/overflow e tempo para obter
+  uma conexão do pool do engine de app/database.py
+- aponta_cache_hits_total / aponta_cache_misses_total{cache}: todos os
+  caches registrados em app/utils/cache_stats
+
+O endpoint fica habilitado fora de produção; METRICS_ENABLED força o valor.
+As métricas são por processo (cada worker do uvicorn expõe as suas).
+"""
+
+import time
+from typing import Iterable
+from urllib.parse import urlsplit
+
+import httpx
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.utils.cache_stats import cache_counters
+
+settings = get_settings()
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "aponta_http_request_duration_seconds",
+    "Latência das requisições HTTP por template de rota",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+AZURE_REQUESTS = Counter(
+    "aponta_azure_requests_total",
+    "Chamadas ao Azure DevOps",
+    ["org", "endpoint", "status"],
+    registry=REGISTRY,
+)
+AZURE_REQUEST_DURATION = Histogram(
+    "aponta_azure_request_duration_seconds",
+    "Latência das chamadas ao Azure DevOps",
+    ["org", "endpoint"],
+    registry=REGISTRY,
+)
+DB_POOL_CHECKOUTS = Counter(
+    "aponta_db_pool_checkouts_total",
+    "Conexões retiradas do pool",
+    registry=REGISTRY,
+)
+DB_POOL_CONNECT_DURATION = Histogram(
+    "aponta_db_pool_connect_duration_seconds",
+    "Tempo para obter uma conexão do pool (espera por vaga e abertura de conexões novas)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    registry=REGISTRY,
+)
+
+# Famílias de endpoint do Azure DevOps (primeiro trecho do path que casar)
+AZURE_ENDPOINT_FAMILIES = (
+    ("/wit/wiql", "wiql"),
+    ("workitemicons", "icons"),
+    ("/teamsettings/iterations", "iterations"),
+    ("/classificationnodes/iterations", "iterations"),
+    ("/wit/workitems", "workitems"),
+    ("/wit/reporting/", "workitems"),
+    ("/profile/", "profile"),
+    ("/connectiondata", "profile"),
+    ("/_apis/projects", "projects"),
+)
+
+
+def metrics_enabled() -> bool:
+    """Indica se /metrics está habilitado (padrão: fora de produção)."""
+    if settings.metrics_enabled is not None:
+        return settings.metrics_enabled
+    return settings.environment.lower() != "production"
+
+
+def azure_labels(url: httpx.URL | str) -> tuple[str, str] | None:
+    """
+    Organização e família de endpoint de uma URL do Azure DevOps.
+
+    Returns:
+        Tupla (org, endpoint) ou None se a URL não for do Azure DevOps.
+    """
+    parts = urlsplit(str(url))
+    host = (parts.hostname or "").lower()
+    segments = [s for s in parts.path.split("/") if s]
+    if host == "dev.azure.com" or host.endswith(".dev.azure.com"):
+        org = segments[0] if segments else ""
+    elif host.endswith(".visualstudio.com"):
+        org = host.split(".", 1)[0]
+    else:
+        return None
+
+    path = parts.path.lower()
+    for fragment, family in AZURE_ENDPOINT_FAMILIES:
+        if fragment in path:
+            return org, family
+    return org, "other"
+
+
+def instrument_httpx() -> None:
+    """
+    Mede as chamadas de todos os httpx.AsyncClient ao Azure DevOps.
+
+    Os clientes são criados em vários serviços, então a medição é feita em
+    AsyncClient.send (uma única vez por processo).
+    """
+    if getattr(httpx.AsyncClient.send, "_aponta_metrics", False):
+        return
+    original_send = httpx.AsyncClient.send
+
+    async def send(self, request: httpx.Request, *args, **kwargs) -> httpx.Response:
+        labels = azure_labels(request.url)
+        if labels is None:
+            return await original_send(self, request, *args, **kwargs)
+        start = time.perf_counter()
+        status = "erro"
+        try:
+            response = await original_send(self, request, *args, **kwargs)
+            status = str(response.status_code)
+            return response
+        finally:
+            AZURE_REQUEST_DURATION.labels(*labels).observe(time.perf_counter() - start)
+            AZURE_REQUESTS.labels(*labels, status).inc()
+
+    send._aponta_metrics = True  # type: ignore[attr-defined]
+    httpx.AsyncClient.send = send  # type: ignore[method-assign]
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mede o tempo para entregar cada conexão."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CONNECT_DURATION.observe(time.perf_counter() - start)
+
+
+class _PoolCollector:
+    """Estado do pool lido no momento da coleta."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        for name, doc, value in (
+            ("aponta_db_pool_size", "Tamanho configurado do pool", pool.size()),
+            ("aponta_db_pool_checked_out", "Conexões em uso", pool.checkedout()),
+            ("aponta_db_pool_overflow", "Conexões além do tamanho do pool", max(pool.overflow(), 0)),
+        ):
+            yield GaugeMetricFamily(name, doc, value=value)
+
+    def describe(self) -> Iterable[GaugeMetricFamily]:
+        return []
+
+
+class _CacheCollector:
+    """Contadores dos caches registrados em app/utils/cache_stats."""
+
+    def collect(self) -> Iterable[CounterMetricFamily]:
+        hits = CounterMetricFamily("aponta_cache_hits", "Acertos do cache", labels=["cache"])
+        misses = CounterMetricFamily("aponta_cache_misses", "Faltas do cache", labels=["cache"])
+        for name, (cache_hits, cache_misses) in cache_counters().items():
+            hits.add_metric([name], cache_hits)
+            misses.add_metric([name], cache_misses)
+        yield hits
+        yield misses
+
+    def describe(self) -> Iterable[CounterMetricFamily]:
+        return []
+
+
+REGISTRY.register(_CacheCollector())
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra checkouts e o estado do pool do engine."""
+    event.listen(engine, "checkout", lambda *args: DB_POOL_CHECKOUTS.inc())
+    REGISTRY.register(_PoolCollector(engine))
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede a latência por template de rota."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not metrics_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # O roteador grava a rota encontrada no scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "nao_mapeada"
+            HTTP_REQUEST_DURATION.labels(scope["method"], template, str(status_code)).observe(
+                time.perf_counter() - start
+            )
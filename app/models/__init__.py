@@ -2,5 +2,23 @@ from .atividade import Atividade
 from .projeto import Projeto
 from .atividade_projeto import AtividadeProjeto
 from .organization_pat import OrganizationPat
+from .horas_diarias import HorasDiarias, HorasDiariasPendencia, RollupWatermark
+from .work_item import WorkItem, WorkItemMirrorStatus
+from .background_job import BackgroundJob
+from .reconciliacao import ReconciliacaoExecucao, ReconciliacaoItem, ReconciliacaoPendencia
 
-__all__ = ["Atividade", "Projeto", "AtividadeProjeto", "OrganizationPat"]
+__all__ = [
+    "Atividade",
+    "Projeto",
+    "AtividadeProjeto",
+    "OrganizationPat",
+    "HorasDiarias",
+    "HorasDiariasPendencia",
+    "RollupWatermark",
+    "WorkItem",
+    "WorkItemMirrorStatus",
+    "BackgroundJob",
+    "ReconciliacaoExecucao",
+    "ReconciliacaoItem",
+    "ReconciliacaoPendencia",
+]
@@ -5,7 +5,7 @@ Modelo SQLAlchemy para a entidade Apontamento (Registro de Horas).
 import uuid
 import re
 from datetime import datetime, date
-from sqlalchemy import Column, String, DateTime, Date, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Date, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.custom_types import GUID
 from app.database import Base
@@ -102,6 +102,22 @@ class Apontamento(Base):
     # Relacionamento com Atividade
     atividade = relationship("Atividade", lazy="joined")
 
+    __table_args__ = (
+        # Índices da paginação por cursor (data_apontamento, criado_em, id)
+        Index("ix_apontamentos_keyset", "data_apontamento", "criado_em", "id"),
+        Index(
+            "ix_apontamentos_work_item_keyset",
+            "work_item_id",
+            "organization_name",
+            "project_id",
+            "data_apontamento",
+            "criado_em",
+            "id",
+        ),
+        # Refresh incremental do rollup de horas (horas_diarias)
+        Index("ix_apontamentos_atualizado_em", "atualizado_em"),
+    )
+
     @property
     def duracao_horas(self) -> float:
         """Retorna a duracao em horas decimais (ex: 1.5 para 01:30)."""
@@ -4,7 +4,7 @@ Modelo SQLAlchemy para a entidade Atividade.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Boolean, DateTime
+from sqlalchemy import Column, String, Text, Boolean, DateTime, Index
 from app.models.custom_types import GUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -30,6 +30,11 @@ class Atividade(Base):
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
+    __table_args__ = (
+        # Índice da paginação por cursor (criado_em, id)
+        Index("ix_atividades_keyset", "criado_em", "id"),
+    )
+
     # Relacionamento N:N com projetos através da tabela de junção
     atividade_projetos = relationship(
         "AtividadeProjeto",
@@ -0,0 +1,28 @@
+"""
+Modelo SQLAlchemy do estado dos jobs em segundo plano.
+
+Uma linha por job (ver app/services/job_scheduler.py), atualizada pela
+réplica que executou a última rodada: é o estado compartilhado entre as
+réplicas da API.
+"""
+
+from sqlalchemy import Column, String, DateTime, Integer, Text
+from app.database import Base
+
+
+class BackgroundJob(Base):
+    """Última execução de um job em segundo plano."""
+
+    __tablename__ = "background_jobs"
+
+    nome = Column(String(100), primary_key=True)
+    holder = Column(String(255), nullable=True, comment="Réplica (host:pid) que executou a última rodada")
+    status = Column(String(20), nullable=True, comment="executando, sucesso ou erro")
+    ultimo_inicio = Column(DateTime, nullable=True)
+    ultimo_fim = Column(DateTime, nullable=True)
+    ultima_duracao_ms = Column(Integer, nullable=True)
+    ultimo_erro = Column(Text, nullable=True)
+    execucoes = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<BackgroundJob(nome={self.nome}, status={self.status}, holder={self.holder})>"
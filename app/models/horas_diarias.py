@@ -0,0 +1,58 @@
+"""
+Modelos SQLAlchemy do rollup de horas para relatórios.
+
+`horas_diarias` guarda o total de horas por (organização, projeto, usuário,
+atividade, dia) e é atualizada incrementalmente a partir de `apontamentos`.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Date, Integer
+from app.models.custom_types import GUID
+from app.database import Base
+
+
+class HorasDiarias(Base):
+    """Total de horas apontadas por usuário, projeto, atividade e dia."""
+
+    __tablename__ = "horas_diarias"
+
+    organization_name = Column(String(255), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    project_id = Column(String(255), primary_key=True)
+    usuario_id = Column(String(255), primary_key=True)
+    id_atividade = Column(GUID(), primary_key=True)
+
+    usuario_nome = Column(String(255), nullable=True)
+    total_minutos = Column(Integer, nullable=False, default=0)
+    total_apontamentos = Column(Integer, nullable=False, default=0)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<HorasDiarias(org={self.organization_name}, dia={self.dia}, "
+            f"usuario={self.usuario_id}, minutos={self.total_minutos})>"
+        )
+
+
+class HorasDiariasPendencia(Base):
+    """
+    Partições (organização, dia) que precisam ser recalculadas.
+
+    Registradas ao alterar ou excluir um apontamento, pois a chave antiga
+    (ou a linha excluída) não aparece mais na busca por `atualizado_em`.
+    """
+
+    __tablename__ = "horas_diarias_pendencias"
+
+    organization_name = Column(String(255), primary_key=True)
+    dia = Column(Date, primary_key=True)
+
+
+class RollupWatermark(Base):
+    """Último `atualizado_em` processado por cada rollup."""
+
+    __tablename__ = "rollup_watermarks"
+
+    nome = Column(String(100), primary_key=True)
+    watermark = Column(DateTime, nullable=True)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy import Column, String, DateTime, Text, Index
 from app.models.custom_types import GUID
 import uuid
 from sqlalchemy.sql import func
@@ -38,6 +38,11 @@ class Projeto(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    __table_args__ = (
+        # Índice funcional para a resolução nome -> UUID (normalize_project_id)
+        Index("ix_projetos_nome_upper", func.upper(nome)),
+    )
+
     # Relacionamento N:N com atividades através da tabela de junção
     atividade_projetos = relationship(
         "AtividadeProjeto",
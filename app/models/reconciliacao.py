@@ -0,0 +1,79 @@
+"""
+Modelos SQLAlchemy do relatório da reconciliação de horas com o Azure DevOps.
+
+Cada execução da reconciliação (app/services/reconciliacao_service.py) grava
+um resumo em `reconciliacao_execucoes` e, em `reconciliacao_itens`, apenas os
+work items cujo CompletedWork divergia do total apontado localmente.
+
+`reconciliacao_pendencias` guarda os work items com apontamentos excluídos,
+que a busca por `atualizado_em` não enxerga (e que, sem apontamentos
+restantes, nem aparecem no total agregado).
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Boolean, Column, String, DateTime, Float, Integer, Text, ForeignKey
+from app.models.custom_types import GUID
+from app.database import Base
+
+
+class ReconciliacaoExecucao(Base):
+    """Resumo de uma execução da reconciliação."""
+
+    __tablename__ = "reconciliacao_execucoes"
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    organization_name = Column(String(255), nullable=True, comment="Organização reconciliada (nulo: todas)")
+    dry_run = Column(Boolean, nullable=False, default=False)
+    status = Column(String(20), nullable=False, default="executando", comment="executando, sucesso ou erro")
+    iniciado_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finalizado_em = Column(DateTime, nullable=True)
+    total_work_items = Column(Integer, nullable=False, default=0)
+    divergentes = Column(Integer, nullable=False, default=0)
+    corrigidos = Column(Integer, nullable=False, default=0)
+    falhas = Column(Integer, nullable=False, default=0)
+    nao_encontrados = Column(Integer, nullable=False, default=0)
+    erro = Column(Text, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<ReconciliacaoExecucao(id={self.id}, status={self.status}, divergentes={self.divergentes})>"
+
+
+class ReconciliacaoItem(Base):
+    """Work item divergente encontrado em uma execução."""
+
+    __tablename__ = "reconciliacao_itens"
+
+    execucao_id = Column(
+        GUID(), ForeignKey("reconciliacao_execucoes.id", ondelete="CASCADE"), primary_key=True
+    )
+    organization_name = Column(String(255), primary_key=True)
+    work_item_id = Column(Integer, primary_key=True)
+    project_id = Column(String(255), nullable=True)
+    horas_local = Column(Float, nullable=False, comment="Total apontado localmente (horas)")
+    completed_work_azure = Column(Float, nullable=True)
+    remaining_work_azure = Column(Float, nullable=True)
+    original_estimate = Column(Float, nullable=True)
+    remaining_work_novo = Column(Float, nullable=True)
+    acao = Column(String(20), nullable=False, comment="corrigido, divergente (dry-run), falha ou nao_encontrado")
+    erro = Column(Text, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<ReconciliacaoItem(work_item={self.work_item_id}, acao={self.acao})>"
+
+
+class ReconciliacaoPendencia(Base):
+    """
+    Work item que perdeu apontamentos e precisa entrar na próxima
+    reconciliação, mesmo sem nenhum apontamento restante (total 0).
+    """
+
+    __tablename__ = "reconciliacao_pendencias"
+
+    organization_name = Column(String(255), primary_key=True)
+    work_item_id = Column(Integer, primary_key=True)
+    project_id = Column(String(255), nullable=True)
+    marcado_em = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ReconciliacaoPendencia(org={self.organization_name}, work_item={self.work_item_id})>"
@@ -0,0 +1,82 @@
+"""
+Modelo SQLAlchemy da cópia local de work items do Azure DevOps.
+
+Preenchida a partir das consultas já feitas ao Azure (timesheet, detalhes
+e busca) e pelos service hooks do Azure DevOps. Usada como índice de busca
+da typeahead de work items e, quando a carga do projeto está em dia, como
+espelho para montar a hierarquia do timesheet.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Float, Index
+from app.database import Base
+
+
+class WorkItem(Base):
+    """Modelo da tabela work_items (cache local de work items)."""
+
+    __tablename__ = "work_items"
+
+    organization_name = Column(
+        String(255),
+        primary_key=True,
+        comment="Nome da organização no Azure DevOps",
+    )
+    id = Column(Integer, primary_key=True, autoincrement=False, comment="ID do Work Item")
+
+    project_id = Column(String(255), nullable=True, comment="UUID do projeto, quando conhecido")
+    project_name = Column(String(255), nullable=True, comment="Nome do projeto (System.TeamProject)")
+    title = Column(String(512), nullable=False, default="")
+    work_item_type = Column(String(100), nullable=True)
+    state = Column(String(100), nullable=True)
+    parent_id = Column(Integer, nullable=True)
+    assigned_to = Column(String(255), nullable=True)
+    assigned_to_email = Column(String(255), nullable=True, comment="uniqueName do responsável")
+    iteration_path = Column(String(512), nullable=True)
+    original_estimate = Column(Float, nullable=True)
+    completed_work = Column(Float, nullable=True)
+    remaining_work = Column(Float, nullable=True)
+    url = Column(String(500), nullable=True)
+    rev = Column(Integer, nullable=True, comment="Revisão do Azure DevOps (descarta eventos fora de ordem)")
+
+    atualizado_em = Column(
+        DateTime, default=datetime.utcnow, nullable=False, comment="Última vez que o item foi visto no Azure"
+    )
+
+    __table_args__ = (
+        Index("ix_work_items_org_project", "organization_name", "project_name"),
+        Index("ix_work_items_org_project_id", "organization_name", "project_id"),
+        # Busca por trecho do título (ILIKE '%texto%') com pg_trgm
+        Index(
+            "ix_work_items_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<WorkItem(org={self.organization_name}, id={self.id}, title='{self.title}')>"
+
+
+class WorkItemMirrorStatus(Base):
+    """
+    Estado do espelho de work items de um projeto.
+
+    carga_completa_em marca a última sincronização completa do projeto (carga
+    via WIQL ou passada do poller até o último lote); a partir dela os service
+    hooks e o poller mantêm o espelho atualizado. Os continuation tokens das
+    APIs de reporting são o watermark do poller.
+    """
+
+    __tablename__ = "work_item_mirror_status"
+
+    organization_name = Column(String(255), primary_key=True)
+    project_id = Column(String(255), primary_key=True, comment="UUID do projeto")
+    carga_completa_em = Column(DateTime, nullable=True)
+    ultimo_evento_em = Column(DateTime, nullable=True, comment="Último service hook recebido")
+    revisions_token = Column(String(1000), nullable=True, comment="Continuation token de reporting/workitemrevisions")
+    links_token = Column(String(1000), nullable=True, comment="Continuation token de reporting/workitemlinks")
+
+    def __repr__(self) -> str:
+        return f"<WorkItemMirrorStatus(org={self.organization_name}, project={self.project_id})>"
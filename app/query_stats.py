@@ -0,0 +1,154 @@
+"""
+Contagem de comandos SQL por requisição (detecção de N+1).
+
+Eventos do SQLAlchemy registram, para a requisição corrente, a quantidade
+de comandos, o tempo total no banco e quantas vezes cada fingerprint (SQL
+com literais e listas de parâmetros normalizados) se repetiu.
+
+- Fora de produção (ou com QUERY_STATS_HEADERS=true) a resposta recebe
+  X-DB-Query-Count, X-DB-Time-Ms e X-DB-Repeated-Queries.
+- Um warning é registrado quando a rota passa de QUERY_BUDGET_PER_REQUEST
+  comandos ou repete o mesmo comando QUERY_REPEAT_THRESHOLD vezes.
+
+Comandos executados depois do início da resposta (BackgroundTasks) entram
+apenas no warning, não nos headers.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normaliza um comando SQL para agrupar execuções equivalentes.
+
+    Parâmetros, literais e listas IN (?, ?, ...) viram "?", de modo que o
+    mesmo SELECT por id em um laço gera sempre o mesmo fingerprint.
+    """
+    sql = _STRING.sub("?", statement)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class RequestQueryStats:
+    """Comandos SQL executados durante uma requisição."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        key = fingerprint(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.fingerprints[key] += 1
+
+    def repeated(self) -> list[tuple[str, int]]:
+        """Fingerprints executados mais de uma vez, do mais repetido ao menos."""
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n > 1]
+
+
+_current: ContextVar[RequestQueryStats | None] = ContextVar("aponta_query_stats", default=None)
+
+
+def current_query_stats() -> RequestQueryStats | None:
+    """Estatísticas da requisição corrente (None fora de uma requisição)."""
+    return _current.get()
+
+
+def headers_enabled() -> bool:
+    """Indica se os headers X-DB-* são enviados (padrão: fora de produção)."""
+    if settings.query_stats_headers is not None:
+        return settings.query_stats_headers
+    return settings.environment.lower() != "production"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._aponta_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_aponta_query_start", None)
+    if stats is not None and start is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra os comandos SQL do engine na requisição corrente."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _check_budget(scope: Scope, stats: RequestQueryStats) -> None:
+    route = getattr(scope.get("route"), "path", None) or scope["path"]
+    budget = settings.query_budget_per_request
+    if budget > 0 and stats.count > budget:
+        logger.warning(
+            f"{scope['method']} {route}: {stats.count} comandos SQL "
+            f"(orçamento {budget}, {stats.duration * 1000:.1f} ms no banco)"
+        )
+    threshold = settings.query_repeat_threshold
+    if threshold > 0:
+        for sql, n in stats.repeated():
+            if n < threshold:
+                break
+            logger.warning(f"{scope['method']} {route}: comando repetido {n}x (possível N+1): {sql[:300]}")
+
+
+class QueryStatsMiddleware:
+    """Middleware ASGI que abre a contagem de SQL de cada requisição."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        add_headers = headers_enabled()
+
+        async def send_wrapper(message: Message) -> None:
+            if add_headers and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.1f}"
+                headers["X-DB-Repeated-Queries"] = str(len(stats.repeated()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            _check_budget(scope, stats)
@@ -4,12 +4,24 @@ Repository para operacoes de banco de dados da entidade Apontamento.
 
 import re
 from uuid import UUID
-from datetime import date
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, cast, Integer
+from datetime import date, datetime
+from typing import Iterator
+from sqlalchemy.orm import Session, Query, joinedload
+from sqlalchemy import func, cast, Integer, select
+from sqlalchemy.engine import RowMapping
+from app.cache_events import notify_invalidation
 from app.models.apontamento import Apontamento
 from app.models.atividade import Atividade
+from app.models.horas_diarias import HorasDiariasPendencia
+from app.models.reconciliacao import ReconciliacaoPendencia
+from app.repositories.reference_cache import reference_cache
+from app.repositories.timesheet_cache import week_cache
 from app.schemas.apontamento import ApontamentoCreate, ApontamentoUpdate
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_predicate
+from app.utils.upsert import build_upsert
+
+# Conversores da chave de paginação (data_apontamento, criado_em, id)
+_CURSOR_PARSERS = (date.fromisoformat, datetime.fromisoformat, UUID)
 
 
 def parse_duracao(duracao: str) -> tuple[int, int]:
@@ -63,6 +75,105 @@ class ApontamentoRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    def _paginate(
+        self,
+        query: Query,
+        skip: int,
+        limit: int,
+        cursor: str | None,
+        include_total: bool,
+    ) -> tuple[list[Apontamento], int | None, str | None]:
+        """
+        Ordena (mais recente primeiro) e pagina uma query de apontamentos.
+
+        Com `cursor`, usa keyset pagination sobre (data_apontamento, criado_em, id)
+        e ignora `skip`. Sem cursor, mantém o comportamento OFFSET/LIMIT.
+
+        Args:
+            query: Query ja filtrada.
+            skip: Registros a pular (apenas sem cursor).
+            limit: Maximo de registros a retornar.
+            cursor: Cursor opaco retornado pela pagina anterior.
+            include_total: Se deve executar o COUNT(*) do conjunto filtrado.
+
+        Returns:
+            Tupla (apontamentos, total ou None, cursor da proxima pagina ou None).
+
+        Raises:
+            ValueError: Se o cursor for invalido.
+        """
+        total = query.count() if include_total else None
+
+        if cursor:
+            query = query.filter(
+                keyset_predicate(
+                    (Apontamento.data_apontamento, Apontamento.criado_em, Apontamento.id),
+                    decode_cursor(cursor, _CURSOR_PARSERS),
+                )
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        # Busca um registro a mais para saber se existe proxima pagina
+        apontamentos = (
+            query.order_by(
+                Apontamento.data_apontamento.desc(),
+                Apontamento.criado_em.desc(),
+                Apontamento.id.desc(),
+            )
+            .limit(limit + 1)
+            .all()
+        )
+
+        next_cursor = None
+        if len(apontamentos) > limit:
+            apontamentos = apontamentos[:limit]
+            last = apontamentos[-1]
+            next_cursor = encode_cursor(last.data_apontamento, last.criado_em, last.id)
+
+        return apontamentos, total, next_cursor
+
+    def _mark_rollup_dirty(self, apontamento: Apontamento) -> None:
+        """
+        Marca a particao (organizacao, dia) do apontamento para recalculo no
+        rollup de horas. Necessario em alteracoes e exclusoes, que o refresh
+        incremental por atualizado_em nao enxerga na chave antiga.
+
+        Usa INSERT ... ON CONFLICT DO NOTHING: escritas concorrentes na mesma
+        particao nao falham por chave duplicada.
+        """
+        self.db.execute(
+            build_upsert(
+                self.db.get_bind(),
+                HorasDiariasPendencia.__table__,
+                [{"organization_name": apontamento.organization_name, "dia": apontamento.data_apontamento}],
+                conflict_columns=["organization_name", "dia"],
+            )
+        )
+
+    def _mark_reconciliation_pending(self, apontamento: Apontamento) -> None:
+        """
+        Marca o work item do apontamento para a proxima reconciliacao de horas.
+        Necessario em exclusoes: sem apontamentos restantes, o work item nao
+        aparece mais no total agregado.
+        """
+        self.db.execute(
+            build_upsert(
+                self.db.get_bind(),
+                ReconciliacaoPendencia.__table__,
+                [
+                    {
+                        "organization_name": apontamento.organization_name,
+                        "work_item_id": apontamento.work_item_id,
+                        "project_id": apontamento.project_id,
+                        "marcado_em": datetime.utcnow(),
+                    }
+                ],
+                conflict_columns=["organization_name", "work_item_id"],
+                update_columns=["project_id", "marcado_em"],
+            )
+        )
+
     def _validate_atividade(self, id_atividade: UUID) -> bool:
         """
         Valida se a atividade existe e esta ativa.
@@ -76,11 +187,17 @@ class ApontamentoRepository:
         Raises:
             ValueError: Se a atividade nao existir ou estiver inativa.
         """
-        atividade = (
-            self.db.query(Atividade)
-            .filter(Atividade.id == id_atividade)
-            .first()
-        )
+        atividade = reference_cache.get_atividade(self.db, id_atividade)
+
+        if not atividade:
+            # Pode ter sido criada por outro processo: confirma no banco
+            atividade = (
+                self.db.query(Atividade)
+                .filter(Atividade.id == id_atividade)
+                .first()
+            )
+            if atividade:
+                reference_cache.bump()
 
         if not atividade:
             raise ValueError(f"Atividade nao encontrada: {id_atividade}")
@@ -109,7 +226,9 @@ class ApontamentoRepository:
         # Criar apontamento
         db_apontamento = Apontamento(**apontamento_data.model_dump())
         self.db.add(db_apontamento)
+        notify_invalidation(self.db, "semanas", db_apontamento.organization_name, db_apontamento.project_id)
         self.db.commit()
+        week_cache.invalidate(db_apontamento.organization_name, db_apontamento.project_id)
         self.db.refresh(db_apontamento)
 
         # Recarregar com o relacionamento
@@ -140,7 +259,9 @@ class ApontamentoRepository:
         project_id: str,
         skip: int = 0,
         limit: int = 100,
-    ) -> tuple[list[Apontamento], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> tuple[list[Apontamento], int | None, str | None]:
         """
         Lista apontamentos de um work item especifico com paginacao.
 
@@ -148,11 +269,13 @@ class ApontamentoRepository:
             work_item_id: ID do work item no Azure DevOps.
             organization_name: Nome da organizacao no Azure DevOps.
             project_id: ID do projeto no Azure DevOps.
-            skip: Numero de registros a pular (paginacao).
+            skip: Numero de registros a pular (paginacao por offset).
             limit: Maximo de registros a retornar.
+            cursor: Cursor da pagina anterior (paginacao por keyset).
+            include_total: Se deve calcular o total de registros.
 
         Returns:
-            Tupla (lista de apontamentos, total de registros).
+            Tupla (lista de apontamentos, total de registros ou None, proximo cursor).
         """
         query = (
             self.db.query(Apontamento)
@@ -164,18 +287,7 @@ class ApontamentoRepository:
             )
         )
 
-        # Contar total antes de paginacao
-        total = query.count()
-
-        # Aplicar paginacao e ordenacao (mais recente primeiro)
-        apontamentos = (
-            query.order_by(Apontamento.data_apontamento.desc(), Apontamento.criado_em.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
-
-        return apontamentos, total
+        return self._paginate(query, skip, limit, cursor, include_total)
 
     def get_totals_by_work_item(
         self,
@@ -248,6 +360,95 @@ class ApontamentoRepository:
 
         return total_horas, total_formatado
 
+    def aggregate_by_usuario_work_item_dia(
+        self,
+        organization_name: str,
+        project_id: str,
+        data_inicio: date,
+        data_fim: date,
+        usuario_ids: list[str] | None = None,
+        work_item_ids: list[int] | None = None,
+    ) -> list[dict]:
+        """
+        Totais de minutos por (usuário, work item, dia) em uma única consulta.
+
+        A duração é texto HH:mm, então a consulta agrupa também por duração
+        (COUNT por valor distinto) e a soma é feita aqui: o número de linhas
+        retornadas fica próximo ao de grupos, independente de quantos
+        apontamentos existam.
+
+        Args:
+            organization_name: Nome da organizacao no Azure DevOps.
+            project_id: UUID do projeto.
+            data_inicio: Primeiro dia (inclusive).
+            data_fim: Último dia (inclusive).
+            usuario_ids: Restringe aos usuários informados.
+            work_item_ids: Restringe aos work items informados.
+
+        Returns:
+            Dicts com usuario_id, usuario_nome, work_item_id, dia e total_minutos.
+        """
+        query = self.db.query(
+            Apontamento.usuario_id,
+            func.max(Apontamento.usuario_nome).label("usuario_nome"),
+            Apontamento.work_item_id,
+            Apontamento.data_apontamento,
+            Apontamento.duracao,
+            func.count().label("quantidade"),
+        ).filter(
+            Apontamento.organization_name == organization_name,
+            Apontamento.project_id == project_id,
+            Apontamento.data_apontamento >= data_inicio,
+            Apontamento.data_apontamento <= data_fim,
+        )
+        if usuario_ids is not None:
+            query = query.filter(Apontamento.usuario_id.in_(usuario_ids))
+        if work_item_ids is not None:
+            query = query.filter(Apontamento.work_item_id.in_(work_item_ids))
+
+        rows = query.group_by(
+            Apontamento.usuario_id,
+            Apontamento.work_item_id,
+            Apontamento.data_apontamento,
+            Apontamento.duracao,
+        ).all()
+
+        totais: dict[tuple[str, int, date], dict] = {}
+        for row in rows:
+            key = (row.usuario_id, row.work_item_id, row.data_apontamento)
+            horas, minutos = parse_duracao(row.duracao)
+            grupo = totais.setdefault(
+                key,
+                {
+                    "usuario_id": row.usuario_id,
+                    "usuario_nome": row.usuario_nome,
+                    "work_item_id": row.work_item_id,
+                    "dia": row.data_apontamento,
+                    "total_minutos": 0,
+                },
+            )
+            grupo["total_minutos"] += (horas * 60 + minutos) * row.quantidade
+        return list(totais.values())
+
+    def list_active_projects(self, desde: date) -> list[tuple[str, str]]:
+        """
+        Projetos (organização, project_id) com apontamentos a partir de uma data.
+
+        Args:
+            desde: Primeiro dia considerado.
+
+        Returns:
+            Lista de tuplas (organization_name, project_id).
+        """
+        rows = (
+            self.db.query(Apontamento.organization_name, Apontamento.project_id)
+            .filter(Apontamento.data_apontamento >= desde)
+            .distinct()
+            .order_by(Apontamento.organization_name, Apontamento.project_id)
+            .all()
+        )
+        return [(row.organization_name, row.project_id) for row in rows]
+
     def get_summary_by_work_item(
         self,
         work_item_id: int,
@@ -330,19 +531,23 @@ class ApontamentoRepository:
         usuario_id: str | None = None,
         data_inicio: date | None = None,
         data_fim: date | None = None,
-    ) -> tuple[list[Apontamento], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> tuple[list[Apontamento], int | None, str | None]:
         """
         Lista apontamentos com paginacao e filtros opcionais.
 
         Args:
-            skip: Numero de registros a pular (paginacao).
+            skip: Numero de registros a pular (paginacao por offset).
             limit: Maximo de registros a retornar.
             usuario_id: Filtrar por usuario.
             data_inicio: Data inicial do filtro.
             data_fim: Data final do filtro.
+            cursor: Cursor da pagina anterior (paginacao por keyset).
+            include_total: Se deve calcular o total de registros.
 
         Returns:
-            Tupla (lista de apontamentos, total de registros).
+            Tupla (lista de apontamentos, total de registros ou None, proximo cursor).
         """
         query = self.db.query(Apontamento).options(joinedload(Apontamento.atividade))
 
@@ -356,18 +561,76 @@ class ApontamentoRepository:
         if data_fim:
             query = query.filter(Apontamento.data_apontamento <= data_fim)
 
-        # Contar total antes de paginacao
-        total = query.count()
+        return self._paginate(query, skip, limit, cursor, include_total)
 
-        # Aplicar paginacao e ordenacao
-        apontamentos = (
-            query.order_by(Apontamento.data_apontamento.desc(), Apontamento.criado_em.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+    def iter_export(
+        self,
+        organization_name: str,
+        project_id: str | None = None,
+        usuario_id: str | None = None,
+        data_inicio: date | None = None,
+        data_fim: date | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[RowMapping]:
+        """
+        Percorre os apontamentos filtrados para exportacao em massa.
+
+        Seleciona apenas colunas (sem instanciar objetos ORM) e traz o nome
+        da atividade no proprio SQL. Com `yield_per` o PostgreSQL usa cursor
+        no servidor, entao a memoria fica constante independentemente do
+        tamanho do resultado.
+
+        Args:
+            organization_name: Nome da organizacao no Azure DevOps.
+            project_id: UUID do projeto (opcional).
+            usuario_id: Filtrar por usuario (opcional).
+            data_inicio: Data inicial do filtro (inclusiva).
+            data_fim: Data final do filtro (inclusiva).
+            batch_size: Linhas buscadas do servidor por vez.
+
+        Yields:
+            Linha com as colunas do apontamento e `atividade_nome`.
+        """
+        stmt = (
+            select(
+                Apontamento.id,
+                Apontamento.data_apontamento,
+                Apontamento.duracao,
+                Apontamento.work_item_id,
+                Apontamento.project_id,
+                Apontamento.organization_name,
+                Apontamento.id_atividade,
+                Atividade.nome.label("atividade_nome"),
+                Apontamento.usuario_id,
+                Apontamento.usuario_nome,
+                Apontamento.usuario_email,
+                Apontamento.comentario,
+                Apontamento.criado_em,
+                Apontamento.atualizado_em,
+            )
+            .outerjoin(Atividade, Atividade.id == Apontamento.id_atividade)
+            .where(Apontamento.organization_name == organization_name)
         )
 
-        return apontamentos, total
+        if project_id:
+            stmt = stmt.where(Apontamento.project_id == project_id)
+
+        if usuario_id:
+            stmt = stmt.where(Apontamento.usuario_id == usuario_id)
+
+        if data_inicio:
+            stmt = stmt.where(Apontamento.data_apontamento >= data_inicio)
+
+        if data_fim:
+            stmt = stmt.where(Apontamento.data_apontamento <= data_fim)
+
+        stmt = stmt.order_by(
+            Apontamento.data_apontamento,
+            Apontamento.criado_em,
+            Apontamento.id,
+        ).execution_options(yield_per=batch_size)
+
+        yield from self.db.execute(stmt).mappings()
 
     def update(
         self, apontamento_id: UUID, apontamento_data: ApontamentoUpdate
@@ -396,11 +659,16 @@ class ApontamentoRepository:
         if "id_atividade" in update_data:
             self._validate_atividade(update_data["id_atividade"])
 
+        self._mark_rollup_dirty(db_apontamento)
+        week_cache.invalidate(db_apontamento.organization_name, db_apontamento.project_id)
+
         # Atualizar campos
         for field, value in update_data.items():
             setattr(db_apontamento, field, value)
 
+        notify_invalidation(self.db, "semanas", db_apontamento.organization_name, db_apontamento.project_id)
         self.db.commit()
+        week_cache.invalidate(db_apontamento.organization_name, db_apontamento.project_id)
         self.db.refresh(db_apontamento)
 
         return self.get_by_id(apontamento_id)
@@ -419,6 +687,11 @@ class ApontamentoRepository:
         if not db_apontamento:
             return False
 
+        self._mark_rollup_dirty(db_apontamento)
+        self._mark_reconciliation_pending(db_apontamento)
+        chave = (db_apontamento.organization_name, db_apontamento.project_id)
         self.db.delete(db_apontamento)
+        notify_invalidation(self.db, "semanas", *chave)
         self.db.commit()
+        week_cache.invalidate(*chave)
         return True
@@ -2,13 +2,21 @@
 Repository para operações de banco de dados da entidade Atividade.
 """
 
+from datetime import datetime
 from uuid import UUID
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import exists, inspect
+from sqlalchemy import exists
+from app.cache_events import notify_invalidation
 from app.models.atividade import Atividade
 from app.models.atividade_projeto import AtividadeProjeto
 from app.models.projeto import Projeto
 from app.schemas.atividade import AtividadeCreate, AtividadeUpdate
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_predicate
+from app.utils.schema_cache import table_exists
+from app.repositories.reference_cache import reference_cache
+
+# Conversores da chave de paginação (criado_em, id)
+_CURSOR_PARSERS = (datetime.fromisoformat, UUID)
 
 
 class AtividadeRepository:
@@ -18,10 +26,8 @@ class AtividadeRepository:
         self.db = db
 
     def _table_exists(self, table_name: str) -> bool:
-        """Verifica se uma tabela existe no schema configurado."""
-        schema = Atividade.__table__.schema
-        inspector = inspect(self.db.get_bind())
-        return table_name in inspector.get_table_names(schema=schema)
+        """Verifica se uma tabela existe no schema configurado (cache por processo)."""
+        return table_exists(self.db.get_bind(), table_name, Atividade.__table__.schema)
 
     def _validate_projetos(self, ids_projetos: list[UUID]) -> list[UUID]:
         """
@@ -37,21 +43,26 @@ class AtividadeRepository:
         Raises:
             ValueError: Se algum projeto não existir.
         """
-        projetos_existentes = (
-            self.db.query(Projeto)
-            .filter(
-                (Projeto.id.in_(ids_projetos))
-                | (Projeto.external_id.in_(ids_projetos))
+        # Mapeia external_id -> id interno e id -> id (cache de referência)
+        id_map = reference_cache.resolve_projeto_ids(self.db, ids_projetos)
+
+        # Projetos ausentes do cache (ex: sincronizados por outro processo)
+        ausentes = [i for i in ids_projetos if i not in id_map]
+        if ausentes:
+            projetos_existentes = (
+                self.db.query(Projeto)
+                .filter(
+                    (Projeto.id.in_(ausentes))
+                    | (Projeto.external_id.in_(ausentes))
+                )
+                .all()
             )
-            .all()
-        )
-
-        # Mapeia external_id -> id interno e id -> id
-        id_map = {}
-        for projeto in projetos_existentes:
-            id_map[projeto.id] = projeto.id
-            if projeto.external_id:
-                id_map[projeto.external_id] = projeto.id
+            for projeto in projetos_existentes:
+                id_map[projeto.id] = projeto.id
+                if projeto.external_id:
+                    id_map[projeto.external_id] = projeto.id
+            if projetos_existentes:
+                reference_cache.bump()
 
         # Converte os IDs enviados para IDs internos
         ids_internos = []
@@ -136,7 +147,9 @@ class AtividadeRepository:
         # Criar relacionamentos com projetos (usando IDs internos)
         self._criar_relacionamentos_projetos(db_atividade, ids_projetos_internos)
 
+        notify_invalidation(self.db, "referencia")
         self.db.commit()
+        reference_cache.bump()
         self.db.refresh(db_atividade)
 
         # Recarregar com os relacionamentos
@@ -180,22 +193,31 @@ class AtividadeRepository:
         limit: int = 100,
         ativo: bool | None = None,
         id_projeto: UUID | None = None,
-    ) -> tuple[list[Atividade], int]:
+        cursor: str | None = None,
+        include_total: bool = True,
+    ) -> tuple[list[Atividade], int | None, str | None]:
         """
         Lista atividades com paginação e filtros opcionais.
-        Retorna uma tupla (lista de atividades, total de registros).
+        Retorna uma tupla (lista de atividades, total de registros, próximo cursor).
+
+        Com `cursor`, usa keyset pagination sobre (criado_em, id) e ignora `skip`.
 
         Args:
-            skip: Número de registros a pular (paginação).
+            skip: Número de registros a pular (paginação por offset).
             limit: Máximo de registros a retornar.
             ativo: Filtro por status ativo/inativo.
             id_projeto: Filtro por projeto (retorna atividades que contêm este projeto).
+            cursor: Cursor da página anterior (paginação por keyset).
+            include_total: Se deve calcular o total de registros.
 
         Returns:
-            Tupla (lista de atividades, total de registros).
+            Tupla (lista de atividades, total de registros ou None, próximo cursor).
+
+        Raises:
+            ValueError: Se o cursor for inválido.
         """
         if not self._table_exists(Atividade.__tablename__):
-            return [], 0
+            return [], 0, None
 
         has_rel_table = self._table_exists(AtividadeProjeto.__tablename__)
 
@@ -222,17 +244,35 @@ class AtividadeRepository:
             )
 
         if id_projeto is not None and not has_rel_table:
-            return [], 0
+            return [], 0, None
 
-        # Contar total antes de paginação
-        total = query.count()
+        # Contar total antes de paginação (opcional)
+        total = query.count() if include_total else None
 
-        # Aplicar paginação e ordenação
+        if cursor:
+            query = query.filter(
+                keyset_predicate(
+                    (Atividade.criado_em, Atividade.id),
+                    decode_cursor(cursor, _CURSOR_PARSERS),
+                )
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        # Aplicar ordenação e buscar um registro a mais para detectar próxima página
         atividades = (
-            query.order_by(Atividade.criado_em.desc()).offset(skip).limit(limit).all()
+            query.order_by(Atividade.criado_em.desc(), Atividade.id.desc())
+            .limit(limit + 1)
+            .all()
         )
 
-        return atividades, total
+        next_cursor = None
+        if len(atividades) > limit:
+            atividades = atividades[:limit]
+            last = atividades[-1]
+            next_cursor = encode_cursor(last.criado_em, last.id)
+
+        return atividades, total, next_cursor
 
     def update(
         self, atividade_id: UUID, atividade_data: AtividadeUpdate
@@ -274,7 +314,9 @@ class AtividadeRepository:
         for field, value in update_data.items():
             setattr(db_atividade, field, value)
 
+        notify_invalidation(self.db, "referencia")
         self.db.commit()
+        reference_cache.bump()
         self.db.refresh(db_atividade)
 
         # Recarregar com os relacionamentos atualizados
@@ -295,5 +337,7 @@ class AtividadeRepository:
             return False
 
         self.db.delete(db_atividade)
+        notify_invalidation(self.db, "referencia")
         self.db.commit()
+        reference_cache.bump()
         return True
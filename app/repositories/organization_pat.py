@@ -6,8 +6,14 @@ from uuid import UUID
 from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
+from app.cache import get_cache
+from app.cache_events import notify_invalidation
+from app.config import get_settings
 from app.models.organization_pat import OrganizationPat
 from app.schemas.organization_pat import OrganizationPatCreate, OrganizationPatUpdate
+from app.utils.pagination import decode_cursor, encode_cursor
+
+settings = get_settings()
 
 
 class OrganizationPatRepository:
@@ -39,18 +45,37 @@ class OrganizationPatRepository:
         self, 
         skip: int = 0, 
         limit: int = 100,
-        only_active: bool = False
-    ) -> tuple[list[OrganizationPat], int]:
-        """Lista todos os PATs com paginação."""
+        only_active: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> tuple[list[OrganizationPat], Optional[int], Optional[str]]:
+        """
+        Lista todos os PATs com paginação.
+
+        Com `cursor`, usa keyset pagination sobre organization_name (único)
+        e ignora `skip`. Retorna (itens, total ou None, próximo cursor).
+        """
         query = self.db.query(OrganizationPat)
         
         if only_active:
             query = query.filter(OrganizationPat.ativo == True)
         
-        total = query.count()
-        items = query.order_by(OrganizationPat.organization_name).offset(skip).limit(limit).all()
+        total = query.count() if include_total else None
+        
+        if cursor:
+            (last_name,) = decode_cursor(cursor, (str,))
+            query = query.filter(OrganizationPat.organization_name > last_name)
+        elif skip:
+            query = query.offset(skip)
         
-        return items, total
+        items = query.order_by(OrganizationPat.organization_name).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].organization_name)
+        
+        return items, total, next_cursor
 
     def create(self, data: OrganizationPatCreate, criado_por: str = None) -> OrganizationPat:
         """Cria um novo registro de PAT."""
@@ -73,8 +98,10 @@ class OrganizationPatRepository:
         org_pat.set_pat(data.pat)
         
         self.db.add(org_pat)
+        notify_invalidation(self.db, "pats", org_pat.organization_name)
         self.db.commit()
         self.db.refresh(org_pat)
+        pat_cache.invalidate(org_pat.organization_name)
         
         return org_pat
 
@@ -100,8 +127,10 @@ class OrganizationPatRepository:
         if data.pat is not None:
             org_pat.set_pat(data.pat)
         
+        notify_invalidation(self.db, "pats", org_pat.organization_name)
         self.db.commit()
         self.db.refresh(org_pat)
+        pat_cache.invalidate(org_pat.organization_name)
         
         return org_pat
 
@@ -111,8 +140,11 @@ class OrganizationPatRepository:
         if not org_pat:
             return False
         
+        organization_name = org_pat.organization_name
         self.db.delete(org_pat)
+        notify_invalidation(self.db, "pats", organization_name)
         self.db.commit()
+        pat_cache.invalidate(organization_name)
         
         return True
 
@@ -123,8 +155,10 @@ class OrganizationPatRepository:
             return None
         
         org_pat.ativo = not org_pat.ativo
+        notify_invalidation(self.db, "pats", org_pat.organization_name)
         self.db.commit()
         self.db.refresh(org_pat)
+        pat_cache.invalidate(org_pat.organization_name)
         
         return org_pat
 
@@ -147,3 +181,8 @@ class OrganizationPatRepository:
                 OrganizationPat.descricao.ilike(search_term)
             )
         ).all()
+
+
+# PAT descriptografado por organização (nome normalizado). Sempre em memória:
+# o segredo não sai do processo. As escritas acima invalidam a organização.
+pat_cache = get_cache("pats", lambda: settings.pat_cache_ttl_seconds, local=True)
@@ -0,0 +1,166 @@
+"""
+Repository da reconciliação de horas: totais locais por work item e o
+relatório das execuções.
+"""
+
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.orm import Session
+from app.models.apontamento import Apontamento
+from app.models.reconciliacao import ReconciliacaoExecucao, ReconciliacaoItem, ReconciliacaoPendencia
+
+# duracao é gravada normalizada em HH:mm (ver ApontamentoBase.validate_duracao)
+_DURACAO_MINUTOS = (
+    cast(func.substr(Apontamento.duracao, 1, 2), Integer) * 60
+    + cast(func.substr(Apontamento.duracao, 4, 2), Integer)
+)
+
+
+class ReconciliacaoRepository:
+    """Repository para a reconciliação com o CompletedWork do Azure DevOps."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def work_item_totals(
+        self, organization_name: str | None = None, changed_since: datetime | None = None
+    ) -> list[tuple[str, int, str, int]]:
+        """
+        Total apontado por work item em uma única consulta agregada.
+
+        Inclui os work items com apontamentos excluídos (reconciliacao_pendencias),
+        com total 0 se não restou nenhum apontamento.
+
+        Args:
+            organization_name: Apenas os work items desta organização.
+            changed_since: Apenas work items com algum apontamento alterado
+                (ou excluído) desde esta data (o total considera todos os
+                apontamentos).
+
+        Returns:
+            Lista de (organização, work_item_id, project_id, total_minutos).
+        """
+        query = self._totals_query(organization_name)
+        if changed_since is not None:
+            query = query.having(func.max(Apontamento.atualizado_em) >= changed_since)
+        totals = {
+            (org, work_item_id): (project_id, int(total or 0))
+            for org, work_item_id, project_id, total in query
+        }
+
+        pendencias = self.db.query(ReconciliacaoPendencia)
+        if organization_name:
+            pendencias = pendencias.filter(ReconciliacaoPendencia.organization_name == organization_name)
+        if changed_since is not None:
+            pendencias = pendencias.filter(ReconciliacaoPendencia.marcado_em >= changed_since)
+        missing = [p for p in pendencias if (p.organization_name, p.work_item_id) not in totals]
+        if missing:
+            # Total completo dos pendentes que ainda têm apontamentos fora da janela
+            recount = {
+                (org, work_item_id): (project_id, int(total or 0))
+                for org, work_item_id, project_id, total in self._totals_query(organization_name).filter(
+                    Apontamento.work_item_id.in_({p.work_item_id for p in missing})
+                )
+            }
+            for p in missing:
+                key = (p.organization_name, p.work_item_id)
+                totals[key] = recount.get(key, (p.project_id, 0))
+
+        return [(org, work_item_id, *totals[(org, work_item_id)]) for org, work_item_id in sorted(totals)]
+
+    def _totals_query(self, organization_name: str | None = None):
+        query = self.db.query(
+            Apontamento.organization_name,
+            Apontamento.work_item_id,
+            func.max(Apontamento.project_id),
+            func.sum(_DURACAO_MINUTOS),
+        ).group_by(Apontamento.organization_name, Apontamento.work_item_id)
+        if organization_name:
+            query = query.filter(Apontamento.organization_name == organization_name)
+        return query
+
+    def clear_pending(
+        self, until: datetime, organization_name: str | None = None, keep: set[tuple[str, int]] = frozenset()
+    ) -> int:
+        """
+        Remove as pendências já reconciliadas.
+
+        Args:
+            until: Apenas as marcadas até esta data (início da execução).
+            organization_name: Apenas desta organização.
+            keep: (organização, work_item_id) que continuam pendentes (falhas).
+
+        Returns:
+            Quantidade removida.
+        """
+        query = self.db.query(ReconciliacaoPendencia).filter(ReconciliacaoPendencia.marcado_em <= until)
+        if organization_name:
+            query = query.filter(ReconciliacaoPendencia.organization_name == organization_name)
+        removed = 0
+        for pendencia in query:
+            if (pendencia.organization_name, pendencia.work_item_id) not in keep:
+                self.db.delete(pendencia)
+                removed += 1
+        self.db.commit()
+        return removed
+
+    def create_run(self, dry_run: bool, organization_name: str | None = None) -> ReconciliacaoExecucao:
+        """Registra o início de uma execução."""
+        execucao = ReconciliacaoExecucao(organization_name=organization_name, dry_run=dry_run)
+        self.db.add(execucao)
+        self.db.commit()
+        self.db.refresh(execucao)
+        return execucao
+
+    def finish_run(
+        self,
+        execucao: ReconciliacaoExecucao,
+        total_work_items: int,
+        itens: list[dict],
+        erro: str | None = None,
+    ) -> ReconciliacaoExecucao:
+        """
+        Grava os itens divergentes e o resumo da execução.
+
+        Args:
+            execucao: Execução criada por create_run().
+            total_work_items: Work items comparados.
+            itens: Dicts com as colunas de ReconciliacaoItem (sem execucao_id).
+            erro: Erro que interrompeu a execução, se houver.
+        """
+        self.db.add_all(ReconciliacaoItem(execucao_id=execucao.id, **item) for item in itens)
+        acoes = [item["acao"] for item in itens]
+        execucao.total_work_items = total_work_items
+        # Itens sem os valores do Azure (lote não lido, não encontrado) não
+        # chegaram a ser comparados
+        execucao.divergentes = sum(1 for item in itens if item["remaining_work_novo"] is not None)
+        execucao.corrigidos = acoes.count("corrigido")
+        execucao.falhas = acoes.count("falha")
+        execucao.nao_encontrados = acoes.count("nao_encontrado")
+        execucao.status = "erro" if erro else "sucesso"
+        execucao.erro = erro
+        execucao.finalizado_em = datetime.utcnow()
+        self.db.commit()
+        self.db.refresh(execucao)
+        return execucao
+
+    def list_runs(self, limit: int = 20) -> list[ReconciliacaoExecucao]:
+        """Execuções mais recentes primeiro."""
+        return (
+            self.db.query(ReconciliacaoExecucao)
+            .order_by(ReconciliacaoExecucao.iniciado_em.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def get_run(self, execucao_id: UUID) -> ReconciliacaoExecucao | None:
+        return self.db.get(ReconciliacaoExecucao, execucao_id)
+
+    def list_items(self, execucao_id: UUID) -> list[ReconciliacaoItem]:
+        return (
+            self.db.query(ReconciliacaoItem)
+            .filter(ReconciliacaoItem.execucao_id == execucao_id)
+            .order_by(ReconciliacaoItem.organization_name, ReconciliacaoItem.work_item_id)
+            .all()
+        )
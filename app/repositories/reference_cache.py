@@ -0,0 +1,266 @@
+"""
+Cache em memória (por processo) dos dados de referência: atividades e projetos.
+
+Os dados mudam raramente e são lidos a cada carregamento da extensão. O
+snapshot é montado na primeira leitura e descartado quando a versão é
+incrementada: escritas em AtividadeRepository e sync_projects chamam
+reference_cache.bump() e avisam os outros workers via app.cache_events.
+
+O ETag das respostas é derivado do conteúdo do snapshot da versão atual.
+"""
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.cache_events import register_invalidation_handler
+from app.models.atividade import Atividade
+from app.models.atividade_projeto import AtividadeProjeto
+from app.models.projeto import Projeto
+from app.utils.cache_stats import HitCounter, register_cache
+from app.utils.pagination import encode_cursor
+from app.utils.schema_cache import table_exists
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProjetoRef:
+    """Projeto em cache (mesmos atributos usados por ProjetoResponse)."""
+
+    id: UUID
+    external_id: UUID
+    nome: str
+    descricao: str | None = None
+    url: str | None = None
+    estado: str | None = None
+    organizacao: str | None = None
+    last_sync_at: datetime | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+@dataclass(frozen=True)
+class AtividadeRef:
+    """Atividade em cache com os projetos associados."""
+
+    id: UUID
+    nome: str
+    descricao: str | None
+    ativo: bool
+    criado_por: str | None
+    criado_em: datetime
+    atualizado_em: datetime
+    projetos: tuple[ProjetoRef, ...] = ()
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Estado imutável do cache para uma versão."""
+
+    version: int
+    etag: str
+    # Ordenadas por (criado_em desc, id desc), como a listagem paginada
+    atividades: tuple[AtividadeRef, ...]
+    atividades_por_id: dict[UUID, AtividadeRef] = field(repr=False)
+    # id interno do projeto -> ids das atividades associadas
+    atividades_por_projeto: dict[UUID, frozenset[UUID]] = field(repr=False)
+    # Ordenados por nome
+    projetos: tuple[ProjetoRef, ...]
+    # id interno ou external_id -> id interno
+    projeto_ids: dict[UUID, UUID] = field(repr=False)
+
+
+def _projeto_ref(projeto: Projeto) -> ProjetoRef:
+    return ProjetoRef(
+        id=projeto.id,
+        external_id=projeto.external_id,
+        nome=projeto.nome,
+        descricao=projeto.descricao,
+        url=projeto.url,
+        estado=projeto.estado,
+        organizacao=projeto.organizacao,
+        last_sync_at=projeto.last_sync_at,
+        created_at=projeto.created_at,
+        updated_at=projeto.updated_at,
+    )
+
+
+class ReferenceDataCache:
+    """Cache versionado de atividades e projetos."""
+
+    def __init__(self):
+        self._version = 1
+        self._snapshot: ReferenceSnapshot | None = None
+        self._lock = threading.Lock()
+        self.counter = HitCounter()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        """
+        Incrementa a versão e descarta o snapshot atual.
+
+        Deve ser chamado após o commit de qualquer escrita em atividades,
+        atividade_projeto ou projetos.
+
+        Returns:
+            A nova versão.
+        """
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+            return self._version
+
+    def invalidate(self) -> None:
+        """Alias de bump() para uso em testes e ganchos administrativos."""
+        self.bump()
+
+    def _build(self, db: Session, version: int) -> ReferenceSnapshot:
+        """Carrega atividades e projetos do banco (duas consultas)."""
+        schema = Atividade.__table__.schema
+        bind = db.get_bind()
+
+        projetos_db: list[Projeto] = []
+        if table_exists(bind, Projeto.__tablename__, schema):
+            projetos_db = db.query(Projeto).order_by(Projeto.nome).all()
+        projetos = tuple(_projeto_ref(p) for p in projetos_db)
+        projetos_por_id = {p.id: p for p in projetos}
+
+        atividades_db: list[Atividade] = []
+        if table_exists(bind, Atividade.__tablename__, schema):
+            query = db.query(Atividade)
+            if table_exists(bind, AtividadeProjeto.__tablename__, schema):
+                query = query.options(selectinload(Atividade.atividade_projetos))
+            atividades_db = query.order_by(
+                Atividade.criado_em.desc(), Atividade.id.desc()
+            ).all()
+
+        atividades = []
+        por_projeto: dict[UUID, set[UUID]] = {}
+        for atividade in atividades_db:
+            ids_projetos = [ap.id_projeto for ap in atividade.atividade_projetos]
+            for id_projeto in ids_projetos:
+                por_projeto.setdefault(id_projeto, set()).add(atividade.id)
+            atividades.append(
+                AtividadeRef(
+                    id=atividade.id,
+                    nome=atividade.nome,
+                    descricao=atividade.descricao,
+                    ativo=atividade.ativo,
+                    criado_por=atividade.criado_por,
+                    criado_em=atividade.criado_em,
+                    atualizado_em=atividade.atualizado_em,
+                    projetos=tuple(
+                        projetos_por_id[i] for i in ids_projetos if i in projetos_por_id
+                    ),
+                )
+            )
+
+        projeto_ids: dict[UUID, UUID] = {}
+        for projeto in projetos:
+            projeto_ids[projeto.id] = projeto.id
+            if projeto.external_id:
+                projeto_ids[projeto.external_id] = projeto.id
+
+        digest = hashlib.sha1()
+        for atividade in atividades:
+            digest.update(repr(atividade).encode())
+        for projeto in projetos:
+            digest.update(repr(projeto).encode())
+
+        return ReferenceSnapshot(
+            version=version,
+            etag=f'"ref-{digest.hexdigest()[:20]}"',
+            atividades=tuple(atividades),
+            atividades_por_id={a.id: a for a in atividades},
+            atividades_por_projeto={k: frozenset(v) for k, v in por_projeto.items()},
+            projetos=projetos,
+            projeto_ids=projeto_ids,
+        )
+
+    def snapshot(self, db: Session) -> ReferenceSnapshot:
+        """
+        Retorna o snapshot da versão atual, carregando do banco se necessário.
+
+        Args:
+            db: Sessão usada apenas quando o snapshot precisa ser montado.
+        """
+        snapshot = self._snapshot
+        self.counter.record(snapshot is not None)
+        if snapshot is not None:
+            return snapshot
+
+        version = self._version
+        snapshot = self._build(db, version)
+        with self._lock:
+            # Uma escrita concorrente durante a carga torna este snapshot obsoleto
+            if self._version == version:
+                self._snapshot = snapshot
+        logger.debug(f"Cache de referência carregado (versão {version})")
+        return snapshot
+
+    def get_atividade(self, db: Session, atividade_id: UUID) -> AtividadeRef | None:
+        """Busca uma atividade no cache."""
+        return self.snapshot(db).atividades_por_id.get(atividade_id)
+
+    def resolve_projeto_ids(self, db: Session, ids: list[UUID]) -> dict[UUID, UUID]:
+        """
+        Mapeia ids (internos ou external_id) para o id interno do projeto.
+
+        Returns:
+            Dict apenas com os ids encontrados.
+        """
+        projeto_ids = self.snapshot(db).projeto_ids
+        return {i: projeto_ids[i] for i in ids if i in projeto_ids}
+
+    def list_atividades(
+        self,
+        db: Session,
+        limit: int,
+        ativo: bool | None = None,
+        id_projeto: UUID | None = None,
+    ) -> tuple[list[AtividadeRef], int, str | None]:
+        """
+        Primeira página da listagem de atividades, servida do cache.
+
+        Mesma ordenação e cursor de AtividadeRepository.get_all(), de modo
+        que as páginas seguintes podem ser buscadas no banco pelo cursor.
+
+        Returns:
+            Tupla (atividades, total, próximo cursor).
+        """
+        snapshot = self.snapshot(db)
+        atividades = snapshot.atividades
+
+        if id_projeto is not None:
+            ids = snapshot.atividades_por_projeto.get(id_projeto, frozenset())
+            atividades = tuple(a for a in atividades if a.id in ids)
+
+        if ativo is not None:
+            atividades = tuple(a for a in atividades if a.ativo == ativo)
+
+        page = list(atividades[:limit])
+        next_cursor = None
+        if len(atividades) > limit:
+            next_cursor = encode_cursor(page[-1].criado_em, page[-1].id)
+
+        return page, len(atividades), next_cursor
+
+    def list_projetos(self, db: Session) -> list[ProjetoRef]:
+        """Projetos ordenados por nome, servidos do cache."""
+        return list(self.snapshot(db).projetos)
+
+
+# Instância única por processo
+reference_cache = ReferenceDataCache()
+register_cache("referencia", reference_cache.counter)
+# Escritas de atividades em outros workers (LISTEN/NOTIFY)
+register_invalidation_handler("referencia", lambda *key: reference_cache.bump())
@@ -0,0 +1,218 @@
+"""
+Repository do rollup de horas (tabela horas_diarias) usado pelos relatórios.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select
+from app.models.apontamento import Apontamento
+from app.models.atividade import Atividade
+from app.models.horas_diarias import HorasDiarias, HorasDiariasPendencia, RollupWatermark
+from app.repositories.apontamento import parse_duracao
+
+ROLLUP_NAME = "horas_diarias"
+
+# Releitura de segurança: transações que commitam depois de outras mais
+# recentes podem ter atualizado_em um pouco anterior ao watermark salvo
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Máximo de dias recalculados por comando (limite do IN)
+DAYS_PER_BATCH = 500
+
+# Dimensões aceitas no agrupamento -> colunas do rollup
+GROUP_BY_COLUMNS = {
+    "usuario": (HorasDiarias.usuario_id,),
+    "projeto": (HorasDiarias.project_id,),
+    "atividade": (HorasDiarias.id_atividade, Atividade.nome),
+    "dia": (HorasDiarias.dia,),
+}
+
+
+class RelatorioRepository:
+    """Repository para o rollup de horas por usuário × projeto × atividade × dia."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _changed_partitions(self, since: datetime) -> set[tuple[str, date]]:
+        """Partições (organização, dia) com apontamentos alterados desde `since`."""
+        rows = (
+            self.db.query(Apontamento.organization_name, Apontamento.data_apontamento)
+            .filter(Apontamento.atualizado_em > since)
+            .distinct()
+            .all()
+        )
+        return {(org, dia) for org, dia in rows}
+
+    def _all_partitions(self) -> set[tuple[str, date]]:
+        """Todas as partições (organização, dia) existentes em apontamentos."""
+        rows = (
+            self.db.query(Apontamento.organization_name, Apontamento.data_apontamento)
+            .distinct()
+            .all()
+        )
+        return {(org, dia) for org, dia in rows}
+
+    def _recompute(self, partitions: set[tuple[str, date]]) -> None:
+        """
+        Recalcula as linhas do rollup das partições informadas.
+
+        Cada partição é apagada e reagregada a partir de apontamentos, o que
+        cobre inclusões, alterações (inclusive de chave) e exclusões.
+        """
+        dias_por_org: dict[str, list[date]] = defaultdict(list)
+        for org, dia in partitions:
+            dias_por_org[org].append(dia)
+
+        now = datetime.utcnow()
+        for org, dias in dias_por_org.items():
+            dias.sort()
+            for start in range(0, len(dias), DAYS_PER_BATCH):
+                chunk = dias[start:start + DAYS_PER_BATCH]
+
+                self.db.query(HorasDiarias).filter(
+                    HorasDiarias.organization_name == org,
+                    HorasDiarias.dia.in_(chunk),
+                ).delete(synchronize_session=False)
+
+                rows = self.db.execute(
+                    select(
+                        Apontamento.project_id,
+                        Apontamento.usuario_id,
+                        Apontamento.id_atividade,
+                        Apontamento.data_apontamento,
+                        Apontamento.duracao,
+                        Apontamento.usuario_nome,
+                    ).where(
+                        Apontamento.organization_name == org,
+                        Apontamento.data_apontamento.in_(chunk),
+                    )
+                )
+
+                totais: dict[tuple, dict] = {}
+                for project_id, usuario_id, id_atividade, dia, duracao, usuario_nome in rows:
+                    key = (project_id, usuario_id, id_atividade, dia)
+                    if key not in totais:
+                        totais[key] = {
+                            "organization_name": org,
+                            "project_id": project_id,
+                            "usuario_id": usuario_id,
+                            "id_atividade": id_atividade,
+                            "dia": dia,
+                            "usuario_nome": usuario_nome,
+                            "total_minutos": 0,
+                            "total_apontamentos": 0,
+                            "atualizado_em": now,
+                        }
+                    horas, minutos = parse_duracao(duracao)
+                    totais[key]["total_minutos"] += horas * 60 + minutos
+                    totais[key]["total_apontamentos"] += 1
+
+                if totais:
+                    self.db.execute(insert(HorasDiarias), list(totais.values()))
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Atualiza o rollup a partir dos apontamentos alterados desde o watermark.
+
+        Na primeira execução (sem watermark) ou com `full=True`, reconstrói
+        o rollup inteiro. Faz commit ao final.
+
+        Args:
+            full: Força a reconstrução completa.
+
+        Returns:
+            Número de partições (organização, dia) recalculadas.
+        """
+        watermark = self.db.get(RollupWatermark, ROLLUP_NAME)
+        latest = self.db.query(func.max(Apontamento.atualizado_em)).scalar()
+        pendencias = self.db.query(HorasDiariasPendencia).all()
+
+        if full or watermark is None or watermark.watermark is None:
+            self.db.query(HorasDiarias).delete(synchronize_session=False)
+            partitions = self._all_partitions()
+        else:
+            if not pendencias and (latest is None or latest <= watermark.watermark):
+                return 0
+            partitions = self._changed_partitions(watermark.watermark - WATERMARK_OVERLAP)
+            partitions |= {(p.organization_name, p.dia) for p in pendencias}
+
+        self._recompute(partitions)
+
+        for pendencia in pendencias:
+            self.db.delete(pendencia)
+
+        if watermark is None:
+            watermark = RollupWatermark(nome=ROLLUP_NAME)
+            self.db.add(watermark)
+        watermark.watermark = latest
+        watermark.atualizado_em = datetime.utcnow()
+
+        self.db.commit()
+        return len(partitions)
+
+    def get_watermark(self) -> datetime | None:
+        """Retorna o último atualizado_em processado pelo rollup."""
+        watermark = self.db.get(RollupWatermark, ROLLUP_NAME)
+        return watermark.watermark if watermark else None
+
+    def query_horas(
+        self,
+        organization_name: str,
+        data_inicio: date,
+        data_fim: date,
+        group_by: list[str],
+        project_id: str | None = None,
+        usuario_id: str | None = None,
+    ) -> list[dict]:
+        """
+        Agrega o rollup pelas dimensões pedidas.
+
+        Args:
+            organization_name: Nome da organização.
+            data_inicio: Data inicial (inclusiva).
+            data_fim: Data final (inclusiva).
+            group_by: Dimensões de GROUP_BY_COLUMNS.
+            project_id: Filtrar por projeto (opcional).
+            usuario_id: Filtrar por usuário (opcional).
+
+        Returns:
+            Lista de dicts com as dimensões, total_minutos e total_apontamentos.
+        """
+        dimensions = [c for dim in group_by for c in GROUP_BY_COLUMNS[dim]]
+        columns = list(dimensions)
+        if "usuario" in group_by:
+            columns.append(func.max(HorasDiarias.usuario_nome).label("usuario_nome"))
+
+        stmt = select(
+            *columns,
+            func.sum(HorasDiarias.total_minutos).label("total_minutos"),
+            func.sum(HorasDiarias.total_apontamentos).label("total_apontamentos"),
+        ).where(
+            HorasDiarias.organization_name == organization_name,
+            HorasDiarias.dia >= data_inicio,
+            HorasDiarias.dia <= data_fim,
+        )
+
+        if "atividade" in group_by:
+            stmt = stmt.outerjoin(Atividade, Atividade.id == HorasDiarias.id_atividade)
+
+        if project_id:
+            stmt = stmt.where(HorasDiarias.project_id == project_id)
+
+        if usuario_id:
+            stmt = stmt.where(HorasDiarias.usuario_id == usuario_id)
+
+        if dimensions:
+            stmt = stmt.group_by(*dimensions).order_by(*dimensions)
+
+        result = []
+        for row in self.db.execute(stmt).mappings():
+            item = dict(row)
+            if "nome" in item:
+                item["atividade_nome"] = item.pop("nome")
+            if item["total_minutos"] is None:
+                continue
+            result.append(item)
+        return result
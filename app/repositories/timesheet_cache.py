@@ -0,0 +1,124 @@
+"""
+Caches do timesheet, aquecidos pelo TimesheetWarmer.
+
+- week_cache: apontamentos de uma semana por (organização, projeto, segunda,
+  usuário). Escritas em ApontamentoRepository invalidam o projeto.
+- iteration_cache: work items de uma iteration por (organização, projeto,
+  iteration). Eventos do espelho de work items invalidam a organização.
+
+Os dois são namespaces de app.cache (em memória ou no Redis, conforme
+CACHE_BACKEND). O processo lembra quais entradas gravou por prefetch: o
+primeiro acerto em uma entrada pré-carregada conta como prefetch_hit, de modo
+que prefetch_hits / prefetched mostra se o aquecimento compensa.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Hashable
+from uuid import UUID
+
+from app.cache import get_cache
+from app.config import get_settings
+
+settings = get_settings()
+
+MAX_ENTRIES = 5000
+
+
+@dataclass(frozen=True)
+class ApontamentoSemana:
+    """Apontamento em cache (atributos usados pelas células do timesheet)."""
+
+    id: UUID
+    work_item_id: int
+    data_apontamento: date
+    duracao: str
+    id_atividade: UUID
+    atividade_nome: str
+    comentario: str | None = None
+
+
+class TimesheetCache:
+    """
+    Namespace de app.cache com TTL e limite de entradas, mais a contabilidade
+    do aquecimento (entradas gravadas por prefetch e seus acertos, no processo).
+    """
+
+    def __init__(self, name: str, ttl: Callable[[], int], max_entries: int = MAX_ENTRIES):
+        self.name = name
+        self.cache = get_cache(name, ttl, max_entries=max_entries)
+        self._prefetched: OrderedDict[str, None] = OrderedDict()
+        self._max_prefetched = max_entries
+        self._lock = threading.Lock()
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
+
+    def get(self, key: Hashable) -> Any | None:
+        """Valor em cache ou None (ausente ou expirado)."""
+        value = self.cache.get(key)
+        if value is not None and self._prefetched:
+            full_key = self.cache.key(key)
+            with self._lock:
+                if full_key in self._prefetched:
+                    del self._prefetched[full_key]
+                    self.prefetch_hits += 1
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        """Indica se há valor válido, sem afetar as estatísticas."""
+        return self.cache.contains(key)
+
+    def set(self, key: Hashable, value: Any, prefetched: bool = False) -> None:
+        """Grava um valor; prefetched marca valores carregados pelo aquecimento."""
+        if not self.cache.set(key, value):
+            return
+        with self._lock:
+            full_key = self.cache.key(key)
+            if prefetched:
+                self._prefetched[full_key] = None
+                while len(self._prefetched) > self._max_prefetched:
+                    self._prefetched.popitem(last=False)
+                self.prefetched += 1
+            else:
+                self._prefetched.pop(full_key, None)
+
+    def invalidate(self, *prefix: Any) -> int:
+        """Remove as chaves que começam por prefix. Retorna a quantidade removida."""
+        return self.cache.invalidate(*prefix)
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self.cache.reset_stats()
+        with self._lock:
+            self._prefetched.clear()
+            self.prefetched = 0
+            self.prefetch_hits = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Contadores e taxas de acerto do cache."""
+        stats = self.cache.stats()
+        return {
+            "entradas": stats["entradas"],
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": stats["hit_rate"],
+            "prefetched": self.prefetched,
+            "prefetch_hits": self.prefetch_hits,
+            "prefetch_hit_rate": round(self.prefetch_hits / self.prefetched, 4) if self.prefetched else None,
+            "invalidacoes": stats["invalidacoes"],
+        }
+
+
+# Instâncias únicas por processo
+week_cache = TimesheetCache("semanas", lambda: settings.timesheet_week_cache_ttl_seconds)
+iteration_cache = TimesheetCache("iterations", lambda: settings.timesheet_iteration_cache_ttl_seconds)
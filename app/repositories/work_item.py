@@ -0,0 +1,274 @@
+"""
+Repository do índice local de work items (tabela work_items).
+"""
+
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, or_
+from app.models.apontamento import Apontamento
+from app.models.work_item import WorkItem, WorkItemMirrorStatus
+from app.utils.upsert import build_upsert
+
+# Colunas gravadas a partir dos dados do Azure DevOps
+INDEX_COLUMNS = (
+    "title",
+    "work_item_type",
+    "state",
+    "original_estimate",
+    "completed_work",
+    "remaining_work",
+)
+
+# Nem toda consulta ao Azure traz esses campos (a busca WIQL não pede
+# System.Parent, por exemplo): valores nulos não apagam os gravados
+OPTIONAL_COLUMNS = (
+    "project_id",
+    "project_name",
+    "url",
+    "parent_id",
+    "assigned_to",
+    "assigned_to_email",
+    "iteration_path",
+    "rev",
+)
+
+# Máximo de linhas por INSERT ... ON CONFLICT
+UPSERT_BATCH_SIZE = 500
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class WorkItemRepository:
+    """Repository para o índice local de work items."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert_many(self, organization_name: str, items: list[dict], commit: bool = True) -> int:
+        """
+        Grava (ou atualiza) work items no índice local.
+
+        Args:
+            organization_name: Organização dos work items.
+            items: Dicts com "id" e as colunas de INDEX_COLUMNS/OPTIONAL_COLUMNS.
+            commit: Se False, a transação fica a cargo de quem chama.
+
+        Returns:
+            Quantidade de work items gravados.
+        """
+        now = datetime.utcnow()
+        rows_by_id: dict[int, dict] = {}
+        for item in items:
+            if not item.get("id"):
+                continue
+            # Um mesmo id duas vezes no INSERT quebra o ON CONFLICT
+            row = {column: item.get(column) for column in (*INDEX_COLUMNS, *OPTIONAL_COLUMNS)}
+            row["title"] = (row["title"] or "")[:512]
+            row.update(organization_name=organization_name, id=int(item["id"]), atualizado_em=now)
+            rows_by_id[row["id"]] = row
+
+        rows = list(rows_by_id.values())
+        for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+            self.db.execute(
+                build_upsert(
+                    self.db.get_bind(),
+                    WorkItem.__table__,
+                    rows[i : i + UPSERT_BATCH_SIZE],
+                    conflict_columns=["organization_name", "id"],
+                    update_columns=[*INDEX_COLUMNS, "atualizado_em"],
+                    coalesce_columns=OPTIONAL_COLUMNS,
+                )
+            )
+        if commit:
+            self.db.commit()
+        return len(rows)
+
+    def search(
+        self,
+        organization_name: str,
+        query: str,
+        project_ids: list[str] | None = None,
+        project_names: list[str] | None = None,
+        usuario_id: str | None = None,
+        limit: int = 10,
+    ) -> list[WorkItem]:
+        """
+        Busca work items por ID ou trecho do título.
+
+        Resultados com apontamentos recentes do usuário aparecem primeiro,
+        seguidos dos atualizados mais recentemente no Azure DevOps.
+
+        Args:
+            organization_name: Organização dos work items.
+            query: ID ou trecho do título.
+            project_ids: Filtra pelo UUID do projeto.
+            project_names: Filtra pelo nome do projeto (System.TeamProject).
+            usuario_id: Usuário cujos apontamentos definem a prioridade.
+            limit: Máximo de resultados.
+
+        Returns:
+            Lista de work items.
+        """
+        query = query.strip()
+        filters = [WorkItem.title.ilike(f"%{_escape_like(query)}%", escape="\\")]
+        ordering = []
+        if query.isdigit():
+            filters.append(WorkItem.id == int(query))
+            ordering.append(case((WorkItem.id == int(query), 0), else_=1))
+
+        q = self.db.query(WorkItem).filter(
+            WorkItem.organization_name == organization_name,
+            or_(*filters),
+        )
+
+        if project_ids or project_names:
+            q = q.filter(
+                or_(
+                    WorkItem.project_id.in_(project_ids or []),
+                    WorkItem.project_name.in_(project_names or []),
+                )
+            )
+
+        if usuario_id:
+            recentes = (
+                self.db.query(
+                    Apontamento.work_item_id.label("work_item_id"),
+                    func.max(Apontamento.data_apontamento).label("ultimo_apontamento"),
+                )
+                .filter(
+                    Apontamento.organization_name == organization_name,
+                    Apontamento.usuario_id == usuario_id,
+                )
+                .group_by(Apontamento.work_item_id)
+                .subquery()
+            )
+            q = q.outerjoin(recentes, recentes.c.work_item_id == WorkItem.id)
+            ordering.append(recentes.c.ultimo_apontamento.desc().nulls_last())
+
+        ordering.extend([WorkItem.atualizado_em.desc(), WorkItem.id.desc()])
+        return q.order_by(*ordering).limit(limit).all()
+
+    def apply_snapshot(self, organization_name: str, item: dict) -> bool:
+        """
+        Grava o estado completo de um work item recebido por service hook.
+
+        Diferente de upsert_many, campos ausentes são gravados como nulos
+        (ex: o item deixou de ter pai). Revisões mais antigas que a gravada
+        são descartadas, pois o Azure não garante a ordem de entrega.
+
+        Returns:
+            False se o evento estava desatualizado.
+        """
+        existing = self.db.get(WorkItem, (organization_name, int(item["id"])))
+        rev = item.get("rev")
+        if existing is not None and existing.rev is not None and rev is not None and rev < existing.rev:
+            return False
+
+        if existing is None:
+            existing = WorkItem(organization_name=organization_name, id=int(item["id"]))
+            self.db.add(existing)
+        for column in (*INDEX_COLUMNS, *OPTIONAL_COLUMNS):
+            if column in ("project_id", "project_name", "url") and item.get(column) is None:
+                continue
+            setattr(existing, column, item.get(column))
+        existing.title = (existing.title or "")[:512]
+        existing.atualizado_em = datetime.utcnow()
+        return True
+
+    def delete(self, organization_name: str, work_item_id: int) -> bool:
+        """Remove um work item do espelho. Retorna False se ele não existia."""
+        deleted = (
+            self.db.query(WorkItem)
+            .filter(WorkItem.organization_name == organization_name, WorkItem.id == work_item_id)
+            .delete(synchronize_session=False)
+        )
+        return deleted > 0
+
+    def apply_parent_links(self, organization_name: str, links: list[tuple[int, int, bool]]) -> int:
+        """
+        Aplica alterações de links pai/filho (hierarquia) ao espelho.
+
+        Args:
+            organization_name: Organização dos work items.
+            links: Tuplas (filho, pai, ativo) na ordem em que ocorreram. Um link
+                removido só limpa o pai se ele ainda for o pai gravado.
+
+        Returns:
+            Quantidade de work items alterados.
+        """
+        # Apenas o último estado de cada filho importa
+        final: dict[int, tuple[int, bool]] = {}
+        for child_id, parent_id, active in links:
+            final[child_id] = (parent_id, active)
+
+        por_pai: dict[int, list[int]] = {}
+        removidos: dict[int, list[int]] = {}
+        for child_id, (parent_id, active) in final.items():
+            (por_pai if active else removidos).setdefault(parent_id, []).append(child_id)
+
+        changed = 0
+        base = self.db.query(WorkItem).filter(WorkItem.organization_name == organization_name)
+        for parent_id, children in por_pai.items():
+            changed += base.filter(WorkItem.id.in_(children)).update(
+                {WorkItem.parent_id: parent_id}, synchronize_session=False
+            )
+        for parent_id, children in removidos.items():
+            changed += base.filter(WorkItem.id.in_(children), WorkItem.parent_id == parent_id).update(
+                {WorkItem.parent_id: None}, synchronize_session=False
+            )
+        return changed
+
+    def get_many(self, organization_name: str, ids: set[int] | list[int]) -> list[WorkItem]:
+        """Work items do índice local pelos IDs (os ausentes são ignorados)."""
+        if not ids:
+            return []
+        return (
+            self.db.query(WorkItem)
+            .filter(WorkItem.organization_name == organization_name, WorkItem.id.in_(list(ids)))
+            .all()
+        )
+
+    def list_by_project(
+        self, organization_name: str, project_id: str, work_item_types: list[str] | None = None
+    ) -> list[WorkItem]:
+        """Work items do espelho de um projeto, opcionalmente filtrados por tipo."""
+        q = self.db.query(WorkItem).filter(
+            WorkItem.organization_name == organization_name,
+            WorkItem.project_id == project_id,
+        )
+        if work_item_types:
+            q = q.filter(WorkItem.work_item_type.in_(work_item_types))
+        return q.order_by(WorkItem.id).all()
+
+    def get_mirror_status(self, organization_name: str, project_id: str) -> WorkItemMirrorStatus | None:
+        """Estado do espelho do projeto (None se nunca foi carregado nem recebeu eventos)."""
+        return self.db.get(WorkItemMirrorStatus, (organization_name, project_id))
+
+    def list_polled_projects(self) -> list[WorkItemMirrorStatus]:
+        """Projetos já sincronizados pelo poller (com watermark gravado)."""
+        return (
+            self.db.query(WorkItemMirrorStatus)
+            .filter(WorkItemMirrorStatus.revisions_token.isnot(None))
+            .order_by(WorkItemMirrorStatus.organization_name, WorkItemMirrorStatus.project_id)
+            .all()
+        )
+
+    def touch_mirror_status(
+        self,
+        organization_name: str,
+        project_id: str,
+        carga_completa_em: datetime | None = None,
+        ultimo_evento_em: datetime | None = None,
+    ) -> WorkItemMirrorStatus:
+        """Atualiza as datas de carga completa e/ou do último evento do projeto."""
+        status = self.get_mirror_status(organization_name, project_id)
+        if status is None:
+            status = WorkItemMirrorStatus(organization_name=organization_name, project_id=project_id)
+            self.db.add(status)
+        if carga_completa_em is not None:
+            status.carga_completa_em = carga_completa_em
+        if ultimo_evento_em is not None:
+            status.ultimo_evento_em = ultimo_evento_em
+        return status
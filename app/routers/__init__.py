@@ -8,6 +8,11 @@ from . import work_items
 from . import timesheet
 from . import organization_pats
 from . import iterations
+from . import relatorios
+from . import hooks
+from . import cache
+from . import jobs
+from . import reconciliacao
 
 __all__ = [
     "atividades",
@@ -19,4 +24,9 @@ __all__ = [
     "timesheet",
     "organization_pats",
     "iterations",
+    "relatorios",
+    "hooks",
+    "cache",
+    "jobs",
+    "reconciliacao",
 ]
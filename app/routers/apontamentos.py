@@ -3,12 +3,18 @@ Endpoints REST para CRUD de Apontamentos (Registro de Horas).
 Todos os endpoints sao protegidos por autenticacao Azure DevOps.
 """
 
+import re
+from datetime import date
+from typing import Literal
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
+from app.database import get_db, get_session_factory
 from app.auth import get_current_user, AzureDevOpsUser
 from app.services.apontamento_service import ApontamentoService
+from app.services.apontamento_export import EXPORT_MEDIA_TYPES, stream_export
+from app.utils.project_id_normalizer import normalize_project_id
 from app.repositories.apontamento import ApontamentoRepository
 from app.schemas.apontamento import (
     ApontamentoCreate,
@@ -52,6 +58,10 @@ def get_service(
 
     Apos criar o apontamento, os campos CompletedWork e RemainingWork do work item
     no Azure DevOps sao automaticamente atualizados.
+
+    Aceita o header `Idempotency-Key`: repetições com a mesma chave e o mesmo
+    token recebem a resposta original, sem gravar de novo nem recalcular o
+    Azure DevOps.
     """,
 )
 async def criar_apontamento(
@@ -70,6 +80,10 @@ async def criar_apontamento(
     Lista todos os apontamentos de um work item especifico com paginacao.
 
     Retorna tambem o total de horas apontadas em formato decimal e formatado (HH:mm).
+
+    **Paginacao por cursor:** envie o `next_cursor` da resposta anterior em `cursor`
+    para obter a proxima pagina (mais eficiente que `skip` em paginas profundas).
+    Use `include_total=false` para evitar a contagem total de registros.
     """,
 )
 def listar_apontamentos_work_item(
@@ -78,21 +92,28 @@ def listar_apontamentos_work_item(
     project_id: str = Query(..., description="ID do projeto no Azure DevOps"),
     skip: int = Query(0, ge=0, description="Registros a pular"),
     limit: int = Query(100, ge=1, le=1000, description="Maximo de registros"),
+    cursor: str | None = Query(None, description="Cursor da pagina anterior (next_cursor)"),
+    include_total: bool = Query(True, description="Calcular o total de registros"),
     service: ApontamentoService = Depends(get_service),
 ) -> ApontamentoListResponse:
     """Endpoint para listar apontamentos de um work item."""
-    apontamentos, total, total_horas, total_formatado = service.listar_por_work_item(
-        work_item_id=work_item_id,
-        organization_name=organization_name,
-        project_id=project_id,
-        skip=skip,
-        limit=limit,
+    apontamentos, total, total_horas, total_formatado, next_cursor = (
+        service.listar_por_work_item(
+            work_item_id=work_item_id,
+            organization_name=organization_name,
+            project_id=project_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+        )
     )
     return ApontamentoListResponse(
         items=apontamentos,
         total=total,
         total_horas=total_horas,
         total_formatado=total_formatado,
+        next_cursor=next_cursor,
     )
 
 
@@ -148,6 +169,68 @@ async def info_work_item_azure(
     )
 
 
+@router.get(
+    "/export",
+    summary="Exportar apontamentos (CSV / NDJSON)",
+    description="""
+    Exporta em streaming os apontamentos de uma organizacao para folha de pagamento e BI.
+
+    **Filtros:**
+    - `organization_name`: Nome da organizacao (obrigatorio)
+    - `project_id`: UUID ou nome do projeto
+    - `usuario_id`: ID do usuario no Azure DevOps
+    - `data_inicio` / `data_fim`: Periodo (inclusivo)
+
+    **Formatos:** `csv` (com cabecalho) ou `ndjson` (um objeto JSON por linha).
+
+    As linhas sao lidas do banco com cursor no servidor e enviadas a medida que
+    sao geradas, sem carregar todo o resultado em memoria.
+    """,
+)
+def exportar_apontamentos(
+    organization_name: str = Query(..., description="Nome da organizacao no Azure DevOps"),
+    formato: Literal["csv", "ndjson"] = Query("csv", description="Formato da exportacao"),
+    project_id: str | None = Query(None, description="UUID ou nome do projeto"),
+    usuario_id: str | None = Query(None, description="ID do usuario no Azure DevOps"),
+    data_inicio: date | None = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    data_fim: date | None = Query(None, description="Data final (YYYY-MM-DD)"),
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+) -> StreamingResponse:
+    """Endpoint para exportar apontamentos em streaming."""
+    if data_inicio and data_fim and data_inicio > data_fim:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="data_inicio deve ser menor ou igual a data_fim",
+        )
+
+    if project_id:
+        try:
+            project_id = normalize_project_id(project_id, db)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+    # organization_name vem da query string: apenas caracteres seguros no header
+    filename = f"apontamentos_{re.sub(r'[^A-Za-z0-9._-]', '_', organization_name)}.{formato}"
+    return StreamingResponse(
+        stream_export(
+            session_factory,
+            formato,
+            organization_name=organization_name,
+            project_id=project_id,
+            usuario_id=usuario_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get(
     "/{apontamento_id}",
     response_model=ApontamentoResponse,
@@ -181,6 +264,10 @@ def obter_apontamento(
 
     Apos atualizar, os campos CompletedWork e RemainingWork do work item no Azure DevOps
     sao automaticamente recalculados.
+
+    Aceita o header `Idempotency-Key`: repetições com a mesma chave e o mesmo
+    token recebem a resposta original, sem gravar de novo nem recalcular o
+    Azure DevOps.
     """,
 )
 async def atualizar_apontamento(
@@ -201,6 +288,10 @@ async def atualizar_apontamento(
 
     Apos excluir, os campos CompletedWork e RemainingWork do work item no Azure DevOps
     sao automaticamente recalculados.
+
+    Aceita o header `Idempotency-Key`: repetições com a mesma chave e o mesmo
+    token recebem a resposta original, sem gravar de novo nem recalcular o
+    Azure DevOps.
     """,
 )
 async def excluir_apontamento(
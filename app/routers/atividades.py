@@ -7,11 +7,13 @@ permitindo que uma atividade seja associada a múltiplos projetos.
 """
 
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.auth import get_current_user, AzureDevOpsUser
 from app.repositories.atividade import AtividadeRepository
+from app.repositories.reference_cache import reference_cache
+from app.utils.http_cache import etag_matches, not_modified
 from app.schemas.atividade import (
     AtividadeCreate,
     AtividadeUpdate,
@@ -69,23 +71,51 @@ def criar_atividade(
 
     O filtro `id_projeto` retorna atividades que **contêm** o projeto especificado
     (uma atividade pode estar em múltiplos projetos).
+
+    Para paginar por cursor, envie o `next_cursor` da resposta anterior em `cursor`.
+
+    A primeira página é servida do cache de referência e acompanha o header `ETag`;
+    envie-o em `If-None-Match` para receber `304 Not Modified` se nada mudou.
     """,
 )
 def listar_atividades(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Registros a pular"),
     limit: int = Query(100, ge=1, le=1000, description="Máximo de registros"),
     ativo: bool | None = Query(None, description="Filtrar por status ativo"),
     id_projeto: UUID | None = Query(
         None, description="Filtrar por projeto (retorna atividades que contêm este projeto)"
     ),
+    cursor: str | None = Query(None, description="Cursor da página anterior (next_cursor)"),
     current_user: AzureDevOpsUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> AtividadeCatalogResponse:
     """Endpoint para listar atividades no formato esperado pelo frontend."""
-    repository = AtividadeRepository(db)
-    atividades, _ = repository.get_all(
-        skip=skip, limit=limit, ativo=ativo, id_projeto=id_projeto
-    )
+    if not cursor and not skip:
+        etag = reference_cache.snapshot(db).etag
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        atividades, _, next_cursor = reference_cache.list_atividades(
+            db, limit=limit, ativo=ativo, id_projeto=id_projeto
+        )
+    else:
+        repository = AtividadeRepository(db)
+        try:
+            atividades, _, next_cursor = repository.get_all(
+                skip=skip,
+                limit=limit,
+                ativo=ativo,
+                id_projeto=id_projeto,
+                cursor=cursor,
+                include_total=False,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
 
     atividades_ordenadas = sorted(atividades, key=lambda item: (item.nome or ""))
     items = [
@@ -99,7 +129,7 @@ def listar_atividades(
         for index, atividade in enumerate(atividades_ordenadas)
     ]
 
-    return AtividadeCatalogResponse(items=items)
+    return AtividadeCatalogResponse(items=items, next_cursor=next_cursor)
 
 
 @router.get(
@@ -109,23 +139,54 @@ def listar_atividades(
     description="""
     Lista todas as atividades com projetos associados para a tela de gestão.
     Retorna todos os campos incluindo a lista de projetos vinculados.
+
+    Para paginar por cursor, envie o `next_cursor` da resposta anterior em `cursor`.
+    Use `include_total=false` para evitar a contagem total de registros.
+
+    A primeira página é servida do cache de referência e acompanha o header `ETag`.
     """,
 )
 def listar_atividades_gestao(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Registros a pular"),
     limit: int = Query(100, ge=1, le=1000, description="Máximo de registros"),
     ativo: bool | None = Query(None, description="Filtrar por status ativo"),
     id_projeto: UUID | None = Query(
         None, description="Filtrar por projeto (retorna atividades que contêm este projeto)"
     ),
+    cursor: str | None = Query(None, description="Cursor da página anterior (next_cursor)"),
+    include_total: bool = Query(True, description="Calcular o total de registros"),
     current_user: AzureDevOpsUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> AtividadeGestaoResponse:
     """Endpoint para listar atividades na tela de gestão (com projetos)."""
-    repository = AtividadeRepository(db)
-    atividades, total = repository.get_all(
-        skip=skip, limit=limit, ativo=ativo, id_projeto=id_projeto
-    )
+    if not cursor and not skip:
+        etag = reference_cache.snapshot(db).etag
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        atividades, total, next_cursor = reference_cache.list_atividades(
+            db, limit=limit, ativo=ativo, id_projeto=id_projeto
+        )
+        if not include_total:
+            total = None
+    else:
+        repository = AtividadeRepository(db)
+        try:
+            atividades, total, next_cursor = repository.get_all(
+                skip=skip,
+                limit=limit,
+                ativo=ativo,
+                id_projeto=id_projeto,
+                cursor=cursor,
+                include_total=include_total,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
 
     atividades_ordenadas = sorted(atividades, key=lambda item: (item.nome or ""))
     items = [
@@ -143,7 +204,7 @@ def listar_atividades_gestao(
         for atividade in atividades_ordenadas
     ]
 
-    return AtividadeGestaoResponse(items=items, total=total)
+    return AtividadeGestaoResponse(items=items, total=total, next_cursor=next_cursor)
 
 
 @router.get(
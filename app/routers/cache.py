@@ -0,0 +1,80 @@
+"""
+Endpoints administrativos dos caches (app/cache.py).
+Permitem inspecionar e esvaziar os namespaces do processo.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.auth import AzureDevOpsUser, get_current_user
+from app.cache import Cache, registered_caches
+from app.cache_events import cache_invalidation_listener
+from app.config import get_settings
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+settings = get_settings()
+
+
+def get_namespace(namespace: str) -> Cache:
+    """Dependency que resolve o namespace ou retorna 404."""
+    cache = registered_caches().get(namespace)
+    if cache is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Namespace de cache '{namespace}' não encontrado",
+        )
+    return cache
+
+
+@router.get(
+    "",
+    summary="Listar caches",
+    description="""
+    Backend configurado (`CACHE_BACKEND`) e estatísticas de cada namespace:
+    entradas, hits, misses, cargas (e quantas foram compartilhadas pelo
+    single-flight), invalidações e erros do backend, além do listener de
+    invalidação entre workers (LISTEN/NOTIFY). Os contadores são do
+    processo que atendeu a requisição.
+    """,
+)
+def listar_caches(
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+) -> dict:
+    """Endpoint para listar os namespaces de cache."""
+    return {
+        "backend": settings.cache_backend,
+        "namespaces": {name: cache.stats() for name, cache in registered_caches().items()},
+        "invalidacao": cache_invalidation_listener.stats(),
+    }
+
+
+@router.get(
+    "/{namespace}",
+    summary="Inspecionar namespace de cache",
+    description="Estatísticas e até `limit` chaves do namespace.",
+)
+def inspecionar_cache(
+    limit: int = Query(100, ge=1, le=1000, description="Máximo de chaves retornadas"),
+    cache: Cache = Depends(get_namespace),
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+) -> dict:
+    """Endpoint para inspecionar um namespace de cache."""
+    return {"namespace": cache.namespace, **cache.stats(), "chaves": cache.keys(limit)}
+
+
+@router.delete(
+    "/{namespace}",
+    summary="Esvaziar namespace de cache",
+    description="""
+    Remove as entradas do namespace. Com `prefix` (repetível), remove apenas
+    as chaves que começam pelas partes informadas, ex:
+    `DELETE /cache/semanas?prefix=sefaz-ceara&prefix=<project_id>`.
+    """,
+)
+def esvaziar_cache(
+    prefix: list[str] | None = Query(None, description="Partes iniciais da chave"),
+    cache: Cache = Depends(get_namespace),
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+) -> dict:
+    """Endpoint para esvaziar um namespace de cache."""
+    removidas = cache.invalidate(*prefix) if prefix else cache.clear()
+    return {"namespace": cache.namespace, "removidas": removidas}
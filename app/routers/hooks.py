@@ -0,0 +1,92 @@
+"""
+Endpoints para os service hooks do Azure DevOps.
+
+Assinatura recomendada (Project Settings > Service hooks > Web Hooks) para os
+eventos "Work item created", "Work item updated", "Work item deleted" e
+"Work item restored", com o segredo AZURE_DEVOPS_WEBHOOK_SECRET enviado no
+header X-Webhook-Secret ou como senha da autenticação básica.
+"""
+
+import base64
+import binascii
+import hmac
+import logging
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import get_db
+from app.schemas.hooks import ServiceHookResult
+from app.services.work_item_mirror import SUPPORTED_EVENTS, WorkItemMirrorService, parse_service_hook
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+router = APIRouter(prefix="/hooks", tags=["Service Hooks"])
+
+
+def verify_webhook_secret(
+    x_webhook_secret: str | None = Header(default=None),
+    authorization: str | None = Header(default=None),
+) -> None:
+    """
+    Valida o segredo compartilhado da assinatura do service hook.
+
+    Raises:
+        HTTPException: 503 se o segredo não estiver configurado, 401 se inválido.
+    """
+    secret = settings.azure_devops_webhook_secret
+    if not secret:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service hooks não configurados (AZURE_DEVOPS_WEBHOOK_SECRET)",
+        )
+
+    provided = x_webhook_secret
+    if provided is None and authorization and authorization.lower().startswith("basic "):
+        try:
+            decoded = base64.b64decode(authorization[6:]).decode()
+            provided = decoded.split(":", 1)[1] if ":" in decoded else decoded
+        except (binascii.Error, UnicodeDecodeError):
+            provided = None
+
+    if provided is None or not hmac.compare_digest(provided.encode(), secret.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Segredo do service hook inválido",
+        )
+
+
+@router.post(
+    "/azure-devops",
+    response_model=ServiceHookResult,
+    summary="Receber service hook do Azure DevOps",
+    description=(
+        "Aplica eventos workitem.created/updated/restored/deleted ao espelho local "
+        "de work items usado pelo timesheet. Outros eventos são ignorados."
+    ),
+    dependencies=[Depends(verify_webhook_secret)],
+)
+def receive_azure_devops_hook(
+    payload: dict = Body(...),
+    db: Session = Depends(get_db),
+) -> ServiceHookResult:
+    """Endpoint chamado pelas assinaturas de service hook do Azure DevOps."""
+    event_type = str(payload.get("eventType") or "")
+    if event_type not in SUPPORTED_EVENTS:
+        return ServiceHookResult(evento=event_type, acao="ignorado")
+
+    try:
+        event = parse_service_hook(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    acao = WorkItemMirrorService(db).apply(event)
+    logger.debug(f"Service hook {event_type}: WI {event.work_item_id} ({event.organization_name}) -> {acao}")
+    return ServiceHookResult(
+        evento=event_type,
+        organization_name=event.organization_name,
+        work_item_id=event.work_item_id,
+        acao=acao,
+    )
@@ -1,15 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
 from app.auth import get_current_user, AzureDevOpsUser
+from app.database import get_db
+from app.repositories.reference_cache import reference_cache
 from app.services.azure import AzureService
+from app.services.projeto_service import ProjetoService
+from app.services.project_sync_scheduler import is_stale
 
 router = APIRouter(prefix="/integracao", tags=["Integração"])
 
 
 @router.get("/projetos", summary="Listar projetos do Azure DevOps")
-async def listar_projetos(current_user: AzureDevOpsUser = Depends(get_current_user)):
+async def listar_projetos(
+    response: Response,
+    live: bool = Query(False, description="Consultar o Azure DevOps mesmo com dados locais recentes"),
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     """
-    Lista projetos da organização configurada usando o token do usuário autenticado.
-    Serve para testar a integração e o escopo do token.
+    Lista projetos da organização configurada.
+
+    Responde com a tabela local de projetos (no formato da API do Azure DevOps)
+    enquanto a última sincronização da organização estiver dentro do limite
+    PROJECT_SYNC_MAX_STALENESS_SECONDS. Com dados vencidos, ou com `live=true`,
+    consulta o Azure DevOps usando o token do usuário autenticado (útil para
+    testar a integração e o escopo do token).
     """
     if not current_user.token:
         raise HTTPException(
@@ -18,4 +33,28 @@ async def listar_projetos(current_user: AzureDevOpsUser = Depends(get_current_us
         )
 
     service = AzureService(token=current_user.token)
+
+    if not live:
+        org_name = service.organization_name.lower()
+        last_sync = {
+            org.lower(): synced_at
+            for org, synced_at in ProjetoService(db, current_user).last_sync_by_organization().items()
+        }.get(org_name)
+
+        if not is_stale(last_sync):
+            response.headers["X-Data-Source"] = "local"
+            response.headers["X-Last-Sync-At"] = last_sync.isoformat()
+            return [
+                {
+                    "id": str(projeto.external_id),
+                    "name": projeto.nome,
+                    "description": projeto.descricao,
+                    "url": projeto.url,
+                    "state": projeto.estado,
+                }
+                for projeto in reference_cache.list_projetos(db)
+                if (projeto.organizacao or "").lower() == org_name
+            ]
+
+    response.headers["X-Data-Source"] = "azure"
     return await service.list_projects()
@@ -0,0 +1,28 @@
+"""
+Endpoints de acompanhamento dos jobs em segundo plano (app/services/job_scheduler.py).
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.auth import AzureDevOpsUser, get_current_user
+from app.services.job_scheduler import INSTANCE_ID, job_scheduler
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get(
+    "",
+    summary="Estado dos jobs em segundo plano",
+    description="""
+    Para cada job: réplica que detém o lock agora (`holder`, nulo se nenhuma
+    rodada está em andamento), última execução (início, fim, duração, status
+    e erro) e a réplica que a executou. Em `local`, os contadores do processo
+    que atendeu a requisição (`instancia`), incluindo as rodadas puladas por
+    outra réplica ser a líder.
+    """,
+)
+def listar_jobs(
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+) -> dict:
+    """Endpoint para listar o estado dos jobs."""
+    return {"instancia": INSTANCE_ID, "jobs": job_scheduler.status()}
@@ -31,14 +31,24 @@ async def listar_pats(
     skip: int = Query(0, ge=0, description="Registros a pular"),
     limit: int = Query(100, ge=1, le=500, description="Limite de registros"),
     only_active: bool = Query(False, description="Apenas PATs ativos"),
+    cursor: str | None = Query(None, description="Cursor da página anterior (next_cursor)"),
+    include_total: bool = Query(True, description="Calcular o total de registros"),
     current_user: AzureDevOpsUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> OrganizationPatList:
     """Lista todos os PATs cadastrados."""
     service = OrganizationPatService(db)
-    items, total = service.list_all(skip, limit, only_active)
+    try:
+        items, total, next_cursor = service.list_all(
+            skip, limit, only_active, cursor=cursor, include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
-    return OrganizationPatList(items=items, total=total)
+    return OrganizationPatList(items=items, total=total, next_cursor=next_cursor)
 
 
 @router.get(
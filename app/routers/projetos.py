@@ -1,32 +1,78 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+import logging
+from datetime import datetime
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, sessionmaker
+from app.database import get_db, get_session_factory
 from app.auth import get_current_user, AzureDevOpsUser
 from app.services.projeto_service import ProjetoService
+from app.services.project_sync_scheduler import project_sync_scheduler
 from app.schemas.projeto import ProjetoResponse
+from app.repositories.reference_cache import reference_cache
+from app.utils.http_cache import etag_matches, not_modified
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["Projetos"])
 
 
+def _oldest_sync(service: ProjetoService, organizations: list[str]) -> datetime | None:
+    """Última sincronização da organização mais desatualizada entre as informadas."""
+    last_sync = service.last_sync_by_organization(organizations)
+    return min(last_sync.values()) if last_sync else None
+
+
 @router.post("/integracao/sincronizar")
 async def sync_projects(
-    db: Session = Depends(get_db), user: AzureDevOpsUser = Depends(get_current_user)
+    user: AzureDevOpsUser = Depends(get_current_user),
+    session_factory: sessionmaker = Depends(get_session_factory),
 ):
     """
     Sincroniza projetos do Azure DevOps com o banco local.
+
+    Se uma sincronização (automática ou manual) já estiver em andamento,
+    aguarda e retorna o resultado dela em vez de iniciar outra.
     """
-    service = ProjetoService(db, user)
-    result = await service.sync_projects()
-    return result
+    return await project_sync_scheduler.sync_now(session_factory, user)
 
 
 @router.get("/projetos", response_model=list[ProjetoResponse])
-def list_projects(
-    db: Session = Depends(get_db), user: AzureDevOpsUser = Depends(get_current_user)
+async def list_projects(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: AzureDevOpsUser = Depends(get_current_user),
+    session_factory: sessionmaker = Depends(get_session_factory),
 ):
     """
     Lista projetos do cache local.
+
+    Se a organização configurada sincronizada há mais tempo passou do limite
+    PROJECT_SYNC_MAX_STALENESS_SECONDS, sincroniza com o Azure DevOps antes de
+    responder. O header `X-Last-Sync-At` informa a data dessa sincronização.
+    Organizações removidas ou desativadas não entram na conta, nem as que
+    falharam na última sincronização (ficam para o job periódico).
+
+    A resposta acompanha o header `ETag`; envie-o em `If-None-Match` para
+    receber `304 Not Modified` se nada mudou.
     """
     service = ProjetoService(db, user)
-    projetos = service.list_local_projects()
+
+    # Consultas síncronas: fora do event loop
+    failed = project_sync_scheduler.failed_organizations
+    configured = await run_in_threadpool(service.configured_organization_names)
+    organizations = [org for org in configured if org.lower() not in failed]
+    oldest_sync = await run_in_threadpool(_oldest_sync, service, organizations)
+    if organizations and await project_sync_scheduler.refresh_if_stale(oldest_sync, session_factory):
+        db.expire_all()
+        oldest_sync = await run_in_threadpool(_oldest_sync, service, organizations)
+
+    etag = (await run_in_threadpool(reference_cache.snapshot, db)).etag
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    if oldest_sync:
+        response.headers["X-Last-Sync-At"] = oldest_sync.isoformat()
+
+    projetos = await run_in_threadpool(service.list_local_projects)
     return [ProjetoResponse.model_validate(projeto) for projeto in projetos]
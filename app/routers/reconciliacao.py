@@ -0,0 +1,88 @@
+"""
+Endpoints da reconciliação de horas com o CompletedWork do Azure DevOps.
+"""
+
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, sessionmaker
+from app.database import get_db, get_session_factory
+from app.auth import get_current_user, AzureDevOpsUser
+from app.repositories.reconciliacao import ReconciliacaoRepository
+from app.services.reconciliacao_service import reconciliacao_scheduler
+from app.schemas.reconciliacao import ReconciliacaoDetalheResponse, ReconciliacaoExecucaoResponse
+
+router = APIRouter(prefix="/reconciliacao", tags=["Reconciliação"])
+
+
+@router.post(
+    "",
+    response_model=ReconciliacaoExecucaoResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Executar reconciliação de horas",
+    description="""
+    Compara o total apontado localmente com o CompletedWork de cada work item
+    no Azure DevOps e corrige apenas os divergentes (CompletedWork e
+    RemainingWork). Por padrão executa em **dry-run**: as divergências são
+    registradas no relatório sem alterar o Azure.
+
+    A execução roda em segundo plano: a resposta traz a execução registrada
+    (status `executando`); acompanhe o resultado em `GET /reconciliacao/{id}`.
+
+    A mesma reconciliação roda diariamente em `RECONCILIATION_TIME`.
+    """,
+)
+async def executar_reconciliacao(
+    dry_run: bool = Query(True, description="Apenas registrar as divergências"),
+    organization_name: str | None = Query(None, description="Apenas esta organização"),
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+) -> ReconciliacaoExecucaoResponse:
+    """Endpoint para iniciar a reconciliação."""
+    execucao = await run_in_threadpool(ReconciliacaoRepository(db).create_run, dry_run, organization_name)
+    reconciliacao_scheduler.run_in_background(execucao.id, dry_run, organization_name, session_factory)
+    return ReconciliacaoExecucaoResponse.model_validate(execucao)
+
+
+@router.get(
+    "",
+    response_model=list[ReconciliacaoExecucaoResponse],
+    summary="Listar execuções da reconciliação",
+    description="Execuções mais recentes primeiro.",
+)
+def listar_reconciliacoes(
+    limit: int = Query(20, ge=1, le=200, description="Máximo de execuções retornadas"),
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> list[ReconciliacaoExecucaoResponse]:
+    """Endpoint para listar as execuções da reconciliação."""
+    return [
+        ReconciliacaoExecucaoResponse.model_validate(execucao)
+        for execucao in ReconciliacaoRepository(db).list_runs(limit)
+    ]
+
+
+@router.get(
+    "/{execucao_id}",
+    response_model=ReconciliacaoDetalheResponse,
+    summary="Detalhar execução da reconciliação",
+    description="Resumo da execução e os work items divergentes com a ação tomada.",
+)
+def obter_reconciliacao(
+    execucao_id: UUID,
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> ReconciliacaoDetalheResponse:
+    """Endpoint para detalhar uma execução da reconciliação."""
+    repository = ReconciliacaoRepository(db)
+    execucao = repository.get_run(execucao_id)
+    if execucao is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Execução de reconciliação {execucao_id} não encontrada",
+        )
+    return ReconciliacaoDetalheResponse(
+        **ReconciliacaoExecucaoResponse.model_validate(execucao).model_dump(),
+        itens=repository.list_items(execucao_id),
+    )
@@ -0,0 +1,83 @@
+"""
+Endpoints de relatórios de horas, servidos a partir do rollup horas_diarias.
+"""
+
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.auth import get_current_user, AzureDevOpsUser
+from app.services.relatorio_service import RelatorioService
+from app.schemas.relatorio import RelatorioHorasResponse, RollupRefreshResponse
+from app.utils.project_id_normalizer import normalize_project_id
+
+router = APIRouter(prefix="/relatorios", tags=["Relatórios"])
+
+
+@router.get(
+    "/horas",
+    response_model=RelatorioHorasResponse,
+    summary="Relatório de horas",
+    description="""
+    Total de horas apontadas em um período, agrupado pelas dimensões pedidas.
+
+    **Agrupamentos (`group_by`, pode repetir):** `usuario`, `projeto`, `atividade`,
+    `dia` ou `mes`. Sem agrupamento, retorna apenas o total geral.
+
+    Os dados vêm do rollup diário por usuário × projeto × atividade, atualizado
+    em segundo plano a partir dos apontamentos alterados desde a última
+    atualização. `atualizado_ate` indica até onde o rollup está em dia.
+    """,
+)
+def relatorio_horas(
+    organization_name: str = Query(..., description="Nome da organização no Azure DevOps"),
+    data_inicio: date = Query(..., description="Data inicial (YYYY-MM-DD)"),
+    data_fim: date = Query(..., description="Data final (YYYY-MM-DD)"),
+    group_by: list[str] = Query(["usuario"], description="Dimensões do agrupamento"),
+    project_id: str | None = Query(None, description="UUID ou nome do projeto"),
+    usuario_id: str | None = Query(None, description="ID do usuário no Azure DevOps"),
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> RelatorioHorasResponse:
+    """Endpoint do relatório de horas agrupado."""
+    try:
+        if project_id:
+            project_id = normalize_project_id(project_id, db)
+        resultado = RelatorioService(db).horas(
+            organization_name=organization_name,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            group_by=group_by,
+            project_id=project_id,
+            usuario_id=usuario_id,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    return RelatorioHorasResponse(**resultado)
+
+
+@router.post(
+    "/horas/refresh",
+    response_model=RollupRefreshResponse,
+    summary="Atualizar rollup de horas",
+    description="""
+    Atualiza o rollup de horas. Use `full=true` para reconstruí-lo por completo
+    (ex: após carga manual de dados).
+    """,
+)
+def atualizar_rollup_horas(
+    full: bool = Query(False, description="Reconstruir o rollup inteiro"),
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> RollupRefreshResponse:
+    """Endpoint para atualizar o rollup de horas."""
+    service = RelatorioService(db)
+    particoes = service.atualizar_rollup(full=full)
+    return RollupRefreshResponse(
+        particoes_recalculadas=particoes,
+        atualizado_ate=service.repository.get_watermark(),
+    )
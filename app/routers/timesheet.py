@@ -4,20 +4,22 @@ Fornece a grade semanal com hierarquia de Work Items e apontamentos.
 """
 
 from datetime import date
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.auth import AzureDevOpsUser, get_current_user
-from app.database import get_db
+from app.database import get_db, get_session_factory
 from app.schemas.timesheet import (
     ProcessStateMapping,
     StateCategoryResponse,
+    TeamTimesheetResponse,
     TimesheetResponse,
     WorkItemCurrentState,
     WorkItemRevisionsResponse,
     WorkItemsCurrentStateResponse,
 )
-from app.services.timesheet_service import TimesheetService
+from app.services.timesheet_service import TimesheetService, get_week_dates
+from app.services.timesheet_warmer import timesheet_warmer
 
 router = APIRouter(prefix="/timesheet", tags=["Timesheet"])
 
@@ -57,9 +59,15 @@ def get_service(
     **Permissões de edição:**
     - Work Items em estados **Proposed**, **InProgress** ou **Resolved**: permitem edição/exclusão
     - Work Items em estados **Completed** ou **Removed**: bloqueiam edição/exclusão
+
+    **Tipos:** ícone, cor, nível e estados editáveis de cada tipo vêm uma única
+    vez em `types`, pela chave `type` dos work items. O `icon_url` por item é
+    legado e só é preenchido com `include_icon_url=true` (ou com a
+    configuração TIMESHEET_INCLUDE_ICON_URL do servidor).
     """,
 )
 async def get_timesheet(
+    background_tasks: BackgroundTasks,
     organization_name: str = Query(
         ..., description="Nome da organização no Azure DevOps"
     ),
@@ -72,17 +80,110 @@ async def get_timesheet(
         default=None,
         description="ID da Iteration (Sprint) para filtrar work items. Se não informado, exibe todos.",
     ),
+    show_parents: bool = Query(
+        default=False,
+        description="Inclui os ancestrais (Story/Feature/Epic) ausentes do filtro como contexto (eh_ancestral=true).",
+    ),
+    include_icon_url: bool | None = Query(
+        default=None,
+        description="Mantém o ícone em cada work item (icon_url, legado). Se omitido, segue a configuração do servidor.",
+    ),
     current_user: AzureDevOpsUser = Depends(get_current_user),
     service: TimesheetService = Depends(get_service),
+    session_factory: sessionmaker = Depends(get_session_factory),
 ) -> TimesheetResponse:
     """Endpoint para obter o timesheet semanal."""
-    return await service.get_timesheet(
+    response = await service.get_timesheet(
         organization=organization_name,
         project=project_id,
         week_start=week_start,
         user_email=current_user.email,
         user_id=current_user.id,
         iteration_id=iteration_id,
+        show_parents=show_parents,
+        include_icon_url=include_icon_url,
+    )
+    # Quem navega entre semanas costuma pedir a vizinha em seguida
+    background_tasks.add_task(
+        timesheet_warmer.prefetch_adjacent_weeks,
+        session_factory,
+        organization_name,
+        project_id,
+        get_week_dates(week_start)[0],
+    )
+    return response
+
+
+@router.get(
+    "/cache/stats",
+    summary="Estatísticas dos caches do timesheet",
+    description="""
+    Taxas de acerto dos caches de semanas e de iterations e os contadores do
+    aquecimento preditivo. `prefetch_hit_rate` é a fração das entradas
+    pré-carregadas que chegaram a ser usadas.
+    """,
+)
+def get_timesheet_cache_stats(
+    current_user: AzureDevOpsUser = Depends(get_current_user),
+) -> dict:
+    """Endpoint para consultar as estatísticas dos caches do timesheet."""
+    return timesheet_warmer.stats()
+
+
+@router.get(
+    "/team",
+    response_model=TeamTimesheetResponse,
+    summary="Obter timesheet semanal da equipe",
+    description="""
+    Retorna as horas apontadas na semana por usuário, agregadas por work item
+    e por dia, para a visão de gestor.
+
+    **Filtros:**
+    - `iteration_id`: apenas work items da iteration (sprint)
+    - `team`: apenas membros do time do Azure DevOps (ID ou nome)
+    - `usuario_ids`: apenas os usuários informados (separados por vírgula)
+
+    **Formato:** os dados dos work items vêm uma única vez em `work_items`
+    (chaveado por ID); as linhas de cada usuário referenciam apenas o ID.
+    """,
+)
+async def get_team_timesheet(
+    organization_name: str = Query(
+        ..., description="Nome da organização no Azure DevOps"
+    ),
+    project_id: str = Query(..., description="ID do projeto no Azure DevOps"),
+    week_start: date | None = Query(
+        default=None,
+        description="Data de início da semana (segunda-feira). Se não informado, usa a semana atual.",
+    ),
+    iteration_id: str | None = Query(
+        default=None,
+        description="ID da Iteration (Sprint) para filtrar work items.",
+    ),
+    team: str | None = Query(
+        default=None,
+        description="ID ou nome do time do Azure DevOps para filtrar usuários.",
+    ),
+    usuario_ids: str | None = Query(
+        default=None,
+        description="IDs dos usuários separados por vírgula.",
+    ),
+    service: TimesheetService = Depends(get_service),
+) -> TeamTimesheetResponse:
+    """Endpoint para obter o timesheet semanal da equipe."""
+    ids = [u.strip() for u in usuario_ids.split(",") if u.strip()] if usuario_ids else None
+    if usuario_ids is not None and not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="usuario_ids deve conter ao menos um ID",
+        )
+    return await service.get_team_timesheet(
+        organization=organization_name,
+        project=project_id,
+        week_start=week_start,
+        iteration_id=iteration_id,
+        team=team,
+        usuario_ids=ids,
     )
 
 
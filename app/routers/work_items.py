@@ -2,9 +2,11 @@
 Endpoints para busca de Work Items no Azure DevOps.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
 from app.auth import get_current_user, AzureDevOpsUser
-from app.services.azure import AzureService
+from app.database import get_db
+from app.services.work_item_search import WorkItemSearchService
 from app.schemas.work_item import WorkItemSearchResponse
 
 router = APIRouter(prefix="/work-items", tags=["Work Items"])
@@ -14,9 +16,14 @@ router = APIRouter(prefix="/work-items", tags=["Work Items"])
     "/search",
     response_model=WorkItemSearchResponse,
     summary="Buscar work items",
-    description="Busca work items por ID ou título (Azure DevOps).",
+    description=(
+        "Busca work items por ID ou título. Usa o índice local (work items já "
+        "vistos pelo backend), priorizando os com apontamentos recentes do usuário; "
+        "consulta o Azure DevOps apenas quando não há resultados locais ou com remote=true."
+    ),
 )
 async def search_work_items(
+    response: Response,
     query: str = Query(..., min_length=2, description="Texto ou ID para busca"),
     project_id: str | None = Query(
         None, description="ID ou nome do projeto (Azure DevOps)"
@@ -25,20 +32,25 @@ async def search_work_items(
         None, description="Nome da organização no Azure DevOps"
     ),
     limit: int = Query(10, ge=1, le=50, description="Limite de resultados"),
+    remote: bool = Query(False, description="Consultar o Azure DevOps mesmo com resultados locais"),
+    db: Session = Depends(get_db),
     current_user: AzureDevOpsUser = Depends(get_current_user),
 ) -> WorkItemSearchResponse:
-    """Endpoint para busca de work items no Azure DevOps."""
+    """Endpoint para busca de work items (índice local com fallback no Azure DevOps)."""
     if not current_user.token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token de acesso não disponível para este usuário.",
         )
 
-    service = AzureService(token=current_user.token)
-    results = await service.search_work_items(
+    service = WorkItemSearchService(db, token=current_user.token)
+    results, source = await service.search(
         query=query,
         project_id=project_id,
         organization_name=organization_name,
         limit=limit,
+        usuario_id=current_user.id,
+        remote=remote,
     )
+    response.headers["X-Data-Source"] = source
     return WorkItemSearchResponse(results=results, count=len(results))
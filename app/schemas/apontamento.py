@@ -247,9 +247,14 @@ class ApontamentoListResponse(BaseModel):
     """Schema de resposta para listagem de apontamentos."""
 
     items: list[ApontamentoResponse]
-    total: int = Field(..., description="Total de registros")
+    total: int | None = Field(
+        default=None, description="Total de registros (None quando include_total=false)"
+    )
     total_horas: float = Field(..., description="Total de horas apontadas (decimal)")
     total_formatado: str = Field(..., description="Total formatado como HH:mm")
+    next_cursor: str | None = Field(
+        default=None, description="Cursor para a proxima pagina (None na ultima pagina)"
+    )
 
 
 class ResumoPorAtividade(BaseModel):
@@ -140,7 +140,12 @@ class AtividadeGestaoResponse(BaseModel):
     """Resposta de listagem de atividades para gestão."""
 
     items: list[AtividadeGestaoItem]
-    total: int = Field(..., description="Total de registros")
+    total: int | None = Field(
+        default=None, description="Total de registros (None quando include_total=false)"
+    )
+    next_cursor: str | None = Field(
+        default=None, description="Cursor para a próxima página (None na última página)"
+    )
 
 
 class AtividadeCatalogItem(BaseModel):
@@ -157,3 +162,6 @@ class AtividadeCatalogResponse(BaseModel):
     """Resposta de catálogo de atividades para o frontend."""
 
     items: list[AtividadeCatalogItem]
+    next_cursor: str | None = Field(
+        default=None, description="Cursor para a próxima página (None na última página)"
+    )
@@ -0,0 +1,16 @@
+"""
+Schemas Pydantic para os service hooks do Azure DevOps.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class ServiceHookResult(BaseModel):
+    """Resultado do processamento de um service hook."""
+
+    evento: str = Field(..., description="Tipo do evento (ex: workitem.updated)")
+    organization_name: str | None = Field(default=None, description="Organização do work item")
+    work_item_id: int | None = Field(default=None, description="ID do work item")
+    acao: str = Field(
+        ..., description="upsert, delete, desatualizado (revisão antiga descartada) ou ignorado"
+    )
@@ -136,7 +136,12 @@ class OrganizationPatList(BaseModel):
     """Schema para listagem de PATs."""
 
     items: list[OrganizationPatResponse] = Field(..., description="Lista de PATs")
-    total: int = Field(..., description="Total de registros")
+    total: int | None = Field(
+        None, description="Total de registros (None quando include_total=false)"
+    )
+    next_cursor: str | None = Field(
+        None, description="Cursor para a próxima página (None na última página)"
+    )
 
 
 class OrganizationPatValidateRequest(BaseModel):
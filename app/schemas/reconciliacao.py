@@ -0,0 +1,49 @@
+"""
+Schemas Pydantic do relatório da reconciliação de horas.
+"""
+
+from datetime import datetime
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ReconciliacaoItemResponse(BaseModel):
+    """Work item divergente de uma execução."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    organization_name: str = Field(..., description="Nome da organização")
+    work_item_id: int = Field(..., description="ID do work item")
+    project_id: str | None = Field(default=None, description="UUID do projeto")
+    horas_local: float = Field(..., description="Total apontado localmente (horas)")
+    completed_work_azure: float | None = Field(default=None, description="CompletedWork lido do Azure")
+    remaining_work_azure: float | None = Field(default=None, description="RemainingWork lido do Azure")
+    original_estimate: float | None = Field(default=None, description="OriginalEstimate lido do Azure")
+    remaining_work_novo: float | None = Field(default=None, description="RemainingWork gravado (ou a gravar)")
+    acao: str = Field(..., description="corrigido, divergente (dry-run), falha ou nao_encontrado")
+    erro: str | None = Field(default=None, description="Erro da leitura ou do PATCH")
+
+
+class ReconciliacaoExecucaoResponse(BaseModel):
+    """Resumo de uma execução da reconciliação."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID = Field(..., description="ID da execução")
+    organization_name: str | None = Field(default=None, description="Organização (nulo: todas)")
+    dry_run: bool = Field(..., description="Execução sem alterações no Azure")
+    status: str = Field(..., description="executando, sucesso ou erro")
+    iniciado_em: datetime = Field(..., description="Início da execução")
+    finalizado_em: datetime | None = Field(default=None, description="Fim da execução")
+    total_work_items: int = Field(..., description="Work items comparados")
+    divergentes: int = Field(..., description="Work items com CompletedWork divergente")
+    corrigidos: int = Field(..., description="Work items corrigidos no Azure")
+    falhas: int = Field(..., description="Leituras ou PATCHes que falharam")
+    nao_encontrados: int = Field(..., description="Work items não encontrados no Azure")
+    erro: str | None = Field(default=None, description="Erro que interrompeu a execução")
+
+
+class ReconciliacaoDetalheResponse(ReconciliacaoExecucaoResponse):
+    """Execução com os work items divergentes."""
+
+    itens: list[ReconciliacaoItemResponse] = Field(default_factory=list, description="Work items divergentes")
@@ -0,0 +1,48 @@
+"""
+Schemas Pydantic para os relatórios de horas.
+"""
+
+from datetime import date, datetime
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+
+class HorasAgrupadas(BaseModel):
+    """Total de horas de um grupo do relatório."""
+
+    usuario_id: str | None = Field(default=None, description="ID do usuário (agrupado por usuario)")
+    usuario_nome: str | None = Field(default=None, description="Nome do usuário")
+    project_id: str | None = Field(default=None, description="UUID do projeto (agrupado por projeto)")
+    id_atividade: UUID | None = Field(default=None, description="ID da atividade (agrupado por atividade)")
+    atividade_nome: str | None = Field(default=None, description="Nome da atividade")
+    periodo: str | None = Field(
+        default=None, description="Dia (YYYY-MM-DD) ou mês (YYYY-MM), conforme o agrupamento"
+    )
+    total_horas: float = Field(..., description="Total de horas em formato decimal")
+    total_formatado: str = Field(..., description="Total de horas no formato HH:mm")
+    total_apontamentos: int = Field(..., description="Quantidade de apontamentos")
+
+
+class RelatorioHorasResponse(BaseModel):
+    """Resposta do relatório de horas."""
+
+    organization_name: str = Field(..., description="Nome da organização")
+    data_inicio: date = Field(..., description="Data inicial do período")
+    data_fim: date = Field(..., description="Data final do período")
+    group_by: list[str] = Field(..., description="Dimensões do agrupamento")
+    items: list[HorasAgrupadas] = Field(..., description="Totais por grupo")
+    total_horas: float = Field(..., description="Total geral em horas decimais")
+    total_formatado: str = Field(..., description="Total geral no formato HH:mm")
+    total_apontamentos: int = Field(..., description="Total geral de apontamentos")
+    atualizado_ate: datetime | None = Field(
+        default=None, description="Último atualizado_em de apontamentos incluído no rollup"
+    )
+
+
+class RollupRefreshResponse(BaseModel):
+    """Resultado da atualização do rollup de horas."""
+
+    particoes_recalculadas: int = Field(..., description="Partições (organização, dia) recalculadas")
+    atualizado_ate: datetime | None = Field(
+        default=None, description="Último atualizado_em de apontamentos incluído no rollup"
+    )
@@ -47,7 +47,10 @@ class WorkItemTimesheet(BaseModel):
         default="InProgress",
         description="Categoria do estado (Proposed, InProgress, Resolved, Completed, Removed)",
     )
-    icon_url: str = Field(default="", description="URL do ícone do tipo")
+    icon_url: str = Field(
+        default="",
+        description="Data URI do ícone do tipo (legado: vazio sem include_icon_url; use types[type].icon)",
+    )
     assigned_to: str | None = Field(default=None, description="Usuário atribuído")
 
     # Campos de esforço do Azure DevOps
@@ -80,6 +83,10 @@ class WorkItemTimesheet(BaseModel):
     children: list["WorkItemTimesheet"] = Field(
         default_factory=list, description="Work Items filhos"
     )
+    eh_ancestral: bool = Field(
+        default=False,
+        description="Incluído apenas como contexto da hierarquia (show_parents); não pertence ao filtro",
+    )
 
     # Flags de permissão
     pode_editar: bool = Field(
@@ -103,6 +110,18 @@ class TotalDia(BaseModel):
     eh_hoje: bool = Field(default=False, description="Se é o dia atual")
 
 
+class WorkItemTypeInfo(BaseModel):
+    """Apresentação de um tipo de Work Item, enviada uma vez por resposta."""
+
+    icon: str = Field(..., description="Data URI do ícone do tipo")
+    color: str = Field(..., description="Cor do tipo (#RRGGBB)")
+    nivel: int = Field(..., description="Nível na hierarquia (0=Epic, 1=Feature, etc)")
+    estados_editaveis: list[str] = Field(
+        default_factory=list,
+        description="Estados conhecidos que permitem editar/excluir apontamentos",
+    )
+
+
 class TimesheetResponse(BaseModel):
     """Resposta completa do timesheet para uma semana."""
 
@@ -115,6 +134,10 @@ class TimesheetResponse(BaseModel):
     work_items: list[WorkItemTimesheet] = Field(
         default_factory=list, description="Árvore hierárquica de Work Items"
     )
+    types: dict[str, WorkItemTypeInfo] = Field(
+        default_factory=dict,
+        description="Tipos presentes na árvore, pela chave usada em WorkItemTimesheet.type",
+    )
 
     # Totais gerais
     total_geral_horas: float = Field(
@@ -141,6 +164,50 @@ class TimesheetResponse(BaseModel):
     )
 
 
+class TeamWorkItem(BaseModel):
+    """Work item referenciado pelas linhas do timesheet da equipe (enviado uma única vez)."""
+
+    id: int = Field(..., description="ID do Work Item")
+    title: str = Field(default="", description="Título do Work Item")
+    type: str = Field(default="", description="Tipo do Work Item")
+    state: str = Field(default="", description="Estado atual")
+    parent_id: int | None = Field(default=None, description="ID do Work Item pai")
+
+
+class TeamUsuarioItem(BaseModel):
+    """Horas de um usuário em um work item na semana."""
+
+    work_item_id: int = Field(..., description="ID do Work Item (chave em work_items)")
+    horas_dia: list[float] = Field(..., description="Horas de seg a dom (7 posições)")
+    total_horas: float = Field(..., description="Total da semana")
+
+
+class TeamUsuario(BaseModel):
+    """Linha de um membro da equipe."""
+
+    usuario_id: str = Field(..., description="ID do usuário no Azure DevOps")
+    usuario_nome: str | None = Field(default=None, description="Nome do usuário")
+    horas_dia: list[float] = Field(..., description="Total de horas de seg a dom (7 posições)")
+    total_horas: float = Field(..., description="Total da semana")
+    total_formatado: str = Field(default="", description="Total da semana HH:mm")
+    itens: list[TeamUsuarioItem] = Field(default_factory=list, description="Horas por work item")
+
+
+class TeamTimesheetResponse(BaseModel):
+    """Timesheet semanal da equipe, agregado no servidor."""
+
+    semana_inicio: date = Field(..., description="Data de início da semana (segunda)")
+    semana_fim: date = Field(..., description="Data de fim da semana (domingo)")
+    semana_label: str = Field(..., description="Label da semana (ex: '19/01 - 25/01')")
+    work_items: dict[int, TeamWorkItem] = Field(
+        default_factory=dict, description="Work items referenciados pelas linhas, por ID"
+    )
+    usuarios: list[TeamUsuario] = Field(default_factory=list, description="Linhas por usuário")
+    horas_dia: list[float] = Field(..., description="Total da equipe de seg a dom (7 posições)")
+    total_geral_horas: float = Field(default=0.0, description="Total da equipe na semana")
+    total_geral_formatado: str = Field(default="", description="Total da equipe HH:mm")
+
+
 class TimesheetQueryParams(BaseModel):
     """Parâmetros de consulta para o timesheet."""
 
@@ -0,0 +1,64 @@
+"""
+Cache dos work items ancestrais (pais, avós...) usados pelo "show parents"
+do timesheet.
+
+Links pai/filho raramente mudam, então os ancestrais ficam em cache por
+WORK_ITEM_ANCESTOR_TTL_SECONDS no namespace "ancestrais" de app.cache
+(limitado a MAX_ENTRIES itens no backend em memória).
+"""
+
+from typing import Any
+
+from app.cache import get_cache
+from app.config import get_settings
+
+settings = get_settings()
+
+MAX_ENTRIES = 20000
+
+
+class AncestorCache:
+    """Work items ancestrais por (organização, id), com TTL."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.cache = get_cache(
+            "ancestrais", lambda: settings.work_item_ancestor_ttl_seconds, max_entries=max_entries
+        )
+
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
+
+    def get_many(self, organization: str, ids: set[int]) -> tuple[list[dict[str, Any]], set[int]]:
+        """
+        Busca ancestrais no cache.
+
+        Returns:
+            Tupla (itens encontrados, ids ausentes ou expirados).
+        """
+        found: list[dict[str, Any]] = []
+        missing: set[int] = set()
+        for work_item_id in ids:
+            item = self.cache.get((organization, work_item_id))
+            if item is None:
+                missing.add(work_item_id)
+            else:
+                found.append(dict(item))
+        return found, missing
+
+    def set_many(self, organization: str, items: list[dict[str, Any]]) -> None:
+        """Grava ancestrais buscados no Azure DevOps."""
+        for item in items:
+            self.cache.set((organization, item["id"]), dict(item))
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self.cache.reset_stats()
+
+
+# Instância única por processo
+ancestor_cache = AncestorCache()
@@ -0,0 +1,164 @@
+"""
+Exportacao em massa de apontamentos (CSV / NDJSON) para folha de pagamento e BI.
+
+As linhas sao lidas do banco em lotes (cursor no servidor) e serializadas
+uma a uma, de forma que a memoria do processo nao cresce com o volume
+exportado.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date
+from typing import Iterator
+
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.repositories.apontamento import ApontamentoRepository, duracao_to_decimal
+
+logger = logging.getLogger(__name__)
+
+# Colunas exportadas, na ordem do cabecalho CSV
+EXPORT_COLUMNS = (
+    "id",
+    "data_apontamento",
+    "duracao",
+    "duracao_horas",
+    "work_item_id",
+    "project_id",
+    "organization_name",
+    "id_atividade",
+    "atividade_nome",
+    "usuario_id",
+    "usuario_nome",
+    "usuario_email",
+    "comentario",
+    "criado_em",
+    "atualizado_em",
+)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Linhas serializadas por chunk enviado ao cliente
+CHUNK_ROWS = 500
+
+
+def _to_record(row: RowMapping) -> dict:
+    """Converte uma linha do banco para o registro exportado."""
+    record = {}
+    for column in EXPORT_COLUMNS:
+        if column == "duracao_horas":
+            value = round(duracao_to_decimal(row["duracao"]), 2)
+        else:
+            value = row[column]
+        if value is not None and not isinstance(value, (int, float, str)):
+            value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+        record[column] = value
+    return record
+
+
+class ApontamentoExportService:
+    """Servico de exportacao de apontamentos em streaming."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = ApontamentoRepository(db)
+
+    def _iter_records(self, **filtros) -> Iterator[dict]:
+        for row in self.repository.iter_export(**filtros):
+            yield _to_record(row)
+
+    def iter_csv(self, **filtros) -> Iterator[str]:
+        """
+        Gera o CSV (com cabecalho) em chunks de CHUNK_ROWS linhas.
+
+        Args:
+            filtros: Argumentos de ApontamentoRepository.iter_export().
+
+        Yields:
+            Trechos de texto CSV.
+        """
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+
+        for count, record in enumerate(self._iter_records(**filtros), start=1):
+            writer.writerow(record)
+            if count % CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def iter_ndjson(self, **filtros) -> Iterator[str]:
+        """
+        Gera NDJSON (um objeto JSON por linha) em chunks de CHUNK_ROWS linhas.
+
+        Args:
+            filtros: Argumentos de ApontamentoRepository.iter_export().
+
+        Yields:
+            Trechos de texto NDJSON.
+        """
+        lines: list[str] = []
+        for record in self._iter_records(**filtros):
+            lines.append(json.dumps(record, ensure_ascii=False))
+            if len(lines) >= CHUNK_ROWS:
+                yield "\n".join(lines) + "\n"
+                lines = []
+
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+
+def stream_export(
+    session_factory: sessionmaker,
+    formato: str,
+    organization_name: str,
+    project_id: str | None = None,
+    usuario_id: str | None = None,
+    data_inicio: date | None = None,
+    data_fim: date | None = None,
+) -> Iterator[bytes]:
+    """
+    Gera o corpo da exportacao usando uma sessao propria.
+
+    A sessao e aberta quando o primeiro chunk e pedido e fechada ao final
+    (ou se o cliente desconectar), independente do ciclo de vida da request.
+
+    Args:
+        session_factory: Fabrica de sessoes do banco.
+        formato: "csv" ou "ndjson".
+        organization_name: Nome da organizacao no Azure DevOps.
+        project_id: UUID do projeto (opcional).
+        usuario_id: Filtrar por usuario (opcional).
+        data_inicio: Data inicial (inclusiva).
+        data_fim: Data final (inclusiva).
+
+    Yields:
+        Chunks codificados em UTF-8.
+    """
+    db = session_factory()
+    try:
+        service = ApontamentoExportService(db)
+        generator = service.iter_csv if formato == "csv" else service.iter_ndjson
+        for chunk in generator(
+            organization_name=organization_name,
+            project_id=project_id,
+            usuario_id=usuario_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+        ):
+            yield chunk.encode("utf-8")
+    except Exception as e:
+        logger.error(f"Erro durante exportacao de apontamentos: {e}")
+        raise
+    finally:
+        db.close()
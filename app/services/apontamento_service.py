@@ -401,6 +401,8 @@ class ApontamentoService:
         project_id: str,
         skip: int = 0,
         limit: int = 100,
+        cursor: str | None = None,
+        include_total: bool = True,
     ):
         """
         Lista apontamentos de um work item.
@@ -411,17 +413,30 @@ class ApontamentoService:
             project_id: ID do projeto.
             skip: Registros a pular.
             limit: Maximo de registros.
+            cursor: Cursor da pagina anterior (keyset pagination).
+            include_total: Se deve calcular o total de registros.
 
         Returns:
-            Tupla (lista de apontamentos, total, total_horas, total_formatado).
+            Tupla (lista de apontamentos, total, total_horas, total_formatado, next_cursor).
+
+        Raises:
+            HTTPException 400: Se o cursor for invalido.
         """
-        apontamentos, total = self.repository.get_by_work_item(
-            work_item_id=work_item_id,
-            organization_name=organization_name,
-            project_id=project_id,
-            skip=skip,
-            limit=limit,
-        )
+        try:
+            apontamentos, total, next_cursor = self.repository.get_by_work_item(
+                work_item_id=work_item_id,
+                organization_name=organization_name,
+                project_id=project_id,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                include_total=include_total,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
 
         total_horas, total_formatado = self.repository.get_totals_formatted_by_work_item(
             work_item_id=work_item_id,
@@ -429,7 +444,7 @@ class ApontamentoService:
             project_id=project_id,
         )
 
-        return apontamentos, total, total_horas, total_formatado
+        return apontamentos, total, total_horas, total_formatado, next_cursor
 
     async def get_work_item_info(
         self, organization: str, project: str, work_item_id: int
@@ -6,40 +6,69 @@ import base64
 import re
 import httpx
 from fastapi import HTTPException, status
+from app.cache import get_cache
 from app.config import get_settings
 
 settings = get_settings()
 
 
-# Cache em memória para ícones oficiais
-_WORK_ITEM_ICON_CACHE = {}
+# Ícones oficiais (id -> url) por organização
+_WORK_ITEM_ICON_CACHE = get_cache("icones_oficiais", lambda: settings.work_item_icon_cache_ttl_seconds)
 
 import asyncio
 
 async def get_official_work_item_icons(org_name: str, token: str) -> dict:
     """Busca e faz cache dos ícones oficiais do Azure DevOps para a organização."""
-    global _WORK_ITEM_ICON_CACHE
-    if org_name in _WORK_ITEM_ICON_CACHE:
-        return _WORK_ITEM_ICON_CACHE[org_name]
-
     url = f"https://dev.azure.com/{org_name}/_apis/wit/workitemicons?api-version=7.2-preview.1"
     pat_encoded = base64.b64encode(f":{token}".encode()).decode()
     headers = {"Authorization": f"Basic {pat_encoded}"}
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url, headers=headers)
-        if response.status_code != 200:
-            # fallback: retorna dict vazio
-            _WORK_ITEM_ICON_CACHE[org_name] = {}
-            return {}
-        data = response.json()
-        icon_map = {icon["id"]: icon["url"] for icon in data.get("value", [])}
-        _WORK_ITEM_ICON_CACHE[org_name] = icon_map
-        return icon_map
+
+    async def fetch() -> dict | None:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(url, headers=headers)
+            if response.status_code != 200:
+                # fallback (dict vazio) não entra no cache
+                return None
+            data = response.json()
+            return {icon["id"]: icon["url"] for icon in data.get("value", [])}
+
+    return await _WORK_ITEM_ICON_CACHE.aget_or_set(org_name, fetch) or {}
 
 # Ícone padrão genérico (quadrado com cantos arredondados)
 _DEFAULT_ICON_SVG = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 16 16"><rect fill="{color}" x="1" y="1" width="14" height="14" rx="2"/></svg>'
 _DEFAULT_COLOR = "#888888"
 
+# Mapeamento dos tipos para os IDs oficiais de ícone e cores do Azure DevOps
+# Referência: GET https://dev.azure.com/{organization}/_apis/wit/workitemicons/{icon}?color={color}&v={v}
+WORK_ITEM_TYPE_ICONS: dict[str, tuple[str, str]] = {
+    "Task": ("icon_clipboard", "F2CB1D"),
+    "Bug": ("icon_insect", "CC293D"),
+    "Epic": ("icon_crown", "FF7B00"),
+    "Feature": ("icon_trophy", "773B93"),
+    "User Story": ("icon_book", "009CCC"),
+    "Product Backlog Item": ("icon_list", "009CCC"),
+    "Issue": ("icon_traffic_cone", "B4009E"),
+    "Test Case": ("icon_test_case", "004B50"),
+    "Test Plan": ("icon_test_plan", "004B50"),
+    "Test Suite": ("icon_test_suite", "004B50"),
+}
+
+
+def get_work_item_type_color(work_item_type: str) -> str:
+    """Cor (#RRGGBB) do tipo de work item; cinza para tipos desconhecidos."""
+    icon = WORK_ITEM_TYPE_ICONS.get(work_item_type)
+    return f"#{icon[1]}" if icon else _DEFAULT_COLOR
+
+
+# Data URIs dos ícones obtidos do Azure DevOps, por (organização, tipo).
+# Fallbacks gerados após falhas não entram no cache.
+_WORK_ITEM_ICON_DATA_URI_CACHE = get_cache("icones", lambda: settings.work_item_icon_cache_ttl_seconds)
+
+
+def get_cached_work_item_icon(org_name: str, work_item_type: str) -> str | None:
+    """Retorna o Data URI do ícone já obtido para o tipo, sem acessar a rede."""
+    return _WORK_ITEM_ICON_DATA_URI_CACHE.get((org_name, work_item_type))
+
 
 
 async def get_work_item_icon_data_uri(org_name: str, token: str, work_item_type: str) -> str:
@@ -52,24 +81,9 @@ async def get_work_item_icon_data_uri(org_name: str, token: str, work_item_type:
     import logging
     
     logger = logging.getLogger(__name__)
-    
-    # Mapeamento dos tipos para os IDs oficiais de ícone do Azure DevOps
-    # Referência: GET https://dev.azure.com/{organization}/_apis/wit/workitemicons/{icon}?color={color}&v={v}
-    type_to_icon_id = {
-        "Task": ("icon_clipboard", "F2CB1D"),
-        "Bug": ("icon_insect", "CC293D"),
-        "Epic": ("icon_crown", "FF7B00"),
-        "Feature": ("icon_trophy", "773B93"),
-        "User Story": ("icon_book", "009CCC"),
-        "Product Backlog Item": ("icon_list", "009CCC"),
-        "Issue": ("icon_traffic_cone", "B4009E"),
-        "Test Case": ("icon_test_case", "004B50"),
-        "Test Plan": ("icon_test_plan", "004B50"),
-        "Test Suite": ("icon_test_suite", "004B50"),
-    }
-    
+
     # Se não encontrar, usa o ícone padrão do Azure DevOps (clipboard cinza)
-    icon_id, color = type_to_icon_id.get(work_item_type, ("icon_clipboard", "888888"))
+    icon_id, color = WORK_ITEM_TYPE_ICONS.get(work_item_type, ("icon_clipboard", "888888"))
     
     # Função helper para gerar fallback SVG
     def _get_fallback_svg() -> str:
@@ -84,18 +98,25 @@ async def get_work_item_icon_data_uri(org_name: str, token: str, work_item_type:
         pat_encoded = base64.b64encode(f":{token}".encode()).decode()
         headers = {"Authorization": f"Basic {pat_encoded}"}
         
-        # Timeout reduzido para evitar bloqueio prolongado (5s por ícone)
-        async with httpx.AsyncClient(timeout=5.0, follow_redirects=True) as client:
-            resp = await client.get(icon_url, headers=headers)
-            if resp.status_code == 200:
-                content_type = resp.headers.get("content-type", "")
-                if content_type.startswith("image/svg"):
-                    svg = resp.text
-                    encoded = urllib.parse.quote(svg, safe="")
-                    return f"data:image/svg+xml,{encoded}"
-                elif content_type.startswith("image/png"):
-                    b64 = base64.b64encode(resp.content).decode()
-                    return f"data:image/png;base64,{b64}"
+        async def fetch_official() -> str | None:
+            # Timeout reduzido para evitar bloqueio prolongado (5s por ícone)
+            async with httpx.AsyncClient(timeout=5.0, follow_redirects=True) as client:
+                resp = await client.get(icon_url, headers=headers)
+                if resp.status_code == 200:
+                    content_type = resp.headers.get("content-type", "")
+                    if content_type.startswith("image/svg"):
+                        svg = resp.text
+                        encoded = urllib.parse.quote(svg, safe="")
+                        return f"data:image/svg+xml,{encoded}"
+                    elif content_type.startswith("image/png"):
+                        b64 = base64.b64encode(resp.content).decode()
+                        return f"data:image/png;base64,{b64}"
+            return None
+
+        # Timesheets concorrentes da mesma organização compartilham a busca
+        data_uri = await _WORK_ITEM_ICON_DATA_URI_CACHE.aget_or_set((org_name, work_item_type), fetch_official)
+        if data_uri:
+            return data_uri
         
         # Fallback: retorna SVG oficial do clipboard cinza
         fallback_url = f"https://dev.azure.com/{org_name}/_apis/wit/workitemicons/icon_clipboard?color=888888&v=2&api-version=7.2-preview.1"
@@ -136,6 +157,11 @@ class AzureService:
                 detail="AZURE_DEVOPS_ORG_URL não configurada no .env",
             )
 
+    @property
+    def organization_name(self) -> str:
+        """Nome da organização padrão deste serviço."""
+        return self._resolve_org_name(None)
+
     def _resolve_org_name(self, organization_name: str | None) -> str:
         """Resolve o nome da organização a partir do parâmetro ou da URL configurada."""
         if organization_name:
@@ -205,9 +231,10 @@ class AzureService:
             project_id = "DEV"
 
         org_name = self._resolve_org_name(organization_name)
+        # $top: o Azure devolve só os ids que serão exibidos
         wiql_url = (
             f"https://dev.azure.com/{org_name}/{project_id}"
-            f"/_apis/wit/wiql?api-version=7.1"
+            f"/_apis/wit/wiql?$top={limit}&api-version=7.1"
         )
 
         safe_query = query.replace("'", "''")
@@ -28,31 +28,33 @@ class IterationService:
     def __init__(self, db: Session, token: str | None = None):
         self.db = db
         self._token_fallback = token
-        self._pat_cache: dict[str, str] = {}
 
     def _get_pat_for_org(self, organization: str) -> str:
         """
         Retorna o PAT para uma organização específica.
         Busca primeiro no banco de dados, depois nas variáveis de ambiente.
         """
-        if organization in self._pat_cache:
-            return self._pat_cache[organization]
+        from app.repositories.organization_pat import OrganizationPatRepository, pat_cache
+
+        cache_key = organization.lower().strip()
+        cached = pat_cache.get(cache_key)
+        if cached:
+            return cached
 
         # 1. Busca no banco de dados
-        from app.repositories.organization_pat import OrganizationPatRepository
         repo = OrganizationPatRepository(self.db)
         pat = repo.get_pat_for_organization(organization)
 
         if pat:
             logger.debug(f"PAT encontrado no banco para {organization}")
-            self._pat_cache[organization] = pat
+            pat_cache.set(cache_key, pat)
             return pat
 
         # 2. Fallback: busca nas variáveis de ambiente
         pat = settings.get_pat_for_org(organization)
         if pat:
             logger.debug(f"PAT encontrado nas variáveis de ambiente para {organization}")
-            self._pat_cache[organization] = pat
+            pat_cache.set(cache_key, pat)
             return pat
 
         # 3. Fallback final: usa token fornecido na construção
@@ -0,0 +1,300 @@
+"""
+Agendador dos jobs em segundo plano com eleição de líder por job.
+
+Todas as réplicas da API mantêm o mesmo loop de cada job, mas cada rodada só
+é executada pela réplica que obtiver pg_try_advisory_lock(chave do job); as
+demais pulam a rodada. O lock é de sessão, em uma conexão mantida durante a
+execução: se a réplica líder morrer, a conexão cai, o Postgres libera o lock
+e a próxima rodada de outra réplica assume.
+
+Como as réplicas não disparam no mesmo instante, a rodada também é pulada se
+outra réplica concluiu o job há menos de min_interval segundos (tabela
+background_jobs, que guarda a última execução de cada job). Fora do Postgres
+(SQLite) não há lock e o processo é sempre o líder.
+
+Estado dos jobs em GET /api/v1/jobs.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import SessionLocal, engine as default_engine
+from app.models.background_job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# Identifica a réplica nos registros de execução
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+STATUS_RUNNING = "executando"
+STATUS_OK = "sucesso"
+STATUS_ERROR = "erro"
+
+
+def lock_key(name: str) -> int:
+    """Chave bigint estável do advisory lock de um job."""
+    digest = hashlib.blake2b(f"aponta-job:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@dataclass
+class Job:
+    """Job periódico registrado no agendador."""
+
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    next_delay: Callable[[], float]
+    initial_delay: float | None = None
+    min_interval: float = 0
+    # Contadores do processo
+    runs: int = 0
+    skipped: int = 0
+    failures: int = 0
+    running: bool = False
+    task: asyncio.Task | None = None
+
+
+class JobScheduler:
+    """Loops dos jobs do processo, com uma rodada por vez no cluster."""
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal, engine: Engine = default_engine):
+        self.session_factory = session_factory
+        self.engine = engine
+        self.jobs: dict[str, Job] = {}
+
+    @property
+    def uses_advisory_locks(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def _try_lock(self, job: Job) -> tuple[bool, Connection | None]:
+        """Tenta o advisory lock do job (sem esperar) em uma conexão dedicada."""
+        if not self.uses_advisory_locks:
+            return True, None
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": lock_key(job.name)}
+            ).scalar()
+            # O lock é de sessão: sobrevive ao fim da transação implícita
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False, None
+        return True, conn
+
+    def _unlock(self, job: Job, conn: Connection | None) -> None:
+        if conn is None:
+            return
+        try:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": lock_key(job.name)})
+            conn.commit()
+        except Exception as e:
+            # Conexão descartada em vez de devolvida ao pool com o lock
+            logger.warning(f"Falha ao liberar o lock do job {job.name}: {e}")
+            conn.invalidate()
+        finally:
+            conn.close()
+
+    def _begin(self, job: Job) -> bool:
+        """
+        Registra o início da rodada em background_jobs.
+
+        Returns:
+            False se outra réplica concluiu o job há menos de min_interval.
+        """
+        db = self.session_factory()
+        try:
+            row = db.get(BackgroundJob, job.name)
+            now = datetime.utcnow()
+            if row is None:
+                row = BackgroundJob(nome=job.name, execucoes=0)
+                db.add(row)
+            elif (
+                job.min_interval > 0
+                and row.status != STATUS_RUNNING
+                and row.ultimo_inicio is not None
+                and now - row.ultimo_inicio < timedelta(seconds=job.min_interval)
+            ):
+                # STATUS_RUNNING com o lock livre: a réplica líder morreu na rodada
+                return False
+            row.holder = INSTANCE_ID
+            row.status = STATUS_RUNNING
+            row.ultimo_inicio = now
+            row.ultimo_erro = None
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def _finish(self, job: Job, duration_ms: int, error: str | None) -> None:
+        db = self.session_factory()
+        try:
+            row = db.get(BackgroundJob, job.name)
+            if row is None:
+                return
+            row.status = STATUS_ERROR if error else STATUS_OK
+            row.ultimo_fim = datetime.utcnow()
+            row.ultima_duracao_ms = duration_ms
+            row.ultimo_erro = error
+            row.execucoes = (row.execucoes or 0) + 1
+            db.commit()
+        finally:
+            db.close()
+
+    async def run_once(self, job: Job) -> bool:
+        """
+        Executa uma rodada do job se esta réplica for a líder.
+
+        Falhas do job são registradas e não propagadas.
+
+        Returns:
+            True se a rodada foi executada por este processo.
+        """
+        acquired, conn = await asyncio.to_thread(self._try_lock, job)
+        if not acquired:
+            job.skipped += 1
+            return False
+        try:
+            # Registro em background_jobs: Session síncrona, fora do event loop
+            if not await asyncio.to_thread(self._begin, job):
+                job.skipped += 1
+                return False
+            job.running = True
+            started = time.perf_counter()
+            error = None
+            try:
+                await job.run()
+            except asyncio.CancelledError:
+                error = "cancelado"
+                raise
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                job.failures += 1
+                logger.error(f"Falha no job {job.name}: {error}")
+            finally:
+                job.running = False
+                job.runs += 1
+                await asyncio.to_thread(self._finish, job, int((time.perf_counter() - started) * 1000), error)
+            return True
+        finally:
+            await asyncio.to_thread(self._unlock, job, conn)
+
+    async def _loop(self, job: Job) -> None:
+        delay = job.next_delay() if job.initial_delay is None else job.initial_delay
+        await asyncio.sleep(delay)
+        while True:
+            try:
+                await self.run_once(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Sem banco para o lock ou o registro: tenta na próxima rodada
+                logger.error(f"Job {job.name} não executado: {e}")
+            await asyncio.sleep(job.next_delay())
+
+    def add(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[Any]],
+        next_delay: Callable[[], float],
+        initial_delay: float | None = None,
+        min_interval: float = 0,
+    ) -> Job:
+        """
+        Registra e inicia o loop de um job (no lifespan da aplicação).
+
+        Args:
+            name: Nome do job (também define a chave do advisory lock).
+            run: Corrotina de uma rodada.
+            next_delay: Segundos até a próxima rodada.
+            initial_delay: Atraso da primeira rodada (None: next_delay()).
+            min_interval: Intervalo mínimo entre rodadas no cluster.
+        """
+        job = self.jobs.get(name)
+        if job is None or job.task is None or job.task.done():
+            job = Job(name, run, next_delay, initial_delay, min_interval)
+            job.task = asyncio.create_task(self._loop(job))
+            self.jobs[name] = job
+        return job
+
+    async def remove(self, name: str) -> None:
+        """Interrompe o loop de um job."""
+        job = self.jobs.pop(name, None)
+        if job is not None and job.task is not None and not job.task.done():
+            job.task.cancel()
+            try:
+                await job.task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def stop(self) -> None:
+        """Interrompe todos os loops."""
+        for name in list(self.jobs):
+            await self.remove(name)
+
+    def _lock_holders(self) -> set[int]:
+        """Chaves dos advisory locks de jobs mantidos agora por alguma réplica."""
+        if not self.uses_advisory_locks:
+            return {lock_key(name) for name, job in self.jobs.items() if job.running}
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT (classid::bigint << 32) | objid::bigint FROM pg_locks "
+                    "WHERE locktype = 'advisory' AND granted AND objsubid = 1"
+                )
+            ).scalars()
+            # pg_locks expõe a chave bigint como dois oids (metades alta e baixa)
+            return {key - (1 << 64) if key >= (1 << 63) else key for key in rows}
+
+    def status(self) -> list[dict[str, Any]]:
+        """Estado compartilhado (background_jobs) e contadores locais de cada job."""
+        db = self.session_factory()
+        try:
+            rows = {row.nome: row for row in db.query(BackgroundJob).all()}
+        finally:
+            db.close()
+        holders = self._lock_holders()
+        result = []
+        for name in sorted(set(self.jobs) | set(rows)):
+            row = rows.get(name)
+            job = self.jobs.get(name)
+            locked = lock_key(name) in holders
+            result.append(
+                {
+                    "nome": name,
+                    "em_execucao": locked,
+                    "holder": row.holder if row is not None and locked else None,
+                    "ultimo_holder": row.holder if row is not None else None,
+                    "status": row.status if row is not None else None,
+                    "ultimo_inicio": row.ultimo_inicio.isoformat() if row is not None and row.ultimo_inicio else None,
+                    "ultimo_fim": row.ultimo_fim.isoformat() if row is not None and row.ultimo_fim else None,
+                    "ultima_duracao_ms": row.ultima_duracao_ms if row is not None else None,
+                    "ultimo_erro": row.ultimo_erro if row is not None else None,
+                    "execucoes": row.execucoes if row is not None else 0,
+                    "local": {
+                        "agendado": job is not None,
+                        "execucoes": job.runs if job else 0,
+                        "puladas": job.skipped if job else 0,
+                        "falhas": job.failures if job else 0,
+                    },
+                }
+            )
+        return result
+
+
+# Instância única por processo
+job_scheduler = JobScheduler()
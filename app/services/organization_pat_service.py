@@ -102,10 +102,14 @@ class OrganizationPatService:
         self, 
         skip: int = 0, 
         limit: int = 100,
-        only_active: bool = False
-    ) -> tuple[list[OrganizationPatResponse], int]:
-        """Lista todos os PATs cadastrados."""
-        items, total = self.repository.list_all(skip, limit, only_active)
+        only_active: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> tuple[list[OrganizationPatResponse], Optional[int], Optional[str]]:
+        """Lista todos os PATs cadastrados (itens, total, próximo cursor)."""
+        items, total, next_cursor = self.repository.list_all(
+            skip, limit, only_active, cursor=cursor, include_total=include_total
+        )
         
         responses = []
         for item in items:
@@ -123,7 +127,7 @@ class OrganizationPatService:
                 status_validacao="não verificado"
             ))
         
-        return responses, total
+        return responses, total, next_cursor
 
     async def create(
         self, 
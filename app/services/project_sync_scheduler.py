@@ -0,0 +1,170 @@
+"""
+Sincronização de projetos em segundo plano.
+
+O job "sincronizacao_projetos" (app/services/job_scheduler.py) sincroniza
+os projetos de todas as organizações a cada PROJECT_SYNC_INTERVAL_SECONDS,
+em uma réplica por vez. Disparos manuais (POST
+/api/v1/integracao/sincronizar) e leituras com dados vencidos aguardam a
+sincronização em andamento em vez de iniciar outra.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import sessionmaker
+
+from app.auth import AzureDevOpsUser
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.job_scheduler import job_scheduler
+from app.services.projeto_service import ProjetoService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JOB_NAME = "sincronizacao_projetos"
+
+# Atraso da primeira execução após o startup
+INITIAL_DELAY_SECONDS = 10
+
+# Intervalo mínimo entre sincronizações disparadas por leituras com dados
+# vencidos (evita uma chamada ao Azure por request quando a sync falha)
+READ_SYNC_MIN_INTERVAL_SECONDS = 60
+
+# Usuário registrado nos logs das execuções automáticas
+SCHEDULER_USER = AzureDevOpsUser(id="project-sync-scheduler", display_name="Sincronização automática")
+
+
+class ProjectSyncScheduler:
+    """Coordena as sincronizações de projetos do processo."""
+
+    def __init__(self):
+        self._running: asyncio.Task | None = None
+        self.last_result: dict | None = None
+        self.last_started_at: datetime | None = None
+        self.last_finished_at: datetime | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running is not None and not self._running.done()
+
+    @property
+    def failed_organizations(self) -> set[str]:
+        """Organizações (em minúsculas) cuja busca falhou na última sincronização do processo."""
+        if not self.last_result:
+            return set()
+        return {
+            org["organization"].lower()
+            for org in self.last_result.get("organizations", [])
+            if org.get("status") == "error"
+        }
+
+    async def _sync(self, session_factory: sessionmaker, user: AzureDevOpsUser) -> dict:
+        self.last_started_at = datetime.now(timezone.utc)
+        db = session_factory()
+        try:
+            result = await ProjetoService(db, user).sync_projects()
+        finally:
+            db.close()
+        self.last_result = result
+        self.last_finished_at = datetime.now(timezone.utc)
+        return result
+
+    async def sync_now(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        user: AzureDevOpsUser = SCHEDULER_USER,
+    ) -> dict:
+        """
+        Executa uma sincronização ou aguarda a que já está em andamento.
+
+        Args:
+            session_factory: Fábrica da sessão usada pela sincronização.
+            user: Usuário que disparou (apenas para log).
+
+        Returns:
+            Resultado de ProjetoService.sync_projects().
+        """
+        if not self.is_running:
+            self._running = asyncio.create_task(self._sync(session_factory, user))
+        else:
+            logger.info(f"Sincronização de projetos em andamento; {user.display_name} aguardará o resultado")
+        # shield: quem desistir de esperar não cancela a sincronização dos demais
+        return await asyncio.shield(self._running)
+
+    async def refresh_if_stale(
+        self, last_sync_at: datetime | None, session_factory: sessionmaker = SessionLocal
+    ) -> bool:
+        """
+        Sincroniza (ou aguarda a sincronização em andamento) se os dados
+        locais estiverem vencidos. Falhas são registradas e não propagadas:
+        quem chama continua servindo os dados locais.
+
+        Args:
+            last_sync_at: Data da última sincronização dos dados a servir.
+            session_factory: Fábrica da sessão usada pela sincronização.
+
+        Returns:
+            True se uma sincronização foi concluída com sucesso.
+        """
+        if not is_stale(last_sync_at):
+            return False
+
+        if not self.is_running and self.last_started_at is not None:
+            elapsed = datetime.now(timezone.utc) - self.last_started_at
+            if elapsed < timedelta(seconds=READ_SYNC_MIN_INTERVAL_SECONDS):
+                return False
+
+        try:
+            await self.sync_now(session_factory)
+            return True
+        except Exception as e:
+            logger.warning(f"Sincronização de projetos sob demanda falhou; servindo dados locais: {e}")
+            return False
+
+    async def _scheduled_sync(self) -> dict:
+        result = await self.sync_now()
+        logger.info(
+            f"Sincronização automática de projetos: {result.get('created', 0)} criados, "
+            f"{result.get('updated', 0)} atualizados, {result.get('unchanged', 0)} sem alterações"
+        )
+        return result
+
+    def start(self) -> None:
+        """Inicia o loop periódico (no lifespan da aplicação)."""
+        interval = settings.project_sync_interval_seconds
+        if interval <= 0:
+            logger.info("Sincronização automática de projetos desativada")
+            return
+        job_scheduler.add(
+            JOB_NAME,
+            self._scheduled_sync,
+            next_delay=lambda: interval,
+            initial_delay=INITIAL_DELAY_SECONDS,
+            min_interval=interval / 2,
+        )
+        logger.info(f"Sincronização automática de projetos a cada {interval}s")
+
+    async def stop(self) -> None:
+        """Interrompe o loop periódico e a sincronização em andamento."""
+        await job_scheduler.remove(JOB_NAME)
+        if self._running is not None and not self._running.done():
+            self._running.cancel()
+            try:
+                await self._running
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._running = None
+
+
+def is_stale(last_sync_at: datetime | None) -> bool:
+    """Indica se a data de sincronização passou do limite de PROJECT_SYNC_MAX_STALENESS_SECONDS."""
+    if last_sync_at is None:
+        return True
+    max_age = timedelta(seconds=settings.project_sync_max_staleness_seconds)
+    return datetime.now(timezone.utc) - last_sync_at > max_age
+
+
+# Instância única por processo
+project_sync_scheduler = ProjectSyncScheduler()
@@ -1,6 +1,9 @@
+import asyncio
+import hashlib
+import json
 import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from datetime import datetime, timezone
 import uuid
 import base64
@@ -8,12 +11,39 @@ import httpx
 from app.models.projeto import Projeto
 from app.models.organization_pat import OrganizationPat
 from app.auth import AzureDevOpsUser
+from app.cache_events import notify_invalidation, register_invalidation_handler
 from app.config import get_settings
+from app.repositories.reference_cache import ProjetoRef, reference_cache
+from app.tracing import traced
+from app.utils.project_id_normalizer import invalidate_project_id_cache
+from app.utils.upsert import build_upsert
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+def _on_projects_changed(*key) -> None:
+    """Sincronização de projetos em outro worker (LISTEN/NOTIFY)."""
+    invalidate_project_id_cache()
+    reference_cache.bump()
+
+
+register_invalidation_handler("projetos", _on_projects_changed)
+
+
+# Campos comparados para detectar projetos alterados
+_PROJECT_FIELDS = ("nome", "descricao", "url", "estado", "organizacao")
+
+# Projetos por comando INSERT ... ON CONFLICT
+UPSERT_BATCH_SIZE = 500
+
+
+def _content_hash(values) -> str:
+    """Hash do conteúdo sincronizado de um projeto."""
+    payload = json.dumps([values.get(f) for f in _PROJECT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
 class ProjetoService:
     def __init__(self, db: Session, user: AzureDevOpsUser):
         """
@@ -28,42 +58,76 @@ class ProjetoService:
         # Nota: AzureService não é mais necessário aqui pois sync_projects
         # usa os PATs do banco de dados diretamente via httpx
 
-    async def _fetch_projects_from_org(self, org_name: str, pat: str) -> list[dict]:
+    async def _fetch_projects_from_org(
+        self, org_name: str, pat: str, client: httpx.AsyncClient
+    ) -> list[dict]:
         """
         Busca projetos de uma organização específica usando PAT.
-        
+
+        Percorre todas as páginas ($top + x-ms-continuationtoken).
+
         Args:
             org_name: Nome da organização
             pat: Personal Access Token para a organização
-            
+            client: Cliente HTTP compartilhado entre as organizações
+
         Returns:
             Lista de projetos da organização
+
+        Raises:
+            RuntimeError: Se o Azure DevOps responder com erro.
         """
-        url = f"https://dev.azure.com/{org_name}/_apis/projects?api-version=7.1-preview.1"
+        url = f"https://dev.azure.com/{org_name}/_apis/projects"
+        params = {
+            "api-version": "7.1-preview.1",
+            "$top": settings.project_sync_page_size,
+        }
         pat_encoded = base64.b64encode(f":{pat}".encode()).decode()
         headers = {"Authorization": f"Basic {pat_encoded}"}
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=headers)
-            
+
+        projects = []
+        while True:
+            response = await client.get(url, headers=headers, params=params)
+
             if response.status_code != 200:
-                logger.error(f"Erro ao buscar projetos de {org_name}: {response.status_code} - {response.text}")
-                return []
-            
-            data = response.json()
-            projects = data.get("value", [])
-            
-            # Adiciona o nome da organização em cada projeto
-            for project in projects:
-                project["_organization"] = org_name
-            
-            return projects
+                # Registrada como erro da organização no resultado da sincronização
+                raise RuntimeError(f"Azure DevOps retornou {response.status_code}: {response.text[:200]}")
+
+            page = response.json().get("value", [])
+            projects.extend(page)
+
+            continuation_token = response.headers.get("x-ms-continuationtoken")
+            if not continuation_token or not page:
+                break
+            params["continuationToken"] = continuation_token
+
+        # Adiciona o nome da organização em cada projeto
+        for project in projects:
+            project["_organization"] = org_name
+
+        return projects
+
+    def _upsert_statement(self, rows: list[dict]):
+        """
+        Monta o INSERT ... ON CONFLICT (external_id) DO UPDATE do dialeto em uso.
+        """
+        return build_upsert(
+            self.db.get_bind(),
+            Projeto.__table__,
+            rows,
+            conflict_columns=["external_id"],
+            update_columns=[*_PROJECT_FIELDS, "last_sync_at"],
+            extra_set={"updated_at": func.now()},
+        )
 
+    @traced("projetos.sync")
     async def sync_projects(self) -> dict:
         """
         Busca projetos de TODAS as organizações Azure DevOps configuradas e atualiza o banco local.
         Inclui organizações das variáveis de ambiente E do banco de dados (tabela organization_pats).
-        Realiza upsert baseado no external_id.
+
+        As organizações são consultadas em paralelo e a gravação é feita em lote
+        (upsert por external_id), ignorando projetos cujo conteúdo não mudou.
         """
         logger.info(f"Iniciando sincronização de projetos para usuário: {self.user.display_name}")
 
@@ -102,7 +166,11 @@ class ProjetoService:
                 org["source"] = "environment"
                 organizations.append(org)
                 org_names_seen.add(org_name.lower())
-        
+
+        # Encerra a transação de leitura: a conexão volta ao pool enquanto
+        # as chamadas ao Azure DevOps estão em andamento
+        self.db.commit()
+
         if not organizations:
             logger.warning("Nenhuma organização configurada para sincronização")
             return {
@@ -110,35 +178,45 @@ class ProjetoService:
                 "synced": 0,
                 "created": 0,
                 "updated": 0,
+                "unchanged": 0,
                 "organizations": [],
             }
         
         logger.info(f"Sincronizando projetos de {len(organizations)} organização(ões): {[org['name'] for org in organizations]}")
 
-        all_projects = []
-        org_results = []
-        
-        # Buscar projetos de cada organização
-        for org in organizations:
+        semaphore = asyncio.Semaphore(max(1, settings.project_sync_concurrency))
+
+        async def fetch(org: dict, client: httpx.AsyncClient) -> tuple[list[dict], dict]:
             org_name = org["name"]
-            pat = org["pat"]
             source = org.get("source", "unknown")
-            
-            try:
-                projects = await self._fetch_projects_from_org(org_name, pat)
-                logger.info(f"Recebidos {len(projects)} projetos de {org_name} (fonte: {source})")
-                all_projects.extend(projects)
-                org_results.append({"organization": org_name, "count": len(projects), "status": "success", "source": source})
-            except Exception as e:
-                logger.error(f"Erro ao buscar projetos de {org_name}: {e}")
-                org_results.append({"organization": org_name, "count": 0, "status": "error", "error": str(e), "source": source})
+            async with semaphore:
+                try:
+                    projects = await self._fetch_projects_from_org(org_name, org["pat"], client)
+                    logger.info(f"Recebidos {len(projects)} projetos de {org_name} (fonte: {source})")
+                    return projects, {"organization": org_name, "count": len(projects), "status": "success", "source": source}
+                except Exception as e:
+                    logger.error(f"Erro ao buscar projetos de {org_name}: {e}")
+                    return [], {"organization": org_name, "count": 0, "status": "error", "error": str(e), "source": source}
+
+        # Buscar projetos de todas as organizações em paralelo
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            results = await asyncio.gather(*(fetch(org, client) for org in organizations))
+
+        all_projects = [project for projects, _ in results for project in projects]
+        org_results = [org_result for _, org_result in results]
 
         logger.info(f"Total de {len(all_projects)} projetos recebidos de todas as organizações")
 
-        synced_count = 0
-        created_count = 0
-        updated_count = 0
+        # Conteúdo atual dos projetos locais (uma consulta)
+        existing_hashes = {
+            row.external_id: _content_hash(row._mapping)
+            for row in self.db.execute(
+                select(Projeto.external_id, *(getattr(Projeto, f) for f in _PROJECT_FIELDS))
+            )
+        }
 
+        now = datetime.now(timezone.utc)
+        rows_by_ext_id: dict[uuid.UUID, dict] = {}
         for params in all_projects:
             # Azure ID (UUID)
             ext_id_str = params.get("id")
@@ -150,65 +228,121 @@ class ProjetoService:
             except ValueError:
                 continue  # Pula se ID inválido
 
-            # Verifica se já existe
-            stmt = select(Projeto).where(Projeto.external_id == ext_id)
-            existing = self.db.execute(stmt).scalar_one_or_none()
-
             # Mapeamento de campos
-            nome = params.get("name")
-            descricao = params.get("description")
-            url = params.get("url")
-            estado = params.get("state")
-            organizacao = params.get("_organization")
-            now = datetime.now(timezone.utc)
-
-            if existing:
-                # Update
-                existing.nome = nome
-                existing.descricao = descricao
-                existing.url = url
-                existing.estado = estado
-                existing.organizacao = organizacao
-                existing.last_sync_at = now
-                updated_count += 1
-            else:
-                # Create
-                new_proj = Projeto(
-                    external_id=ext_id,
-                    nome=nome,
-                    descricao=descricao,
-                    url=url,
-                    estado=estado,
-                    organizacao=organizacao,
-                    last_sync_at=now,
-                )
-                self.db.add(new_proj)
-                self.db.flush()  # Flush imediatamente após adicionar
+            rows_by_ext_id[ext_id] = {
+                "external_id": ext_id,
+                "nome": params.get("name"),
+                "descricao": params.get("description"),
+                "url": params.get("url"),
+                "estado": params.get("state"),
+                "organizacao": params.get("_organization"),
+            }
+
+        synced_count = len(rows_by_ext_id)
+        created_count = 0
+        updated_count = 0
+        rows = []
+        unchanged_ids = []
+        for ext_id, row in rows_by_ext_id.items():
+            current_hash = existing_hashes.get(ext_id)
+            if current_hash == _content_hash(row):
+                unchanged_ids.append(ext_id)  # Sem alterações
+                continue
+            if current_hash is None:
                 created_count += 1
+            else:
+                updated_count += 1
+            rows.append({**row, "id": uuid.uuid4(), "last_sync_at": now})
 
-            synced_count += 1
+        unchanged_count = len(unchanged_ids)
 
         try:
+            for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                self.db.execute(self._upsert_statement(rows[start:start + UPSERT_BATCH_SIZE]))
+            # Projetos sem alteração só têm a data de sincronização renovada
+            for start in range(0, len(unchanged_ids), UPSERT_BATCH_SIZE):
+                self.db.execute(
+                    update(Projeto)
+                    .where(Projeto.external_id.in_(unchanged_ids[start:start + UPSERT_BATCH_SIZE]))
+                    .values(last_sync_at=now, updated_at=Projeto.updated_at)
+                    .execution_options(synchronize_session=False)
+                )
+            if rows:
+                notify_invalidation(self.db, "projetos")
             self.db.commit()
-            logger.info(f"Sincronização concluída: {created_count} criados, {updated_count} atualizados")
+            logger.info(
+                f"Sincronização concluída: {created_count} criados, {updated_count} atualizados, "
+                f"{unchanged_count} sem alterações"
+            )
         except Exception as e:
             logger.error(f"Erro ao salvar projetos no banco: {e}")
             self.db.rollback()
             raise
 
+        if rows:
+            # Nomes/UUIDs podem ter mudado: descarta a resolução nome -> UUID em cache
+            invalidate_project_id_cache()
+            reference_cache.bump()
+
         return {
             "total_azure": len(all_projects),
             "synced": synced_count,
             "created": created_count,
             "updated": updated_count,
+            "unchanged": unchanged_count,
             "organizations": org_results,
         }
 
-    def list_local_projects(self) -> list[Projeto]:
+    def list_local_projects(self) -> list[ProjetoRef]:
         """
         Lista projetos armazenados no cache local (banco de dados).
 
         Returns:
-            Lista de objetos Projeto ordenados por nome.
+            Lista de projetos (cache de referência) ordenados por nome.
+        """
+        return reference_cache.list_projetos(self.db)
+
+    def configured_organization_names(self) -> list[str]:
+        """
+        Organizações sincronizadas por sync_projects() (PATs ativos do banco e
+        variáveis de ambiente), sem descriptografar os PATs.
+        """
+        names = [
+            name
+            for (name,) in self.db.query(OrganizationPat.organization_name).filter(OrganizationPat.ativo == True)
+        ]
+        names.extend(org["name"] for org in settings.get_all_organizations())
+
+        unique: dict[str, str] = {}
+        for name in names:
+            unique.setdefault(name.lower(), name)
+        return list(unique.values())
+
+    def last_sync_by_organization(self, organizations: list[str] | None = None) -> dict[str, datetime]:
+        """
+        Data da última sincronização de cada organização (uma consulta agregada).
+
+        Args:
+            organizations: Apenas estas organizações (sem diferenciar
+                maiúsculas); padrão: todas as da tabela projetos.
+
+        Returns:
+            Dict organização -> último last_sync_at (sempre com timezone UTC).
         """
-        return self.db.query(Projeto).order_by(Projeto.nome).all()
+        query = (
+            select(Projeto.organizacao, func.max(Projeto.last_sync_at))
+            .where(Projeto.organizacao.isnot(None))
+            .group_by(Projeto.organizacao)
+        )
+        if organizations is not None:
+            query = query.where(func.lower(Projeto.organizacao).in_([org.lower() for org in organizations]))
+        rows = self.db.execute(query).all()
+
+        result = {}
+        for organizacao, last_sync_at in rows:
+            if last_sync_at is None:
+                continue
+            if last_sync_at.tzinfo is None:
+                last_sync_at = last_sync_at.replace(tzinfo=timezone.utc)
+            result[organizacao] = last_sync_at
+        return result
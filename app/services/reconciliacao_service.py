@@ -0,0 +1,388 @@
+"""
+Reconciliação do CompletedWork/RemainingWork no Azure DevOps com os totais
+apontados localmente.
+
+As atualizações feitas a cada apontamento (ApontamentoService.
+_update_work_item_hours) podem falhar e são apenas registradas em log; a
+reconciliação corrige a divergência acumulada:
+
+1. uma consulta agregada calcula o total apontado por work item, incluindo
+   os work items com apontamentos excluídos (total 0 se não restou nenhum);
+2. os valores atuais são lidos do Azure em lotes de 200 IDs (workitemsbatch);
+3. apenas os work items com CompletedWork divergente recebem um PATCH
+   (CompletedWork = total local, RemainingWork = OriginalEstimate - total,
+   mínimo 0, a mesma regra da atualização por apontamento), com no máximo
+   RECONCILIATION_CONCURRENCY PATCHes simultâneos por organização.
+
+Cada organização faz no máximo RECONCILIATION_MAX_REQUESTS_PER_SECOND
+chamadas ao Azure por segundo. O PATCH testa a revisão lida no lote: se o
+work item mudou no meio tempo, o item é registrado como falha e fica para a
+próxima execução. Em dry-run nada é alterado no Azure. O resultado vai para
+as tabelas reconciliacao_execucoes/reconciliacao_itens.
+
+O job "reconciliacao_horas" (app/services/job_scheduler.py) executa a
+reconciliação diariamente em RECONCILIATION_TIME. Execuções manuais (POST
+/api/v1/reconciliacao) rodam em segundo plano, acompanhadas pelo ID.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import httpx
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.reconciliacao import ReconciliacaoExecucao
+from app.repositories.reconciliacao import ReconciliacaoRepository
+from app.services.job_scheduler import job_scheduler
+from app.services.timesheet_service import TimesheetService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JOB_NAME = "reconciliacao_horas"
+
+# Limite de IDs por chamada de workitemsbatch
+BATCH_SIZE = 200
+
+# Diferença (em horas) abaixo da qual os valores são considerados iguais
+TOLERANCE_HOURS = 0.01
+
+# Uma execução por dia no cluster
+MIN_INTERVAL_SECONDS = 12 * 3600
+
+FIELD_ORIGINAL = "Microsoft.VSTS.Scheduling.OriginalEstimate"
+FIELD_COMPLETED = "Microsoft.VSTS.Scheduling.CompletedWork"
+FIELD_REMAINING = "Microsoft.VSTS.Scheduling.RemainingWork"
+
+
+class RateLimiter:
+    """Espaça o início das chamadas ao Azure de uma organização."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1 / per_second if per_second > 0 else 0
+        self._next_slot = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ReconciliacaoService:
+    """Serviço da reconciliação de horas com o Azure DevOps."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = ReconciliacaoRepository(db)
+
+    async def reconciliar(
+        self,
+        dry_run: bool = False,
+        organization_name: str | None = None,
+        execucao_id: UUID | None = None,
+    ) -> ReconciliacaoExecucao:
+        """
+        Executa a reconciliação e grava o relatório.
+
+        As consultas (Session síncrona) rodam em threads, fora do event loop.
+
+        Args:
+            dry_run: Apenas registra as divergências, sem alterar o Azure.
+            organization_name: Apenas esta organização (padrão: todas).
+            execucao_id: Execução já registrada por create_run() (o endpoint
+                devolve o ID antes de executar); None registra uma nova.
+
+        Returns:
+            Execução registrada, com os contadores do resultado.
+        """
+        if execucao_id is None:
+            execucao = await asyncio.to_thread(self.repository.create_run, dry_run, organization_name)
+        else:
+            execucao = await asyncio.to_thread(self.repository.get_run, execucao_id)
+        lookback = settings.reconciliation_lookback_days
+        changed_since = datetime.utcnow() - timedelta(days=lookback) if lookback > 0 else None
+
+        totals = 0
+        itens: list[dict] = []
+        try:
+            by_org, headers = await asyncio.to_thread(self._load_totals, organization_name, changed_since)
+            totals = sum(len(items) for items in by_org.values())
+
+            results = await asyncio.gather(
+                *(self._reconcile_org(org, items, headers[org], dry_run) for org, items in by_org.items())
+            )
+            itens = [item for org_items in results for item in org_items]
+        except Exception as e:
+            logger.error(f"Reconciliação de horas interrompida: {e}")
+            return await asyncio.to_thread(self._finish, execucao, totals, itens, dry_run, organization_name, e)
+
+        execucao = await asyncio.to_thread(self._finish, execucao, totals, itens, dry_run, organization_name)
+        logger.info(
+            f"Reconciliação de horas{' (dry-run)' if dry_run else ''}: {execucao.total_work_items} work items, "
+            f"{execucao.divergentes} divergentes, {execucao.corrigidos} corrigidos, {execucao.falhas} falhas"
+        )
+        return execucao
+
+    def _load_totals(
+        self, organization_name: str | None, changed_since: datetime | None
+    ) -> tuple[dict[str, list[tuple[int, str, int]]], dict[str, dict[str, str]]]:
+        """Totais locais agrupados por organização e os headers do Azure de cada uma."""
+        by_org: dict[str, list[tuple[int, str, int]]] = defaultdict(list)
+        for org, work_item_id, project_id, total_minutos in self.repository.work_item_totals(
+            organization_name, changed_since
+        ):
+            by_org[org].append((work_item_id, project_id, total_minutos))
+        headers = {org: TimesheetService(self.db)._get_headers_for_org(org) for org in by_org}
+        # Encerra a transação de leitura: a conexão volta ao pool enquanto
+        # as chamadas ao Azure DevOps estão em andamento
+        self.db.commit()
+        return by_org, headers
+
+    def _finish(
+        self,
+        execucao: ReconciliacaoExecucao,
+        totals: int,
+        itens: list[dict],
+        dry_run: bool,
+        organization_name: str | None,
+        error: Exception | None = None,
+    ) -> ReconciliacaoExecucao:
+        """Grava o relatório e, sem dry-run, remove as pendências reconciliadas."""
+        if error is not None:
+            self.db.rollback()
+            return self.repository.finish_run(execucao, totals, itens, erro=str(error) or type(error).__name__)
+        execucao = self.repository.finish_run(execucao, totals, itens)
+        if not dry_run:
+            # Exclusões reconciliadas; as que falharam ficam para a próxima execução
+            falhas = {(item["organization_name"], item["work_item_id"]) for item in itens if item["acao"] == "falha"}
+            self.repository.clear_pending(execucao.iniciado_em, organization_name, keep=falhas)
+        return execucao
+
+    async def _reconcile_org(
+        self,
+        organization: str,
+        items: list[tuple[int, str, int]],
+        headers: dict[str, str],
+        dry_run: bool,
+    ) -> list[dict]:
+        """Compara e corrige os work items de uma organização."""
+        limiter = RateLimiter(settings.reconciliation_max_requests_per_second)
+        semaphore = asyncio.Semaphore(max(1, settings.reconciliation_concurrency))
+        result: list[dict] = []
+        drifted: list[tuple[dict, int]] = []
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            for i in range(0, len(items), BATCH_SIZE):
+                batch = items[i : i + BATCH_SIZE]
+                try:
+                    current = await self._fetch_batch(
+                        client, organization, headers, [wi for wi, _, _ in batch], limiter
+                    )
+                except Exception as e:
+                    logger.warning(f"Reconciliação: falha ao ler lote de {organization}: {e}")
+                    result.extend(
+                        self._item(organization, wi, project_id, minutos, None, "falha", str(e))
+                        for wi, project_id, minutos in batch
+                    )
+                    continue
+
+                for work_item_id, project_id, minutos in batch:
+                    azure = current.get(work_item_id)
+                    if azure is None:
+                        result.append(
+                            self._item(organization, work_item_id, project_id, minutos, None, "nao_encontrado")
+                        )
+                        continue
+                    completed = azure["fields"].get(FIELD_COMPLETED) or 0
+                    if abs(completed - minutos / 60) < TOLERANCE_HOURS:
+                        continue
+                    item = self._item(organization, work_item_id, project_id, minutos, azure["fields"], "divergente")
+                    result.append(item)
+                    drifted.append((item, azure["rev"]))
+
+            if not dry_run:
+
+                async def patch(item: dict, rev: int) -> None:
+                    async with semaphore:
+                        try:
+                            await self._patch(client, organization, headers, item, rev, limiter)
+                            item["acao"] = "corrigido"
+                        except Exception as e:
+                            item["acao"] = "falha"
+                            item["erro"] = str(e) or type(e).__name__
+
+                await asyncio.gather(*(patch(item, rev) for item, rev in drifted))
+
+        return result
+
+    @staticmethod
+    def _item(
+        organization: str,
+        work_item_id: int,
+        project_id: str,
+        minutos: int,
+        fields: dict | None,
+        acao: str,
+        erro: str | None = None,
+    ) -> dict:
+        horas = minutos / 60
+        fields = fields or {}
+        original = fields.get(FIELD_ORIGINAL)
+        return {
+            "organization_name": organization,
+            "work_item_id": work_item_id,
+            "project_id": project_id,
+            "horas_local": horas,
+            "completed_work_azure": fields.get(FIELD_COMPLETED),
+            "remaining_work_azure": fields.get(FIELD_REMAINING),
+            "original_estimate": original,
+            "remaining_work_novo": max(0, (original or 0) - horas) if fields else None,
+            "acao": acao,
+            "erro": erro,
+        }
+
+    async def _fetch_batch(
+        self,
+        client: httpx.AsyncClient,
+        organization: str,
+        headers: dict[str, str],
+        work_item_ids: list[int],
+        limiter: RateLimiter,
+    ) -> dict[int, dict]:
+        """Valores atuais (rev e campos de scheduling) de até 200 work items."""
+        await limiter.wait()
+        response = await client.post(
+            f"https://dev.azure.com/{organization}/_apis/wit/workitemsbatch?api-version=7.1",
+            headers={**headers, "Content-Type": "application/json"},
+            json={
+                "ids": work_item_ids,
+                "fields": ["System.Id", FIELD_ORIGINAL, FIELD_COMPLETED, FIELD_REMAINING],
+                # Work items excluídos voltam como null em vez de falhar o lote
+                "errorPolicy": "Omit",
+            },
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"workitemsbatch retornou {response.status_code}")
+        return {
+            wi["id"]: {"rev": wi.get("rev"), "fields": wi.get("fields", {})}
+            for wi in response.json().get("value", [])
+            if wi
+        }
+
+    async def _patch(
+        self,
+        client: httpx.AsyncClient,
+        organization: str,
+        headers: dict[str, str],
+        item: dict,
+        rev: int | None,
+        limiter: RateLimiter,
+    ) -> None:
+        """Grava CompletedWork/RemainingWork se o work item ainda estiver na revisão lida."""
+        patch_document = [
+            {"op": "add", "path": f"/fields/{FIELD_COMPLETED}", "value": item["horas_local"]},
+            {"op": "add", "path": f"/fields/{FIELD_REMAINING}", "value": item["remaining_work_novo"]},
+        ]
+        if rev is not None:
+            patch_document.insert(0, {"op": "test", "path": "/rev", "value": rev})
+        await limiter.wait()
+        response = await client.patch(
+            f"https://dev.azure.com/{organization}/_apis/wit/workitems/{item['work_item_id']}?api-version=7.1",
+            headers={**headers, "Content-Type": "application/json-patch+json"},
+            json=patch_document,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"PATCH retornou {response.status_code}: {response.text[:200]}")
+
+
+def seconds_until_daily_run(now: datetime, hour: int, minute: int) -> float:
+    """Segundos até o próximo horário informado (todos os dias)."""
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class ReconciliacaoScheduler:
+    """Registra a reconciliação diária no agendador de jobs e executa as manuais."""
+
+    def __init__(self):
+        self._tasks: set[asyncio.Task] = set()
+
+    def run_in_background(
+        self,
+        execucao_id: UUID,
+        dry_run: bool,
+        organization_name: str | None = None,
+        session_factory: sessionmaker = SessionLocal,
+    ) -> asyncio.Task:
+        """
+        Executa em segundo plano uma reconciliação já registrada (POST
+        /api/v1/reconciliacao), acompanhada por GET /api/v1/reconciliacao/{id}.
+        """
+
+        async def run() -> None:
+            db = session_factory()
+            try:
+                await ReconciliacaoService(db).reconciliar(dry_run, organization_name, execucao_id=execucao_id)
+            except Exception as e:
+                logger.error(f"Reconciliação {execucao_id} não executada: {e}")
+            finally:
+                db.close()
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def run(self, session_factory: sessionmaker = SessionLocal) -> ReconciliacaoExecucao:
+        db = session_factory()
+        try:
+            execucao = await ReconciliacaoService(db).reconciliar(dry_run=settings.reconciliation_dry_run)
+        finally:
+            db.close()
+        if execucao.status == "erro":
+            # Registrado também como falha do job em background_jobs
+            raise RuntimeError(execucao.erro)
+        return execucao
+
+    def start(self) -> None:
+        """Inicia o job diário (no lifespan da aplicação)."""
+        if not settings.reconciliation_time:
+            return
+        try:
+            hour, minute = (int(part) for part in settings.reconciliation_time.split(":"))
+        except ValueError:
+            logger.error(f"RECONCILIATION_TIME inválido (use HH:MM): {settings.reconciliation_time}")
+            return
+        job_scheduler.add(
+            JOB_NAME,
+            self.run,
+            next_delay=lambda: seconds_until_daily_run(datetime.now(), hour, minute),
+            min_interval=MIN_INTERVAL_SECONDS,
+        )
+        logger.info(f"Reconciliação de horas diária às {hour:02d}:{minute:02d}")
+
+    async def stop(self) -> None:
+        """Interrompe o job diário e as execuções manuais em andamento."""
+        await job_scheduler.remove(JOB_NAME)
+        for task in list(self._tasks):
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+# Instância única por processo
+reconciliacao_scheduler = ReconciliacaoScheduler()
@@ -0,0 +1,188 @@
+"""
+Serviço de relatórios de horas, servidos a partir do rollup horas_diarias.
+
+O job "rollup_horas" (app/services/job_scheduler.py) atualiza o rollup a
+cada HORAS_ROLLUP_INTERVAL_SECONDS em uma réplica por vez; as leituras não
+o atualizam e informam em atualizado_ate até onde ele está em dia.
+"""
+
+import asyncio
+import logging
+from datetime import date
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from app.config import get_settings
+from app.database import SessionLocal
+from app.repositories.apontamento import format_duracao
+from app.repositories.relatorio import RelatorioRepository
+from app.services.job_scheduler import job_scheduler
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JOB_NAME = "rollup_horas"
+
+# Atraso da primeira atualização após o startup
+INITIAL_DELAY_SECONDS = 5
+
+# Dimensões aceitas em group_by ("mes" é derivado de "dia")
+GROUP_BY_OPTIONS = ("usuario", "projeto", "atividade", "dia", "mes")
+
+
+class RelatorioService:
+    """Serviço para relatórios de horas apontadas."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = RelatorioRepository(db)
+
+    def atualizar_rollup(self, full: bool = False) -> int:
+        """
+        Atualiza o rollup de horas de forma incremental.
+
+        Se outro worker estiver atualizando o mesmo trecho ao mesmo tempo,
+        a atualização é descartada e o relatório usa o estado já gravado.
+
+        Args:
+            full: Força a reconstrução completa.
+
+        Returns:
+            Número de partições recalculadas.
+        """
+        try:
+            return self.repository.refresh(full=full)
+        except (IntegrityError, OperationalError) as e:
+            self.db.rollback()
+            logger.warning(f"Refresh do rollup de horas concorrente descartado: {e}")
+            return 0
+
+    def horas(
+        self,
+        organization_name: str,
+        data_inicio: date,
+        data_fim: date,
+        group_by: list[str],
+        project_id: str | None = None,
+        usuario_id: str | None = None,
+    ) -> dict:
+        """
+        Relatório de horas agrupado pelas dimensões informadas.
+
+        Args:
+            organization_name: Nome da organização.
+            data_inicio: Data inicial (inclusiva).
+            data_fim: Data final (inclusiva).
+            group_by: Dimensões de GROUP_BY_OPTIONS.
+            project_id: Filtrar por projeto (opcional).
+            usuario_id: Filtrar por usuário (opcional).
+
+        Returns:
+            Dict compatível com RelatorioHorasResponse.
+
+        Raises:
+            ValueError: Se o período ou o agrupamento forem inválidos.
+        """
+        if data_inicio > data_fim:
+            raise ValueError("data_inicio deve ser menor ou igual a data_fim")
+
+        invalid = [g for g in group_by if g not in GROUP_BY_OPTIONS]
+        if invalid:
+            raise ValueError(
+                f"Agrupamento inválido: {', '.join(invalid)}. "
+                f"Opções: {', '.join(GROUP_BY_OPTIONS)}"
+            )
+        if "dia" in group_by and "mes" in group_by:
+            raise ValueError("Use apenas um entre 'dia' e 'mes' no agrupamento")
+
+        group_by = list(dict.fromkeys(group_by))
+        por_mes = "mes" in group_by
+        dimensions = ["dia" if g == "mes" else g for g in group_by]
+
+        rows = self.repository.query_horas(
+            organization_name=organization_name,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            group_by=dimensions,
+            project_id=project_id,
+            usuario_id=usuario_id,
+        )
+
+        # Converte dia -> período e soma os dias do mesmo mês
+        grupos: dict[tuple, dict] = {}
+        for row in rows:
+            dia = row.pop("dia", None)
+            if dia is not None:
+                row["periodo"] = dia.strftime("%Y-%m") if por_mes else dia.isoformat()
+            key = tuple(row.get(k) for k in ("usuario_id", "project_id", "id_atividade", "periodo"))
+            if key in grupos:
+                grupos[key]["total_minutos"] += row["total_minutos"]
+                grupos[key]["total_apontamentos"] += row["total_apontamentos"]
+            else:
+                grupos[key] = row
+
+        items = []
+        total_minutos = 0
+        total_apontamentos = 0
+        for grupo in grupos.values():
+            minutos = int(grupo.pop("total_minutos"))
+            total_minutos += minutos
+            total_apontamentos += int(grupo["total_apontamentos"])
+            items.append(
+                {
+                    **grupo,
+                    "total_horas": round(minutos / 60, 2),
+                    "total_formatado": format_duracao(minutos),
+                }
+            )
+
+        return {
+            "organization_name": organization_name,
+            "data_inicio": data_inicio,
+            "data_fim": data_fim,
+            "group_by": group_by,
+            "items": items,
+            "total_horas": round(total_minutos / 60, 2),
+            "total_formatado": format_duracao(total_minutos),
+            "total_apontamentos": total_apontamentos,
+            "atualizado_ate": self.repository.get_watermark(),
+        }
+
+
+class RollupScheduler:
+    """Registra a atualização periódica do rollup de horas no agendador de jobs."""
+
+    def refresh(self, session_factory: sessionmaker = SessionLocal) -> int:
+        db = session_factory()
+        try:
+            return RelatorioService(db).atualizar_rollup()
+        finally:
+            db.close()
+
+    async def run(self) -> int:
+        # Consultas síncronas: fora do event loop
+        particoes = await asyncio.to_thread(self.refresh)
+        if particoes:
+            logger.info(f"Rollup de horas: {particoes} partições recalculadas")
+        return particoes
+
+    def start(self) -> None:
+        """Inicia o loop periódico (no lifespan da aplicação)."""
+        interval = settings.horas_rollup_interval_seconds
+        if interval <= 0:
+            logger.info("Atualização automática do rollup de horas desativada")
+            return
+        job_scheduler.add(
+            JOB_NAME,
+            self.run,
+            next_delay=lambda: interval,
+            initial_delay=INITIAL_DELAY_SECONDS,
+            min_interval=interval / 2,
+        )
+
+    async def stop(self) -> None:
+        """Interrompe o loop periódico."""
+        await job_scheduler.remove(JOB_NAME)
+
+
+# Instância única por processo
+rollup_scheduler = RollupScheduler()
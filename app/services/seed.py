@@ -4,7 +4,6 @@ Seed de dados iniciais para desenvolvimento.
 
 import logging
 import uuid
-from sqlalchemy import inspect
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.config import get_settings
@@ -12,6 +11,8 @@ from app.database import SessionLocal
 from app.models.atividade import Atividade
 from app.models.atividade_projeto import AtividadeProjeto
 from app.models.projeto import Projeto
+from app.repositories.reference_cache import reference_cache
+from app.utils.schema_cache import get_table_names
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +26,7 @@ def ensure_seed_data() -> None:
 
     db = SessionLocal()
     try:
-        inspector = inspect(db.get_bind())
-        schema = Atividade.__table__.schema
-        tables = set(inspector.get_table_names(schema=schema))
+        tables = get_table_names(db.get_bind(), Atividade.__table__.schema)
 
         if "atividades" not in tables or "projetos" not in tables:
             logger.info("Seed ignorado: tabelas base ausentes no schema.")
@@ -67,6 +66,7 @@ def ensure_seed_data() -> None:
             )
 
         db.commit()
+        reference_cache.bump()
         logger.info("Seed de desenvolvimento aplicado com sucesso.")
     except SQLAlchemyError as exc:
         db.rollback()
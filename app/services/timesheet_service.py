@@ -6,31 +6,49 @@ Monta a hierarquia de Work Items e agrega apontamentos por semana.
 import asyncio
 import base64
 import logging
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any
 from uuid import UUID
 
 import httpx
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import get_settings
 from app.models.apontamento import Apontamento
-from app.repositories.apontamento import duracao_to_decimal, format_duracao
+from app.models.atividade import Atividade
+from app.repositories.apontamento import ApontamentoRepository, duracao_to_decimal, format_duracao
+from app.repositories.timesheet_cache import ApontamentoSemana, iteration_cache, week_cache
+from app.repositories.work_item import WorkItemRepository
 from app.schemas.timesheet import (
     ApontamentoDia,
     CelulaDia,
     ProcessStateMapping,
     StateCategoryResponse,
+    TeamTimesheetResponse,
+    TeamUsuario,
+    TeamUsuarioItem,
+    TeamWorkItem,
     TimesheetResponse,
     TotalDia,
     WorkItemRevision,
     WorkItemRevisionFields,
     WorkItemRevisionsResponse,
     WorkItemTimesheet,
+    WorkItemTypeInfo,
 )
-from app.services.azure import AzureService, get_work_item_icon_data_uri
+from app.services.ancestor_cache import ancestor_cache
+from app.services.azure import AzureService, get_work_item_icon_data_uri, get_work_item_type_color
+from app.services.work_item_mirror import (
+    WorkItemMirrorService,
+    identity_email,
+    mirror_enabled,
+    mirror_loads,
+    poller_enabled,
+    work_item_snapshot,
+)
+from app.tracing import traced
 from app.utils.project_id_normalizer import normalize_project_id, is_valid_uuid
 
 settings = get_settings()
@@ -57,6 +75,9 @@ STATE_TO_CATEGORY = {
 # Categorias que permitem edição/exclusão
 EDITABLE_CATEGORIES = {"Proposed", "InProgress", "Resolved"}
 
+# Estados conhecidos cuja categoria permite edição (enviados em types)
+EDITABLE_STATES = sorted(state for state, category in STATE_TO_CATEGORY.items() if category in EDITABLE_CATEGORIES)
+
 # Mapeamento de tipo para nível hierárquico
 TYPE_TO_LEVEL = {
     "Epic": 0,
@@ -67,6 +88,26 @@ TYPE_TO_LEVEL = {
     "Bug": 3,
 }
 
+# Campos lidos pelo poller do espelho (reporting/workitemrevisions)
+REPORTING_FIELDS = [
+    "System.Id",
+    "System.Rev",
+    "System.Title",
+    "System.WorkItemType",
+    "System.State",
+    "System.AssignedTo",
+    "System.TeamProject",
+    "System.IterationPath",
+    "System.IsDeleted",
+    "Microsoft.VSTS.Scheduling.OriginalEstimate",
+    "Microsoft.VSTS.Scheduling.CompletedWork",
+    "Microsoft.VSTS.Scheduling.RemainingWork",
+]
+HIERARCHY_LINK_TYPE = "System.LinkTypes.Hierarchy"
+
+# Profundidade máxima da busca de ancestrais (Epic > Feature > Story > Task + margem)
+MAX_ANCESTOR_DEPTH = 6
+
 # Dias da semana em português
 DIAS_SEMANA_PT = ["seg", "ter", "qua", "qui", "sex", "sáb", "dom"]
 
@@ -112,32 +153,33 @@ class TimesheetService:
         self.db = db
         self._token_fallback = token
         self._organization = organization
-        # O PAT será resolvido dinamicamente por organização
-        self._pat_cache: dict[str, str] = {}
 
     def _get_pat_for_org(self, organization: str) -> str:
         """
         Retorna o PAT para uma organização específica.
         Busca primeiro no banco de dados, depois nas variáveis de ambiente.
         """
-        if organization in self._pat_cache:
-            return self._pat_cache[organization]
+        from app.repositories.organization_pat import OrganizationPatRepository, pat_cache
+
+        cache_key = organization.lower().strip()
+        cached = pat_cache.get(cache_key)
+        if cached:
+            return cached
         
         # 1. Busca no banco de dados
-        from app.repositories.organization_pat import OrganizationPatRepository
         repo = OrganizationPatRepository(self.db)
         pat = repo.get_pat_for_organization(organization)
         
         if pat:
             logger.debug(f"PAT encontrado no banco para {organization}")
-            self._pat_cache[organization] = pat
+            pat_cache.set(cache_key, pat)
             return pat
         
         # 2. Fallback: busca nas variáveis de ambiente
         pat = settings.get_pat_for_org(organization)
         if pat:
             logger.debug(f"PAT encontrado nas variáveis de ambiente para {organization}")
-            self._pat_cache[organization] = pat
+            pat_cache.set(cache_key, pat)
             return pat
         
         # 3. Fallback final: usa token fornecido na construção
@@ -220,6 +262,7 @@ class TimesheetService:
             
             return find_iteration_path(data)
 
+    @traced("timesheet.work_items_by_iteration")
     async def _get_work_items_by_iteration_api(
         self,
         organization: str,
@@ -242,6 +285,41 @@ class TimesheetService:
         Returns:
             Lista de Work Items com detalhes.
         """
+        cache_key = (organization, project, iteration_id)
+        cached = iteration_cache.get(cache_key)
+        if cached is not None:
+            return [dict(item) for item in cached]
+
+        items = await self._fetch_work_items_by_iteration(organization, project, iteration_id)
+        if items is None:
+            # Fallback para WIQL se a API falhar (não vai para o cache)
+            return await self._get_work_items_simple(organization, project, None, None)
+        iteration_cache.set(cache_key, [dict(item) for item in items])
+        return items
+
+    async def prefetch_iteration(self, organization: str, project: str, iteration_id: str) -> bool:
+        """
+        Pré-carrega os work items de uma iteration no cache (aquecimento).
+
+        Returns:
+            True se a iteration foi buscada (False se já estava em cache ou a API falhou).
+        """
+        cache_key = (organization, project, iteration_id)
+        if iteration_cache.contains(cache_key):
+            return False
+        items = await self._fetch_work_items_by_iteration(organization, project, iteration_id)
+        if items is None:
+            return False
+        iteration_cache.set(cache_key, items, prefetched=True)
+        return True
+
+    async def _fetch_work_items_by_iteration(
+        self,
+        organization: str,
+        project: str,
+        iteration_id: str,
+    ) -> list[dict[str, Any]] | None:
+        """Busca os work items da iteration no Azure DevOps (None se a API falhar)."""
         headers = self._get_headers_for_org(organization)
         if not headers:
             logger.warning(f"Sem credenciais para {organization}")
@@ -262,8 +340,7 @@ class TimesheetService:
                 logger.error(
                     f"Erro ao buscar work items da iteration: {response.status_code} - {response.text[:500]}"
                 )
-                # Fallback para WIQL se a API falhar
-                return await self._get_work_items_simple(organization, project, None, None)
+                return None
 
             data = response.json()
 
@@ -290,6 +367,7 @@ class TimesheetService:
             organization, project, list(work_item_ids), relations
         )
 
+    @traced("timesheet.work_items_hierarchy")
     async def _get_work_items_hierarchy(
         self,
         organization: str,
@@ -324,7 +402,12 @@ class TimesheetService:
                 organization, project, iteration_id
             )
 
-        # Sem iteration_id: usar WIQL para buscar todos os work items
+        # Sem iteration_id: usar o espelho local quando estiver em dia
+        mirrored = await self._get_work_items_from_mirror(organization, project, user_email)
+        if mirrored is not None:
+            return mirrored
+
+        # Espelho indisponível: usar WIQL para buscar todos os work items
         logger.debug("Sem iteration_id, usando WIQL para buscar todos work items")
 
         # WIQL para buscar hierarquia (Epic -> Feature -> Story -> Task/Bug)
@@ -447,6 +530,7 @@ class TimesheetService:
                 organization, project, work_item_ids, []
             )
 
+    @traced("timesheet.work_items_details")
     async def _get_work_items_details(
         self,
         organization: str,
@@ -472,6 +556,8 @@ class TimesheetService:
                 "System.State",
                 "System.AssignedTo",
                 "System.Parent",
+                "System.TeamProject",
+                "System.IterationPath",
                 "Microsoft.VSTS.Scheduling.OriginalEstimate",
                 "Microsoft.VSTS.Scheduling.CompletedWork",
                 "Microsoft.VSTS.Scheduling.RemainingWork",
@@ -495,25 +581,10 @@ class TimesheetService:
 
                 items_data = response.json().get("value", [])
 
-                # Buscar ícones apenas para tipos únicos (cache por tipo)
-                pat_for_org = self._get_pat_for_org(organization)
-                unique_types = set()
-                for item in items_data:
-                    work_item_type = item.get("fields", {}).get("System.WorkItemType", "")
-                    if work_item_type:
-                        unique_types.add(work_item_type)
-                
-                # Buscar ícones apenas para tipos únicos (máximo ~6 tipos)
-                icon_cache: dict[str, str] = {}
-                if unique_types:
-                    icon_tasks = [
-                        get_work_item_icon_data_uri(organization, pat_for_org or "", wt)
-                        for wt in unique_types
-                    ]
-                    icon_results = await asyncio.gather(*icon_tasks)
-                    icon_cache = dict(zip(unique_types, icon_results))
-                
-                logger.debug(f"Ícones buscados: {len(unique_types)} tipos únicos para {len(items_data)} work items")
+                icon_cache = await self._get_type_icons(
+                    organization,
+                    {item.get("fields", {}).get("System.WorkItemType", "") for item in items_data},
+                )
 
                 for idx, item in enumerate(items_data):
                     fields_data = item.get("fields", {})
@@ -525,10 +596,16 @@ class TimesheetService:
                         assigned_to_name = assigned_to.get("displayName", "")
                     else:
                         assigned_to_name = str(assigned_to) if assigned_to else ""
+                    assigned_to_email = identity_email(assigned_to)
 
                     all_items.append(
                         {
                             "id": item.get("id"),
+                            "project_name": fields_data.get("System.TeamProject"),
+                            "url": item.get("url"),
+                            "rev": item.get("rev"),
+                            "iteration_path": fields_data.get("System.IterationPath"),
+                            "assigned_to_email": assigned_to_email,
                             "title": fields_data.get("System.Title", ""),
                             "type": fields_data.get("System.WorkItemType", ""),
                             "state": state,
@@ -548,8 +625,308 @@ class TimesheetService:
                         }
                     )
 
+        self._index_work_items(organization, project, all_items)
         return all_items
 
+    @traced("timesheet.type_icons")
+    async def _get_type_icons(self, organization: str, work_item_types: set[str]) -> dict[str, str]:
+        """
+        Busca os ícones apenas para os tipos únicos (máximo ~6 tipos).
+
+        Returns:
+            Dict tipo -> Data URI do ícone.
+        """
+        unique_types = {wt for wt in work_item_types if wt}
+        if not unique_types:
+            return {}
+        pat_for_org = self._get_pat_for_org(organization)
+        icon_results = await asyncio.gather(
+            *(get_work_item_icon_data_uri(organization, pat_for_org or "", wt) for wt in unique_types)
+        )
+        logger.debug(f"Ícones buscados: {len(unique_types)} tipos únicos")
+        return dict(zip(unique_types, icon_results))
+
+    async def _get_type_dictionary(
+        self, organization: str, work_item_types: set[str]
+    ) -> dict[str, WorkItemTypeInfo]:
+        """
+        Dicionário de apresentação dos tipos (ícone, cor, nível e estados
+        editáveis), enviado uma vez por resposta em vez de por work item.
+        """
+        icons = await self._get_type_icons(organization, work_item_types)
+        return {
+            work_item_type: WorkItemTypeInfo(
+                icon=icon,
+                color=get_work_item_type_color(work_item_type),
+                nivel=TYPE_TO_LEVEL.get(work_item_type, 3),
+                estados_editaveis=EDITABLE_STATES,
+            )
+            for work_item_type, icon in sorted(icons.items())
+        }
+
+    async def _get_work_items_from_mirror(
+        self, organization: str, project: str, user_email: str | None
+    ) -> list[dict[str, Any]] | None:
+        """
+        Monta a lista de work items a partir do espelho local (service hooks).
+
+        Returns:
+            Work items no mesmo formato de _get_work_items_details, ou None se o
+            espelho do projeto não estiver em dia (nesse caso agenda uma carga
+            completa em segundo plano).
+        """
+        if not mirror_enabled():
+            return None
+
+        mirror = WorkItemMirrorService(self.db)
+        project_id = mirror.resolve_project_id(project)
+        if not project_id:
+            return None
+        if not mirror.is_fresh(organization, project_id):
+            self._schedule_mirror_load(organization, project_id)
+            return None
+
+        rows = mirror.get_hierarchy(organization, project_id, list(TYPE_TO_LEVEL), user_email)
+        icon_cache = await self._get_type_icons(organization, {r.work_item_type or "" for r in rows})
+        logger.debug(f"Timesheet montado do espelho: {len(rows)} work items ({organization}/{project_id})")
+        return [
+            {
+                "id": row.id,
+                "title": row.title,
+                "type": row.work_item_type or "",
+                "state": row.state or "",
+                "state_category": get_state_category(row.state or ""),
+                "assigned_to": row.assigned_to or "",
+                "parent_id": row.parent_id,
+                "icon_url": icon_cache.get(row.work_item_type or "", ""),
+                "original_estimate": row.original_estimate,
+                "completed_work": row.completed_work,
+                "remaining_work": row.remaining_work,
+            }
+            for row in rows
+        ]
+
+    def _schedule_mirror_load(self, organization: str, project_id: str) -> None:
+        """Agenda a carga completa do espelho do projeto, com sessão própria."""
+        session_factory = sessionmaker(bind=self.db.get_bind(), autocommit=False, autoflush=False)
+        token = self._token_fallback
+
+        async def load() -> None:
+            db = session_factory()
+            try:
+                service = TimesheetService(db, token=token)
+                if poller_enabled():
+                    # A primeira passada do poller (sem watermark) é uma carga completa
+                    await service.poll_mirror(organization, project_id)
+                else:
+                    await service.load_mirror(organization, project_id)
+            finally:
+                db.close()
+
+        if mirror_loads.start((organization, project_id), load):
+            logger.info(f"Carga do espelho de work items agendada para {organization}/{project_id}")
+
+    @traced("timesheet.load_mirror")
+    async def load_mirror(self, organization: str, project_id: str) -> int:
+        """
+        Carga completa do espelho: grava todos os work items da hierarquia do
+        projeto e remove os que não existem mais no Azure DevOps.
+
+        Args:
+            organization: Nome da organização.
+            project_id: UUID do projeto.
+
+        Returns:
+            Quantidade de work items carregados.
+
+        Raises:
+            HTTPException: Se a consulta WIQL falhar.
+        """
+        started_at = datetime.utcnow()
+        types = ", ".join(f"'{t}'" for t in TYPE_TO_LEVEL)
+        wiql = f"""
+        SELECT [System.Id]
+        FROM WorkItems
+        WHERE [System.TeamProject] = @project
+        AND [System.WorkItemType] IN ({types})
+        """
+        wiql_url = f"https://dev.azure.com/{organization}/{project_id}/_apis/wit/wiql?api-version=7.1"
+
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            response = await client.post(
+                wiql_url, headers=self._get_headers_for_org(organization), json={"query": wiql}
+            )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Erro ao carregar work items do projeto: {response.status_code}",
+            )
+
+        work_item_ids = [item["id"] for item in response.json().get("workItems", [])]
+        items = await self._get_work_items_details(organization, project_id, work_item_ids, [])
+        if len(items) < len(work_item_ids):
+            # Algum lote de detalhes falhou: o espelho ficaria incompleto
+            logger.warning(
+                f"Carga do espelho incompleta ({len(items)}/{len(work_item_ids)}) para {organization}/{project_id}"
+            )
+            return len(items)
+
+        repository = WorkItemRepository(self.db)
+        loaded_ids = {item["id"] for item in items}
+        for row in repository.list_by_project(organization, project_id, list(TYPE_TO_LEVEL)):
+            # Itens excluídos enquanto nenhum service hook chegou
+            if row.id not in loaded_ids and row.atualizado_em < started_at:
+                repository.delete(organization, row.id)
+        repository.touch_mirror_status(organization, project_id, carga_completa_em=started_at)
+        self.db.commit()
+        logger.info(f"Espelho de work items carregado: {len(items)} itens ({organization}/{project_id})")
+        return len(items)
+
+    async def _get_reporting_page(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, Any],
+        token: str | None,
+    ) -> dict[str, Any]:
+        """Uma página de uma API de reporting a partir do continuation token."""
+        if token:
+            params = {**params, "continuationToken": token}
+        response = await client.get(url, headers=headers, params=params)
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Erro na API de reporting ({url.rsplit('/', 1)[-1]}): {response.status_code}",
+            )
+        return response.json()
+
+    @traced("timesheet.poll_mirror")
+    async def poll_mirror(self, organization: str, project_id: str) -> dict[str, int]:
+        """
+        Sincronização incremental do espelho via APIs de reporting.
+
+        Lê reporting/workitemrevisions (última revisão de cada item alterado)
+        e reporting/workitemlinks (links de hierarquia criados/removidos) a
+        partir dos continuation tokens gravados para o projeto. Sem token, a
+        primeira passada percorre todos os itens do projeto. O token é gravado
+        a cada página, então uma falha retoma do ponto em que parou.
+
+        Args:
+            organization: Nome da organização.
+            project_id: UUID do projeto.
+
+        Returns:
+            Dict com as quantidades de revisões, itens excluídos e links aplicados.
+
+        Raises:
+            HTTPException: Se uma API de reporting falhar.
+        """
+        started_at = datetime.utcnow()
+        repository = WorkItemRepository(self.db)
+        mirror_status = repository.touch_mirror_status(organization, project_id)
+        base_url = f"https://dev.azure.com/{organization}/{project_id}/_apis/wit/reporting"
+        page_size = settings.work_item_poll_page_size
+        result = {"revisoes": 0, "excluidos": 0, "links": 0}
+        headers = self._get_headers_for_org(organization)
+
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            while True:
+                data = await self._get_reporting_page(
+                    client,
+                    f"{base_url}/workitemrevisions",
+                    headers,
+                    {
+                        "fields": ",".join(REPORTING_FIELDS),
+                        "types": ",".join(TYPE_TO_LEVEL),
+                        "includeLatestOnly": "true",
+                        "includeDeleted": "true",
+                        "$maxPageSize": page_size,
+                        "api-version": "7.1",
+                    },
+                    mirror_status.revisions_token,
+                )
+                snapshots = []
+                for value in data.get("values", []):
+                    if value.get("fields", {}).get("System.IsDeleted"):
+                        repository.delete(organization, value["id"])
+                        result["excluidos"] += 1
+                    else:
+                        snapshots.append(work_item_snapshot(value, project_id))
+                if snapshots:
+                    # Sem commit intermediário: itens e token avançam juntos
+                    repository.upsert_many(organization, snapshots, commit=False)
+                result["revisoes"] += len(snapshots)
+                mirror_status.revisions_token = data.get("continuationToken") or mirror_status.revisions_token
+                self.db.commit()
+                if data.get("isLastBatch", True):
+                    break
+
+            while True:
+                data = await self._get_reporting_page(
+                    client,
+                    f"{base_url}/workitemlinks",
+                    headers,
+                    {"linkTypes": HIERARCHY_LINK_TYPE, "api-version": "7.1"},
+                    mirror_status.links_token,
+                )
+                links = [
+                    (link["targetId"], link["sourceId"], link.get("isActive", link.get("changedOperation") != "remove"))
+                    for link in data.get("values", [])
+                    if link.get("rel") == f"{HIERARCHY_LINK_TYPE}-Forward"
+                ]
+                repository.apply_parent_links(organization, links)
+                result["links"] += len(links)
+                mirror_status.links_token = data.get("continuationToken") or mirror_status.links_token
+                self.db.commit()
+                if data.get("isLastBatch", True):
+                    break
+
+        mirror_status.carga_completa_em = started_at
+        self.db.commit()
+        logger.info(
+            f"Poll do espelho {organization}/{project_id}: {result['revisoes']} revisões, "
+            f"{result['excluidos']} excluídos, {result['links']} links"
+        )
+        return result
+
+    def _index_work_items(self, organization: str, project: str, items: list[dict[str, Any]]) -> None:
+        """
+        Grava os work items buscados no índice local usado pela busca de work items.
+        Falhas são apenas registradas: o índice não pode quebrar o timesheet.
+        """
+        if not items:
+            return
+        project_id = project if is_valid_uuid(project) else None
+        try:
+            WorkItemRepository(self.db).upsert_many(
+                organization,
+                [
+                    {
+                        **item,
+                        "work_item_type": item["type"],
+                        "project_id": project_id,
+                        "project_name": item["project_name"] or (None if project_id else project),
+                    }
+                    for item in items
+                ],
+            )
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.warning(f"Falha ao indexar work items de {organization}: {e}")
+
+    def _normalize_project(self, project: str) -> str:
+        """Normaliza project_id para UUID se possível (mantém o valor original se não)."""
+        try:
+            if not is_valid_uuid(project):
+                project_normalized = normalize_project_id(project, self.db)
+                logger.debug(f"Project ID normalizado: {project} -> {project_normalized}")
+                return project_normalized
+        except ValueError as e:
+            logger.warning(f"Não foi possível normalizar project_id '{project}': {e}")
+        return project
+
+    @traced("timesheet.apontamentos_semana")
     def _get_apontamentos_semana(
         self,
         organization: str,
@@ -557,62 +934,133 @@ class TimesheetService:
         week_start: date,
         week_end: date,
         user_id: str | None = None,
-    ) -> dict[int, dict[date, list[Apontamento]]]:
+    ) -> dict[int, dict[date, list[ApontamentoSemana]]]:
         """
         Busca apontamentos da semana agrupados por work_item_id e data.
         
-        Durante a transição, aceita tanto UUID quanto nome do projeto.
+        Aceita tanto UUID quanto nome do projeto: o nome é resolvido para UUID
+        (via cache) e a consulta usa um único predicado de igualdade. O
+        resultado fica em week_cache até uma escrita no projeto ou o TTL.
 
         Returns:
-            Dict[work_item_id, Dict[data, List[Apontamento]]]
+            Dict[work_item_id, Dict[data, List[ApontamentoSemana]]]
         """
-        # Normalizar project_id para UUID se possível
-        project_normalized = project
-        try:
-            if not is_valid_uuid(project):
-                project_normalized = normalize_project_id(project, self.db)
-                logger.info(f"Project ID normalizado: {project} -> {project_normalized}")
-        except ValueError as e:
-            logger.warning(f"Não foi possível normalizar project_id '{project}': {e}")
-        
-        # Query que aceita ambos os formatos durante a transição
-        query = self.db.query(Apontamento).filter(
-            Apontamento.organization_name == organization,
-            or_(
-                Apontamento.project_id == project_normalized,  # UUID
-                Apontamento.project_id == project,  # Formato antigo (fallback)
-            ),
-            Apontamento.data_apontamento >= week_start,
-            Apontamento.data_apontamento <= week_end,
+        project_normalized = self._normalize_project(project)
+        cache_key = (organization, project_normalized, week_start, user_id)
+        cached = week_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = self._load_apontamentos_semana(organization, project_normalized, week_start, week_end, user_id)
+        week_cache.set(cache_key, result)
+        return result
+
+    def prefetch_week(
+        self, organization: str, project: str, week_start: date, user_id: str | None = None
+    ) -> bool:
+        """
+        Pré-carrega os apontamentos de uma semana no cache (aquecimento).
+
+        Returns:
+            True se a semana foi consultada (False se já estava em cache).
+        """
+        project_normalized = self._normalize_project(project)
+        cache_key = (organization, project_normalized, week_start, user_id)
+        if week_cache.contains(cache_key):
+            return False
+        week_end = week_start + timedelta(days=6)
+        result = self._load_apontamentos_semana(organization, project_normalized, week_start, week_end, user_id)
+        week_cache.set(cache_key, result, prefetched=True)
+        return True
+
+    def _load_apontamentos_semana(
+        self,
+        organization: str,
+        project_normalized: str,
+        week_start: date,
+        week_end: date,
+        user_id: str | None = None,
+    ) -> dict[int, dict[date, list[ApontamentoSemana]]]:
+        """Consulta os apontamentos da semana (com o nome da atividade) e agrupa."""
+        # Registros legados (project_id = nome) foram convertidos para UUID
+        # pela migração f6g7h8i9j0k1, então basta uma igualdade simples
+        query = (
+            self.db.query(Apontamento, Atividade.nome)
+            .outerjoin(Atividade, Atividade.id == Apontamento.id_atividade)
+            .filter(
+                Apontamento.organization_name == organization,
+                Apontamento.project_id == project_normalized,
+                Apontamento.data_apontamento >= week_start,
+                Apontamento.data_apontamento <= week_end,
+            )
         )
 
         if user_id:
             query = query.filter(Apontamento.usuario_id == user_id)
 
-        apontamentos = query.all()
-
         # Agrupar por work_item_id e data
-        result: dict[int, dict[date, list[Apontamento]]] = {}
-        for apt in apontamentos:
-            wi_id: int = apt.work_item_id  # type: ignore
-            data_apt: date = apt.data_apontamento  # type: ignore
-            if wi_id not in result:
-                result[wi_id] = {}
-            if data_apt not in result[wi_id]:
-                result[wi_id][data_apt] = []
-            result[wi_id][data_apt].append(apt)
+        result: dict[int, dict[date, list[ApontamentoSemana]]] = {}
+        for apt, atividade_nome in query.all():
+            snapshot = ApontamentoSemana(
+                id=apt.id,
+                work_item_id=apt.work_item_id,
+                data_apontamento=apt.data_apontamento,
+                duracao=str(apt.duracao),
+                id_atividade=apt.id_atividade,
+                atividade_nome=atividade_nome or "",
+                comentario=str(apt.comentario) if apt.comentario is not None else None,
+            )
+            result.setdefault(snapshot.work_item_id, {}).setdefault(snapshot.data_apontamento, []).append(snapshot)
 
         return result
 
+    @traced("timesheet.resolve_ancestors")
+    async def _resolve_ancestors(
+        self, organization: str, project: str, work_items: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Busca os ancestrais dos work items cujo pai não está no conjunto.
+
+        Os pais ausentes são buscados nível a nível, em lotes de até 200 IDs
+        por request (_get_work_items_details), consultando antes o cache de
+        ancestrais. O custo é de uma rodada por nível, não por item.
+
+        Returns:
+            Ancestrais (marcados com eh_ancestral=True), sem repetir os já presentes.
+        """
+        known = {wi["id"] for wi in work_items}
+        missing = {wi["parent_id"] for wi in work_items if wi.get("parent_id")} - known
+        ancestors: list[dict[str, Any]] = []
+
+        for _ in range(MAX_ANCESTOR_DEPTH):
+            if not missing:
+                break
+            level, to_fetch = ancestor_cache.get_many(organization, missing)
+            if to_fetch:
+                fetched = await self._get_work_items_details(organization, project, sorted(to_fetch), [])
+                ancestor_cache.set_many(organization, fetched)
+                level.extend(fetched)
+
+            for item in level:
+                item["eh_ancestral"] = True
+            ancestors.extend(level)
+            known.update(missing)
+            missing = {a["parent_id"] for a in level if a.get("parent_id")} - known
+
+        logger.debug(f"Ancestrais resolvidos: {len(ancestors)}")
+        return ancestors
+
     def _build_work_item_timesheet(
         self,
         work_item: dict[str, Any],
         week_dates: list[date],
-        apontamentos_map: dict[int, dict[date, list[Apontamento]]],
+        apontamentos_map: dict[int, dict[date, list[ApontamentoSemana]]],
         today: date,
+        include_icon_url: bool = True,
     ) -> WorkItemTimesheet:
         """
         Constrói o objeto WorkItemTimesheet com células e totais.
+        Sem include_icon_url o ícone fica apenas no dicionário types da resposta.
         """
         work_item_id = work_item["id"]
         state_category = work_item.get("state_category", "InProgress")
@@ -628,19 +1076,19 @@ class TimesheetService:
 
             # Calcular total do dia
             total_dia = sum(
-                duracao_to_decimal(str(apt.duracao)) for apt in dia_apontamentos
+                duracao_to_decimal(apt.duracao) for apt in dia_apontamentos
             )
             total_semana += total_dia
 
             # Converter apontamentos para schema
             apontamentos_dia = [
                 ApontamentoDia(
-                    id=apt.id,  # type: ignore
-                    duracao=str(apt.duracao),
-                    duracao_horas=duracao_to_decimal(str(apt.duracao)),
-                    id_atividade=apt.id_atividade,  # type: ignore
-                    atividade_nome=apt.atividade.nome if apt.atividade else "",
-                    comentario=str(apt.comentario) if apt.comentario is not None else None,
+                    id=apt.id,
+                    duracao=apt.duracao,
+                    duracao_horas=duracao_to_decimal(apt.duracao),
+                    id_atividade=apt.id_atividade,
+                    atividade_nome=apt.atividade_nome,
+                    comentario=apt.comentario,
                 )
                 for apt in dia_apontamentos
             ]
@@ -663,7 +1111,7 @@ class TimesheetService:
             type=work_item.get("type", ""),
             state=work_item.get("state", ""),
             state_category=state_category,
-            icon_url=work_item.get("icon_url", ""),
+            icon_url=work_item.get("icon_url", "") if include_icon_url else "",
             assigned_to=work_item.get("assigned_to"),
             original_estimate=work_item.get("original_estimate"),
             completed_work=work_item.get("completed_work"),
@@ -676,8 +1124,10 @@ class TimesheetService:
             children=[],
             pode_editar=pode_editar,
             pode_excluir=pode_editar,
+            eh_ancestral=work_item.get("eh_ancestral", False),
         )
 
+    @traced("timesheet.build_hierarchy")
     def _build_hierarchy(
         self, work_items: list[WorkItemTimesheet]
     ) -> list[WorkItemTimesheet]:
@@ -708,6 +1158,36 @@ class TimesheetService:
 
         return roots
 
+    def _build_totais_por_dia(
+        self,
+        week_dates: list[date],
+        apontamentos_map: dict[int, dict[date, list[ApontamentoSemana]]],
+        today: date,
+    ) -> list[TotalDia]:
+        """
+        Totais de horas de cada dia da semana, somando todos os work items.
+        """
+        totais_por_dia: list[TotalDia] = []
+        for i, dt in enumerate(week_dates):
+            total_dia = sum(
+                sum(duracao_to_decimal(apt.duracao) for apt in apts)
+                for wi_apts in apontamentos_map.values()
+                for d, apts in wi_apts.items()
+                if d == dt
+            )
+            totais_por_dia.append(
+                TotalDia(
+                    data=dt,
+                    dia_semana=DIAS_SEMANA_PT[i],
+                    dia_numero=dt.day,
+                    total_horas=total_dia,
+                    total_formatado=format_duracao(int(total_dia * 60)) if total_dia > 0 else "",
+                    eh_hoje=dt == today,
+                )
+            )
+        return totais_por_dia
+
+    @traced("timesheet.get_timesheet")
     async def get_timesheet(
         self,
         organization: str,
@@ -716,6 +1196,8 @@ class TimesheetService:
         user_email: str | None = None,
         user_id: str | None = None,
         iteration_id: str | None = None,
+        show_parents: bool = False,
+        include_icon_url: bool | None = None,
     ) -> TimesheetResponse:
         """
         Retorna o timesheet completo para uma semana.
@@ -726,6 +1208,10 @@ class TimesheetService:
             week_start: Início da semana (segunda). Se None, usa semana atual.
             user_email: Email do usuário para filtro.
             user_id: ID do usuário para filtrar apontamentos.
+            show_parents: Inclui os ancestrais ausentes (ex: Story/Feature/Epic
+                das Tasks da iteration) como contexto da hierarquia.
+            include_icon_url: Mantém o ícone em cada work item (legado). Se
+                None, usa TIMESHEET_INCLUDE_ICON_URL.
 
         Returns:
             TimesheetResponse com a hierarquia e totais.
@@ -744,34 +1230,27 @@ class TimesheetService:
             organization, project, week_start_date, week_end_date
         )
 
+        ancestors = (
+            await self._resolve_ancestors(organization, project, work_items_data) if show_parents else []
+        )
+
+        if include_icon_url is None:
+            include_icon_url = settings.timesheet_include_icon_url
+
         # Construir objetos WorkItemTimesheet
         work_items_timesheet = [
-            self._build_work_item_timesheet(wi, week_dates, apontamentos_map, today)
-            for wi in work_items_data
+            self._build_work_item_timesheet(wi, week_dates, apontamentos_map, today, include_icon_url)
+            for wi in work_items_data + ancestors
         ]
+        types = await self._get_type_dictionary(
+            organization, {wi.get("type", "") for wi in work_items_data + ancestors}
+        )
 
         # Construir hierarquia
         hierarchy = self._build_hierarchy(work_items_timesheet)
 
         # Calcular totais por dia
-        totais_por_dia: list[TotalDia] = []
-        for i, dt in enumerate(week_dates):
-            total_dia = sum(
-                sum(duracao_to_decimal(str(apt.duracao)) for apt in apts)
-                for wi_apts in apontamentos_map.values()
-                for d, apts in wi_apts.items()
-                if d == dt
-            )
-            totais_por_dia.append(
-                TotalDia(
-                    data=dt,
-                    dia_semana=DIAS_SEMANA_PT[i],
-                    dia_numero=dt.day,
-                    total_horas=total_dia,
-                    total_formatado=format_duracao(int(total_dia * 60)) if total_dia > 0 else "",
-                    eh_hoje=dt == today,
-                )
-            )
+        totais_por_dia = self._build_totais_por_dia(week_dates, apontamentos_map, today)
 
         # Calcular totais gerais
         total_geral = sum(t.total_horas for t in totais_por_dia)
@@ -788,6 +1267,7 @@ class TimesheetService:
             semana_fim=week_end_date,
             semana_label=semana_label,
             work_items=hierarchy,
+            types=types,
             total_geral_horas=total_geral,
             total_geral_formatado=format_duracao(int(total_geral * 60)) if total_geral > 0 else "",
             totais_por_dia=totais_por_dia,
@@ -796,6 +1276,192 @@ class TimesheetService:
             total_historico=total_historico,
         )
 
+    async def get_current_iteration_ids(self, organization: str, project: str) -> list[str]:
+        """
+        IDs das iterations atuais de todos os times de um projeto.
+
+        Returns:
+            IDs distintos (times sem iteration atual são ignorados).
+        """
+        headers = self._get_headers_for_org(organization)
+        if not headers:
+            return []
+
+        iteration_ids: list[str] = []
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            response = await client.get(
+                f"https://dev.azure.com/{organization}/_apis/projects/{project}/teams?$top=1000&api-version=7.1",
+                headers=headers,
+            )
+            if response.status_code != 200:
+                logger.warning(f"Erro ao listar times de {organization}/{project}: {response.status_code}")
+                return []
+
+            for team in response.json().get("value", []):
+                response = await client.get(
+                    f"https://dev.azure.com/{organization}/{project}/{team['id']}"
+                    f"/_apis/work/teamsettings/iterations?$timeframe=current&api-version=7.1",
+                    headers=headers,
+                )
+                if response.status_code != 200:
+                    continue
+                for iteration in response.json().get("value", []):
+                    if iteration.get("id") and iteration["id"] not in iteration_ids:
+                        iteration_ids.append(iteration["id"])
+        return iteration_ids
+
+    async def _get_team_member_ids(self, organization: str, project: str, team: str) -> list[str]:
+        """
+        IDs dos membros de um time do Azure DevOps.
+
+        Raises:
+            HTTPException: Se o time não for encontrado ou a API falhar.
+        """
+        url = (
+            f"https://dev.azure.com/{organization}/_apis/projects/{project}"
+            f"/teams/{team}/members?$top=1000&api-version=7.1"
+        )
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            response = await client.get(url, headers=self._get_headers_for_org(organization))
+        if response.status_code == 404:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Time '{team}' não encontrado")
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Erro ao buscar membros do time: {response.status_code}",
+            )
+        return [
+            member["identity"]["id"]
+            for member in response.json().get("value", [])
+            if member.get("identity", {}).get("id")
+        ]
+
+    @traced("timesheet.get_team_timesheet")
+    async def get_team_timesheet(
+        self,
+        organization: str,
+        project: str,
+        week_start: date | None = None,
+        iteration_id: str | None = None,
+        team: str | None = None,
+        usuario_ids: list[str] | None = None,
+    ) -> TeamTimesheetResponse:
+        """
+        Timesheet semanal de uma equipe, agregado no servidor.
+
+        Uma consulta agrega os apontamentos por (usuário, work item, dia) e os
+        work items referenciados são buscados uma única vez para todos os
+        usuários: pela API da iteration, quando informada, ou pelo índice local
+        com fallback em lote no Azure DevOps.
+
+        Args:
+            organization: Nome da organização Azure DevOps.
+            project: ID (ou nome) do projeto.
+            week_start: Início da semana (segunda). Se None, usa semana atual.
+            iteration_id: Restringe aos work items da iteration (sprint).
+            team: Restringe aos membros do time do Azure DevOps.
+            usuario_ids: Restringe aos usuários informados.
+
+        Returns:
+            TeamTimesheetResponse com uma linha por usuário.
+        """
+        week_start_date, week_end_date, week_dates = get_week_dates(week_start)
+        project_normalized = self._normalize_project(project)
+
+        if team:
+            member_ids = await self._get_team_member_ids(organization, project, team)
+            usuario_ids = [u for u in usuario_ids if u in member_ids] if usuario_ids else member_ids
+
+        work_items: dict[int, dict[str, Any]] = {}
+        work_item_filter: list[int] | None = None
+        if iteration_id:
+            for item in await self._get_work_items_by_iteration_api(organization, project, iteration_id):
+                work_items[item["id"]] = item
+            work_item_filter = list(work_items)
+
+        rows = ApontamentoRepository(self.db).aggregate_by_usuario_work_item_dia(
+            organization,
+            project_normalized,
+            week_start_date,
+            week_end_date,
+            usuario_ids=usuario_ids,
+            work_item_ids=work_item_filter,
+        )
+
+        if not iteration_id:
+            referenced = {row["work_item_id"] for row in rows}
+            for item in WorkItemRepository(self.db).get_many(organization, referenced):
+                work_items[item.id] = {
+                    "id": item.id,
+                    "title": item.title,
+                    "type": item.work_item_type or "",
+                    "state": item.state or "",
+                    "parent_id": item.parent_id,
+                }
+            missing = sorted(referenced - set(work_items))
+            for item in await self._get_work_items_details(organization, project, missing, []):
+                work_items[item["id"]] = item
+
+        day_index = {dt: i for i, dt in enumerate(week_dates)}
+        usuarios: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            usuario = usuarios.setdefault(
+                row["usuario_id"],
+                {"usuario_id": row["usuario_id"], "usuario_nome": row["usuario_nome"], "itens": {}},
+            )
+            minutos = usuario["itens"].setdefault(row["work_item_id"], [0] * 7)
+            minutos[day_index[row["dia"]]] += row["total_minutos"]
+
+        linhas: list[TeamUsuario] = []
+        equipe_minutos = [0] * 7
+        for usuario in sorted(usuarios.values(), key=lambda u: (u["usuario_nome"] or "", u["usuario_id"])):
+            dia_minutos = [0] * 7
+            itens = []
+            for work_item_id, minutos in sorted(usuario["itens"].items()):
+                itens.append(
+                    TeamUsuarioItem(
+                        work_item_id=work_item_id,
+                        horas_dia=[m / 60 for m in minutos],
+                        total_horas=sum(minutos) / 60,
+                    )
+                )
+                dia_minutos = [a + b for a, b in zip(dia_minutos, minutos)]
+            equipe_minutos = [a + b for a, b in zip(equipe_minutos, dia_minutos)]
+            total = sum(dia_minutos)
+            linhas.append(
+                TeamUsuario(
+                    usuario_id=usuario["usuario_id"],
+                    usuario_nome=usuario["usuario_nome"],
+                    horas_dia=[m / 60 for m in dia_minutos],
+                    total_horas=total / 60,
+                    total_formatado=format_duracao(total) if total else "",
+                    itens=itens,
+                )
+            )
+
+        referenced_ids = {item.work_item_id for linha in linhas for item in linha.itens}
+        total_geral = sum(equipe_minutos)
+        return TeamTimesheetResponse(
+            semana_inicio=week_start_date,
+            semana_fim=week_end_date,
+            semana_label=f"{week_start_date.strftime('%d/%m')} - {week_end_date.strftime('%d/%m')}",
+            work_items={
+                wi_id: TeamWorkItem(
+                    id=wi_id,
+                    title=wi.get("title", ""),
+                    type=wi.get("type", ""),
+                    state=wi.get("state", ""),
+                    parent_id=wi.get("parent_id"),
+                )
+                for wi_id, wi in work_items.items()
+                if wi_id in referenced_ids
+            },
+            usuarios=linhas,
+            horas_dia=[m / 60 for m in equipe_minutos],
+            total_geral_horas=total_geral / 60,
+            total_geral_formatado=format_duracao(total_geral) if total_geral else "",
+        )
+
     async def get_state_category(
         self, organization: str, project: str, work_item_id: int
     ) -> StateCategoryResponse:
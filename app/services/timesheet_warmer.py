@@ -0,0 +1,210 @@
+"""
+Aquecimento preditivo dos caches do timesheet.
+
+- Depois de servir um timesheet, o endpoint agenda (BackgroundTasks) o
+  prefetch das semanas anterior e seguinte, limitado a
+  TIMESHEET_PREFETCH_MAX_PER_MINUTE consultas por minuto no processo.
+- Em dias úteis, no horário TIMESHEET_WARM_TIME, o job
+  "aquecimento_timesheet" (app/services/job_scheduler.py) pré-carrega os
+  work items da iteration atual de cada time dos projetos com apontamentos
+  recentes, até TIMESHEET_WARM_MAX_ITERATIONS por execução.
+
+As taxas de acerto dos caches (prefetch_hit_rate em particular) e os
+contadores do aquecimento ficam em GET /api/v1/timesheet/cache/stats.
+"""
+
+import logging
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.repositories.apontamento import ApontamentoRepository
+from app.repositories.timesheet_cache import iteration_cache, week_cache
+from app.services.job_scheduler import job_scheduler
+from app.services.timesheet_service import TimesheetService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Semanas vizinhas pré-carregadas após cada timesheet (em dias)
+ADJACENT_WEEK_OFFSETS = (-7, 7)
+
+JOB_NAME = "aquecimento_timesheet"
+
+# Uma execução por dia no cluster, mesmo com relógios um pouco diferentes
+# entre as réplicas
+MIN_INTERVAL_SECONDS = 12 * 3600
+
+
+class TimesheetWarmer:
+    """Coordena o aquecimento dos caches do timesheet no processo."""
+
+    def __init__(self):
+        self._window_started = 0.0
+        self._window_count = 0
+        self.semanas_carregadas = 0
+        self.iterations_carregadas = 0
+        self.ignorados_orcamento = 0
+        self.falhas = 0
+        self.last_run_at: datetime | None = None
+        self.last_result: dict | None = None
+
+    def _take_budget(self) -> bool:
+        """Consome uma consulta do orçamento por minuto (False se esgotado)."""
+        limit = settings.timesheet_prefetch_max_per_minute
+        now = time.monotonic()
+        if now - self._window_started >= 60:
+            self._window_started = now
+            self._window_count = 0
+        if self._window_count >= limit:
+            self.ignorados_orcamento += 1
+            return False
+        self._window_count += 1
+        return True
+
+    def prefetch_adjacent_weeks(
+        self,
+        session_factory: sessionmaker,
+        organization: str,
+        project: str,
+        week_start: date,
+        user_id: str | None = None,
+    ) -> int:
+        """
+        Pré-carrega as semanas anterior e seguinte à servida.
+        Falhas são registradas e não propagadas.
+
+        Síncrono de propósito: as consultas usam a Session síncrona e, como
+        função comum, o BackgroundTasks a executa no threadpool, fora do
+        event loop.
+
+        Returns:
+            Quantidade de semanas consultadas.
+        """
+        if settings.timesheet_prefetch_max_per_minute <= 0 or settings.timesheet_week_cache_ttl_seconds <= 0:
+            return 0
+
+        loaded = 0
+        db = session_factory()
+        try:
+            service = TimesheetService(db)
+            for offset in ADJACENT_WEEK_OFFSETS:
+                target = week_start + timedelta(days=offset)
+                if not self._take_budget():
+                    break
+                try:
+                    if service.prefetch_week(organization, project, target, user_id):
+                        loaded += 1
+                except Exception as e:
+                    db.rollback()
+                    self.falhas += 1
+                    logger.warning(f"Falha no prefetch da semana {target} de {organization}/{project}: {e}")
+        finally:
+            db.close()
+        self.semanas_carregadas += loaded
+        return loaded
+
+    async def warm_current_iterations(self, session_factory: sessionmaker = SessionLocal) -> dict[str, int]:
+        """
+        Pré-carrega as iterations atuais dos times dos projetos ativos.
+
+        Returns:
+            Dict com projetos, iterations carregadas, ignoradas (já em cache
+            ou além do limite) e falhas.
+        """
+        result = {"projetos": 0, "iterations": 0, "ignoradas": 0, "falhas": 0}
+        limit = settings.timesheet_warm_max_iterations
+        desde = date.today() - timedelta(days=settings.timesheet_warm_active_days)
+
+        db = session_factory()
+        try:
+            service = TimesheetService(db)
+            for organization, project_id in ApontamentoRepository(db).list_active_projects(desde):
+                result["projetos"] += 1
+                try:
+                    iteration_ids = await service.get_current_iteration_ids(organization, project_id)
+                except Exception as e:
+                    result["falhas"] += 1
+                    logger.warning(f"Falha ao listar iterations atuais de {organization}/{project_id}: {e}")
+                    continue
+                for iteration_id in iteration_ids:
+                    if result["iterations"] >= limit:
+                        result["ignoradas"] += 1
+                        continue
+                    try:
+                        if await service.prefetch_iteration(organization, project_id, iteration_id):
+                            result["iterations"] += 1
+                        else:
+                            result["ignoradas"] += 1
+                    except Exception as e:
+                        result["falhas"] += 1
+                        logger.warning(f"Falha no prefetch da iteration {iteration_id}: {e}")
+        finally:
+            db.close()
+
+        self.iterations_carregadas += result["iterations"]
+        self.falhas += result["falhas"]
+        self.last_run_at = datetime.now(timezone.utc)
+        self.last_result = result
+        return result
+
+    def stats(self) -> dict:
+        """Contadores do aquecimento e estatísticas dos caches."""
+        return {
+            "semanas": week_cache.stats(),
+            "iterations": iteration_cache.stats(),
+            "aquecimento": {
+                "semanas_carregadas": self.semanas_carregadas,
+                "iterations_carregadas": self.iterations_carregadas,
+                "ignorados_orcamento": self.ignorados_orcamento,
+                "falhas": self.falhas,
+                "ultima_execucao": self.last_run_at.isoformat() if self.last_run_at else None,
+                "ultimo_resultado": self.last_result,
+            },
+        }
+
+    async def _scheduled_warm(self) -> dict:
+        result = await self.warm_current_iterations()
+        logger.info(
+            f"Aquecimento do timesheet: {result['iterations']} iterations de "
+            f"{result['projetos']} projetos ({result['ignoradas']} ignoradas)"
+        )
+        return result
+
+    def start(self) -> None:
+        """Inicia o loop diário (no lifespan da aplicação)."""
+        if not settings.timesheet_warm_time:
+            return
+        try:
+            hour, minute = (int(part) for part in settings.timesheet_warm_time.split(":"))
+        except ValueError:
+            logger.error(f"TIMESHEET_WARM_TIME inválido (use HH:MM): {settings.timesheet_warm_time}")
+            return
+        job_scheduler.add(
+            JOB_NAME,
+            self._scheduled_warm,
+            next_delay=lambda: seconds_until_next_run(datetime.now(), hour, minute),
+            min_interval=MIN_INTERVAL_SECONDS,
+        )
+        logger.info(f"Aquecimento do timesheet em dias úteis às {hour:02d}:{minute:02d}")
+
+    async def stop(self) -> None:
+        """Interrompe o loop diário."""
+        await job_scheduler.remove(JOB_NAME)
+
+
+def seconds_until_next_run(now: datetime, hour: int, minute: int) -> float:
+    """Segundos até o próximo dia útil (segunda a sexta) no horário informado."""
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    while target.weekday() >= 5:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+# Instância única por processo
+timesheet_warmer = TimesheetWarmer()
@@ -0,0 +1,319 @@
+"""
+Espelho local de work items (tabela work_items) mantido pelos service hooks
+do Azure DevOps.
+
+Fluxo:
+- Uma carga completa do projeto (TimesheetService.load_mirror) grava todos os
+  work items da hierarquia e marca carga_completa_em.
+- Os eventos workitem.created/updated/restored/deleted recebidos em
+  POST /api/v1/hooks/azure-devops mantêm o espelho atualizado.
+- Onde os service hooks não chegam, o poller (TimesheetService.poll_mirror,
+  agendado por app.services.work_item_poller) lê as APIs de reporting de
+  revisões e links a partir do último continuation token do projeto.
+- Enquanto a carga estiver dentro de WORK_ITEM_MIRROR_MAX_AGE_SECONDS, o
+  timesheet sem iteration é montado a partir do espelho, sem WIQL.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.orm import Session
+
+from app.cache_events import notify_invalidation
+from app.config import get_settings
+from app.models.work_item import WorkItem
+from app.repositories.timesheet_cache import iteration_cache
+from app.repositories.work_item import WorkItemRepository
+from app.utils.project_id_normalizer import is_valid_uuid, normalize_project_id
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+UPSERT_EVENTS = {"workitem.created", "workitem.updated", "workitem.restored"}
+DELETE_EVENTS = {"workitem.deleted"}
+SUPPORTED_EVENTS = UPSERT_EVENTS | DELETE_EVENTS
+
+# Intervalo mínimo entre cargas completas disparadas para o mesmo projeto
+# (evita uma carga por request quando o Azure está falhando)
+LOAD_MIN_INTERVAL_SECONDS = 300
+
+_ORG_URL_PATTERNS = (
+    re.compile(r"dev\.azure\.com/([^/?#]+)"),
+    re.compile(r"https?://([^./]+)\.visualstudio\.com"),
+)
+_PARENT_LINK = "System.LinkTypes.Hierarchy-Reverse"
+
+
+def poller_enabled() -> bool:
+    """Indica se o poller incremental (APIs de reporting) está ativo."""
+    return settings.work_item_poll_interval_seconds > 0
+
+
+def mirror_enabled() -> bool:
+    """O espelho só é mantido com service hooks configurados ou com o poller ativo."""
+    return bool(settings.azure_devops_webhook_secret) or poller_enabled()
+
+
+def organization_from_url(url: str | None) -> str | None:
+    """Extrai o nome da organização de uma URL do Azure DevOps."""
+    for pattern in _ORG_URL_PATTERNS:
+        match = pattern.search(url or "")
+        if match:
+            return match.group(1)
+    return None
+
+
+def identity_name(value: Any) -> str | None:
+    """displayName de um campo de identidade (objeto ou "Nome <email>")."""
+    if isinstance(value, dict):
+        return value.get("displayName")
+    if isinstance(value, str) and value:
+        return value.split("<")[0].strip()
+    return None
+
+
+def identity_email(value: Any) -> str | None:
+    """uniqueName (email) de um campo de identidade (objeto ou "Nome <email>")."""
+    if isinstance(value, dict):
+        return value.get("uniqueName")
+    if isinstance(value, str):
+        match = re.search(r"<([^>]+)>", value)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _parent_from_relations(relations: list[dict] | None) -> int | None:
+    for relation in relations or []:
+        if relation.get("rel") == _PARENT_LINK:
+            try:
+                return int(relation.get("url", "").rstrip("/").rsplit("/", 1)[-1])
+            except ValueError:
+                return None
+    return None
+
+
+def work_item_snapshot(resource: dict, project_id: str | None) -> dict:
+    """
+    Converte um work item da API REST (id, rev, fields, relations, url) nas
+    colunas do espelho.
+    """
+    fields = resource.get("fields", {})
+    parent_id = fields.get("System.Parent") or _parent_from_relations(resource.get("relations"))
+    assigned_to = fields.get("System.AssignedTo")
+    return {
+        "id": resource.get("id"),
+        "rev": resource.get("rev") or fields.get("System.Rev"),
+        "project_id": project_id,
+        "project_name": fields.get("System.TeamProject"),
+        "title": fields.get("System.Title", ""),
+        "work_item_type": fields.get("System.WorkItemType"),
+        "state": fields.get("System.State"),
+        "parent_id": parent_id,
+        "assigned_to": identity_name(assigned_to),
+        "assigned_to_email": identity_email(assigned_to),
+        "iteration_path": fields.get("System.IterationPath"),
+        "original_estimate": fields.get("Microsoft.VSTS.Scheduling.OriginalEstimate"),
+        "completed_work": fields.get("Microsoft.VSTS.Scheduling.CompletedWork"),
+        "remaining_work": fields.get("Microsoft.VSTS.Scheduling.RemainingWork"),
+        "url": resource.get("url"),
+    }
+
+
+@dataclass(frozen=True)
+class ServiceHookEvent:
+    """Evento de work item recebido de um service hook."""
+
+    event_type: str
+    organization_name: str
+    project_id: str | None
+    work_item_id: int
+    snapshot: dict
+
+
+def parse_service_hook(payload: dict) -> ServiceHookEvent:
+    """
+    Interpreta o payload de um service hook workitem.*.
+
+    Nos eventos workitem.updated o estado completo do item está em
+    resource.revision; nos demais, o próprio resource é o work item.
+
+    Raises:
+        ValueError: Se o payload não for um evento de work item válido.
+    """
+    event_type = payload.get("eventType")
+    if event_type not in SUPPORTED_EVENTS:
+        raise ValueError(f"Evento não suportado: {event_type}")
+
+    resource = payload.get("resource") or {}
+    if event_type == "workitem.updated":
+        work_item = resource.get("revision") or {}
+        work_item_id = resource.get("workItemId") or work_item.get("id")
+        work_item = {**work_item, "id": work_item_id}
+    else:
+        work_item = resource
+        work_item_id = resource.get("id")
+    if not work_item_id:
+        raise ValueError("Payload sem ID de work item")
+
+    containers = payload.get("resourceContainers") or {}
+    organization_name = (
+        organization_from_url((containers.get("collection") or {}).get("baseUrl"))
+        or organization_from_url((containers.get("account") or {}).get("baseUrl"))
+        or organization_from_url(work_item.get("url"))
+    )
+    if not organization_name:
+        raise ValueError("Não foi possível identificar a organização do evento")
+
+    project_id = (containers.get("project") or {}).get("id")
+    return ServiceHookEvent(
+        event_type=event_type,
+        organization_name=organization_name,
+        project_id=project_id,
+        work_item_id=int(work_item_id),
+        snapshot=work_item_snapshot(work_item, project_id),
+    )
+
+
+class WorkItemMirrorService:
+    """Operações sobre o espelho de work items."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = WorkItemRepository(db)
+
+    def apply(self, event: ServiceHookEvent) -> str:
+        """
+        Aplica um evento ao espelho.
+
+        Returns:
+            "upsert", "delete" ou "desatualizado" (revisão anterior à gravada).
+        """
+        project_id = event.project_id or self.resolve_project_id(event.snapshot.get("project_name"))
+
+        if event.event_type in DELETE_EVENTS:
+            self.repository.delete(event.organization_name, event.work_item_id)
+            acao = "delete"
+        else:
+            applied = self.repository.apply_snapshot(
+                event.organization_name, {**event.snapshot, "project_id": project_id}
+            )
+            acao = "upsert" if applied else "desatualizado"
+
+        if acao != "desatualizado":
+            # Work items de iterations em cache podem ter mudado
+            iteration_cache.invalidate(event.organization_name)
+            notify_invalidation(self.db, "iterations", event.organization_name)
+
+        if project_id:
+            self.repository.touch_mirror_status(
+                event.organization_name, project_id, ultimo_evento_em=datetime.utcnow()
+            )
+        self.db.commit()
+        return acao
+
+    def resolve_project_id(self, project: str | None) -> str | None:
+        """UUID do projeto a partir do UUID ou do nome (None se desconhecido)."""
+        if not project:
+            return None
+        if is_valid_uuid(project):
+            return project
+        try:
+            return normalize_project_id(project, self.db)
+        except ValueError:
+            return None
+
+    def is_fresh(self, organization_name: str, project_id: str) -> bool:
+        """Indica se a última carga completa do projeto está dentro da idade máxima."""
+        if not mirror_enabled():
+            return False
+        status = self.repository.get_mirror_status(organization_name, project_id)
+        if status is None or status.carga_completa_em is None:
+            return False
+        max_age = timedelta(seconds=settings.work_item_mirror_max_age_seconds)
+        return datetime.utcnow() - status.carga_completa_em <= max_age
+
+    def get_hierarchy(
+        self,
+        organization_name: str,
+        project_id: str,
+        work_item_types: list[str],
+        user_email: str | None = None,
+    ) -> list[WorkItem]:
+        """
+        Work items do projeto equivalentes à consulta WIQL recursiva do timesheet:
+        os itens atribuídos ao usuário (ou todos) e seus descendentes.
+        """
+        items = self.repository.list_by_project(organization_name, project_id, work_item_types)
+        if not user_email:
+            return items
+
+        email = user_email.lower()
+        children: dict[int, list[WorkItem]] = {}
+        for item in items:
+            if item.parent_id:
+                children.setdefault(item.parent_id, []).append(item)
+
+        selected: dict[int, WorkItem] = {}
+        pending = [i for i in items if (i.assigned_to_email or "").lower() == email]
+        while pending:
+            item = pending.pop()
+            if item.id in selected:
+                continue
+            selected[item.id] = item
+            pending.extend(children.get(item.id, []))
+        return sorted(selected.values(), key=lambda i: i.id)
+
+
+class MirrorLoadTracker:
+    """Cargas completas do espelho em segundo plano, no máximo uma por projeto."""
+
+    def __init__(self):
+        self._tasks: dict[tuple[str, str], asyncio.Task] = {}
+        self._started_at: dict[tuple[str, str], datetime] = {}
+
+    def start(self, key: tuple[str, str], load: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Inicia a carga do projeto se não houver outra em andamento ou recente.
+
+        Returns:
+            True se a carga foi iniciada.
+        """
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            return False
+        started_at = self._started_at.get(key)
+        if started_at and datetime.utcnow() - started_at < timedelta(seconds=LOAD_MIN_INTERVAL_SECONDS):
+            return False
+
+        self._started_at[key] = datetime.utcnow()
+        self._tasks[key] = asyncio.create_task(self._run(key, load))
+        return True
+
+    async def _run(self, key: tuple[str, str], load: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await load()
+        except Exception as e:
+            logger.warning(f"Falha na carga do espelho de work items {key}: {e}")
+
+    async def wait(self) -> None:
+        """Aguarda as cargas em andamento."""
+        pending = [t for t in self._tasks.values() if not t.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Cancela as cargas em andamento (shutdown da aplicação)."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+        await self.wait()
+        self._tasks.clear()
+
+
+# Instância única por processo
+mirror_loads = MirrorLoadTracker()
@@ -0,0 +1,80 @@
+"""
+Poller incremental do espelho de work items.
+
+Para organizações que os service hooks não alcançam, o job
+"poller_work_items" (app/services/job_scheduler.py, uma réplica por vez)
+chama TimesheetService.poll_mirror a cada WORK_ITEM_POLL_INTERVAL_SECONDS
+para cada projeto já sincronizado (com watermark gravado). Projetos novos
+entram no poller na primeira vez que o timesheet os pede sem iteration.
+"""
+
+import logging
+
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.repositories.work_item import WorkItemRepository
+from app.services.job_scheduler import job_scheduler
+from app.services.timesheet_service import TimesheetService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+JOB_NAME = "poller_work_items"
+
+# Atraso da primeira execução após o startup
+INITIAL_DELAY_SECONDS = 30
+
+
+class WorkItemPollScheduler:
+    """Coordena as passadas do poller do processo."""
+
+    async def poll_all(self, session_factory: sessionmaker = SessionLocal) -> dict[str, dict]:
+        """
+        Executa uma passada do poller em todos os projetos registrados.
+        Falhas de um projeto são registradas e não interrompem os demais.
+
+        Returns:
+            Dict "org/projeto" -> resultado de poll_mirror (ou {"erro": ...}).
+        """
+        db = session_factory()
+        try:
+            projects = [
+                (s.organization_name, s.project_id)
+                for s in WorkItemRepository(db).list_polled_projects()
+            ]
+            results: dict[str, dict] = {}
+            for organization, project_id in projects:
+                key = f"{organization}/{project_id}"
+                try:
+                    results[key] = await TimesheetService(db).poll_mirror(organization, project_id)
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Falha no poll do espelho {key}: {e}")
+                    results[key] = {"erro": str(e)}
+            return results
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Inicia o loop periódico (no lifespan da aplicação)."""
+        interval = settings.work_item_poll_interval_seconds
+        if interval <= 0:
+            return
+        job_scheduler.add(
+            JOB_NAME,
+            self.poll_all,
+            next_delay=lambda: interval,
+            initial_delay=INITIAL_DELAY_SECONDS,
+            min_interval=interval / 2,
+        )
+        logger.info(f"Poller do espelho de work items a cada {interval}s")
+
+    async def stop(self) -> None:
+        """Interrompe o loop periódico."""
+        await job_scheduler.remove(JOB_NAME)
+
+
+# Instância única por processo
+work_item_poller = WorkItemPollScheduler()
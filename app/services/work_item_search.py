@@ -0,0 +1,149 @@
+"""
+Busca de work items (typeahead) servida do índice local.
+
+O índice (tabela work_items) é alimentado pelos work items que o backend já
+busca no Azure DevOps (timesheet e a própria busca). O Azure só é consultado
+quando o índice não tem resultados ou quando remote=True.
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.work_item import WorkItem
+from app.repositories.reference_cache import reference_cache
+from app.repositories.work_item import WorkItemRepository
+from app.services.azure import AzureService, get_work_item_icon_data_uri
+from app.utils.project_id_normalizer import is_valid_uuid
+
+logger = logging.getLogger(__name__)
+
+SOURCE_LOCAL = "local"
+SOURCE_AZURE = "azure"
+
+
+class WorkItemSearchService:
+    """Serviço de busca de work items."""
+
+    def __init__(self, db: Session, token: str):
+        self.db = db
+        self.token = token
+        self.repository = WorkItemRepository(db)
+
+    def _project_filters(self, project_id: str | None) -> tuple[list[str], list[str]]:
+        """
+        Converte o parâmetro project_id (UUID ou nome) nos filtros do índice.
+
+        Returns:
+            Tupla (UUIDs, nomes) aceitos para o projeto.
+        """
+        if not project_id:
+            return [], []
+        try:
+            external_id = UUID(project_id)
+        except ValueError:
+            return [], [project_id]
+
+        nomes = [
+            p.nome
+            for p in reference_cache.list_projetos(self.db)
+            if p.external_id == external_id or p.id == external_id
+        ]
+        return [str(external_id)], nomes
+
+    async def _to_result(self, item: WorkItem, icon_token: str) -> dict:
+        icon_url = await get_work_item_icon_data_uri(
+            item.organization_name, icon_token, item.work_item_type or ""
+        )
+        return {
+            "id": item.id,
+            "title": item.title,
+            "type": item.work_item_type or "",
+            "project": item.project_name or item.project_id or "",
+            "url": item.url or "",
+            "iconUrl": icon_url,
+            "originalEstimate": item.original_estimate,
+            "completedWork": item.completed_work,
+            "remainingWork": item.remaining_work,
+            "state": item.state or "",
+        }
+
+    def index_results(self, organization_name: str, results: list[dict], project_id: str | None = None) -> None:
+        """Grava no índice local os work items retornados pela busca no Azure."""
+        project_uuid = project_id if project_id and is_valid_uuid(project_id) else None
+        try:
+            self.repository.upsert_many(
+                organization_name,
+                [
+                    {
+                        "id": r.get("id"),
+                        "title": r.get("title"),
+                        "work_item_type": r.get("type"),
+                        "state": r.get("state"),
+                        "project_id": project_uuid,
+                        "project_name": r.get("project"),
+                        "url": r.get("url"),
+                        "original_estimate": r.get("originalEstimate"),
+                        "completed_work": r.get("completedWork"),
+                        "remaining_work": r.get("remainingWork"),
+                    }
+                    for r in results
+                ],
+            )
+        except SQLAlchemyError as e:
+            # O índice é só uma otimização: a busca não falha por ele
+            self.db.rollback()
+            logger.warning(f"Falha ao indexar work items de {organization_name}: {e}")
+
+    async def search(
+        self,
+        query: str,
+        project_id: str | None,
+        organization_name: str | None,
+        limit: int = 10,
+        usuario_id: str | None = None,
+        remote: bool = False,
+    ) -> tuple[list[dict], str]:
+        """
+        Busca work items no índice local e, se necessário, no Azure DevOps.
+
+        Args:
+            query: Texto ou ID para busca.
+            project_id: UUID ou nome do projeto.
+            organization_name: Organização (padrão: a configurada).
+            limit: Máximo de resultados.
+            usuario_id: Usuário cujos apontamentos recentes priorizam os resultados.
+            remote: Consulta o Azure DevOps mesmo com resultados locais.
+
+        Returns:
+            Tupla (resultados, origem "local" ou "azure").
+        """
+        azure = AzureService(token=self.token, organization_name=organization_name)
+        org_name = azure.organization_name
+
+        if not remote:
+            project_ids, project_names = self._project_filters(project_id)
+            items = self.repository.search(
+                org_name,
+                query,
+                project_ids=project_ids,
+                project_names=project_names,
+                usuario_id=usuario_id,
+                limit=limit,
+            )
+            if items:
+                icon_token = azure._get_pat_for_request(org_name)
+                results = await asyncio.gather(*(self._to_result(i, icon_token) for i in items))
+                return list(results), SOURCE_LOCAL
+
+        results = await azure.search_work_items(
+            query=query,
+            project_id=project_id,
+            organization_name=org_name,
+            limit=limit,
+        )
+        self.index_results(org_name, results, project_id)
+        return results, SOURCE_AZURE
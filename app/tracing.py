@@ -0,0 +1,315 @@
+"""
+Tracing (OpenTelemetry) com exportação local, sem backend hospedado.
+
+TRACING_EXPORTER escolhe o destino dos spans:
+- "" (padrão): desativado; os pontos instrumentados não gravam nada
+- "console": um JSON por span no stdout (ConsoleSpanExporter)
+- "file": JSON Lines no formato OTLP/JSON em TRACING_FILE (um lote de
+  resourceSpans por linha, legível pelo receiver otlpjsonfile do Collector)
+
+Spans gerados:
+- requisição HTTP ("GET /api/v1/timesheet"), pelo TracingMiddleware
+- chamadas httpx ("azure workitems"), em AsyncClient.send
+- comandos SQL ("db SELECT"), por eventos do SQLAlchemy
+- passos dos serviços, pelo decorator @traced("timesheet.work_items_details")
+
+O contexto fica em contextvars, então tasks criadas com asyncio.create_task
+e BackgroundTasks herdam o span da requisição que as agendou.
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+from typing import Any, Callable, Sequence, TypeVar
+
+import httpx
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+settings = get_settings()
+
+SERVICE_NAME = "aponta-api"
+
+# Tamanho máximo do SQL gravado em db.statement
+MAX_STATEMENT_LENGTH = 2000
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_tracer: trace.Tracer = trace.NoOpTracer()
+_provider: TracerProvider | None = None
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Any) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in (attributes or {}).items()]
+
+
+def span_to_otlp(span: ReadableSpan) -> dict[str, Any]:
+    """Converte um span para a codificação JSON do OTLP."""
+    ctx = span.get_span_context()
+    data: dict[str, Any] = {
+        "traceId": format(ctx.trace_id, "032x"),
+        "spanId": format(ctx.span_id, "016x"),
+        "name": span.name,
+        # SpanKind do SDK começa em 0 (INTERNAL); no OTLP INTERNAL é 1
+        "kind": span.kind.value + 1,
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": span.status.status_code.value},
+    }
+    if span.parent is not None:
+        data["parentSpanId"] = format(span.parent.span_id, "016x")
+    if span.status.description:
+        data["status"]["message"] = span.status.description
+    if span.events:
+        data["events"] = [
+            {"timeUnixNano": str(e.timestamp), "name": e.name, "attributes": _otlp_attributes(e.attributes)}
+            for e in span.events
+        ]
+    return data
+
+
+class OtlpJsonFileExporter(SpanExporter):
+    """Grava cada lote de spans como uma linha OTLP/JSON (resourceSpans)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if not spans:
+            return SpanExportResult.SUCCESS
+        resource = spans[0].resource
+        scopes: dict[str, list[dict[str, Any]]] = {}
+        for span in spans:
+            scope = span.instrumentation_scope.name if span.instrumentation_scope else ""
+            scopes.setdefault(scope, []).append(span_to_otlp(span))
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {"attributes": _otlp_attributes(resource.attributes)},
+                        "scopeSpans": [
+                            {"scope": {"name": name}, "spans": items} for name, items in scopes.items()
+                        ],
+                    }
+                ]
+            },
+            separators=(",", ":"),
+        )
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+
+def configure_tracing(exporter: SpanExporter | None = None) -> TracerProvider | None:
+    """
+    Configura o provider conforme TRACING_EXPORTER (ou com o exporter informado).
+
+    Args:
+        exporter: Exporter explícito (ex: em memória, nos testes).
+
+    Returns:
+        O provider configurado ou None se o tracing estiver desativado.
+    """
+    global _tracer, _provider
+
+    if exporter is None:
+        kind = settings.tracing_exporter.lower()
+        if kind == "console":
+            exporter = ConsoleSpanExporter()
+        elif kind == "file":
+            exporter = OtlpJsonFileExporter(settings.tracing_file)
+        else:
+            return None
+
+    shutdown_tracing()
+    _provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    _tracer = _provider.get_tracer("app")
+    return _provider
+
+
+def shutdown_tracing() -> None:
+    """Exporta os spans pendentes e desativa o tracing."""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _provider = None
+    _tracer = trace.NoOpTracer()
+
+
+def tracing_enabled() -> bool:
+    return _provider is not None
+
+
+def get_tracer() -> trace.Tracer:
+    return _tracer
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator que envolve a função (sync ou async) em um span."""
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _tracer.start_as_current_span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _tracer.start_as_current_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def instrument_httpx() -> None:
+    """Cria um span CLIENT para cada requisição de httpx.AsyncClient."""
+    if getattr(httpx.AsyncClient.send, "_aponta_tracing", False):
+        return
+    from app.metrics import azure_labels
+
+    original_send = httpx.AsyncClient.send
+
+    async def send(self, request: httpx.Request, *args, **kwargs) -> httpx.Response:
+        if not tracing_enabled():
+            return await original_send(self, request, *args, **kwargs)
+        labels = azure_labels(request.url)
+        name = f"azure {labels[1]}" if labels else f"http {request.method}"
+        with _tracer.start_as_current_span(name, kind=SpanKind.CLIENT) as span:
+            span.set_attribute("http.method", request.method)
+            span.set_attribute("http.url", str(request.url.copy_with(query=None)))
+            if labels:
+                span.set_attribute("azure.org", labels[0])
+                span.set_attribute("azure.endpoint", labels[1])
+            response = await original_send(self, request, *args, **kwargs)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 400:
+                span.set_status(Status(StatusCode.ERROR))
+            return response
+
+    send._aponta_tracing = True  # type: ignore[attr-defined]
+    send._aponta_metrics = getattr(original_send, "_aponta_metrics", False)  # type: ignore[attr-defined]
+    httpx.AsyncClient.send = send  # type: ignore[method-assign]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not tracing_enabled() or context is None:
+        return
+    operation = statement.lstrip().split(" ", 1)[0].upper()
+    span = _tracer.start_span(f"db {operation}", kind=SpanKind.CLIENT)
+    span.set_attribute("db.system", conn.dialect.name)
+    span.set_attribute("db.statement", statement[:MAX_STATEMENT_LENGTH])
+    context._aponta_span = span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_aponta_span", None)
+    if span is not None:
+        if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+        span.end()
+        context._aponta_span = None
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_aponta_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
+        exception_context.execution_context._aponta_span = None
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Cria um span para cada comando SQL executado pelo engine."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class TracingMiddleware:
+    """Middleware ASGI que abre o span SERVER de cada requisição."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        span = _tracer.start_span(f"{scope['method']} {scope['path']}", kind=SpanKind.SERVER)
+        span.set_attribute("http.method", scope["method"])
+        span.set_attribute("http.target", scope["path"])
+        start = time.perf_counter()
+
+        def finish(status_code: int) -> None:
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                span.update_name(f"{scope['method']} {route}")
+                span.set_attribute("http.route", route)
+            span.set_attribute("http.status_code", status_code)
+            span.set_attribute("http.duration_ms", round((time.perf_counter() - start) * 1000, 3))
+            if status_code >= 500:
+                span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            # Encerra ao enviar o corpo: BackgroundTasks seguem como filhos do span
+            if message["type"] == "http.response.body" and not message.get("more_body") and span.is_recording():
+                finish(status_code)
+
+        token = otel_context.attach(trace.set_span_in_context(span))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            otel_context.detach(token)
+            if span.is_recording():
+                finish(status_code)
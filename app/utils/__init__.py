@@ -3,13 +3,22 @@ Utilitários diversos do backend.
 """
 
 from app.utils.project_id_normalizer import (
+    invalidate_project_id_cache,
     is_valid_uuid,
     normalize_project_id,
     validate_project_id_format,
 )
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_predicate
+from app.utils.schema_cache import refresh_schema_cache, table_exists
 
 __all__ = [
+    "decode_cursor",
+    "encode_cursor",
+    "keyset_predicate",
+    "invalidate_project_id_cache",
     "is_valid_uuid",
     "normalize_project_id",
+    "refresh_schema_cache",
+    "table_exists",
     "validate_project_id_format",
 ]
@@ -0,0 +1,56 @@
+"""
+Redirecionamento das chamadas ao Azure DevOps para um servidor local.
+
+Usado nos testes de carga (loadtest/fake_azure.py): com
+AZURE_DEVOPS_REDIRECT_URL=http://127.0.0.1:9000, toda requisição para
+dev.azure.com, *.dev.azure.com ou *.visualstudio.com sai para esse endereço
+com o mesmo path e query. O header Host original é mantido.
+
+A troca acontece no transporte de rede do httpx (abaixo de
+AsyncClient.send), então métricas e spans continuam com a URL do Azure.
+Ignorado em produção.
+"""
+
+import logging
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def is_azure_host(host: str) -> bool:
+    host = host.lower()
+    return host == "dev.azure.com" or host.endswith(".dev.azure.com") or host.endswith(".visualstudio.com")
+
+
+def install_azure_redirect() -> bool:
+    """
+    Ativa o redirecionamento se AZURE_DEVOPS_REDIRECT_URL estiver definido.
+
+    Returns:
+        True se o redirecionamento foi ativado.
+    """
+    target = settings.azure_devops_redirect_url
+    if not target:
+        return False
+    if settings.environment.lower() == "production":
+        logger.warning("AZURE_DEVOPS_REDIRECT_URL ignorado em produção")
+        return False
+    if getattr(httpx.AsyncHTTPTransport.handle_async_request, "_aponta_redirect", False):
+        return True
+
+    base = httpx.URL(target)
+    original = httpx.AsyncHTTPTransport.handle_async_request
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if is_azure_host(request.url.host):
+            request.url = request.url.copy_with(scheme=base.scheme, host=base.host, port=base.port)
+        return await original(self, request)
+
+    handle_async_request._aponta_redirect = True  # type: ignore[attr-defined]
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request  # type: ignore[method-assign]
+    logger.warning(f"Chamadas ao Azure DevOps redirecionadas para {target}")
+    return True
@@ -0,0 +1,39 @@
+"""
+Registro dos caches em memória do processo, lido pelas métricas (/metrics).
+
+Cada cache registra uma função que devolve os contadores acumulados
+(hits, misses); os valores são lidos apenas no momento da coleta.
+"""
+
+from typing import Callable
+
+_REGISTRY: dict[str, Callable[[], tuple[int, int]]] = {}
+
+
+class HitCounter:
+    """Contadores de acerto para caches baseados em dict."""
+
+    __slots__ = ("hits", "misses")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def __call__(self) -> tuple[int, int]:
+        return self.hits, self.misses
+
+
+def register_cache(name: str, counters: Callable[[], tuple[int, int]]) -> None:
+    """Registra (ou substitui) os contadores de um cache pelo nome."""
+    _REGISTRY[name] = counters
+
+
+def cache_counters() -> dict[str, tuple[int, int]]:
+    """Contadores (hits, misses) de todos os caches registrados."""
+    return {name: counters() for name, counters in sorted(_REGISTRY.items())}
@@ -0,0 +1,27 @@
+"""
+Utilitários para respostas condicionais (ETag / If-None-Match).
+"""
+
+from fastapi import Request, Response, status
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Verifica se o cliente já possui a representação com o ETag informado.
+
+    Aceita listas separadas por vírgula, `*` e ETags fracos (W/"...").
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Resposta 304 com o ETag atual."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,83 @@
+"""
+Utilitários para paginação por cursor (keyset pagination).
+
+O cursor é um token opaco (JSON em base64 url-safe) com os valores da
+chave de ordenação do último registro da página. A próxima página é
+obtida com `WHERE (chave) < (valores do cursor)`, sem OFFSET.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Sequence
+from uuid import UUID
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def _to_json_value(value: Any) -> Any:
+    """Converte um valor da chave de ordenação para tipo serializável."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Gera um cursor opaco a partir dos valores da chave de ordenação.
+
+    Args:
+        values: Valores da chave (ex: data_apontamento, criado_em, id).
+
+    Returns:
+        Token base64 url-safe (sem padding).
+    """
+    payload = json.dumps([_to_json_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[Any], Any]]) -> list[Any]:
+    """
+    Decodifica um cursor gerado por encode_cursor().
+
+    Args:
+        cursor: Token recebido do cliente.
+        parsers: Conversores para cada posição da chave
+            (ex: [date.fromisoformat, datetime.fromisoformat, UUID]).
+
+    Returns:
+        Lista com os valores da chave já convertidos.
+
+    Raises:
+        ValueError: Se o cursor for inválido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("tamanho inesperado")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor de paginação inválido: {cursor}") from e
+
+
+def keyset_predicate(
+    columns: Sequence[ColumnElement], values: Sequence[Any], descending: bool = True
+) -> ColumnElement:
+    """
+    Monta o filtro `(col1, col2, ...) < (v1, v2, ...)` da página seguinte.
+
+    Os valores são vinculados com o tipo de cada coluna, para que a
+    comparação seja feita no mesmo formato armazenado (ex: GUID, DateTime).
+
+    Args:
+        columns: Colunas da chave de ordenação.
+        values: Valores decodificados do cursor.
+        descending: True para ordenação decrescente (usa `<`), False para `>`.
+    """
+    left = tuple_(*columns)
+    right = tuple_(*[literal(value, column.type) for column, value in zip(columns, values)])
+    return left < right if descending else left > right
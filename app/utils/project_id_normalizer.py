@@ -6,10 +6,32 @@ convertendo automaticamente para UUID quando necessário.
 """
 
 import re
+import threading
 from uuid import UUID
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from app.utils.cache_stats import HitCounter, register_cache
+
+
+# Cache em memória (por processo) da resolução nome -> UUID dos projetos.
+# Chave: nome do projeto em maiúsculas. Invalidado após a sincronização de projetos.
+_PROJECT_UUID_CACHE: dict[str, str] = {}
+_PROJECT_UUID_CACHE_LOCK = threading.Lock()
+_PROJECT_UUID_CACHE_COUNTER = HitCounter()
+register_cache("projeto_uuid", _PROJECT_UUID_CACHE_COUNTER)
+
+
+def invalidate_project_id_cache() -> None:
+    """
+    Limpa o cache de resolução nome -> UUID de projetos.
+
+    Deve ser chamado sempre que a tabela projetos for alterada
+    (ex: ao final de ProjetoService.sync_projects).
+    """
+    with _PROJECT_UUID_CACHE_LOCK:
+        _PROJECT_UUID_CACHE.clear()
+
 
 def is_valid_uuid(value: str) -> bool:
     """
@@ -37,6 +59,7 @@ def normalize_project_id(project_id: str, db: Session) -> str:
     Durante a transição, aceita:
     - UUID válido: retorna como está
     - Nome do projeto: busca o UUID correspondente na tabela projetos
+      (resultado mantido em cache até a próxima sincronização de projetos)
     
     Args:
         project_id: ID do projeto (UUID ou nome)
@@ -59,7 +82,14 @@ def normalize_project_id(project_id: str, db: Session) -> str:
     if not project_name:
         raise ValueError("project_id não pode ser vazio")
     
+    cache_key = project_name.upper()
+    cached = _PROJECT_UUID_CACHE.get(cache_key)
+    _PROJECT_UUID_CACHE_COUNTER.record(cached is not None)
+    if cached:
+        return cached
+    
     # Busca o UUID do projeto pelo nome (case-insensitive)
+    # Usa o índice funcional ix_projetos_nome_upper
     result = db.execute(
         text("""
             SELECT CAST(external_id AS TEXT)
@@ -79,7 +109,10 @@ def normalize_project_id(project_id: str, db: Session) -> str:
             f"ou verifique se o projeto existe na tabela 'projetos'."
         )
     
-    project_uuid = row[0]
+    project_uuid = str(row[0])
+    
+    with _PROJECT_UUID_CACHE_LOCK:
+        _PROJECT_UUID_CACHE[cache_key] = project_uuid
     
     return project_uuid
 
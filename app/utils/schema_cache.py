@@ -0,0 +1,89 @@
+"""
+Cache de introspecção do schema do banco de dados.
+
+A existência das tabelas é consultada no catálogo uma única vez por
+processo (no startup) e reaproveitada pelos repositories, em vez de rodar
+`inspect(...).get_table_names()` a cada request. Após aplicar migrações com
+o processo em execução, chame refresh_schema_cache().
+"""
+
+import logging
+import threading
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.utils.cache_stats import HitCounter, register_cache
+
+logger = logging.getLogger(__name__)
+
+# (URL do engine, schema) -> nomes das tabelas existentes
+_TABLE_NAMES_CACHE: dict[tuple[str, str | None], frozenset[str]] = {}
+_TABLE_NAMES_CACHE_LOCK = threading.Lock()
+_TABLE_NAMES_COUNTER = HitCounter()
+register_cache("schema", _TABLE_NAMES_COUNTER)
+
+
+def _engine_of(bind: Engine | Connection) -> Engine:
+    return bind.engine if isinstance(bind, Connection) else bind
+
+
+def get_table_names(bind: Engine | Connection, schema: str | None) -> frozenset[str]:
+    """
+    Retorna os nomes das tabelas do schema, consultando o catálogo apenas
+    na primeira chamada.
+
+    Args:
+        bind: Engine ou conexão (ex: session.get_bind()).
+        schema: Schema consultado (None para o padrão).
+
+    Returns:
+        Conjunto com os nomes das tabelas existentes.
+    """
+    engine = _engine_of(bind)
+    key = (str(engine.url), schema)
+
+    cached = _TABLE_NAMES_CACHE.get(key)
+    _TABLE_NAMES_COUNTER.record(cached is not None)
+    if cached is not None:
+        return cached
+
+    with _TABLE_NAMES_CACHE_LOCK:
+        cached = _TABLE_NAMES_CACHE.get(key)
+        if cached is None:
+            cached = frozenset(inspect(bind).get_table_names(schema=schema))
+            _TABLE_NAMES_CACHE[key] = cached
+            logger.debug(f"Schema '{schema}' introspectado: {len(cached)} tabela(s)")
+        return cached
+
+
+def table_exists(bind: Engine | Connection, table_name: str, schema: str | None) -> bool:
+    """Verifica (via cache) se uma tabela existe no schema."""
+    return table_name in get_table_names(bind, schema)
+
+
+def refresh_schema_cache(bind: Engine | Connection | None = None, schema: str | None = None) -> None:
+    """
+    Descarta o cache de introspecção.
+
+    Sem argumentos limpa tudo. Com `bind`, recarrega imediatamente o schema
+    informado (útil após aplicar migrações com o processo em execução).
+    """
+    with _TABLE_NAMES_CACHE_LOCK:
+        _TABLE_NAMES_CACHE.clear()
+
+    if bind is not None:
+        get_table_names(bind, schema)
+
+
+def warm_schema_cache(bind: Engine | Connection, schema: str | None) -> None:
+    """
+    Carrega o cache no startup. Falhas de conexão não impedem a subida da
+    aplicação: a introspecção será feita na primeira consulta.
+    """
+    try:
+        tables = get_table_names(bind, schema)
+        logger.info(f"Cache de schema carregado: {len(tables)} tabela(s) em '{schema}'")
+    except SQLAlchemyError as exc:
+        logger.warning(f"Não foi possível carregar o cache de schema: {exc}")
@@ -0,0 +1,55 @@
+"""
+INSERT ... ON CONFLICT DO UPDATE/DO NOTHING portável entre PostgreSQL e SQLite
+(testes).
+"""
+
+from typing import Any, Iterable
+
+from sqlalchemy import Table, func
+from sqlalchemy.engine import Connection, Engine
+
+
+def build_upsert(
+    bind: Engine | Connection,
+    table: Table,
+    rows: list[dict],
+    conflict_columns: Iterable[str],
+    update_columns: Iterable[str] = (),
+    extra_set: dict[str, Any] | None = None,
+    coalesce_columns: Iterable[str] = (),
+):
+    """
+    Monta um INSERT de várias linhas com ON CONFLICT (...) DO UPDATE, ou
+    DO NOTHING quando não há colunas a atualizar.
+
+    Args:
+        bind: Engine/conexão (define o dialeto).
+        table: Tabela de destino.
+        rows: Linhas a inserir.
+        conflict_columns: Colunas da constraint única usada no conflito.
+        update_columns: Colunas copiadas da linha nova (EXCLUDED) no conflito.
+        extra_set: Valores adicionais do SET (ex: {"updated_at": func.now()}).
+        coalesce_columns: Colunas atualizadas apenas quando o valor novo não é
+            nulo (fontes que não conhecem o campo não apagam o valor gravado).
+
+    Raises:
+        NotImplementedError: Para dialetos sem suporte a ON CONFLICT.
+    """
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert não suportado para o dialeto {dialect}")
+
+    stmt = insert(table).values(rows)
+    index_elements = [table.c[c] for c in conflict_columns]
+    set_ = {
+        **{c: stmt.excluded[c] for c in update_columns},
+        **{c: func.coalesce(stmt.excluded[c], table.c[c]) for c in coalesce_columns},
+        **(extra_set or {}),
+    }
+    if not set_:
+        return stmt.on_conflict_do_nothing(index_elements=index_elements)
+    return stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
@@ -0,0 +1,106 @@
+"""
+Dados sintéticos e determinísticos para os benchmarks do timesheet.
+
+A árvore segue a proporção típica de um projeto (1% Epics, 4% Features,
+20% User Stories, 75% Tasks) e cada Task recebe apontamentos em todos os
+dias úteis da semana (mapa denso).
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+from uuid import UUID
+
+from app.repositories.timesheet_cache import ApontamentoSemana
+
+SEED = 42
+WEEK_START = date(2026, 1, 19)
+WEEK_DATES = [WEEK_START + timedelta(days=i) for i in range(7)]
+TODAY = WEEK_START + timedelta(days=2)
+
+# (tipo, fração da árvore, tipo do pai)
+LEVELS = (
+    ("Epic", 0.01, None),
+    ("Feature", 0.04, "Epic"),
+    ("User Story", 0.20, "Feature"),
+    ("Task", 0.75, "User Story"),
+)
+STATES = ("New", "Active", "Resolved", "Closed")
+ATIVIDADES = ("Desenvolvimento", "Reunião", "Revisão de código", "Testes")
+
+
+@dataclass
+class TimesheetData:
+    work_items: list[dict[str, Any]]
+    apontamentos_map: dict[int, dict[date, list[ApontamentoSemana]]]
+    duracoes: list[str]
+
+
+def _uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def build_data(size: int, seed: int = SEED) -> TimesheetData:
+    """
+    Gera work items e apontamentos para uma árvore de size nós.
+
+    Args:
+        size: Quantidade total de work items.
+        seed: Semente do gerador (mesma semente, mesmos dados).
+
+    Returns:
+        TimesheetData com os work items no formato de _get_work_items_hierarchy.
+    """
+    rng = random.Random(seed)
+    atividades = [(_uuid(rng), nome) for nome in ATIVIDADES]
+    work_items: list[dict[str, Any]] = []
+    ids_by_type: dict[str, list[int]] = {}
+    next_id = 1000
+
+    for wi_type, fraction, parent_type in LEVELS:
+        count = max(1, round(size * fraction))
+        ids = ids_by_type.setdefault(wi_type, [])
+        for _ in range(count):
+            state = rng.choice(STATES)
+            parent_ids = ids_by_type.get(parent_type) if parent_type else None
+            work_items.append(
+                {
+                    "id": next_id,
+                    "title": f"{wi_type} {next_id}",
+                    "type": wi_type,
+                    "state": state,
+                    "state_category": "Completed" if state == "Closed" else "InProgress",
+                    "icon_url": "",
+                    "assigned_to": f"usuario{rng.randint(1, 20)}@sefaz.ce.gov.br",
+                    "original_estimate": float(rng.randint(1, 40)),
+                    "completed_work": float(rng.randint(0, 40)),
+                    "remaining_work": float(rng.randint(0, 40)),
+                    "parent_id": rng.choice(parent_ids) if parent_ids else None,
+                }
+            )
+            ids.append(next_id)
+            next_id += 1
+
+    apontamentos_map: dict[int, dict[date, list[ApontamentoSemana]]] = {}
+    duracoes: list[str] = []
+    for task_id in ids_by_type["Task"]:
+        dias = apontamentos_map.setdefault(task_id, {})
+        for dt in WEEK_DATES[:5]:
+            for _ in range(rng.randint(1, 3)):
+                duracao = f"{rng.randint(0, 4):02d}:{rng.choice((0, 15, 30, 45)):02d}"
+                id_atividade, atividade_nome = rng.choice(atividades)
+                dias.setdefault(dt, []).append(
+                    ApontamentoSemana(
+                        id=_uuid(rng),
+                        work_item_id=task_id,
+                        data_apontamento=dt,
+                        duracao=duracao,
+                        id_atividade=id_atividade,
+                        atividade_nome=atividade_nome,
+                        comentario=None,
+                    )
+                )
+                duracoes.append(duracao)
+
+    return TimesheetData(work_items, apontamentos_map, duracoes[:size])
@@ -0,0 +1,255 @@
+"""
+Micro-benchmarks dos trechos puros do timesheet.
+
+Uso:
+    python -m benchmarks.run                          # todos os casos, saída em stdout
+    python -m benchmarks.run --output atual.json      # grava o resultado em JSON
+    python -m benchmarks.run --compare baseline.json  # compara com um resultado anterior
+    python -m benchmarks.run --sizes 100 1000 --filter hierarchy
+
+Cada caso roda --repeats vezes com o GC desligado (como o timeit); casos
+rápidos repetem a chamada até cada medição somar ~50 ms. O tempo reportado
+é por execução (min, mediana e desvio). O pico de memória vem de uma
+execução separada com tracemalloc, para não distorcer os tempos.
+
+Na comparação, casos cujo tempo mínimo (o estimador menos sensível a ruído
+da máquina) piorou mais que --threshold (padrão 10%) são marcados como
+regressão e o processo termina com código 1.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cache
+from typing import Any, Callable
+
+from app.repositories.apontamento import duracao_to_decimal, format_duracao, parse_duracao
+from app.schemas.timesheet import TimesheetResponse
+from app.services.timesheet_service import TimesheetService
+from benchmarks.data import TODAY, WEEK_DATES, build_data
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_REPEATS = 7
+DEFAULT_THRESHOLD = 0.10
+
+# Duração mínima de cada medição (casos com fresh_args=False)
+MIN_SAMPLE_SECONDS = 0.05
+
+
+@dataclass
+class Case:
+    """
+    Um benchmark: setup (fora da medição) devolve os argumentos de func.
+
+    fresh_args indica que func altera os argumentos, então cada chamada
+    medida recebe um setup novo.
+    """
+
+    name: str
+    setup: Callable[[], tuple]
+    func: Callable[..., Any]
+    fresh_args: bool = False
+
+
+def build_cases(sizes: list[int]) -> list[Case]:
+    """Casos de benchmark para cada tamanho de árvore."""
+    # Os métodos medidos não acessam o banco
+    service = TimesheetService(db=None)  # type: ignore[arg-type]
+    cases: list[Case] = []
+
+    for size in sizes:
+        data = build_data(size)
+
+        def build_items(data=data):
+            return [
+                service._build_work_item_timesheet(wi, WEEK_DATES, data.apontamentos_map, TODAY)
+                for wi in data.work_items
+            ]
+
+        @cache
+        def built_items(build_items=build_items):
+            return build_items()
+
+        def fresh_items(built_items=built_items):
+            return [item.model_copy(update={"children": []}) for item in built_items()]
+
+        @cache
+        def build_response(data=data, fresh_items=fresh_items):
+            items = fresh_items()
+            return {
+                "semana_inicio": WEEK_DATES[0],
+                "semana_fim": WEEK_DATES[-1],
+                "semana_label": "19/01 - 25/01",
+                "work_items": service._build_hierarchy(items),
+                "types": {},
+                "totais_por_dia": service._build_totais_por_dia(WEEK_DATES, data.apontamentos_map, TODAY),
+                "total_work_items": len(items),
+            }
+
+        cases += [
+            Case(f"build_work_item_timesheet[{size}]", lambda: (), build_items),
+            # _build_hierarchy preenche children, então cada chamada recebe itens novos
+            Case(
+                f"build_hierarchy[{size}]",
+                lambda fresh_items=fresh_items: (fresh_items(),),
+                service._build_hierarchy,
+                fresh_args=True,
+            ),
+            Case(
+                f"totais_por_dia[{size}]",
+                lambda data=data: (WEEK_DATES, data.apontamentos_map, TODAY),
+                service._build_totais_por_dia,
+            ),
+            Case(
+                f"timesheet_response.init[{size}]",
+                lambda build_response=build_response: (build_response(),),
+                lambda kwargs: TimesheetResponse(**kwargs),
+            ),
+            Case(
+                f"timesheet_response.dump_json[{size}]",
+                lambda build_response=build_response: (TimesheetResponse(**build_response()),),
+                lambda response: response.model_dump_json(),
+            ),
+        ]
+
+    duracoes = build_data(max(sizes)).duracoes
+    minutos = [h * 60 + m for h, m in map(parse_duracao, duracoes)]
+    cases += [
+        Case(f"parse_duracao[{len(duracoes)}]", lambda: (duracoes,), lambda ds: [parse_duracao(d) for d in ds]),
+        Case(
+            f"duracao_to_decimal[{len(duracoes)}]",
+            lambda: (duracoes,),
+            lambda ds: [duracao_to_decimal(d) for d in ds],
+        ),
+        Case(f"format_duracao[{len(minutos)}]", lambda: (minutos,), lambda ms: [format_duracao(m) for m in ms]),
+    ]
+    return cases
+
+
+def measure(case: Case, repeats: int) -> dict[str, Any]:
+    """Executa um caso e devolve tempos (ms por execução) e pico de memória."""
+    times: list[float] = []
+    args = case.setup()
+    start = time.perf_counter()
+    case.func(*args)  # aquecimento e calibração
+    elapsed = time.perf_counter() - start
+    number = 1 if case.fresh_args else max(1, int(MIN_SAMPLE_SECONDS / max(elapsed, 1e-9)))
+
+    for _ in range(repeats):
+        args = case.setup()
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(number):
+                case.func(*args)
+            times.append((time.perf_counter() - start) / number * 1000)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    args = case.setup()
+    tracemalloc.start()
+    try:
+        case.func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeats": repeats,
+        "number": number,
+        "min_ms": round(min(times), 4),
+        "median_ms": round(statistics.median(times), 4),
+        "stdev_ms": round(statistics.stdev(times), 4) if len(times) > 1 else 0.0,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(sizes: list[int], repeats: int = DEFAULT_REPEATS, name_filter: str | None = None) -> dict[str, Any]:
+    """Executa os casos selecionados e devolve o resultado no formato JSON."""
+    results: dict[str, Any] = {}
+    for case in build_cases(sizes):
+        if name_filter and name_filter not in case.name:
+            continue
+        results[case.name] = measure(case, repeats)
+        print(f"{case.name:<45} {results[case.name]['median_ms']:>12.3f} ms", file=sys.stderr)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> list[dict[str, Any]]:
+    """
+    Compara os tempos mínimos com um resultado anterior.
+
+    Returns:
+        Uma linha por caso presente nos dois resultados, com a variação
+        relativa (change) e se ela passa do limite (regression).
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base["min_ms"]:
+            continue
+        change = result["min_ms"] / base["min_ms"] - 1
+        rows.append(
+            {
+                "name": name,
+                "baseline_ms": base["min_ms"],
+                "current_ms": result["min_ms"],
+                "change": round(change, 4),
+                "peak_change_kib": round(result["peak_kib"] - base["peak_kib"], 1),
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--filter", dest="name_filter")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", help="Resultado anterior (JSON) usado como baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.repeats, args.name_filter)
+    payload = json.dumps(current, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    elif not args.compare:
+        print(payload)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, encoding="utf-8") as f:
+        rows = compare(current, json.load(f), args.threshold)
+    for row in rows:
+        flag = "REGRESSÃO" if row["regression"] else ""
+        print(
+            f"{row['name']:<45} {row['baseline_ms']:>10.3f} -> {row['current_ms']:>10.3f} ms "
+            f"{row['change']:>+8.1%} {row['peak_change_kib']:>+10.1f} KiB {flag}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Gerador de carga para a API (timesheet, CRUD de apontamentos e busca).
+
+Uso:
+    python -m loadtest.driver --base-url http://127.0.0.1:8000 --rps 50 --duration 60 \\
+        --organization loadtest --project DEV --mix timesheet=5,crud=2,search=3
+
+A carga é em malha aberta: as requisições partem no ritmo de --rps
+independentemente das respostas, e a latência é medida a partir do horário
+planejado (atrasos do próprio gerador entram na medição, evitando a
+"omissão coordenada"). Acima de --max-in-flight requisições pendentes, as
+novas são descartadas e contadas em "descartadas".
+
+Cenários:
+- timesheet: GET /api/v1/timesheet da semana atual (com --iteration-id, da sprint)
+- crud: POST, PUT e DELETE de um apontamento (medidos separadamente)
+- search: GET /api/v1/work-items/search com termos variados
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any
+
+import httpx
+
+DEFAULT_MIX = {"timesheet": 5, "crud": 2, "search": 3}
+SEARCH_TERMS = ("Task", "Cadastro", "Relatório", "Integração", "Ajuste", "Story", "1200", "1300")
+
+
+@dataclass
+class DriverOptions:
+    base_url: str
+    organization: str
+    project: str
+    rps: float = 10.0
+    duration: float = 30.0
+    mix: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    iteration_id: str | None = None
+    work_item_ids: list[int] = field(default_factory=lambda: list(range(1200, 1500)))
+    atividade_id: str | None = None
+    token: str | None = None
+    max_in_flight: int = 500
+    timeout: float = 30.0
+    seed: int = 42
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Percentil com interpolação linear (values já ordenados)."""
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+class Recorder:
+    """Latências e status por operação."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.dropped = 0
+
+    def record(self, operation: str, latency: float, status: int | str) -> None:
+        self.latencies[operation].append(latency)
+        self.statuses[operation][str(status)] += 1
+
+    def report(self, elapsed: float, options: DriverOptions) -> dict[str, Any]:
+        operations = {}
+        total = 0
+        for operation in sorted(self.latencies):
+            values = sorted(self.latencies[operation])
+            statuses = dict(self.statuses[operation])
+            errors = sum(n for status, n in statuses.items() if not status.isdigit() or int(status) >= 400)
+            total += len(values)
+            operations[operation] = {
+                "count": len(values),
+                "errors": errors,
+                "status": statuses,
+                "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+            }
+        return {
+            "target_rps": options.rps,
+            "duration_s": round(elapsed, 2),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "descartadas": self.dropped,
+            "operations": operations,
+        }
+
+
+class LoadDriver:
+    """Dispara os cenários em malha aberta e registra as latências."""
+
+    def __init__(self, options: DriverOptions, transport: httpx.AsyncBaseTransport | None = None):
+        self.options = options
+        self.transport = transport
+        self.recorder = Recorder()
+        self.rng = random.Random(options.seed)
+        self.week_start = date.today() - timedelta(days=date.today().weekday())
+
+    def _client(self) -> httpx.AsyncClient:
+        headers = {"Authorization": f"Bearer {self.options.token}"} if self.options.token else {}
+        limits = httpx.Limits(max_connections=self.options.max_in_flight)
+        return httpx.AsyncClient(
+            base_url=self.options.base_url,
+            headers=headers,
+            timeout=self.options.timeout,
+            limits=limits,
+            transport=self.transport,
+        )
+
+    async def _call(self, client: httpx.AsyncClient, operation: str, scheduled: float, method: str, url: str, **kwargs):
+        try:
+            response = await client.request(method, url, **kwargs)
+            status: int | str = response.status_code
+        except httpx.HTTPError as exc:
+            response, status = None, type(exc).__name__
+        self.recorder.record(operation, time.perf_counter() - scheduled, status)
+        return response
+
+    async def prepare(self, client: httpx.AsyncClient) -> None:
+        """Escolhe uma atividade para o cenário de CRUD (se não informada)."""
+        if self.options.atividade_id or not self.options.mix.get("crud"):
+            return
+        response = await client.get("/api/v1/atividades")
+        response.raise_for_status()
+        items = [item for item in response.json().get("items", []) if item.get("ativo", True)]
+        if not items:
+            raise SystemExit("Nenhuma atividade ativa: informe --atividade-id ou desative o cenário crud")
+        self.options.atividade_id = items[0]["id"]
+
+    async def timesheet(self, client: httpx.AsyncClient, scheduled: float) -> None:
+        params = {
+            "organization_name": self.options.organization,
+            "project_id": self.options.project,
+            "week_start": self.week_start.isoformat(),
+        }
+        if self.options.iteration_id:
+            params["iteration_id"] = self.options.iteration_id
+        await self._call(client, "timesheet", scheduled, "GET", "/api/v1/timesheet", params=params)
+
+    async def search(self, client: httpx.AsyncClient, scheduled: float) -> None:
+        params = {
+            "query": self.rng.choice(SEARCH_TERMS),
+            "organization_name": self.options.organization,
+            "project_id": self.options.project,
+        }
+        await self._call(client, "search", scheduled, "GET", "/api/v1/work-items/search", params=params)
+
+    async def crud(self, client: httpx.AsyncClient, scheduled: float) -> None:
+        usuario = self.rng.randint(1, 50)
+        body = {
+            "work_item_id": self.rng.choice(self.options.work_item_ids),
+            "project_id": self.options.project,
+            "organization_name": self.options.organization,
+            "data_apontamento": (self.week_start + timedelta(days=self.rng.randint(0, 4))).isoformat(),
+            "duracao": "01:00",
+            "id_atividade": self.options.atividade_id,
+            "usuario_id": f"carga-{usuario}",
+            "usuario_nome": f"Usuário de carga {usuario}",
+        }
+        response = await self._call(client, "apontamento.create", scheduled, "POST", "/api/v1/apontamentos", json=body)
+        if response is None or response.status_code != 201:
+            return
+        apontamento_id = response.json()["id"]
+        await self._call(
+            client,
+            "apontamento.update",
+            time.perf_counter(),
+            "PUT",
+            f"/api/v1/apontamentos/{apontamento_id}",
+            json={"duracao": "02:30"},
+        )
+        await self._call(
+            client, "apontamento.delete", time.perf_counter(), "DELETE", f"/api/v1/apontamentos/{apontamento_id}"
+        )
+
+    async def run(self) -> dict[str, Any]:
+        """Executa a carga e devolve o relatório."""
+        scenarios = [name for name, weight in self.options.mix.items() for _ in range(weight)]
+        interval = 1 / self.options.rps
+        pending: set[asyncio.Task] = set()
+
+        async with self._client() as client:
+            await self.prepare(client)
+            start = time.perf_counter()
+            n = 0
+            while (scheduled := start + n * interval) < start + self.options.duration:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                n += 1
+                if len(pending) >= self.options.max_in_flight:
+                    self.recorder.dropped += 1
+                    continue
+                scenario = getattr(self, self.rng.choice(scenarios))
+                task = asyncio.create_task(scenario(client, scheduled))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+            elapsed = time.perf_counter() - start
+
+        return self.recorder.report(elapsed, self.options)
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Converte "timesheet=5,crud=2" em pesos por cenário."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Cenário desconhecido: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def parse_ids(value: str) -> list[int]:
+    """Converte "1200-1499" ou "1201,1202" em lista de IDs."""
+    if "-" in value:
+        first, last = value.split("-", 1)
+        return list(range(int(first), int(last) + 1))
+    return [int(i) for i in value.split(",")]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--organization", default="loadtest")
+    parser.add_argument("--project", default="DEV")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX))
+    parser.add_argument("--iteration-id")
+    parser.add_argument("--work-item-ids", type=parse_ids, default=list(range(1200, 1500)))
+    parser.add_argument("--atividade-id")
+    parser.add_argument("--token", help="Token enviado como Bearer (com AUTH_ENABLED=true)")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--output", help="Arquivo JSON do relatório (além do stdout)")
+    args = parser.parse_args(argv)
+
+    options = DriverOptions(
+        base_url=args.base_url,
+        organization=args.organization,
+        project=args.project,
+        rps=args.rps,
+        duration=args.duration,
+        mix=args.mix,
+        iteration_id=args.iteration_id,
+        work_item_ids=args.work_item_ids,
+        atividade_id=args.atividade_id,
+        token=args.token,
+        max_in_flight=args.max_in_flight,
+    )
+    report = asyncio.run(LoadDriver(options).run())
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    print(payload)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
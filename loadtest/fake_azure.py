@@ -0,0 +1,545 @@
+"""
+Azure DevOps simulado para testes de carga locais.
+
+Implementa as APIs chamadas pelo backend (WIQL, workitems, workitemsbatch,
+iterations, classificationnodes, revisions, reporting, projects/teams,
+profile/connectionData e ícones) sobre dados sintéticos e determinísticos,
+gerados sob demanda para cada organização/projeto.
+
+Uso:
+    python -m loadtest.fake_azure --port 9000 --latency-ms 80 --throttle-rate 0.02
+
+    # no backend
+    AZURE_DEVOPS_REDIRECT_URL=http://127.0.0.1:9000 uvicorn app.main:app
+
+Injeção de falhas (também via FAKE_AZURE_* ou PUT /_fake/config em execução):
+- latency_ms / jitter_ms: atraso de cada resposta (média e variação)
+- error_rate: fração de respostas 503
+- throttle_rate: fração de respostas 429 com Retry-After
+
+GET /_fake/stats mostra as chamadas recebidas por família de endpoint e status.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+from uuid import NAMESPACE_URL, uuid5
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.metrics import azure_labels
+
+# (tipo, fração dos work items, tipo do pai)
+LEVELS = (
+    ("Epic", 0.02, None),
+    ("Feature", 0.08, "Epic"),
+    ("User Story", 0.30, "Feature"),
+    ("Task", 0.60, "User Story"),
+)
+STATES = {
+    "Epic": ("New", "Active", "Closed"),
+    "Feature": ("New", "Active", "Closed"),
+    "User Story": ("New", "Active", "Resolved", "Closed"),
+    "Task": ("New", "Active", "Closed"),
+}
+SPRINTS = 6
+SPRINT_DAYS = 14
+USERS = 10
+TEAMS = ("Time A", "Time B")
+PROJECTS = ("DEV", "Sustentação", "Projetos Especiais")
+BATCH_LIMIT = 200
+ICON_SVG = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 16 16"><rect fill="#{color}" width="16" height="16"/></svg>'
+HIERARCHY_FORWARD = "System.LinkTypes.Hierarchy-Forward"
+
+
+@dataclass
+class FakeAzureConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    work_items: int = 500
+    seed: int = 42
+
+    @classmethod
+    def from_env(cls) -> "FakeAzureConfig":
+        config = cls()
+        for name, value in asdict(config).items():
+            env = os.environ.get(f"FAKE_AZURE_{name.upper()}")
+            if env is not None:
+                setattr(config, name, type(value)(env))
+        return config
+
+
+def _uid(*parts: Any) -> str:
+    return str(uuid5(NAMESPACE_URL, "/".join(str(p) for p in parts)))
+
+
+def _iso(dt: date) -> str:
+    return datetime.combine(dt, time.min, tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _user(org: str, n: int) -> dict[str, str]:
+    return {
+        "id": _uid(org, "user", n),
+        "displayName": f"Usuário {n}",
+        "uniqueName": f"usuario{n}@example.com",
+    }
+
+
+@dataclass
+class FakeProject:
+    """Work items, iterations e revisões de um projeto simulado."""
+
+    org: str
+    name: str
+    iterations: list[dict[str, Any]]
+    items: dict[int, dict[str, Any]]
+    revisions: dict[int, list[dict[str, Any]]] = field(default_factory=dict)
+    sequence: int = 0
+    changes: dict[int, int] = field(default_factory=dict)
+
+    def touch(self, work_item_id: int) -> None:
+        self.sequence += 1
+        self.changes[work_item_id] = self.sequence
+        self.revisions.setdefault(work_item_id, []).append(
+            {"id": work_item_id, "rev": self.items[work_item_id]["rev"], "fields": dict(self.items[work_item_id]["fields"])}
+        )
+
+
+def build_project(org: str, project: str, config: FakeAzureConfig) -> FakeProject:
+    """Gera os dados de um projeto (mesma org/projeto/semente, mesmos dados)."""
+    rng = random.Random(config.seed ^ zlib.crc32(f"{org}/{project}".encode()))
+    monday = date.today() - timedelta(days=date.today().weekday())
+    iterations = []
+    for n in range(SPRINTS):
+        start = monday + timedelta(days=SPRINT_DAYS * (n - SPRINTS // 2))
+        finish = start + timedelta(days=SPRINT_DAYS - 3)
+        iterations.append(
+            {
+                "id": _uid(org, project, "sprint", n),
+                "name": f"Sprint {n + 1}",
+                "path": f"{project}\\Sprint {n + 1}",
+                "start": start,
+                "finish": finish,
+            }
+        )
+
+    items: dict[int, dict[str, Any]] = {}
+    ids_by_type: dict[str, list[int]] = {}
+    # IDs são únicos na organização: cada projeto tem sua faixa (DEV começa em 1000)
+    known = [name.lower() for name in PROJECTS]
+    offset = known.index(project.lower()) if project.lower() in known else len(known) + zlib.crc32(project.encode()) % 90
+    next_id = 1000 + offset * 100_000
+    for wi_type, fraction, parent_type in LEVELS:
+        for _ in range(max(1, round(config.work_items * fraction))):
+            parent_ids = ids_by_type.get(parent_type) if parent_type else None
+            iteration = rng.choice(iterations) if wi_type in ("User Story", "Task") else None
+            estimate = float(rng.randint(1, 16)) if wi_type == "Task" else None
+            completed = float(rng.randint(0, int(estimate))) if estimate else None
+            fields: dict[str, Any] = {
+                "System.Id": next_id,
+                "System.Title": f"{wi_type} {next_id} - {rng.choice(('Cadastro', 'Relatório', 'Integração', 'Ajuste'))}",
+                "System.WorkItemType": wi_type,
+                "System.State": rng.choice(STATES[wi_type]),
+                "System.AssignedTo": _user(org, rng.randint(1, USERS)),
+                "System.TeamProject": project,
+                "System.IterationPath": iteration["path"] if iteration else project,
+                "System.ChangedDate": _iso(monday),
+            }
+            if parent_ids:
+                fields["System.Parent"] = rng.choice(parent_ids)
+            if estimate is not None:
+                fields["Microsoft.VSTS.Scheduling.OriginalEstimate"] = estimate
+                fields["Microsoft.VSTS.Scheduling.CompletedWork"] = completed
+                fields["Microsoft.VSTS.Scheduling.RemainingWork"] = estimate - completed
+            items[next_id] = {"id": next_id, "rev": 1, "fields": fields}
+            ids_by_type.setdefault(wi_type, []).append(next_id)
+            next_id += 1
+
+    fake = FakeProject(org, project, iterations, items)
+    for work_item_id in items:
+        fake.touch(work_item_id)
+    return fake
+
+
+def _item_payload(item: dict[str, Any], org: str, fields: list[str] | None = None) -> dict[str, Any]:
+    values = item["fields"]
+    if fields:
+        values = {name: values[name] for name in fields if name in values}
+    return {
+        "id": item["id"],
+        "rev": item["rev"],
+        "fields": values,
+        "url": f"https://dev.azure.com/{org}/_apis/wit/workItems/{item['id']}",
+    }
+
+
+def _relations(project: FakeProject, ids: list[int]) -> list[dict[str, Any]]:
+    """workItemRelations como nas consultas de links (raízes com source nulo)."""
+    selected = set(ids)
+    relations = []
+    for work_item_id in ids:
+        parent = project.items[work_item_id]["fields"].get("System.Parent")
+        if parent in selected:
+            relations.append({"rel": HIERARCHY_FORWARD, "source": {"id": parent}, "target": {"id": work_item_id}})
+        else:
+            relations.append({"rel": None, "source": None, "target": {"id": work_item_id}})
+    return relations
+
+
+def _split_ids(value: str | None) -> list[int]:
+    return [int(i) for i in (value or "").split(",") if i.strip().isdigit()]
+
+
+def _split_fields(value: str | None) -> list[str] | None:
+    return [f for f in value.split(",") if f] if value else None
+
+
+def create_app(config: FakeAzureConfig | None = None) -> FastAPI:
+    """Cria o app ASGI do Azure DevOps simulado."""
+    config = config or FakeAzureConfig.from_env()
+    app = FastAPI(title="Azure DevOps simulado", docs_url=None, redoc_url=None)
+    projects: dict[tuple[str, str], FakeProject] = {}
+    stats: Counter[str] = Counter()
+    rng = random.Random(config.seed)
+
+    def get_project(org: str, project: str) -> FakeProject:
+        # O backend usa tanto o nome quanto o UUID do projeto
+        names = {_uid(org, "project", name): name for name in PROJECTS}
+        name = names.get(project.lower(), project)
+        key = (org.lower(), name.lower())
+        if key not in projects:
+            projects[key] = build_project(org, name, config)
+        return projects[key]
+
+    def org_projects(org: str) -> list[FakeProject]:
+        for name in PROJECTS:
+            get_project(org, name)
+        return [fake for (o, _), fake in projects.items() if o == org.lower()]
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path.startswith("/_fake"):
+            return await call_next(request)
+        labels = azure_labels(f"https://dev.azure.com{request.url.path}") or ("", "other")
+        delay = max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms))
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if rng.random() < config.throttle_rate:
+            response = JSONResponse(
+                {"message": "Request was blocked due to exceeding usage of resource."},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after)},
+            )
+        elif rng.random() < config.error_rate:
+            response = JSONResponse({"message": "Serviço indisponível (injetado)"}, status_code=503)
+        else:
+            response = await call_next(request)
+        stats[f"{labels[1]} {response.status_code}"] += 1
+        return response
+
+    # --- Controle do simulador ---
+
+    @app.get("/_fake/config")
+    def get_config():
+        return asdict(config)
+
+    @app.put("/_fake/config")
+    async def put_config(request: Request):
+        for name, value in (await request.json()).items():
+            if hasattr(config, name):
+                setattr(config, name, type(getattr(config, name))(value))
+        return asdict(config)
+
+    @app.get("/_fake/stats")
+    def get_stats():
+        return dict(sorted(stats.items()))
+
+    # --- Identidade ---
+
+    def connection_data(org: str = "loadtest"):
+        user = _user(org, 1)
+        return {
+            "authenticatedUser": {
+                "id": user["id"],
+                "providerDisplayName": user["displayName"],
+                "properties": {"Account": {"$type": "System.String", "$value": user["uniqueName"]}},
+            },
+            "instanceId": _uid(org, "instance"),
+        }
+
+    def profile(org: str = "loadtest"):
+        user = _user(org, 1)
+        return {
+            "id": user["id"],
+            "displayName": user["displayName"],
+            "emailAddress": user["uniqueName"],
+            "publicAlias": user["id"],
+        }
+
+    app.get("/_apis/connectionData")(connection_data)
+    app.get("/{org}/_apis/connectionData")(connection_data)
+    app.get("/_apis/profile/profiles/me")(profile)
+    app.get("/{org}/_apis/profile/profiles/me")(profile)
+
+    # --- Projetos e times ---
+
+    @app.get("/{org}/_apis/projects")
+    def list_projects(org: str):
+        return {
+            "count": len(PROJECTS),
+            "value": [
+                {
+                    "id": _uid(org, "project", name),
+                    "name": name,
+                    "description": f"Projeto simulado {name}",
+                    "url": f"https://dev.azure.com/{org}/_apis/projects/{_uid(org, 'project', name)}",
+                    "state": "wellFormed",
+                    "revision": 1,
+                    "visibility": "private",
+                    "lastUpdateTime": _iso(date.today()),
+                }
+                for name in PROJECTS
+            ],
+        }
+
+    @app.get("/{org}/_apis/projects/{project}/teams")
+    def list_teams(org: str, project: str):
+        return {"value": [{"id": _uid(org, project, "team", t), "name": t} for t in TEAMS], "count": len(TEAMS)}
+
+    @app.get("/{org}/_apis/projects/{project}/teams/{team}/members")
+    def list_members(org: str, project: str, team: str):
+        members = [{"identity": _user(org, n)} for n in range(1, USERS + 1)]
+        return {"value": members, "count": len(members)}
+
+    # --- Iterations ---
+
+    def _iteration_payload(iteration: dict[str, Any]) -> dict[str, Any]:
+        today = date.today()
+        if iteration["finish"] < today:
+            time_frame = "past"
+        elif iteration["start"] > today:
+            time_frame = "future"
+        else:
+            time_frame = "current"
+        return {
+            "id": iteration["id"],
+            "name": iteration["name"],
+            "path": iteration["path"],
+            "attributes": {
+                "startDate": _iso(iteration["start"]),
+                "finishDate": _iso(iteration["finish"]),
+                "timeFrame": time_frame,
+            },
+        }
+
+    @app.get("/{org}/{project}/_apis/wit/classificationnodes/iterations")
+    def classification_iterations(org: str, project: str):
+        fake = get_project(org, project)
+        return {
+            "identifier": _uid(org, project, "iterations"),
+            "name": project,
+            "structureType": "iteration",
+            "hasChildren": True,
+            "children": [
+                {
+                    "identifier": it["id"],
+                    "name": it["name"],
+                    "structureType": "iteration",
+                    "hasChildren": False,
+                    "attributes": {"startDate": _iso(it["start"]), "finishDate": _iso(it["finish"])},
+                }
+                for it in fake.iterations
+            ],
+        }
+
+    def team_iterations(org: str, project: str, request: Request, team: str | None = None):
+        iterations = [_iteration_payload(it) for it in get_project(org, project).iterations]
+        time_frame = request.query_params.get("$timeframe")
+        if time_frame:
+            iterations = [it for it in iterations if it["attributes"]["timeFrame"] == time_frame]
+        return {"count": len(iterations), "value": iterations}
+
+    def iteration_work_items(org: str, project: str, iteration_id: str, team: str | None = None):
+        fake = get_project(org, project)
+        iteration = next((it for it in fake.iterations if it["id"] == iteration_id), None)
+        if iteration is None:
+            return JSONResponse({"message": f"Iteration {iteration_id} não existe"}, status_code=404)
+        ids = [i for i, item in fake.items.items() if item["fields"]["System.IterationPath"] == iteration["path"]]
+        return {"workItemRelations": _relations(fake, ids)}
+
+    app.get("/{org}/{project}/_apis/work/teamsettings/iterations")(team_iterations)
+    app.get("/{org}/{project}/{team}/_apis/work/teamsettings/iterations")(team_iterations)
+    app.get("/{org}/{project}/_apis/work/teamsettings/iterations/{iteration_id}/workitems")(iteration_work_items)
+    app.get("/{org}/{project}/{team}/_apis/work/teamsettings/iterations/{iteration_id}/workitems")(
+        iteration_work_items
+    )
+
+    # --- Work items ---
+
+    @app.post("/{org}/{project}/_apis/wit/wiql")
+    async def wiql(org: str, project: str, request: Request):
+        fake = get_project(org, project)
+        query = (await request.json()).get("query", "")
+        ids = list(fake.items)
+
+        assigned = re.search(r"\[System\.AssignedTo\]\s*=\s*'([^']+)'", query)
+        if assigned:
+            ids = [i for i in ids if fake.items[i]["fields"]["System.AssignedTo"]["uniqueName"] == assigned.group(1)]
+        contains = re.search(r"\[System\.Title\]\s+CONTAINS\s+'([^']*)'", query, re.IGNORECASE)
+        by_id = re.search(r"\[System\.Id\]\s*=\s*(\d+)", query)
+        if by_id and contains:
+            term = contains.group(1).lower()
+            ids = [i for i in ids if i == int(by_id.group(1)) or term in fake.items[i]["fields"]["System.Title"].lower()]
+        elif contains:
+            term = contains.group(1).lower()
+            ids = [i for i in ids if term in fake.items[i]["fields"]["System.Title"].lower()]
+        elif by_id:
+            ids = [i for i in ids if i == int(by_id.group(1))]
+
+        top = request.query_params.get("$top")
+        if top:
+            ids = ids[: int(top)]
+        if "WorkItemLinks" in query:
+            return {"queryType": "tree", "workItemRelations": _relations(fake, ids)}
+        return {"queryType": "flat", "workItems": [{"id": i} for i in ids]}
+
+    def list_work_items(org: str, request: Request, project: str | None = None):
+        ids = _split_ids(request.query_params.get("ids"))
+        if len(ids) > BATCH_LIMIT:
+            return JSONResponse({"message": f"Limite de {BATCH_LIMIT} ids por requisição"}, status_code=400)
+        fields = _split_fields(request.query_params.get("fields"))
+        if project:
+            fakes = [get_project(org, project)]
+        else:
+            fakes = org_projects(org)
+        found = []
+        for fake in fakes:
+            found += [_item_payload(fake.items[i], org, fields) for i in ids if i in fake.items]
+        return {"count": len(found), "value": found}
+
+    app.get("/{org}/_apis/wit/workitems")(list_work_items)
+    app.get("/{org}/{project}/_apis/wit/workitems")(list_work_items)
+
+    @app.post("/{org}/_apis/wit/workitemsbatch")
+    async def work_items_batch(org: str, request: Request):
+        body = await request.json()
+        ids = body.get("ids", [])
+        if len(ids) > BATCH_LIMIT:
+            return JSONResponse({"message": f"Limite de {BATCH_LIMIT} ids por requisição"}, status_code=400)
+        fields = body.get("fields")
+        found = []
+        for fake in org_projects(org):
+            found += [_item_payload(fake.items[i], org, fields) for i in ids if i in fake.items]
+        return {"count": len(found), "value": found}
+
+    @app.get("/{org}/{project}/_apis/wit/workitems/{work_item_id}")
+    def get_work_item(org: str, project: str, work_item_id: int, request: Request):
+        fake = get_project(org, project)
+        if work_item_id not in fake.items:
+            return JSONResponse({"message": f"Work item {work_item_id} não existe"}, status_code=404)
+        return _item_payload(fake.items[work_item_id], org, _split_fields(request.query_params.get("fields")))
+
+    @app.patch("/{org}/{project}/_apis/wit/workitems/{work_item_id}")
+    async def patch_work_item(org: str, project: str, work_item_id: int, request: Request):
+        fake = get_project(org, project)
+        if work_item_id not in fake.items:
+            return JSONResponse({"message": f"Work item {work_item_id} não existe"}, status_code=404)
+        item = fake.items[work_item_id]
+        for op in await request.json():
+            if op.get("op") in ("add", "replace") and op.get("path", "").startswith("/fields/"):
+                item["fields"][op["path"].removeprefix("/fields/")] = op.get("value")
+        item["rev"] += 1
+        item["fields"]["System.ChangedDate"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        fake.touch(work_item_id)
+        return _item_payload(item, org)
+
+    @app.get("/{org}/{project}/_apis/wit/workitems/{work_item_id}/revisions")
+    def work_item_revisions(org: str, project: str, work_item_id: int):
+        fake = get_project(org, project)
+        if work_item_id not in fake.items:
+            return JSONResponse({"message": f"Work item {work_item_id} não existe"}, status_code=404)
+        revisions = fake.revisions.get(work_item_id, [])
+        return {"count": len(revisions), "value": revisions}
+
+    # --- Reporting (poller do espelho) ---
+
+    @app.get("/{org}/{project}/_apis/wit/reporting/workitemrevisions")
+    def reporting_revisions(org: str, project: str, request: Request):
+        fake = get_project(org, project)
+        since = int(request.query_params.get("continuationToken") or 0)
+        page_size = int(request.query_params.get("$maxPageSize") or 200)
+        changed = sorted((seq, i) for i, seq in fake.changes.items() if seq > since)[:page_size]
+        values = [_item_payload(fake.items[i], org) for _, i in changed]
+        token = changed[-1][0] if changed else since
+        return {
+            "values": values,
+            "continuationToken": str(token),
+            "isLastBatch": token >= fake.sequence,
+        }
+
+    @app.get("/{org}/{project}/_apis/wit/reporting/workitemlinks")
+    def reporting_links(org: str, project: str, request: Request):
+        fake = get_project(org, project)
+        if request.query_params.get("continuationToken"):
+            return {"values": [], "continuationToken": "links", "isLastBatch": True}
+        values = [
+            {"rel": HIERARCHY_FORWARD, "sourceId": item["fields"]["System.Parent"], "targetId": i, "isActive": True}
+            for i, item in fake.items.items()
+            if item["fields"].get("System.Parent")
+        ]
+        return {"values": values, "continuationToken": "links", "isLastBatch": True}
+
+    # --- Ícones ---
+
+    @app.get("/{org}/_apis/wit/workitemicons")
+    def list_icons(org: str):
+        icons = ("icon_crown", "icon_trophy", "icon_book", "icon_clipboard", "icon_insect")
+        return {
+            "count": len(icons),
+            "value": [{"id": i, "url": f"https://dev.azure.com/{org}/_apis/wit/workItemIcons/{i}"} for i in icons],
+        }
+
+    @app.get("/{org}/_apis/wit/workitemicons/{icon}")
+    def get_icon(org: str, icon: str, color: str = "888888"):
+        return Response(ICON_SVG.format(color=color), media_type="image/svg+xml")
+
+    return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    defaults = FakeAzureConfig.from_env()
+    parser = argparse.ArgumentParser(description="Azure DevOps simulado para testes de carga")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate)
+    parser.add_argument("--work-items", type=int, default=defaults.work_items)
+    args = parser.parse_args(argv)
+
+    config = FakeAzureConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        work_items=args.work_items,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Cria as tabelas em um banco SQLite local para os testes de carga e uma
+atividade ativa para o cenário de CRUD.
+
+Uso:
+    DATABASE_URL=sqlite:///./loadtest.db DATABASE_SCHEMA= python -m loadtest.setup_db
+
+Com Postgres, use as migrações normais (alembic upgrade head).
+"""
+
+import app.main  # noqa: F401 - registra todos os modelos no metadata
+from app.config import get_settings
+from app.database import Base, SessionLocal, engine
+from app.models.atividade import Atividade
+
+
+def main() -> None:
+    url = get_settings().database_url_resolved
+    if not url.startswith("sqlite"):
+        raise SystemExit("setup_db é apenas para SQLite; com Postgres use: alembic upgrade head")
+    for table in Base.metadata.tables.values():
+        table.schema = None
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        if not db.query(Atividade).filter(Atividade.ativo.is_(True)).first():
+            db.add(Atividade(nome="Desenvolvimento", ativo=True))
+            db.commit()
+    print(f"Tabelas criadas em {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,10 @@ os.environ["AZURE_DEVOPS_PAT"] = "test-pat"
 
 from app.main import app
 from app.database import Base, get_db
+from app.repositories.organization_pat import pat_cache
+from app.repositories.reference_cache import reference_cache
+from app.repositories.timesheet_cache import iteration_cache, week_cache
+from app.utils.schema_cache import refresh_schema_cache
 
 
 # Test database URL (in-memory SQLite)
@@ -38,8 +42,18 @@ def test_db():
         table.schema = None
 
     Base.metadata.create_all(bind=engine)
+    refresh_schema_cache()
+    reference_cache.invalidate()
+    week_cache.clear()
+    iteration_cache.clear()
+    pat_cache.clear()
     yield
     Base.metadata.drop_all(bind=engine)
+    refresh_schema_cache()
+    reference_cache.invalidate()
+    week_cache.clear()
+    iteration_cache.clear()
+    pat_cache.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,143 @@
+"""
+Testes para a exportacao em streaming de apontamentos (CSV / NDJSON).
+"""
+
+import csv
+import io
+import json
+import pytest
+from datetime import date, datetime, timedelta
+
+from app.auth import AzureDevOpsUser, get_current_user
+from app.database import get_session_factory
+from app.main import app
+from app.models.apontamento import Apontamento
+from app.models.atividade import Atividade
+from app.services.apontamento_export import EXPORT_COLUMNS, ApontamentoExportService
+from tests.conftest import TestingSessionLocal
+
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+
+
+@pytest.fixture
+def export_client(client):
+    """Client com usuario fixo e fabrica de sessoes do banco de testes."""
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    app.dependency_overrides[get_current_user] = lambda: AzureDevOpsUser(
+        id="user-1", display_name="Usuário"
+    )
+    return client
+
+
+@pytest.fixture
+def apontamentos(db_session):
+    """Cria 6 apontamentos: 4 do user-1 e 2 do user-2, em dias distintos."""
+    atividade = Atividade(nome="Desenvolvimento", ativo=True)
+    db_session.add(atividade)
+    db_session.commit()
+
+    base = datetime(2026, 1, 19, 8, 0, 0)
+    for i in range(6):
+        db_session.add(
+            Apontamento(
+                work_item_id=100 + i,
+                project_id=PROJECT_ID,
+                organization_name="sefaz-ceara",
+                data_apontamento=date(2026, 1, 19) + timedelta(days=i),
+                duracao="01:30",
+                id_atividade=atividade.id,
+                usuario_id="user-1" if i < 4 else "user-2",
+                usuario_nome="Usuário",
+                comentario="Ajuste, com vírgula" if i == 0 else None,
+                criado_em=base + timedelta(minutes=i),
+                atualizado_em=base + timedelta(minutes=i),
+            )
+        )
+    db_session.commit()
+
+
+class TestApontamentoExportService:
+    """Testes para ApontamentoExportService"""
+
+    def test_csv_has_header_and_rows(self, db_session, apontamentos):
+        """CSV deve ter cabecalho e uma linha por apontamento, em ordem de data"""
+        service = ApontamentoExportService(db_session)
+        content = "".join(service.iter_csv(organization_name="sefaz-ceara"))
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert tuple(rows[0].keys()) == EXPORT_COLUMNS
+        assert len(rows) == 6
+        assert [r["work_item_id"] for r in rows] == [str(100 + i) for i in range(6)]
+        assert rows[0]["atividade_nome"] == "Desenvolvimento"
+        assert rows[0]["comentario"] == "Ajuste, com vírgula"
+        assert rows[0]["duracao_horas"] == "1.5"
+
+    def test_ndjson_filters(self, db_session, apontamentos):
+        """Filtros de usuario e periodo devem ser aplicados no SQL"""
+        service = ApontamentoExportService(db_session)
+        content = "".join(
+            service.iter_ndjson(
+                organization_name="sefaz-ceara",
+                usuario_id="user-1",
+                data_inicio=date(2026, 1, 20),
+                data_fim=date(2026, 1, 21),
+            )
+        )
+
+        records = [json.loads(line) for line in content.splitlines()]
+        assert [r["data_apontamento"] for r in records] == ["2026-01-20", "2026-01-21"]
+
+    def test_empty_export(self, db_session, apontamentos):
+        """Organizacao sem apontamentos gera apenas o cabecalho / nada"""
+        service = ApontamentoExportService(db_session)
+        assert "".join(service.iter_ndjson(organization_name="outra")) == ""
+        csv_content = "".join(service.iter_csv(organization_name="outra"))
+        assert csv_content.strip() == ",".join(EXPORT_COLUMNS)
+
+
+class TestExportEndpoint:
+    """Testes para GET /api/v1/apontamentos/export"""
+
+    def test_export_csv(self, export_client, apontamentos):
+        response = export_client.get(
+            "/api/v1/apontamentos/export",
+            params={"organization_name": "sefaz-ceara", "project_id": PROJECT_ID},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        assert len(list(csv.DictReader(io.StringIO(response.text)))) == 6
+
+    def test_export_ndjson(self, export_client, apontamentos):
+        response = export_client.get(
+            "/api/v1/apontamentos/export",
+            params={
+                "organization_name": "sefaz-ceara",
+                "formato": "ndjson",
+                "usuario_id": "user-2",
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert len(response.text.splitlines()) == 2
+
+    def test_filename_is_sanitized(self, export_client, apontamentos):
+        response = export_client.get(
+            "/api/v1/apontamentos/export",
+            params={"organization_name": 'org"; x=1\r\nSet-Cookie: a=b'},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-disposition"] == (
+            'attachment; filename="apontamentos_org___x_1__Set-Cookie__a_b.csv"'
+        )
+
+    def test_invalid_period(self, export_client):
+        response = export_client.get(
+            "/api/v1/apontamentos/export",
+            params={
+                "organization_name": "sefaz-ceara",
+                "data_inicio": "2026-02-01",
+                "data_fim": "2026-01-01",
+            },
+        )
+        assert response.status_code == 400
@@ -0,0 +1,45 @@
+"""
+Testes para a suíte de benchmarks (dados sintéticos e comparação com baseline).
+"""
+
+from benchmarks.data import build_data
+from benchmarks.run import compare, run
+
+
+def test_synthetic_tree_is_deterministic():
+    first, second = build_data(100), build_data(100)
+
+    assert len(first.work_items) == 100
+    assert first.work_items == second.work_items
+    assert first.apontamentos_map == second.apontamentos_map
+
+    ids = {wi["id"] for wi in first.work_items}
+    children = [wi for wi in first.work_items if wi["type"] != "Epic"]
+    assert all(wi["parent_id"] in ids for wi in children)
+
+
+def test_run_reports_timing_and_memory():
+    result = run([20], repeats=2, name_filter="build_hierarchy")
+
+    assert list(result["results"]) == ["build_hierarchy[20]"]
+    case = result["results"]["build_hierarchy[20]"]
+    assert case["repeats"] == 2 and case["number"] == 1
+    assert case["min_ms"] > 0 and case["peak_kib"] > 0
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"a": {"min_ms": 10.0, "peak_kib": 100.0}, "b": {"min_ms": 10.0, "peak_kib": 100.0}}}
+    current = {
+        "results": {
+            "a": {"min_ms": 10.5, "peak_kib": 100.0},
+            "b": {"min_ms": 12.0, "peak_kib": 150.0},
+            "novo": {"min_ms": 1.0, "peak_kib": 1.0},
+        }
+    }
+
+    rows = {row["name"]: row for row in compare(current, baseline, threshold=0.10)}
+
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"] and rows["b"]["change"] == 0.2
+    assert rows["b"]["peak_change_kib"] == 50.0
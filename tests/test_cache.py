@@ -0,0 +1,225 @@
+"""
+Testes para o subsistema de cache (app/cache.py) e seus endpoints administrativos.
+"""
+
+import asyncio
+import threading
+import time
+
+import fakeredis
+import pytest
+import redis
+
+from app import cache as cache_module
+from app.cache import Cache, CacheBackend, MemoryBackend, RedisBackend, get_cache
+from app.config import get_settings
+from app.repositories.organization_pat import OrganizationPatRepository, pat_cache
+from app.schemas.organization_pat import OrganizationPatCreate, OrganizationPatUpdate
+from app.services.timesheet_service import TimesheetService
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryBackend(max_entries=100)
+    return RedisBackend(fakeredis.FakeRedis())
+
+
+def test_prefix_invalidation(backend):
+    """invalidate() respeita o limite entre as partes da chave"""
+    cache = Cache("teste", backend, ttl=60)
+    cache.set(("org", "proj", 1), "a")
+    cache.set(("org", "proj", 2), "b")
+    cache.set(("org", "proj2", 1), "c")
+    cache.set(("org", "a:b*[x]"), "d")
+    outro = Cache("outro", backend, ttl=60)
+    outro.set(("org", "proj", 1), "e")
+
+    assert cache.invalidate("org", "proj") == 2
+    assert cache.get(("org", "proj", 1)) is None
+    assert cache.get(("org", "proj2", 1)) == "c"
+    assert cache.get(("org", "a:b*[x]")) == "d"
+    assert sorted(cache.keys()) == ["org:a%3Ab%2A%5Bx%5D", "org:proj2:1"]
+
+    assert cache.clear() == 2
+    assert outro.get(("org", "proj", 1)) == "e"
+    assert cache.stats()["invalidacoes"] == 2
+
+
+def test_none_and_zero_ttl_not_stored(backend):
+    cache = Cache("teste", backend, ttl=lambda: 0)
+
+    assert not cache.set("x", 1)
+    assert not cache.set("y", None, ttl=60)
+    assert cache.set("z", 0, ttl=60)
+    assert cache.get("z") == 0
+
+
+def test_add_only_if_absent(backend):
+    """add() reserva a chave apenas uma vez até expirar ou ser removida"""
+    cache = Cache("reserva", backend, ttl=60)
+
+    assert cache.add("k", "primeiro")
+    assert not cache.add("k", "segundo")
+    assert cache.get("k") == "primeiro"
+
+    cache.delete("k")
+    assert cache.add("k", "terceiro")
+
+
+def test_memory_backend_lru_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    backend = MemoryBackend(max_entries=2)
+    cache = Cache("lru", backend, ttl=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" passa a ser a mais recente
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert backend.evictions == 1
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["entradas"] == 0
+
+
+def test_redis_backend_ttl():
+    client = fakeredis.FakeRedis()
+    cache = Cache("ttl", RedisBackend(client), ttl=30)
+
+    cache.set(("org", 1), {"id": 1})
+
+    assert cache.get(("org", 1)) == {"id": 1}
+    assert 0 < client.pttl("aponta:ttl:org:1") <= 30000
+
+
+def test_get_or_set_single_flight():
+    """Threads concorrentes aguardam uma única carga"""
+    cache = Cache("sf", MemoryBackend(), ttl=60)
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "valor"
+
+    def worker():
+        barrier.wait()
+        assert cache.get_or_set("k", loader) == "valor"
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert cache.stats()["cargas"] == 1
+    assert cache.stats()["cargas_compartilhadas"] == 7
+
+
+@pytest.mark.asyncio
+async def test_aget_or_set_single_flight():
+    cache = Cache("asf", MemoryBackend(), ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "valor"
+
+    results = await asyncio.gather(*(cache.aget_or_set("k", loader) for _ in range(5)))
+
+    assert results == ["valor"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["cargas_compartilhadas"] == 4
+
+
+@pytest.mark.asyncio
+async def test_aget_or_set_errors_are_shared_and_not_cached():
+    cache = Cache("erro", MemoryBackend(), ttl=60)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("falhou")
+
+    results = await asyncio.gather(*(cache.aget_or_set("k", failing) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not cache.contains("k")
+
+    async def empty():
+        return None
+
+    assert await cache.aget_or_set("k", empty) is None
+    assert not cache.contains("k")
+
+
+def test_backend_failure_is_a_miss():
+    """Falha do Redis não derruba a requisição"""
+    class Offline:
+        def get(self, *args, **kwargs):
+            raise redis.ConnectionError("Connection refused")
+
+        set = delete = scan_iter = get
+
+    cache = Cache("falha", RedisBackend(Offline()), ttl=60)
+
+    assert cache.get("k") is None
+    assert not cache.set("k", 1)
+    # Invalidações vêm depois do commit das escritas: não podem propagar
+    assert cache.invalidate("org") == 0
+    assert cache.delete("k") is False
+    assert cache.clear() == 0
+    assert cache.stats()["erros"] == 5
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_get_cache_uses_shared_backend(monkeypatch):
+    shared = RedisBackend(fakeredis.FakeRedis())
+    monkeypatch.setattr(get_settings(), "cache_backend", "redis")
+    monkeypatch.setattr(cache_module, "_shared_backend", shared)
+    monkeypatch.setattr(cache_module, "_CACHES", {})
+
+    assert get_cache("compartilhado", 60).backend is shared
+    assert isinstance(get_cache("local", 60, local=True).backend, MemoryBackend)
+    assert get_cache("compartilhado", 10) is get_cache("compartilhado", 60)
+
+
+def test_pat_cache_invalidated_by_writes(db_session):
+    repo = OrganizationPatRepository(db_session)
+    org_pat = repo.create(OrganizationPatCreate(organization_name="Org-Cache", pat="pat-antigo-123456"))
+    service = TimesheetService(db_session)
+
+    assert service._get_pat_for_org("org-cache") == "pat-antigo-123456"
+    assert pat_cache.contains("org-cache")
+
+    repo.update(org_pat.id, OrganizationPatUpdate(pat="pat-novo-1234567"))
+    assert not pat_cache.contains("org-cache")
+    assert TimesheetService(db_session)._get_pat_for_org("Org-Cache") == "pat-novo-1234567"
+
+
+def test_admin_endpoints(client):
+    cache = get_cache("semanas", 60)
+    cache.set(("org", "proj-1", "2026-01-19"), [1])
+    cache.set(("org", "proj-2", "2026-01-19"), [2])
+
+    listing = client.get("/api/v1/cache").json()
+    assert listing["backend"] == "memory"
+    assert {"semanas", "iterations", "ancestrais", "icones", "pats"} <= set(listing["namespaces"])
+
+    detail = client.get("/api/v1/cache/semanas").json()
+    assert detail["entradas"] == 2
+    assert "org:proj-1:2026-01-19" in detail["chaves"]
+
+    response = client.delete("/api/v1/cache/semanas", params={"prefix": ["org", "proj-1"]})
+    assert response.json() == {"namespace": "semanas", "removidas": 1}
+    assert client.delete("/api/v1/cache/semanas").json()["removidas"] == 1
+    assert client.get("/api/v1/cache/inexistente").status_code == 404
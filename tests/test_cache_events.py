@@ -0,0 +1,192 @@
+"""
+Testes para a invalidação de caches entre workers (LISTEN/NOTIFY).
+"""
+
+import asyncio
+import json
+import socket
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app import cache_events
+from app.cache_events import ORIGIN, CacheInvalidationListener, notify_invalidation
+from app.models.atividade import Atividade
+from app.repositories import apontamento as apontamento_repository
+from app.repositories.apontamento import ApontamentoRepository
+from app.repositories.organization_pat import pat_cache
+from app.repositories.reference_cache import reference_cache
+from app.repositories.timesheet_cache import iteration_cache, week_cache
+from app.schemas.apontamento import ApontamentoCreate
+
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+
+
+def _event(namespace: str, *key, origin: str = "outro-worker") -> str:
+    return json.dumps({"o": origin, "ns": namespace, "k": list(key)})
+
+
+class RecordingSession:
+    """Sessão mínima com dialeto Postgres que registra os comandos."""
+
+    def __init__(self, dialect: str = "postgresql"):
+        self.executed = []
+        self._bind = SimpleNamespace(dialect=SimpleNamespace(name=dialect))
+
+    def get_bind(self):
+        return self._bind
+
+    def execute(self, statement, params):
+        self.executed.append((str(statement), params))
+
+
+def test_notify_runs_pg_notify_in_transaction():
+    db = RecordingSession()
+
+    notify_invalidation(db, "semanas", ORG, PROJECT_ID)
+
+    [(sql, params)] = db.executed
+    assert "pg_notify" in sql
+    assert params["channel"] == "aponta_cache"
+    assert json.loads(params["payload"]) == {"o": ORIGIN, "ns": "semanas", "k": [ORG, PROJECT_ID]}
+
+
+def test_notify_is_noop_outside_postgres(monkeypatch):
+    sqlite = RecordingSession("sqlite")
+    notify_invalidation(sqlite, "semanas", ORG)
+    assert sqlite.executed == []
+
+    monkeypatch.setattr(cache_events.settings, "cache_invalidation_channel", "")
+    postgres = RecordingSession()
+    notify_invalidation(postgres, "semanas", ORG)
+    assert postgres.executed == []
+
+
+def test_listener_evicts_matching_keys(test_db):
+    """Eventos de outros workers removem as chaves do prefixo"""
+    week_cache.set((ORG, PROJECT_ID, date(2026, 1, 19), None), {})
+    week_cache.set((ORG, "outro-projeto", date(2026, 1, 19), None), {})
+    pat_cache.set(ORG, "pat")
+    listener = CacheInvalidationListener()
+
+    assert listener.handle(_event("semanas", ORG, PROJECT_ID))
+    assert listener.handle(_event("pats", ORG))
+
+    assert not week_cache.contains((ORG, PROJECT_ID, date(2026, 1, 19), None))
+    assert week_cache.contains((ORG, "outro-projeto", date(2026, 1, 19), None))
+    assert not pat_cache.contains(ORG)
+    assert listener.stats()["aplicados"] == 2
+
+
+def test_listener_ignores_own_and_invalid_events(test_db):
+    week_cache.set((ORG, PROJECT_ID, date(2026, 1, 19), None), {})
+    listener = CacheInvalidationListener()
+
+    assert not listener.handle(_event("semanas", ORG, origin=ORIGIN))
+    assert not listener.handle(_event("desconhecido", ORG))
+    assert not listener.handle("não é json")
+
+    assert week_cache.contains((ORG, PROJECT_ID, date(2026, 1, 19), None))
+    stats = listener.stats()
+    assert (stats["recebidos"], stats["aplicados"], stats["proprios"]) == (3, 0, 1)
+
+
+def test_reference_handlers_bump_version():
+    listener = CacheInvalidationListener()
+    version = reference_cache.version
+
+    listener.handle(_event("referencia"))
+    listener.handle(_event("projetos"))
+
+    assert reference_cache.version == version + 2
+
+
+def test_flush_after_reconnect(test_db):
+    """Após reconexão, eventos podem ter sido perdidos: caches locais são esvaziados"""
+    iteration_cache.set((ORG, PROJECT_ID, "sprint"), [])
+    version = reference_cache.version
+
+    CacheInvalidationListener().flush_local()
+
+    assert not iteration_cache.contains((ORG, PROJECT_ID, "sprint"))
+    assert reference_cache.version > version
+
+
+def test_apontamento_writes_notify_before_commit(db_session, monkeypatch):
+    atividade = Atividade(nome="Desenvolvimento", ativo=True)
+    db_session.add(atividade)
+    db_session.commit()
+    events = []
+
+    def record(db, namespace, *key):
+        # O evento precisa entrar na transação da escrita
+        events.append((namespace, key, bool(db.new or db.dirty or db.deleted)))
+
+    monkeypatch.setattr(apontamento_repository, "notify_invalidation", record)
+    repo = ApontamentoRepository(db_session)
+    apontamento = repo.create(
+        ApontamentoCreate(
+            work_item_id=100,
+            project_id=PROJECT_ID,
+            organization_name=ORG,
+            data_apontamento=date(2026, 1, 19),
+            duracao="01:00",
+            id_atividade=atividade.id,
+            usuario_id="user-1",
+            usuario_nome="Usuário",
+        )
+    )
+    repo.delete(apontamento.id)
+
+    assert events == [("semanas", (ORG, PROJECT_ID), True), ("semanas", (ORG, PROJECT_ID), True)]
+
+
+@pytest.mark.asyncio
+async def test_listener_not_started_outside_postgres():
+    listener = CacheInvalidationListener()
+
+    listener.start(SimpleNamespace(dialect=SimpleNamespace(name="sqlite")))
+
+    assert listener._task is None
+    await listener.stop()
+
+
+@pytest.mark.asyncio
+async def test_listen_consumes_notifications(test_db):
+    """O listener lê as notificações quando a conexão fica legível"""
+    reader, writer = socket.socketpair()
+    reader.setblocking(False)
+
+    class Connection:
+        def __init__(self):
+            self.notifies = []
+
+        def fileno(self):
+            return reader.fileno()
+
+        def poll(self):
+            # Como no psycopg2, poll() não bloqueia
+            try:
+                reader.recv(64)
+            except BlockingIOError:
+                pass
+
+    pat_cache.set(ORG, "pat")
+    listener = CacheInvalidationListener()
+    conn = Connection()
+    task = asyncio.create_task(listener._listen(conn))
+    await asyncio.sleep(0)
+
+    conn.notifies.append(SimpleNamespace(payload=_event("pats", ORG)))
+    writer.send(b"x")
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    reader.close()
+    writer.close()
+
+    assert listener.stats()["aplicados"] == 1
+    assert not pat_cache.contains(ORG)
@@ -0,0 +1,150 @@
+"""
+Testes para o header Idempotency-Key nas escritas de apontamentos.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import idempotency
+from app.idempotency import DONE, PENDING, IdempotencyMiddleware, idempotency_cache
+from app.models.apontamento import Apontamento
+from app.models.atividade import Atividade
+from app.services.apontamento_service import ApontamentoService
+
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+
+
+@pytest.fixture
+def azure_calls(monkeypatch):
+    """Substitui as chamadas ao Azure DevOps do serviço, registrando os recálculos."""
+    calls = []
+
+    async def validate(self, **kwargs):
+        return None
+
+    async def recalculate(self, organization, project, work_item_id):
+        calls.append(work_item_id)
+
+    monkeypatch.setattr(ApontamentoService, "_validate_work_item_state", validate)
+    monkeypatch.setattr(ApontamentoService, "_recalculate_and_update_azure", recalculate)
+    idempotency_cache.clear()
+    yield calls
+    idempotency_cache.clear()
+
+
+@pytest.fixture
+def payload(db_session):
+    atividade = Atividade(nome="Desenvolvimento", ativo=True)
+    db_session.add(atividade)
+    db_session.commit()
+    return {
+        "work_item_id": 100,
+        "project_id": PROJECT_ID,
+        "organization_name": ORG,
+        "data_apontamento": "2026-01-19",
+        "duracao": "01:00",
+        "id_atividade": str(atividade.id),
+        "usuario_id": "user-1",
+        "usuario_nome": "Usuário",
+    }
+
+
+def test_retry_replays_stored_response(client, db_session, azure_calls, payload):
+    """A repetição recebe a mesma resposta sem novo INSERT nem recálculo no Azure"""
+    headers = {"Idempotency-Key": "5f0c7a52-1b0e-4c4e-9d59-0c8d3a7b9e11"}
+
+    first = client.post("/api/v1/apontamentos", json=payload, headers=headers)
+    retry = client.post("/api/v1/apontamentos", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert db_session.query(Apontamento).count() == 1
+    assert azure_calls == [100]
+
+
+def test_without_key_each_request_runs(client, db_session, azure_calls, payload):
+    client.post("/api/v1/apontamentos", json=payload)
+    client.post("/api/v1/apontamentos", json=payload)
+
+    assert db_session.query(Apontamento).count() == 2
+
+
+def test_key_reused_with_other_request(client, azure_calls, payload):
+    headers = {"Idempotency-Key": "chave-1"}
+    client.post("/api/v1/apontamentos", json=payload, headers=headers)
+
+    response = client.post("/api/v1/apontamentos", json={**payload, "duracao": "02:00"}, headers=headers)
+
+    assert response.status_code == 422
+    assert "outra requisição" in response.json()["detail"]
+
+
+def test_delete_retry_is_replayed(client, azure_calls, payload):
+    created = client.post("/api/v1/apontamentos", json=payload).json()
+    headers = {"Idempotency-Key": "exclusao-1"}
+
+    first = client.delete(f"/api/v1/apontamentos/{created['id']}", headers=headers)
+    retry = client.delete(f"/api/v1/apontamentos/{created['id']}", headers=headers)
+
+    # Sem a chave, a repetição receberia 404
+    assert first.status_code == retry.status_code == 204
+    assert azure_calls == [100, 100]
+
+
+def test_key_is_scoped_to_the_caller(client, db_session, azure_calls, payload):
+    """Outro token (ou nenhum) com a mesma chave não recebe a resposta gravada"""
+    key = {"Idempotency-Key": "chave-do-usuario"}
+
+    first = client.post("/api/v1/apontamentos", json=payload, headers={**key, "Authorization": "Bearer a"})
+    other = client.post("/api/v1/apontamentos", json=payload, headers={**key, "Authorization": "Bearer b"})
+    anonymous = client.post("/api/v1/apontamentos", json=payload, headers=key)
+
+    assert first.status_code == other.status_code == anonymous.status_code == 201
+    assert "idempotent-replayed" not in other.headers
+    assert "idempotent-replayed" not in anonymous.headers
+    assert db_session.query(Apontamento).count() == 3
+
+
+def test_server_errors_release_the_key(client, db_session, azure_calls, payload, monkeypatch):
+    real_create = ApontamentoService.criar_apontamento
+    attempts = []
+
+    async def flaky_create(self, data):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise HTTPException(status_code=502, detail="Azure DevOps indisponível")
+        return await real_create(self, data)
+
+    monkeypatch.setattr(ApontamentoService, "criar_apontamento", flaky_create)
+    headers = {"Idempotency-Key": "chave-502"}
+
+    assert client.post("/api/v1/apontamentos", json=payload, headers=headers).status_code == 502
+    assert client.post("/api/v1/apontamentos", json=payload, headers=headers).status_code == 201
+    assert db_session.query(Apontamento).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_waits_for_request_in_progress(monkeypatch):
+    idempotency_cache.clear()
+    monkeypatch.setattr(idempotency, "POLL_INTERVAL_SECONDS", 0.01)
+    middleware = IdempotencyMiddleware(app=None)
+    idempotency_cache.set("em-andamento", {"estado": PENDING, "hash": "h"})
+
+    async def finish():
+        await asyncio.sleep(0.05)
+        idempotency_cache.set("em-andamento", {"estado": DONE, "hash": "h", "status": 201, "headers": [], "body": b"{}"})
+
+    task = asyncio.create_task(finish())
+    record = await middleware._reserve("em-andamento", "h")
+    await task
+    assert record["status"] == 201
+
+    monkeypatch.setattr(idempotency.settings, "idempotency_wait_seconds", 0.02)
+    idempotency_cache.set("travada", {"estado": PENDING, "hash": "h"})
+    assert await middleware._reserve("travada", "h") == 409
+    idempotency_cache.clear()
@@ -0,0 +1,172 @@
+"""
+Testes para o agendador de jobs com eleição de líder (advisory locks).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.background_job import BackgroundJob
+from app.services.job_scheduler import INSTANCE_ID, Job, JobScheduler, job_scheduler, lock_key
+from tests.conftest import TestingSessionLocal, engine as test_engine
+
+
+def make_job(run=None, min_interval=0) -> Job:
+    async def noop():
+        return None
+
+    return Job("teste", run or noop, next_delay=lambda: 3600, min_interval=min_interval)
+
+
+class FakeLockConnection:
+    """Conexão Postgres mínima: responde ao pg_try_advisory_lock e registra os comandos."""
+
+    def __init__(self, acquired: bool, log: list):
+        self.acquired = acquired
+        self.log = log
+
+    def execute(self, statement, params):
+        self.log.append(str(statement).split("(")[0].replace("SELECT ", ""))
+        return SimpleNamespace(scalar=lambda: self.acquired)
+
+    def commit(self):
+        pass
+
+    def invalidate(self):
+        self.log.append("invalidate")
+
+    def close(self):
+        self.log.append("close")
+
+
+def postgres_scheduler(acquired: bool, log: list) -> JobScheduler:
+    fake_engine = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        connect=lambda: FakeLockConnection(acquired, log),
+    )
+    return JobScheduler(TestingSessionLocal, fake_engine)
+
+
+def test_lock_key_is_stable_bigint():
+    assert lock_key("sincronizacao_projetos") == lock_key("sincronizacao_projetos")
+    assert lock_key("sincronizacao_projetos") != lock_key("poller_work_items")
+    assert -(2**63) <= lock_key("sincronizacao_projetos") < 2**63
+
+
+@pytest.mark.asyncio
+async def test_run_records_execution(test_db):
+    scheduler = JobScheduler(TestingSessionLocal, test_engine)
+    job = make_job()
+
+    assert await scheduler.run_once(job)
+
+    db = TestingSessionLocal()
+    row = db.get(BackgroundJob, "teste")
+    assert (row.status, row.holder, row.execucoes) == ("sucesso", INSTANCE_ID, 1)
+    assert row.ultima_duracao_ms is not None and row.ultimo_fim >= row.ultimo_inicio
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_failure_is_recorded_not_raised(test_db):
+    scheduler = JobScheduler(TestingSessionLocal, test_engine)
+
+    async def failing():
+        raise RuntimeError("Azure indisponível")
+
+    job = make_job(failing)
+    assert await scheduler.run_once(job)
+
+    [status] = scheduler.status()
+    assert (status["status"], status["ultimo_erro"]) == ("erro", "Azure indisponível")
+    assert job.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_recent_run_by_other_replica_is_skipped(db_session):
+    """A réplica que dispara logo depois da líder não repete a rodada"""
+    calls = []
+
+    async def run():
+        calls.append(1)
+
+    db_session.add(
+        BackgroundJob(
+            nome="teste", holder="outra:1", status="sucesso", execucoes=1,
+            ultimo_inicio=datetime.utcnow() - timedelta(seconds=30),
+        )
+    )
+    db_session.commit()
+    scheduler = JobScheduler(TestingSessionLocal, test_engine)
+
+    assert not await scheduler.run_once(make_job(run, min_interval=600))
+    assert calls == []
+
+    # Rodada interrompida (líder morreu com o job "executando"): assume
+    db_session.query(BackgroundJob).update({"status": "executando"})
+    db_session.commit()
+    assert await scheduler.run_once(make_job(run, min_interval=600))
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_advisory_lock_held_elsewhere_skips_run(test_db):
+    calls, log = [], []
+
+    async def run():
+        calls.append(1)
+
+    job = make_job(run)
+    assert not await postgres_scheduler(False, log).run_once(job)
+
+    assert calls == [] and job.skipped == 1
+    assert log == ["pg_try_advisory_lock", "close"]
+
+
+@pytest.mark.asyncio
+async def test_advisory_lock_released_after_run(test_db):
+    log = []
+
+    async def run():
+        log.append("run")
+
+    assert await postgres_scheduler(True, log).run_once(make_job(run))
+
+    assert log == ["pg_try_advisory_lock", "run", "pg_advisory_unlock", "close"]
+
+
+@pytest.mark.asyncio
+async def test_loop_runs_and_stops(test_db):
+    scheduler = JobScheduler(TestingSessionLocal, test_engine)
+    ran = asyncio.Event()
+
+    async def run():
+        ran.set()
+
+    job = scheduler.add("teste", run, next_delay=lambda: 3600, initial_delay=0)
+    await asyncio.wait_for(ran.wait(), 1)
+    await scheduler.stop()
+
+    assert job.task.done() and scheduler.jobs == {}
+
+
+def test_status_endpoint(client, db_session, monkeypatch):
+    monkeypatch.setattr(job_scheduler, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(job_scheduler, "engine", test_engine)
+    db_session.add(
+        BackgroundJob(
+            nome="sincronizacao_projetos", holder="api-1:7", status="sucesso", execucoes=3,
+            ultimo_inicio=datetime(2026, 2, 16, 9, 0), ultimo_fim=datetime(2026, 2, 16, 9, 0, 2),
+            ultima_duracao_ms=2000,
+        )
+    )
+    db_session.commit()
+
+    response = client.get("/api/v1/jobs")
+
+    assert response.status_code == 200
+    job = {j["nome"]: j for j in response.json()["jobs"]}["sincronizacao_projetos"]
+    assert (job["ultimo_holder"], job["holder"], job["em_execucao"]) == ("api-1:7", None, False)
+    assert job["ultima_duracao_ms"] == 2000
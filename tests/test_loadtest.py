@@ -0,0 +1,158 @@
+"""
+Testes para o Azure DevOps simulado e o gerador de carga (loadtest/).
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.services import timesheet_service
+from app.utils.azure_redirect import install_azure_redirect, is_azure_host
+from loadtest.driver import DriverOptions, LoadDriver, parse_ids, parse_mix, percentile
+from loadtest.fake_azure import FakeAzureConfig, create_app
+
+ORG = "loadtest"
+
+
+@pytest.fixture
+def fake_azure(monkeypatch):
+    """Direciona o httpx do timesheet para o simulador (sem latência)."""
+    app = create_app(FakeAzureConfig(latency_ms=0, jitter_ms=0, work_items=120))
+    real_client = httpx.AsyncClient
+
+    async def icon(org_name, token, work_item_type):
+        return ""
+
+    monkeypatch.setattr(
+        timesheet_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.ASGITransport(app=app), **kwargs),
+    )
+    monkeypatch.setattr(timesheet_service, "get_work_item_icon_data_uri", icon)
+    return app
+
+
+def test_timesheet_against_fake_azure(client, fake_azure):
+    """O timesheet é montado de ponta a ponta com as respostas do simulador"""
+    response = client.get("/api/v1/timesheet", params={"organization_name": ORG, "project_id": "DEV"})
+
+    assert response.status_code == 200
+    assert response.json()["work_items"]
+
+    counts = TestClient(fake_azure).get("/_fake/stats").json()
+    assert counts["wiql 200"] >= 1
+    assert any(key.startswith("workitems") for key in counts)
+
+
+def test_fault_injection():
+    """429 com Retry-After e 503 são injetados conforme a configuração"""
+    app = create_app(FakeAzureConfig(latency_ms=0, jitter_ms=0, throttle_rate=1.0, retry_after=7))
+    fake = TestClient(app)
+
+    throttled = fake.get(f"/{ORG}/_apis/projects")
+    assert throttled.status_code == 429
+    assert throttled.headers["Retry-After"] == "7"
+
+    fake.put("/_fake/config", json={"throttle_rate": 0, "error_rate": 1})
+    assert fake.get(f"/{ORG}/_apis/projects").status_code == 503
+
+    fake.put("/_fake/config", json={"error_rate": 0})
+    assert fake.get(f"/{ORG}/_apis/projects").status_code == 200
+    assert fake.get("/_fake/stats").json() == {"projects 200": 1, "projects 429": 1, "projects 503": 1}
+
+
+def test_batch_limit():
+    fake = TestClient(create_app(FakeAzureConfig(latency_ms=0, jitter_ms=0)))
+    ids = list(range(1000, 1201))
+
+    response = fake.post(f"/{ORG}/_apis/wit/workitemsbatch", json={"ids": ids})
+    assert response.status_code == 400
+
+    response = fake.post(f"/{ORG}/_apis/wit/workitemsbatch", json={"ids": ids[:200]})
+    assert response.json()["count"] == 200
+
+
+@pytest.mark.asyncio
+async def test_azure_redirect(monkeypatch):
+    """Só hosts do Azure DevOps são reescritos; o Host original é mantido"""
+    sent = []
+
+    async def record(self, request):
+        sent.append((str(request.url), request.headers["host"]))
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", record)
+    monkeypatch.setattr(get_settings(), "azure_devops_redirect_url", "http://127.0.0.1:9000")
+
+    assert install_azure_redirect()
+    assert install_azure_redirect()  # idempotente
+    async with httpx.AsyncClient() as azure_client:
+        await azure_client.get("https://dev.azure.com/org/_apis/projects?api-version=7.1")
+        await azure_client.get("https://example.com/x")
+
+    assert sent == [
+        ("http://127.0.0.1:9000/org/_apis/projects?api-version=7.1", "dev.azure.com"),
+        ("https://example.com/x", "example.com"),
+    ]
+    assert is_azure_host("org.visualstudio.com")
+    assert not is_azure_host("azure.com")
+
+
+def test_azure_redirect_ignored_in_production(monkeypatch):
+    monkeypatch.setattr(get_settings(), "azure_devops_redirect_url", "http://127.0.0.1:9000")
+    monkeypatch.setattr(get_settings(), "environment", "production")
+
+    assert not install_azure_redirect()
+
+
+def test_percentile_and_parsers():
+    values = [1.0, 2.0, 3.0, 4.0]
+
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 99) == 0.0
+    assert parse_mix("timesheet=3,crud") == {"timesheet": 3, "crud": 1}
+    assert parse_ids("10-12") == [10, 11, 12]
+
+
+@pytest.mark.asyncio
+async def test_driver_report():
+    """O gerador exercita os cenários e reporta percentis por operação"""
+    app = FastAPI()
+
+    @app.get("/api/v1/atividades")
+    def atividades():
+        return {"items": [{"id": "a1", "ativo": True}]}
+
+    @app.get("/api/v1/timesheet")
+    def timesheet():
+        return {}
+
+    @app.get("/api/v1/work-items/search")
+    def search():
+        return []
+
+    @app.post("/api/v1/apontamentos", status_code=201)
+    def create():
+        return {"id": "ap-1"}
+
+    @app.put("/api/v1/apontamentos/{apontamento_id}")
+    def update(apontamento_id: str):
+        return {"id": apontamento_id}
+
+    @app.delete("/api/v1/apontamentos/{apontamento_id}")
+    def delete(apontamento_id: str):
+        return Response(status_code=204)
+
+    options = DriverOptions(base_url="http://app", organization=ORG, project="DEV", rps=200, duration=0.2)
+    report = await LoadDriver(options, transport=httpx.ASGITransport(app=app)).run()
+
+    assert report["requests"] >= 40
+    assert options.atividade_id == "a1"
+    operations = report["operations"]
+    assert set(operations) <= {"timesheet", "search", "apontamento.create", "apontamento.update", "apontamento.delete"}
+    assert operations["timesheet"]["errors"] == 0
+    assert operations["timesheet"]["p50_ms"] <= operations["timesheet"]["p99_ms"]
+    assert operations["apontamento.create"]["count"] == operations["apontamento.delete"]["count"]
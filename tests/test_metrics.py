@@ -0,0 +1,69 @@
+"""
+Testes para as métricas Prometheus (GET /metrics).
+"""
+
+import pytest
+import httpx
+
+from app.config import get_settings
+from app.metrics import REGISTRY, azure_labels
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://dev.azure.com/sefaz/DEV/_apis/wit/wiql?api-version=7.1", ("sefaz", "wiql")),
+        ("https://dev.azure.com/sefaz/DEV/_apis/wit/workitems?ids=1", ("sefaz", "workitems")),
+        ("https://dev.azure.com/sefaz/_apis/wit/workitemsbatch", ("sefaz", "workitems")),
+        ("https://dev.azure.com/sefaz/DEV/_apis/work/teamsettings/iterations/x/workitems", ("sefaz", "iterations")),
+        ("https://vssps.dev.azure.com/sefaz/_apis/profile/profiles/me", ("sefaz", "profile")),
+        ("https://dev.azure.com/sefaz/_apis/wit/workitemicons/icon_book?color=009CCC", ("sefaz", "icons")),
+        ("https://sefaz.visualstudio.com/_apis/projects", ("sefaz", "projects")),
+        ("https://example.com/_apis/wit/wiql", None),
+    ],
+)
+def test_azure_labels(url, expected):
+    assert azure_labels(url) == expected
+
+
+def _sample(body: str, prefix: str) -> float:
+    """Valor da primeira linha da exposição que começa com prefix."""
+    for line in body.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"métrica ausente: {prefix}")
+
+
+def test_metrics_endpoint_exposes_routes_azure_and_caches(client):
+    response = client.get("/api/v1/atividades")
+    assert response.status_code == 200
+
+    body = client.get("/metrics").text
+
+    assert _sample(
+        body, 'aponta_http_request_duration_seconds_count{method="GET",route="/api/v1/atividades",status="200"}'
+    ) >= 1
+    # A autenticação por PAT consulta connectionData/profile (família "profile")
+    assert 'aponta_azure_requests_total{endpoint="profile",org="test"' in body
+    assert 'aponta_cache_hits_total{cache="referencia"}' in body
+    assert 'aponta_cache_misses_total{cache="semanas"}' in body
+
+
+@pytest.mark.asyncio
+async def test_azure_calls_counted_by_status():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429)
+
+    labels = {"org": "metricas", "endpoint": "wiql", "status": "429"}
+    before = REGISTRY.get_sample_value("aponta_azure_requests_total", labels) or 0
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await client.post("https://dev.azure.com/metricas/DEV/_apis/wit/wiql", json={})
+    assert REGISTRY.get_sample_value("aponta_azure_requests_total", labels) == before + 1
+
+
+def test_metrics_disabled_in_production(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "environment", "production")
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(get_settings(), "metrics_enabled", True)
+    assert client.get("/metrics").status_code == 200
@@ -0,0 +1,124 @@
+"""
+Testes para paginação por cursor (keyset pagination).
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+from uuid import UUID, uuid4
+
+from app.models.apontamento import Apontamento
+from app.models.atividade import Atividade
+from app.repositories.apontamento import ApontamentoRepository
+from app.repositories.atividade import AtividadeRepository
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+class TestCursorEncoding:
+    """Testes para encode_cursor() / decode_cursor()"""
+
+    def test_roundtrip(self):
+        """Valores devem ser recuperados com os tipos originais"""
+        values = (date(2026, 1, 19), datetime(2026, 1, 19, 10, 30, 0, 123456), uuid4())
+        cursor = encode_cursor(*values)
+        result = decode_cursor(cursor, (date.fromisoformat, datetime.fromisoformat, UUID))
+        assert tuple(result) == values
+
+    def test_invalid_base64_raises(self):
+        """Cursor corrompido deve lançar ValueError"""
+        with pytest.raises(ValueError, match="Cursor de paginação inválido"):
+            decode_cursor("%%%", (str,))
+
+    def test_wrong_size_raises(self):
+        """Cursor com número de chaves diferente deve lançar ValueError"""
+        cursor = encode_cursor("a", "b")
+        with pytest.raises(ValueError, match="Cursor de paginação inválido"):
+            decode_cursor(cursor, (str,))
+
+
+@pytest.fixture
+def atividade(db_session):
+    """Cria uma atividade ativa para os apontamentos."""
+    atividade = Atividade(nome="Desenvolvimento", ativo=True)
+    db_session.add(atividade)
+    db_session.commit()
+    return atividade
+
+
+@pytest.fixture
+def apontamentos(db_session, atividade):
+    """Cria 25 apontamentos em 5 dias (5 por dia)."""
+    base = datetime(2026, 1, 19, 8, 0, 0)
+    for i in range(25):
+        db_session.add(
+            Apontamento(
+                work_item_id=100,
+                project_id="50a9ca09-710f-4478-8278-2d069902d2af",
+                organization_name="sefaz-ceara",
+                data_apontamento=date(2026, 1, 19) + timedelta(days=i // 5),
+                duracao="01:00",
+                id_atividade=atividade.id,
+                usuario_id="user-1",
+                usuario_nome="Usuário",
+                criado_em=base + timedelta(minutes=i),
+                atualizado_em=base + timedelta(minutes=i),
+            )
+        )
+    db_session.commit()
+
+
+class TestApontamentoKeyset:
+    """Testes para a paginação por cursor de ApontamentoRepository"""
+
+    def test_cursor_pages_match_offset_pages(self, db_session, apontamentos):
+        """Percorrer por cursor deve retornar a mesma sequência que OFFSET"""
+        repository = ApontamentoRepository(db_session)
+        expected, total, _ = repository.get_all(limit=100)
+        assert total == 25
+
+        seen = []
+        cursor = None
+        while True:
+            page, page_total, cursor = repository.get_all(
+                limit=10, cursor=cursor, include_total=False
+            )
+            assert page_total is None
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        assert [a.id for a in seen] == [a.id for a in expected]
+
+    def test_last_page_has_no_cursor(self, db_session, apontamentos):
+        """A última página não deve retornar next_cursor"""
+        repository = ApontamentoRepository(db_session)
+        page, _, cursor = repository.get_by_work_item(
+            work_item_id=100,
+            organization_name="sefaz-ceara",
+            project_id="50a9ca09-710f-4478-8278-2d069902d2af",
+            limit=25,
+        )
+        assert len(page) == 25
+        assert cursor is None
+
+
+class TestAtividadeKeyset:
+    """Testes para a paginação por cursor de AtividadeRepository"""
+
+    def test_cursor_pages(self, db_session):
+        """Deve percorrer todas as atividades sem repetição"""
+        base = datetime(2026, 1, 1, 8, 0, 0)
+        for i in range(7):
+            db_session.add(
+                Atividade(nome=f"Atividade {i}", ativo=True, criado_em=base + timedelta(hours=i))
+            )
+        db_session.commit()
+
+        repository = AtividadeRepository(db_session)
+        first, total, cursor = repository.get_all(limit=3)
+        second, _, cursor = repository.get_all(limit=3, cursor=cursor)
+        third, _, cursor = repository.get_all(limit=3, cursor=cursor)
+
+        assert total == 7
+        assert cursor is None
+        nomes = [a.nome for a in first + second + third]
+        assert nomes == [f"Atividade {i}" for i in range(6, -1, -1)]
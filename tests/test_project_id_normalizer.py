@@ -5,6 +5,7 @@ Testes para normalização de project_id.
 import pytest
 from uuid import UUID
 from app.utils.project_id_normalizer import (
+    invalidate_project_id_cache,
     is_valid_uuid,
     validate_project_id_format,
     normalize_project_id,
@@ -103,6 +104,36 @@ class TestNormalizeProjectId:
         assert result1 == result2 == result3
 
 
+class TestProjectIdCache:
+    """Testes para o cache de resolução nome -> UUID"""
+
+    def test_resolved_name_is_cached(self, db_session, mock_projetos):
+        """Após a primeira resolução, não deve consultar o banco novamente"""
+        from app.models.projeto import Projeto
+
+        invalidate_project_id_cache()
+        result1 = normalize_project_id("QA", db_session)
+
+        # Remove o projeto: a resolução deve continuar vindo do cache
+        db_session.query(Projeto).filter(Projeto.nome == "QA").delete()
+        db_session.commit()
+
+        result2 = normalize_project_id("qa", db_session)
+        assert result1 == result2 == "a1b2c3d4-e5f6-4789-a123-456789abcdef"
+
+    def test_invalidate_clears_cache(self, db_session, mock_projetos):
+        """invalidate_project_id_cache() deve forçar nova consulta ao banco"""
+        from app.models.projeto import Projeto
+
+        normalize_project_id("QA", db_session)
+        db_session.query(Projeto).filter(Projeto.nome == "QA").delete()
+        db_session.commit()
+
+        invalidate_project_id_cache()
+        with pytest.raises(ValueError, match="não encontrado"):
+            normalize_project_id("QA", db_session)
+
+
 # Fixtures para os testes
 @pytest.fixture
 def mock_projetos(db_session):
@@ -0,0 +1,172 @@
+"""
+Testes para a sincronização de projetos em segundo plano e as leituras
+limitadas pela data da última sincronização.
+"""
+
+import asyncio
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.auth import AzureDevOpsUser, get_current_user
+from app.database import get_session_factory
+from app.main import app
+from app.models.projeto import Projeto
+from app.services.projeto_service import ProjetoService
+from app.services.project_sync_scheduler import ProjectSyncScheduler, project_sync_scheduler
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def fake_sync(monkeypatch):
+    """Substitui sync_projects por uma versão que grava um projeto 'test' sincronizado agora."""
+    calls = []
+
+    async def sync_projects(self):
+        calls.append(self.user.display_name)
+        await asyncio.sleep(0.01)
+        projeto = self.db.query(Projeto).filter(Projeto.nome == "Sincronizado").first()
+        if not projeto:
+            projeto = Projeto(external_id=uuid.uuid4(), nome="Sincronizado", organizacao="test")
+            self.db.add(projeto)
+        projeto.last_sync_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return {"created": 1, "updated": 0, "unchanged": 0}
+
+    monkeypatch.setattr(ProjetoService, "sync_projects", sync_projects)
+    project_sync_scheduler.last_started_at = None
+    return calls
+
+
+@pytest.fixture
+def sync_client(client):
+    """Client com usuário (com token) e fábrica de sessões do banco de testes."""
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    app.dependency_overrides[get_current_user] = lambda: AzureDevOpsUser(
+        id="user-1", display_name="Usuário", token="token"
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_triggers_join_running_sync(test_db, fake_sync):
+    """Disparos simultâneos devem aguardar a mesma sincronização"""
+    scheduler = ProjectSyncScheduler()
+    user = AzureDevOpsUser(id="u", display_name="Manual")
+
+    results = await asyncio.gather(
+        *(scheduler.sync_now(TestingSessionLocal, user) for _ in range(3))
+    )
+
+    assert fake_sync == ["Manual"]
+    assert results[0] is results[1] is results[2]
+
+
+def test_stale_projects_trigger_sync(sync_client, db_session, fake_sync):
+    """Sem sincronização recente, GET /projetos sincroniza antes de responder"""
+    response = sync_client.get("/api/v1/projetos")
+    assert response.status_code == 200
+    assert [p["nome"] for p in response.json()] == ["Sincronizado"]
+    assert "x-last-sync-at" in response.headers
+    assert len(fake_sync) == 1
+
+    # Dados recentes: serve a tabela local sem sincronizar de novo
+    sync_client.get("/api/v1/projetos")
+    assert len(fake_sync) == 1
+
+
+def test_stale_unconfigured_org_does_not_trigger_sync(sync_client, db_session, fake_sync):
+    """Organização removida (não configurada) com dados antigos não força sincronização"""
+    db_session.add_all(
+        [
+            Projeto(
+                external_id=uuid.uuid4(),
+                nome="Atual",
+                organizacao="test",
+                last_sync_at=datetime.now(timezone.utc),
+            ),
+            Projeto(
+                external_id=uuid.uuid4(),
+                nome="Removida",
+                organizacao="removida",
+                last_sync_at=datetime.now(timezone.utc) - timedelta(days=30),
+            ),
+        ]
+    )
+    db_session.commit()
+
+    response = sync_client.get("/api/v1/projetos")
+
+    assert response.status_code == 200
+    assert fake_sync == []
+
+
+def test_failed_org_does_not_trigger_sync_on_reads(sync_client, db_session, fake_sync, monkeypatch):
+    """Organização que falhou na última sincronização fica para o job periódico"""
+    db_session.add(
+        Projeto(
+            external_id=uuid.uuid4(),
+            nome="DEV",
+            organizacao="test",
+            last_sync_at=datetime.now(timezone.utc) - timedelta(days=2),
+        )
+    )
+    db_session.commit()
+    monkeypatch.setattr(
+        project_sync_scheduler,
+        "last_result",
+        {"organizations": [{"organization": "test", "status": "error", "error": "401"}]},
+    )
+
+    response = sync_client.get("/api/v1/projetos")
+
+    assert response.status_code == 200
+    assert fake_sync == []
+
+
+def test_integracao_projetos_serves_local_when_fresh(sync_client, db_session):
+    """/integracao/projetos usa a tabela local enquanto a sincronização estiver recente"""
+    db_session.add_all(
+        [
+            Projeto(
+                external_id=uuid.uuid4(),
+                nome="DEV",
+                organizacao="test",
+                last_sync_at=datetime.now(timezone.utc),
+            ),
+            Projeto(
+                external_id=uuid.uuid4(),
+                nome="Outra org",
+                organizacao="outra",
+                last_sync_at=datetime.now(timezone.utc),
+            ),
+        ]
+    )
+    db_session.commit()
+
+    response = sync_client.get("/api/v1/integracao/projetos")
+    assert response.status_code == 200
+    assert response.headers["x-data-source"] == "local"
+    assert [p["name"] for p in response.json()] == ["DEV"]
+
+
+def test_integracao_projetos_stale_goes_to_azure(sync_client, db_session, monkeypatch):
+    """Com dados vencidos, /integracao/projetos consulta o Azure DevOps"""
+    db_session.add(
+        Projeto(
+            external_id=uuid.uuid4(),
+            nome="DEV",
+            organizacao="test",
+            last_sync_at=datetime.now(timezone.utc) - timedelta(days=2),
+        )
+    )
+    db_session.commit()
+
+    async def list_projects(self):
+        return [{"id": "azure", "name": "Do Azure"}]
+
+    monkeypatch.setattr("app.services.azure.AzureService.list_projects", list_projects)
+
+    response = sync_client.get("/api/v1/integracao/projetos")
+    assert response.headers["x-data-source"] == "azure"
+    assert response.json() == [{"id": "azure", "name": "Do Azure"}]
@@ -0,0 +1,99 @@
+"""
+Testes para a sincronização de projetos (ProjetoService.sync_projects).
+"""
+
+import pytest
+import uuid
+import httpx
+
+from app.auth import AzureDevOpsUser
+from app.models.projeto import Projeto
+from app.services import projeto_service
+from app.services.projeto_service import ProjetoService
+
+PROJETOS = {
+    "test": [
+        {"id": str(uuid.UUID(int=i + 1)), "name": f"Projeto {i}", "state": "wellFormed"}
+        for i in range(5)
+    ],
+    "outra": [
+        {"id": str(uuid.UUID(int=100)), "name": "Outra", "state": "wellFormed"},
+    ],
+}
+
+
+@pytest.fixture
+def azure_projects(monkeypatch):
+    """Simula a API de projetos paginando de 2 em 2 pelo continuation token."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        org = request.url.path.split("/")[1]
+        requests.append((org, dict(request.url.params)))
+        if org not in PROJETOS:
+            return httpx.Response(401, text="TF400813: não autorizado")
+        start = int(request.url.params.get("continuationToken", 0))
+        page = PROJETOS[org][start:start + 2]
+        headers = {}
+        if start + 2 < len(PROJETOS[org]):
+            headers["x-ms-continuationtoken"] = str(start + 2)
+        return httpx.Response(200, json={"value": page}, headers=headers)
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        projeto_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    monkeypatch.setattr(projeto_service.settings, "azure_devops_org_pats", "outra=pat-2")
+    monkeypatch.setattr(projeto_service.settings, "project_sync_page_size", 2)
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_and_upserts(db_session, azure_projects):
+    """Todas as páginas de todas as organizações devem ser gravadas"""
+    service = ProjetoService(db_session, AzureDevOpsUser(id="u", display_name="U"))
+
+    result = await service.sync_projects()
+
+    assert result["created"] == 6
+    assert result["updated"] == 0
+    assert db_session.query(Projeto).count() == 6
+    assert {r["organization"] for r in result["organizations"]} == {"test", "outra"}
+    # 5 projetos em páginas de 2 -> 3 requisições para "test"
+    assert len([r for r in azure_projects if r[0] == "test"]) == 3
+    assert all(params["$top"] == "2" for _, params in azure_projects)
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_unchanged(db_session, azure_projects, monkeypatch):
+    """Projetos sem alteração não devem ser regravados"""
+    service = ProjetoService(db_session, AzureDevOpsUser(id="u", display_name="U"))
+    await service.sync_projects()
+
+    alterados = [dict(p) for p in PROJETOS["test"]]
+    alterados[0]["name"] = "Renomeado"
+    monkeypatch.setitem(PROJETOS, "test", alterados)
+
+    result = await service.sync_projects()
+
+    assert result["created"] == 0
+    assert result["updated"] == 1
+    assert result["unchanged"] == 5
+    db_session.expire_all()
+    nomes = {p.nome for p in db_session.query(Projeto).all()}
+    assert "Renomeado" in nomes and "Projeto 0" not in nomes
+
+
+@pytest.mark.asyncio
+async def test_failed_org_reported_as_error(db_session, azure_projects, monkeypatch):
+    """Resposta de erro do Azure é registrada como erro da organização, não sucesso"""
+    monkeypatch.setattr(projeto_service.settings, "azure_devops_org_pats", "outra=pat-2,negada=pat-3")
+    service = ProjetoService(db_session, AzureDevOpsUser(id="u", display_name="U"))
+
+    result = await service.sync_projects()
+
+    status = {r["organization"]: r["status"] for r in result["organizations"]}
+    assert status == {"test": "success", "outra": "success", "negada": "error"}
+    assert result["created"] == 6
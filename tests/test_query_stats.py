@@ -0,0 +1,87 @@
+"""
+Testes para a contagem de SQL por requisição (headers X-DB-* e alerta de N+1).
+"""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.query_stats import QueryStatsMiddleware, fingerprint, instrument_engine
+from tests.conftest import engine
+
+
+@pytest.fixture(autouse=True)
+def instrumented_engine():
+    instrument_engine(engine)
+
+
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        ("SELECT * FROM t WHERE id = ?", "SELECT * FROM t WHERE id = ?"),
+        ("SELECT *\n  FROM t WHERE id = %(id_1)s", "SELECT * FROM t WHERE id = ?"),
+        ("SELECT * FROM t WHERE nome = 'a''b' AND n = 42", "SELECT * FROM t WHERE nome = ? AND n = ?"),
+        ("SELECT * FROM t WHERE id IN (?, ?, ?)", "SELECT * FROM t WHERE id IN (?)"),
+        ("SELECT * FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s)", "SELECT * FROM t WHERE id IN (?)"),
+        ("SELECT t_1.id FROM t AS t_1", "SELECT t_1.id FROM t AS t_1"),
+    ],
+)
+def test_fingerprint(statement, expected):
+    assert fingerprint(statement) == expected
+
+
+def test_headers_on_api_response(client):
+    response = client.get("/api/v1/atividades")
+
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Query-Count"]) >= 1
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    assert response.headers["X-DB-Repeated-Queries"] == "0"
+
+
+def test_headers_disabled_in_production(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "environment", "production")
+    assert "X-DB-Query-Count" not in client.get("/api/v1/atividades").headers
+
+    monkeypatch.setattr(get_settings(), "query_stats_headers", True)
+    assert "X-DB-Query-Count" in client.get("/api/v1/atividades").headers
+
+
+@pytest.fixture
+def n_plus_one_client():
+    """App mínima cuja rota repete o mesmo SELECT por id."""
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/itens")
+    def itens():
+        with engine.connect() as conn:
+            return [conn.execute(text("SELECT :id AS id"), {"id": i}).scalar() for i in range(4)]
+
+    return TestClient(app)
+
+
+def test_repeated_statement_logs_warning(n_plus_one_client, monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "query_repeat_threshold", 3)
+    monkeypatch.setattr(get_settings(), "query_budget_per_request", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+        response = n_plus_one_client.get("/itens")
+
+    assert response.headers["X-DB-Query-Count"] == "4"
+    assert response.headers["X-DB-Repeated-Queries"] == "1"
+    assert any("GET /itens: comando repetido 4x" in r.message for r in caplog.records)
+
+
+def test_query_budget_logs_warning(n_plus_one_client, monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "query_repeat_threshold", 0)
+    monkeypatch.setattr(get_settings(), "query_budget_per_request", 2)
+
+    with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+        n_plus_one_client.get("/itens")
+
+    assert any("GET /itens: 4 comandos SQL (orçamento 2" in r.message for r in caplog.records)
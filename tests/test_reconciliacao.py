@@ -0,0 +1,199 @@
+"""
+Testes para a reconciliação do CompletedWork no Azure DevOps com os totais locais.
+"""
+
+import asyncio
+import json
+import time
+from datetime import date
+
+import httpx
+import pytest
+
+from app.database import get_session_factory
+from app.main import app
+from app.models.apontamento import Apontamento
+from app.models.atividade import Atividade
+from app.repositories.apontamento import ApontamentoRepository
+from app.repositories.reconciliacao import ReconciliacaoRepository
+from app.services import reconciliacao_service
+from app.services.reconciliacao_service import ReconciliacaoService
+from tests.conftest import TestingSessionLocal
+
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+
+COMPLETED = "Microsoft.VSTS.Scheduling.CompletedWork"
+REMAINING = "Microsoft.VSTS.Scheduling.RemainingWork"
+ORIGINAL = "Microsoft.VSTS.Scheduling.OriginalEstimate"
+
+
+def seed(db, duracoes: dict[int, list[str]]) -> None:
+    atividade = Atividade(nome="Desenvolvimento", ativo=True)
+    db.add(atividade)
+    db.flush()
+    db.add_all(
+        Apontamento(
+            work_item_id=work_item_id,
+            project_id=PROJECT_ID,
+            organization_name=ORG,
+            data_apontamento=date(2026, 1, 19),
+            duracao=duracao,
+            id_atividade=atividade.id,
+            usuario_id="user-1",
+            usuario_nome="Usuário",
+        )
+        for work_item_id, lista in duracoes.items()
+        for duracao in lista
+    )
+    db.commit()
+
+
+@pytest.fixture
+def azure(monkeypatch):
+    """Simula workitemsbatch e PATCH de work items com os valores de `state`."""
+    calls = {"batches": [], "patches": {}, "max_concurrent_patches": 0}
+    state: dict[int, dict] = {}
+    running = [0]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.method == "POST":
+            calls["batches"].append(body["ids"])
+            return httpx.Response(
+                200,
+                json={"value": [{"id": i, "rev": 7, "fields": state[i]} if i in state else None for i in body["ids"]]},
+            )
+        running[0] += 1
+        calls["max_concurrent_patches"] = max(calls["max_concurrent_patches"], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        calls["patches"][int(request.url.path.rsplit("/", 1)[-1])] = body
+        return httpx.Response(200, json={})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        reconciliacao_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    monkeypatch.setattr(reconciliacao_service.settings, "reconciliation_max_requests_per_second", 0)
+    calls["state"] = state
+    return calls
+
+
+def test_totals_in_one_aggregate(db_session):
+    seed(db_session, {100: ["01:30", "00:45"], 101: ["08:00"]})
+
+    totals = ReconciliacaoRepository(db_session).work_item_totals()
+
+    assert totals == [(ORG, 100, PROJECT_ID, 135), (ORG, 101, PROJECT_ID, 480)]
+
+
+@pytest.mark.asyncio
+async def test_dry_run_only_reports(db_session, azure):
+    seed(db_session, {100: ["02:00"], 101: ["01:30"], 102: ["01:00"]})
+    azure["state"].update({
+        100: {COMPLETED: 1.0, REMAINING: 7.0, ORIGINAL: 8.0},
+        101: {COMPLETED: 1.5, REMAINING: 6.5, ORIGINAL: 8.0},
+    })
+
+    execucao = await ReconciliacaoService(db_session).reconciliar(dry_run=True)
+
+    assert azure["patches"] == {}
+    assert (execucao.total_work_items, execucao.divergentes, execucao.corrigidos) == (3, 1, 0)
+    assert execucao.nao_encontrados == 1
+    itens = {i.work_item_id: i for i in ReconciliacaoRepository(db_session).list_items(execucao.id)}
+    assert set(itens) == {100, 102}
+    assert (itens[100].acao, itens[100].horas_local, itens[100].remaining_work_novo) == ("divergente", 2.0, 6.0)
+    assert itens[102].acao == "nao_encontrado"
+
+
+@pytest.mark.asyncio
+async def test_patches_only_drifted_items(db_session, azure):
+    seed(db_session, {100: ["02:00"], 101: ["01:30"]})
+    azure["state"].update({
+        100: {COMPLETED: 1.0, ORIGINAL: 1.5},
+        101: {COMPLETED: 1.5, ORIGINAL: 8.0},
+    })
+
+    execucao = await ReconciliacaoService(db_session).reconciliar()
+
+    assert list(azure["patches"]) == [100]
+    assert azure["patches"][100] == [
+        {"op": "test", "path": "/rev", "value": 7},
+        {"op": "add", "path": f"/fields/{COMPLETED}", "value": 2.0},
+        {"op": "add", "path": f"/fields/{REMAINING}", "value": 0},
+    ]
+    assert (execucao.status, execucao.corrigidos, execucao.falhas) == ("sucesso", 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_deleted_last_apontamento_patched_to_zero(db_session, azure):
+    """Exclusão cujo recálculo no Azure falhou: o work item sem apontamentos volta a 0"""
+    seed(db_session, {100: ["02:00"]})
+    apontamento = db_session.query(Apontamento).one()
+    ApontamentoRepository(db_session).delete(apontamento.id)
+    azure["state"][100] = {COMPLETED: 2.0, REMAINING: 6.0, ORIGINAL: 8.0}
+
+    execucao = await ReconciliacaoService(db_session).reconciliar()
+
+    assert azure["patches"][100][1:] == [
+        {"op": "add", "path": f"/fields/{COMPLETED}", "value": 0.0},
+        {"op": "add", "path": f"/fields/{REMAINING}", "value": 8.0},
+    ]
+    assert (execucao.total_work_items, execucao.corrigidos) == (1, 1)
+    # Reconciliada: a pendência da exclusão não volta na próxima execução
+    assert ReconciliacaoRepository(db_session).work_item_totals() == []
+
+
+@pytest.mark.asyncio
+async def test_batches_of_200_and_bounded_concurrency(db_session, azure, monkeypatch):
+    monkeypatch.setattr(reconciliacao_service.settings, "reconciliation_concurrency", 2)
+    seed(db_session, {wi: ["01:00"] for wi in range(1, 451)})
+    azure["state"].update({wi: {COMPLETED: 0.0} for wi in range(1, 451)})
+
+    execucao = await ReconciliacaoService(db_session).reconciliar()
+
+    assert [len(ids) for ids in azure["batches"]] == [200, 200, 50]
+    assert execucao.corrigidos == 450
+    assert azure["max_concurrent_patches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_requests(monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(round(seconds, 2))
+
+    monkeypatch.setattr(reconciliacao_service.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(reconciliacao_service.time, "monotonic", lambda: 100.0)
+    limiter = reconciliacao_service.RateLimiter(per_second=4)
+
+    for _ in range(3):
+        await limiter.wait()
+
+    assert slept == [0.25, 0.5]
+
+
+def test_endpoints(client, db_session, azure):
+    """POST responde na hora com a execução registrada; o resultado sai no GET"""
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    seed(db_session, {100: ["02:00"]})
+    azure["state"][100] = {COMPLETED: 1.0}
+
+    response = client.post("/api/v1/reconciliacao", params={"organization_name": ORG})
+    assert response.status_code == 202
+    execucao = response.json()
+    assert (execucao["dry_run"], execucao["status"]) == (True, "executando")
+
+    deadline = time.monotonic() + 5
+    while reconciliacao_service.reconciliacao_scheduler._tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert [e["id"] for e in client.get("/api/v1/reconciliacao").json()] == [execucao["id"]]
+    detalhe = client.get(f"/api/v1/reconciliacao/{execucao['id']}").json()
+    assert (detalhe["status"], detalhe["divergentes"], detalhe["corrigidos"]) == ("sucesso", 1, 0)
+    assert detalhe["itens"][0]["work_item_id"] == 100
+    assert client.get("/api/v1/reconciliacao/00000000-0000-0000-0000-000000000000").status_code == 404
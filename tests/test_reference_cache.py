@@ -0,0 +1,123 @@
+"""
+Testes para o cache versionado de atividades e projetos.
+"""
+
+import pytest
+import uuid
+from sqlalchemy import event
+
+from app.auth import AzureDevOpsUser, get_current_user
+from app.main import app
+from app.models.atividade import Atividade
+from app.models.atividade_projeto import AtividadeProjeto
+from app.models.projeto import Projeto
+from app.repositories.atividade import AtividadeRepository
+from app.repositories.apontamento import ApontamentoRepository
+from app.repositories.reference_cache import reference_cache
+from app.schemas.atividade import AtividadeCreate, AtividadeUpdate
+from tests.conftest import engine
+
+
+@pytest.fixture
+def projeto(db_session):
+    """Cria um projeto local."""
+    projeto = Projeto(external_id=uuid.uuid4(), nome="DEV")
+    db_session.add(projeto)
+    db_session.commit()
+    return projeto
+
+
+@pytest.fixture
+def auth_client(client):
+    """Client com usuário fixo."""
+    app.dependency_overrides[get_current_user] = lambda: AzureDevOpsUser(
+        id="user-1", display_name="Usuário", email="user@test.com"
+    )
+    return client
+
+
+class TestReferenceCache:
+    """Testes para ReferenceDataCache"""
+
+    def test_writes_bump_version(self, db_session, projeto):
+        """Escritas do AtividadeRepository devem invalidar o snapshot"""
+        repository = AtividadeRepository(db_session)
+        etag_inicial = reference_cache.snapshot(db_session).etag
+        version = reference_cache.version
+
+        atividade = repository.create(
+            AtividadeCreate(nome="Desenvolvimento", ids_projetos=[projeto.external_id])
+        )
+        assert reference_cache.version > version
+        snapshot = reference_cache.snapshot(db_session)
+        assert snapshot.etag != etag_inicial
+        assert atividade.id in snapshot.atividades_por_projeto[projeto.id]
+
+        repository.update(atividade.id, AtividadeUpdate(ativo=False))
+        assert not reference_cache.get_atividade(db_session, atividade.id).ativo
+
+        repository.delete(atividade.id)
+        assert reference_cache.get_atividade(db_session, atividade.id) is None
+
+    def test_validate_atividade_uses_cache(self, db_session, projeto):
+        """Validações não devem consultar o banco quando o cache está quente"""
+        atividade = Atividade(nome="Doc", ativo=True)
+        db_session.add(atividade)
+        db_session.commit()
+
+        # Primeira validação: miss no cache, confirma no banco e invalida
+        assert ApontamentoRepository(db_session)._validate_atividade(atividade.id)
+        reference_cache.snapshot(db_session)
+
+        queries = []
+
+        def count(*args):
+            queries.append(args)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            ApontamentoRepository(db_session)._validate_atividade(atividade.id)
+            AtividadeRepository(db_session)._validate_projetos([projeto.external_id])
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert queries == []
+
+    def test_validate_projetos_unknown(self, db_session, projeto):
+        with pytest.raises(ValueError, match="Projetos não encontrados"):
+            AtividadeRepository(db_session)._validate_projetos([uuid.uuid4()])
+
+
+class TestEtag:
+    """Testes para ETag / If-None-Match nos endpoints de referência"""
+
+    def test_atividades_etag(self, auth_client, db_session, projeto):
+        atividade = Atividade(nome="Desenvolvimento", ativo=True)
+        db_session.add(atividade)
+        db_session.flush()
+        db_session.add(AtividadeProjeto(id_atividade=atividade.id, id_projeto=projeto.id))
+        db_session.commit()
+        reference_cache.bump()
+
+        response = auth_client.get("/api/v1/atividades", params={"id_projeto": str(projeto.id)})
+        assert response.status_code == 200
+        assert [i["nome"] for i in response.json()["items"]] == ["Desenvolvimento"]
+        etag = response.headers["etag"]
+
+        response = auth_client.get("/api/v1/atividades", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        auth_client.put(f"/api/v1/atividades/{atividade.id}", json={"nome": "Dev"})
+        response = auth_client.get("/api/v1/atividades", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_projetos_etag(self, auth_client, projeto):
+        response = auth_client.get("/api/v1/projetos")
+        assert response.status_code == 200
+        assert [p["nome"] for p in response.json()] == ["DEV"]
+
+        response = auth_client.get(
+            "/api/v1/projetos", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert response.status_code == 304
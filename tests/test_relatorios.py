@@ -0,0 +1,199 @@
+"""
+Testes para o rollup de horas (horas_diarias) e o relatório de horas.
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+
+from app.auth import AzureDevOpsUser, get_current_user
+from app.main import app
+from app.models.apontamento import Apontamento
+from app.models.atividade import Atividade
+from app.models.horas_diarias import HorasDiarias, HorasDiariasPendencia
+from app.repositories.apontamento import ApontamentoRepository
+from app.repositories.relatorio import RelatorioRepository
+from app.schemas.apontamento import ApontamentoUpdate
+from app.services.relatorio_service import RelatorioService, RollupScheduler
+
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+
+
+@pytest.fixture
+def atividades(db_session):
+    """Cria duas atividades ativas."""
+    dev = Atividade(nome="Desenvolvimento", ativo=True)
+    doc = Atividade(nome="Documentação", ativo=True)
+    db_session.add_all([dev, doc])
+    db_session.commit()
+    return dev, doc
+
+
+def _apontamento(atividade, dia, usuario_id="user-1", duracao="02:00", minuto=0):
+    momento = datetime(2026, 1, 19, 8, 0, 0) + timedelta(minutes=minuto)
+    return Apontamento(
+        work_item_id=100,
+        project_id=PROJECT_ID,
+        organization_name="sefaz-ceara",
+        data_apontamento=dia,
+        duracao=duracao,
+        id_atividade=atividade.id,
+        usuario_id=usuario_id,
+        usuario_nome=f"Nome {usuario_id}",
+        criado_em=momento,
+        atualizado_em=momento,
+    )
+
+
+@pytest.fixture
+def apontamentos(db_session, atividades):
+    """user-1: 2h dev em 19/01 e 20/01, 1h30 doc em 20/01; user-2: 1h dev em 03/02."""
+    dev, doc = atividades
+    db_session.add_all(
+        [
+            _apontamento(dev, date(2026, 1, 19), minuto=0),
+            _apontamento(dev, date(2026, 1, 20), minuto=1),
+            _apontamento(doc, date(2026, 1, 20), duracao="01:30", minuto=2),
+            _apontamento(dev, date(2026, 2, 3), usuario_id="user-2", duracao="01:00", minuto=3),
+        ]
+    )
+    db_session.commit()
+
+
+@pytest.fixture
+def rollup(db_session, apontamentos):
+    """Rollup atualizado com os apontamentos (o relatório não o atualiza)."""
+    RelatorioRepository(db_session).refresh()
+
+
+class TestRollupRefresh:
+    """Testes para RelatorioRepository.refresh()"""
+
+    def test_first_refresh_builds_everything(self, db_session, apontamentos):
+        repository = RelatorioRepository(db_session)
+        assert repository.refresh() == 3  # (org, 19/01), (org, 20/01), (org, 03/02)
+        assert db_session.query(HorasDiarias).count() == 4
+        assert repository.refresh() == 0  # nada mudou
+
+    def test_incremental_picks_new_rows(self, db_session, atividades, apontamentos):
+        repository = RelatorioRepository(db_session)
+        repository.refresh()
+
+        dev, _ = atividades
+        db_session.add(_apontamento(dev, date(2026, 1, 19), duracao="00:30", minuto=60))
+        db_session.commit()
+
+        assert repository.refresh() >= 1
+        linha = (
+            db_session.query(HorasDiarias)
+            .filter(HorasDiarias.dia == date(2026, 1, 19))
+            .one()
+        )
+        assert linha.total_minutos == 150
+        assert linha.total_apontamentos == 2
+
+    def test_update_and_delete_recompute_old_partition(self, db_session, apontamentos):
+        repository = RelatorioRepository(db_session)
+        repository.refresh()
+
+        apontamento_repo = ApontamentoRepository(db_session)
+        alvo = (
+            db_session.query(Apontamento)
+            .filter(Apontamento.data_apontamento == date(2026, 1, 19))
+            .one()
+        )
+        # Move o apontamento de dia: o dia antigo precisa ficar vazio
+        apontamento_repo.update(alvo.id, ApontamentoUpdate(data_apontamento=date(2026, 1, 21)))
+        repository.refresh()
+        dias = {h.dia for h in db_session.query(HorasDiarias).all()}
+        assert date(2026, 1, 19) not in dias
+        assert date(2026, 1, 21) in dias
+
+        apontamento_repo.delete(alvo.id)
+        repository.refresh()
+        dias = {h.dia for h in db_session.query(HorasDiarias).all()}
+        assert date(2026, 1, 21) not in dias
+
+
+    def test_pending_partition_marked_twice(self, db_session, apontamentos):
+        """Marcar a mesma partição de novo não falha por chave duplicada"""
+        apontamento_repo = ApontamentoRepository(db_session)
+        alvo = db_session.query(Apontamento).filter_by(data_apontamento=date(2026, 1, 19)).first()
+
+        apontamento_repo._mark_rollup_dirty(alvo)
+        db_session.commit()
+        apontamento_repo._mark_rollup_dirty(alvo)
+        db_session.commit()
+
+        assert db_session.query(HorasDiariasPendencia).count() == 1
+
+    def test_scheduled_job_refreshes(self, db_session, apontamentos):
+        assert RollupScheduler().refresh(session_factory=lambda: db_session) == 3
+        assert db_session.query(HorasDiarias).count() > 0
+
+
+class TestRelatorioHoras:
+    """Testes para RelatorioService.horas() e o endpoint"""
+
+    def test_group_by_usuario_e_mes(self, db_session, rollup):
+        resultado = RelatorioService(db_session).horas(
+            organization_name="sefaz-ceara",
+            data_inicio=date(2026, 1, 1),
+            data_fim=date(2026, 2, 28),
+            group_by=["usuario", "mes"],
+        )
+
+        items = {(i["usuario_id"], i["periodo"]): i for i in resultado["items"]}
+        assert items[("user-1", "2026-01")]["total_formatado"] == "05:30"
+        assert items[("user-1", "2026-01")]["usuario_nome"] == "Nome user-1"
+        assert items[("user-2", "2026-02")]["total_horas"] == 1.0
+        assert resultado["total_formatado"] == "06:30"
+        assert resultado["total_apontamentos"] == 4
+
+    def test_group_by_atividade_periodo_filtrado(self, db_session, rollup):
+        resultado = RelatorioService(db_session).horas(
+            organization_name="sefaz-ceara",
+            data_inicio=date(2026, 1, 20),
+            data_fim=date(2026, 1, 31),
+            group_by=["atividade"],
+        )
+
+        nomes = {i["atividade_nome"]: i["total_formatado"] for i in resultado["items"]}
+        assert nomes == {"Desenvolvimento": "02:00", "Documentação": "01:30"}
+
+    def test_invalid_group_by(self, db_session):
+        with pytest.raises(ValueError, match="Agrupamento inválido"):
+            RelatorioService(db_session).horas(
+                organization_name="sefaz-ceara",
+                data_inicio=date(2026, 1, 1),
+                data_fim=date(2026, 1, 31),
+                group_by=["semana"],
+            )
+
+    def test_endpoint(self, client, rollup):
+        app.dependency_overrides[get_current_user] = lambda: AzureDevOpsUser(
+            id="user-1", display_name="Usuário"
+        )
+        response = client.get(
+            "/api/v1/relatorios/horas",
+            params=[
+                ("organization_name", "sefaz-ceara"),
+                ("data_inicio", "2026-01-01"),
+                ("data_fim", "2026-01-31"),
+                ("group_by", "usuario"),
+                ("group_by", "dia"),
+            ],
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [i["periodo"] for i in data["items"]] == ["2026-01-19", "2026-01-20"]
+        assert data["total_formatado"] == "05:30"
+
+        response = client.get(
+            "/api/v1/relatorios/horas",
+            params={
+                "organization_name": "sefaz-ceara",
+                "data_inicio": "2026-02-01",
+                "data_fim": "2026-01-01",
+            },
+        )
+        assert response.status_code == 400
@@ -0,0 +1,62 @@
+"""
+Testes para o cache de introspecção do schema.
+"""
+
+from uuid import uuid4
+from sqlalchemy import inspect
+
+from app.models.atividade import Atividade
+from app.repositories.atividade import AtividadeRepository
+from app.utils import schema_cache
+from app.utils.schema_cache import refresh_schema_cache, table_exists
+from tests.conftest import engine
+
+
+def _count_inspections(monkeypatch) -> list:
+    calls = []
+
+    def counting_inspect(bind):
+        calls.append(bind)
+        return inspect(bind)
+
+    monkeypatch.setattr(schema_cache, "inspect", counting_inspect)
+    return calls
+
+
+class TestSchemaCache:
+    """Testes para table_exists() / refresh_schema_cache()"""
+
+    def test_catalog_queried_once(self, test_db, monkeypatch):
+        """Consultas repetidas não devem voltar ao catálogo"""
+        calls = _count_inspections(monkeypatch)
+
+        assert table_exists(engine, "atividades", None)
+        assert table_exists(engine, "atividade_projeto", None)
+        assert not table_exists(engine, "inexistente", None)
+
+        assert len(calls) == 1
+
+    def test_refresh_reloads(self, test_db, monkeypatch):
+        """refresh_schema_cache() deve refletir tabelas removidas"""
+        assert table_exists(engine, "atividades", None)
+
+        Atividade.__table__.drop(bind=engine)
+        assert table_exists(engine, "atividades", None)  # ainda em cache
+
+        refresh_schema_cache(engine)
+        assert not table_exists(engine, "atividades", None)
+
+        Atividade.__table__.create(bind=engine)
+        refresh_schema_cache()
+
+    def test_repository_uses_cache(self, db_session, monkeypatch):
+        """Listar atividades repetidamente não deve refazer a introspecção"""
+        repository = AtividadeRepository(db_session)
+        repository.get_all()
+
+        calls = _count_inspections(monkeypatch)
+        for _ in range(3):
+            repository.get_all(include_total=False)
+            repository.get_by_id(uuid4())
+
+        assert calls == []
@@ -0,0 +1,87 @@
+"""
+Testes para a resolução de ancestrais do timesheet (show_parents).
+"""
+
+import pytest
+import httpx
+
+from app.services import timesheet_service
+from app.services.ancestor_cache import ancestor_cache
+from app.services.timesheet_service import TimesheetService
+
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+
+# Epic 1 > Stories 10 e 11 > Tasks 100, 101 e 110 (as Tasks são as da iteration)
+AZURE_ITEMS = {
+    1: {"System.Title": "Epic", "System.WorkItemType": "Epic", "System.State": "Active"},
+    10: {"System.Title": "Story A", "System.WorkItemType": "User Story", "System.State": "Active", "System.Parent": 1},
+    11: {"System.Title": "Story B", "System.WorkItemType": "User Story", "System.State": "Active", "System.Parent": 1},
+}
+
+
+@pytest.fixture
+def azure_details(monkeypatch):
+    """Simula GET workitems?ids=... registrando os IDs de cada request."""
+    batches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ids = [int(i) for i in request.url.params["ids"].split(",")]
+        batches.append(sorted(ids))
+        return httpx.Response(
+            200, json={"value": [{"id": i, "fields": AZURE_ITEMS[i]} for i in ids if i in AZURE_ITEMS]}
+        )
+
+    async def icon(org_name, token, work_item_type):
+        return ""
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        timesheet_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    monkeypatch.setattr(timesheet_service, "get_work_item_icon_data_uri", icon)
+    ancestor_cache.clear()
+    yield batches
+    ancestor_cache.clear()
+
+
+def _task(id, parent_id):
+    return {"id": id, "title": f"Task {id}", "type": "Task", "state": "Active", "parent_id": parent_id}
+
+
+@pytest.mark.asyncio
+async def test_ancestors_fetched_level_by_level(db_session, azure_details):
+    """Os pais ausentes são buscados em um lote por nível e depois servidos do cache"""
+    service = TimesheetService(db_session)
+    tasks = [_task(100, 10), _task(101, 10), _task(110, 11)]
+
+    ancestors = await service._resolve_ancestors(ORG, PROJECT_ID, tasks)
+
+    assert azure_details == [[10, 11], [1]]
+    assert sorted(a["id"] for a in ancestors) == [1, 10, 11]
+    assert all(a["eh_ancestral"] for a in ancestors)
+
+    # Segunda chamada: nenhum request ao Azure
+    azure_details.clear()
+    ancestors = await service._resolve_ancestors(ORG, PROJECT_ID, tasks)
+    assert azure_details == []
+    assert sorted(a["id"] for a in ancestors) == [1, 10, 11]
+
+
+@pytest.mark.asyncio
+async def test_ancestors_complete_hierarchy(db_session, azure_details):
+    """Com os ancestrais, as Tasks deixam de ser raízes da árvore"""
+    service = TimesheetService(db_session)
+    tasks = [_task(100, 10), _task(110, 11)]
+    ancestors = await service._resolve_ancestors(ORG, PROJECT_ID, tasks)
+
+    week_dates = timesheet_service.get_week_dates()[2]
+    nodes = [service._build_work_item_timesheet(wi, week_dates, {}, week_dates[0]) for wi in tasks + ancestors]
+    roots = service._build_hierarchy(nodes)
+
+    assert [r.id for r in roots] == [1]
+    assert roots[0].eh_ancestral
+    assert [c.id for c in roots[0].children] == [10, 11]
+    assert [c.id for c in roots[0].children[0].children] == [100]
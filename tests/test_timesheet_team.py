@@ -0,0 +1,112 @@
+"""
+Testes para o timesheet semanal da equipe (visão de gestor).
+"""
+
+import pytest
+import httpx
+from datetime import date
+
+from app.models.apontamento import Apontamento
+from app.models.atividade import Atividade
+from app.repositories.work_item import WorkItemRepository
+from app.services import timesheet_service
+from app.services.timesheet_service import TimesheetService
+
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+WEEK = date(2026, 1, 19)
+
+
+@pytest.fixture
+def team_data(db_session):
+    """Dois usuários na semana; o work item 20 não está no índice local."""
+    WorkItemRepository(db_session).upsert_many(
+        ORG,
+        [{"id": 10, "title": "Task indexada", "work_item_type": "Task", "state": "Active",
+          "project_id": PROJECT_ID}],
+    )
+    atividade = Atividade(nome="Desenvolvimento", ativo=True)
+    db_session.add(atividade)
+    db_session.commit()
+    for usuario, work_item_id, dia, duracao in (
+        ("user-a", 10, 0, "01:30"),
+        ("user-a", 10, 0, "01:30"),
+        ("user-a", 20, 2, "00:45"),
+        ("user-b", 10, 4, "08:00"),
+        ("user-b", 10, 7, "02:00"),  # segunda seguinte: fora da semana
+    ):
+        db_session.add(
+            Apontamento(
+                work_item_id=work_item_id,
+                project_id=PROJECT_ID,
+                organization_name=ORG,
+                data_apontamento=date.fromordinal(WEEK.toordinal() + dia),
+                duracao=duracao,
+                id_atividade=atividade.id,
+                usuario_id=usuario,
+                usuario_nome=usuario.upper(),
+            )
+        )
+    db_session.commit()
+
+
+@pytest.fixture
+def azure(monkeypatch):
+    """Simula detalhes de work items e membros de time, registrando as URLs."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path.endswith("/members"):
+            return httpx.Response(200, json={"value": [{"identity": {"id": "user-b"}}]})
+        ids = [int(i) for i in request.url.params["ids"].split(",")]
+        return httpx.Response(200, json={"value": [
+            {"id": i, "fields": {"System.Title": f"Remota {i}", "System.WorkItemType": "Bug",
+                                 "System.State": "New"}}
+            for i in ids
+        ]})
+
+    async def icon(org_name, token, work_item_type):
+        return ""
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        timesheet_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    monkeypatch.setattr(timesheet_service, "get_work_item_icon_data_uri", icon)
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_team_timesheet_aggregates_per_user(db_session, team_data, azure):
+    """Uma linha por usuário, totais por dia e work items buscados uma vez"""
+    result = await TimesheetService(db_session).get_team_timesheet(ORG, PROJECT_ID, week_start=WEEK)
+
+    assert [u.usuario_id for u in result.usuarios] == ["user-a", "user-b"]
+    user_a = result.usuarios[0]
+    assert user_a.horas_dia == [3.0, 0, 0.75, 0, 0, 0, 0]
+    assert user_a.total_formatado == "03:45"
+    assert [i.work_item_id for i in user_a.itens] == [10, 20]
+    assert result.usuarios[1].total_horas == 8.0
+    assert result.total_geral_horas == 11.75
+
+    # Somente o item ausente do índice local foi ao Azure
+    assert len(azure) == 1
+    assert result.work_items[10].title == "Task indexada"
+    assert result.work_items[20].title == "Remota 20"
+
+
+def test_team_endpoint_filters_by_team(client, db_session, team_data, azure):
+    response = client.get(
+        "/api/v1/timesheet/team",
+        params={"organization_name": ORG, "project_id": PROJECT_ID,
+                "week_start": WEEK.isoformat(), "team": "Equipe"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [u["usuario_id"] for u in data["usuarios"]] == ["user-b"]
+    assert list(data["work_items"]) == ["10"]
+    assert data["horas_dia"][4] == 8.0
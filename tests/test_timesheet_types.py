@@ -0,0 +1,74 @@
+"""
+Testes para o dicionário de tipos (types) do timesheet.
+"""
+
+import pytest
+import httpx
+
+from app.config import get_settings
+from app.services import timesheet_service
+
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+ITERATION_ID = "3f1c9a52-0000-4000-8000-000000000001"
+
+
+@pytest.fixture
+def iteration(monkeypatch):
+    """Iteration com uma Story (10) e duas Tasks (11 e 12)."""
+    fields = {
+        10: {"System.Title": "Story", "System.WorkItemType": "User Story", "System.State": "Active"},
+        11: {"System.Title": "Task A", "System.WorkItemType": "Task", "System.State": "Active", "System.Parent": 10},
+        12: {"System.Title": "Task B", "System.WorkItemType": "Task", "System.State": "Closed", "System.Parent": 10},
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/workitems") and "iterations" in request.url.path:
+            return httpx.Response(200, json={"workItemRelations": [{"target": {"id": i}} for i in fields]})
+        if request.url.path.endswith("/wit/workitems"):
+            return httpx.Response(200, json={"value": [{"id": i, "fields": f} for i, f in fields.items()]})
+        return httpx.Response(200, json={})
+
+    async def icon(org_name, token, work_item_type):
+        return f"data:image/svg+xml,{work_item_type}"
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        timesheet_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    monkeypatch.setattr(timesheet_service, "get_work_item_icon_data_uri", icon)
+
+
+def _get(client, **params):
+    return client.get(
+        "/api/v1/timesheet",
+        params={"organization_name": ORG, "project_id": PROJECT_ID, "iteration_id": ITERATION_ID, **params},
+    )
+
+
+def test_types_sent_once_without_inline_icons(client, iteration):
+    response = _get(client, include_icon_url="false")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["types"]) == {"Task", "User Story"}
+    task = data["types"]["Task"]
+    assert task["icon"] == "data:image/svg+xml,Task"
+    assert (task["color"], task["nivel"]) == ("#F2CB1D", 3)
+    assert "Active" in task["estados_editaveis"] and "Closed" not in task["estados_editaveis"]
+
+    story = data["work_items"][0]
+    assert story["type"] == "User Story" and story["icon_url"] == ""
+    assert [c["icon_url"] for c in story["children"]] == ["", ""]
+
+
+def test_inline_icons_follow_compatibility_setting(client, iteration, monkeypatch):
+    """Sem o parâmetro, icon_url segue TIMESHEET_INCLUDE_ICON_URL"""
+    story = _get(client).json()["work_items"][0]
+    assert story["icon_url"] == "data:image/svg+xml,User Story"
+
+    monkeypatch.setattr(get_settings(), "timesheet_include_icon_url", False)
+    story = _get(client).json()["work_items"][0]
+    assert story["icon_url"] == ""
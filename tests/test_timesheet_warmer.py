@@ -0,0 +1,150 @@
+"""
+Testes para os caches do timesheet e o aquecimento preditivo.
+"""
+
+import pytest
+import httpx
+from datetime import date, datetime, timedelta
+
+from app.database import get_session_factory
+from app.main import app
+from app.models.atividade import Atividade
+from app.repositories.apontamento import ApontamentoRepository
+from app.repositories.timesheet_cache import iteration_cache, week_cache
+from app.schemas.apontamento import ApontamentoCreate
+from app.services import timesheet_service
+from app.services.timesheet_service import TimesheetService
+from app.services.timesheet_warmer import TimesheetWarmer, seconds_until_next_run, timesheet_warmer
+from tests.conftest import TestingSessionLocal
+
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+ITERATION_ID = "3f1c9a52-0000-4000-8000-000000000001"
+WEEK = date(2026, 1, 19)
+
+
+@pytest.fixture
+def atividade(db_session):
+    atividade = Atividade(nome="Desenvolvimento", ativo=True)
+    db_session.add(atividade)
+    db_session.commit()
+    return atividade
+
+
+def _apontar(db_session, atividade, dia: date, duracao: str = "02:00"):
+    return ApontamentoRepository(db_session).create(
+        ApontamentoCreate(
+            work_item_id=100,
+            project_id=PROJECT_ID,
+            organization_name=ORG,
+            data_apontamento=dia,
+            duracao=duracao,
+            id_atividade=atividade.id,
+            usuario_id="user-1",
+            usuario_nome="Usuário",
+        )
+    )
+
+
+@pytest.fixture
+def azure(monkeypatch):
+    """Simula a iteration (work item 100) e a listagem de times/iterations atuais."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        requests.append(path)
+        if path.endswith("/teams"):
+            return httpx.Response(200, json={"value": [{"id": "time-a"}, {"id": "time-b"}]})
+        if path.endswith("/teamsettings/iterations"):
+            return httpx.Response(200, json={"value": [{"id": ITERATION_ID}]})
+        if path.endswith(f"/iterations/{ITERATION_ID}/workitems"):
+            return httpx.Response(200, json={"workItemRelations": [{"target": {"id": 100}}]})
+        return httpx.Response(200, json={"value": [
+            {"id": 100, "fields": {"System.Title": "Task", "System.WorkItemType": "Task", "System.State": "Active"}}
+        ]})
+
+    async def icon(org_name, token, work_item_type):
+        return ""
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        timesheet_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    monkeypatch.setattr(timesheet_service, "get_work_item_icon_data_uri", icon)
+    return requests
+
+
+def test_week_cache_invalidated_by_writes(db_session, atividade):
+    """A semana fica em cache até uma escrita no projeto"""
+    _apontar(db_session, atividade, WEEK)
+    service = TimesheetService(db_session)
+    week_end = WEEK + timedelta(days=6)
+
+    first = service._get_apontamentos_semana(ORG, PROJECT_ID, WEEK, week_end)
+    assert service._get_apontamentos_semana(ORG, PROJECT_ID, WEEK, week_end) is first
+    assert first[100][WEEK][0].atividade_nome == "Desenvolvimento"
+
+    _apontar(db_session, atividade, WEEK, "01:00")
+    refreshed = service._get_apontamentos_semana(ORG, PROJECT_ID, WEEK, week_end)
+    assert len(refreshed[100][WEEK]) == 2
+    assert week_cache.stats()["invalidacoes"] == 1
+
+
+def test_timesheet_prefetches_adjacent_weeks(client, db_session, atividade, azure):
+    """O timesheet agenda as semanas vizinhas; a navegação seguinte acerta o prefetch"""
+    _apontar(db_session, atividade, WEEK + timedelta(days=7))
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    params = {"organization_name": ORG, "project_id": PROJECT_ID, "iteration_id": ITERATION_ID}
+    carregadas = timesheet_warmer.semanas_carregadas
+
+    response = client.get("/api/v1/timesheet", params={**params, "week_start": WEEK.isoformat()})
+    assert response.status_code == 200
+    assert week_cache.contains((ORG, PROJECT_ID, WEEK - timedelta(days=7), None))
+    assert week_cache.contains((ORG, PROJECT_ID, WEEK + timedelta(days=7), None))
+
+    azure.clear()
+    next_week = (WEEK + timedelta(days=7)).isoformat()
+    response = client.get("/api/v1/timesheet", params={**params, "week_start": next_week})
+    assert response.json()["total_geral_horas"] == 2.0
+    # Work items da iteration servidos do cache (só a autenticação foi ao Azure)
+    assert not any("/_apis/wit/" in path or "/_apis/work/" in path for path in azure)
+
+    stats = client.get("/api/v1/timesheet/cache/stats").json()
+    assert stats["semanas"]["prefetch_hits"] == 1
+    assert stats["iterations"]["hits"] == 1
+    assert stats["aquecimento"]["semanas_carregadas"] - carregadas == 3
+
+
+def test_prefetch_respects_budget(db_session, monkeypatch):
+    monkeypatch.setattr(timesheet_service.settings, "timesheet_prefetch_max_per_minute", 1)
+    warmer = TimesheetWarmer()
+
+    loaded = warmer.prefetch_adjacent_weeks(TestingSessionLocal, ORG, PROJECT_ID, WEEK)
+
+    assert loaded == 1
+    assert warmer.ignorados_orcamento == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_current_iterations(db_session, atividade, azure):
+    """Iterations atuais dos times dos projetos ativos vão para o cache uma vez"""
+    _apontar(db_session, atividade, date.today())
+
+    result = await TimesheetWarmer().warm_current_iterations(TestingSessionLocal)
+
+    assert result == {"projetos": 1, "iterations": 1, "ignoradas": 0, "falhas": 0}
+    assert iteration_cache.contains((ORG, PROJECT_ID, ITERATION_ID))
+
+    items = await TimesheetService(db_session)._get_work_items_by_iteration_api(ORG, PROJECT_ID, ITERATION_ID)
+    assert [i["id"] for i in items] == [100]
+    assert iteration_cache.stats()["prefetch_hit_rate"] == 1.0
+
+
+def test_next_run_skips_weekend():
+    friday_evening = datetime(2026, 1, 23, 18, 0)
+    assert seconds_until_next_run(friday_evening, 7, 30) == (2 * 24 + 13.5) * 3600
+    monday_early = datetime(2026, 1, 26, 6, 0)
+    assert seconds_until_next_run(monday_early, 7, 30) == 1.5 * 3600
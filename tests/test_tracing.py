@@ -0,0 +1,93 @@
+"""
+Testes para o tracing (spans de requisições, HTTP, SQL e passos de serviço).
+"""
+
+import asyncio
+import json
+
+import pytest
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind
+
+from app import tracing
+from app.tracing import OtlpJsonFileExporter, configure_tracing, shutdown_tracing, traced
+from tests.conftest import engine
+
+
+@pytest.fixture
+def spans():
+    """Ativa o tracing com exporter em memória; devolve a leitura dos spans."""
+    exporter = InMemorySpanExporter()
+    provider = configure_tracing(exporter)
+    tracing.instrument_engine(engine)
+
+    def finished():
+        provider.force_flush()
+        return exporter.get_finished_spans()
+
+    yield finished
+    shutdown_tracing()
+
+
+def test_request_spans_share_trace(client, spans):
+    response = client.get("/api/v1/atividades")
+    assert response.status_code == 200
+
+    finished = spans()
+    server = next(s for s in finished if s.kind == SpanKind.SERVER)
+    assert server.name == "GET /api/v1/atividades"
+    assert server.attributes["http.route"] == "/api/v1/atividades"
+    assert server.attributes["http.status_code"] == 200
+
+    trace_id = server.context.trace_id
+    sql = [s for s in finished if s.name == "db SELECT"]
+    assert sql and all(s.context.trace_id == trace_id for s in sql)
+    assert all(s.attributes["db.system"] == "sqlite" for s in sql)
+    assert any("FROM atividades" in s.attributes["db.statement"] for s in sql)
+
+    # A autenticação por PAT consulta connectionData/profile no Azure DevOps
+    azure = [s for s in finished if s.name == "azure profile"]
+    assert azure and azure[0].context.trace_id == trace_id
+    assert azure[0].attributes["azure.org"] == "test"
+
+
+@pytest.mark.asyncio
+async def test_background_task_inherits_context(spans):
+    @traced("teste.passo")
+    async def passo():
+        await asyncio.sleep(0)
+
+    with tracing.get_tracer().start_as_current_span("teste.requisicao") as parent:
+        task = asyncio.create_task(passo())
+    await task
+
+    child = next(s for s in spans() if s.name == "teste.passo")
+    assert child.parent.span_id == parent.get_span_context().span_id
+
+
+def test_disabled_tracing_records_nothing():
+    @traced("teste.desligado")
+    def passo():
+        return 42
+
+    assert not tracing.tracing_enabled()
+    assert passo() == 42
+
+
+def test_file_exporter_writes_otlp_json(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    configure_tracing(OtlpJsonFileExporter(str(path)))
+    with tracing.get_tracer().start_as_current_span("teste.pai"):
+        with tracing.get_tracer().start_as_current_span("teste.filho") as child:
+            child.set_attribute("itens", 3)
+    shutdown_tracing()
+
+    lines = path.read_text().splitlines()
+    resource_spans = [json.loads(line)["resourceSpans"][0] for line in lines]
+    assert {"key": "service.name", "value": {"stringValue": "aponta-api"}} in resource_spans[0]["resource"]["attributes"]
+
+    exported = {s["name"]: s for rs in resource_spans for ss in rs["scopeSpans"] for s in ss["spans"]}
+    filho, pai = exported["teste.filho"], exported["teste.pai"]
+    assert filho["parentSpanId"] == pai["spanId"]
+    assert filho["traceId"] == pai["traceId"] and len(filho["traceId"]) == 32
+    assert {"key": "itens", "value": {"intValue": "3"}} in filho["attributes"]
@@ -0,0 +1,168 @@
+"""
+Testes para o espelho de work items alimentado por service hooks.
+
+Os payloads em tests/fixtures/service_hooks foram gravados a partir de uma
+assinatura Web Hooks do Azure DevOps.
+"""
+
+import base64
+import json
+import pytest
+import httpx
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.config import get_settings
+from app.models.work_item import WorkItem
+from app.repositories.work_item import WorkItemRepository
+from app.services import timesheet_service
+from app.services.timesheet_service import TimesheetService
+
+FIXTURES = Path(__file__).parent / "fixtures" / "service_hooks"
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+SECRET = "segredo-do-hook"
+
+
+def _payload(name: str) -> dict:
+    return json.loads((FIXTURES / f"{name}.json").read_text())
+
+
+@pytest.fixture
+def webhook_secret(monkeypatch):
+    monkeypatch.setattr(get_settings(), "azure_devops_webhook_secret", SECRET)
+
+
+@pytest.fixture
+def no_icons(monkeypatch):
+    async def icon(org_name, token, work_item_type):
+        return f"data:icon/{work_item_type}"
+
+    monkeypatch.setattr(timesheet_service, "get_work_item_icon_data_uri", icon)
+
+
+def _post(client, payload, **headers):
+    return client.post("/api/v1/hooks/azure-devops", json=payload, headers=headers)
+
+
+def test_hook_requires_secret(client, monkeypatch):
+    """Sem segredo configurado o endpoint fica indisponível; segredo errado é recusado"""
+    assert _post(client, _payload("workitem.created")).status_code == 503
+
+    monkeypatch.setattr(get_settings(), "azure_devops_webhook_secret", SECRET)
+    response = _post(client, _payload("workitem.created"), **{"X-Webhook-Secret": "errado"})
+    assert response.status_code == 401
+
+
+def test_hook_events_update_mirror(client, db_session, webhook_secret):
+    """created/updated/deleted são aplicados ao espelho; revisões antigas são descartadas"""
+    response = _post(client, _payload("workitem.created"), **{"X-Webhook-Secret": SECRET})
+    assert response.status_code == 200
+    assert response.json()["acao"] == "upsert"
+
+    item = db_session.get(WorkItem, (ORG, 501))
+    assert item.parent_id == 500
+    assert item.assigned_to_email == "maria@sefaz.ce.gov.br"
+    assert item.project_id == PROJECT_ID
+
+    # Autenticação básica com o segredo como senha
+    basic = base64.b64encode(f"azure:{SECRET}".encode()).decode()
+    response = _post(client, _payload("workitem.updated"), Authorization=f"Basic {basic}")
+    assert response.json()["acao"] == "upsert"
+    db_session.expire_all()
+    item = db_session.get(WorkItem, (ORG, 501))
+    assert (item.state, item.completed_work, item.rev) == ("Active", 2.5, 3)
+    assert item.assigned_to == "Maria Souza"
+
+    # Entrega fora de ordem: a revisão 1 não sobrescreve a 3
+    response = _post(client, _payload("workitem.created"), **{"X-Webhook-Secret": SECRET})
+    assert response.json()["acao"] == "desatualizado"
+
+    response = _post(client, _payload("workitem.deleted"), **{"X-Webhook-Secret": SECRET})
+    assert response.json()["acao"] == "delete"
+    db_session.expire_all()
+    assert db_session.get(WorkItem, (ORG, 501)) is None
+
+    status = WorkItemRepository(db_session).get_mirror_status(ORG, PROJECT_ID)
+    assert status.ultimo_evento_em is not None
+    assert status.carga_completa_em is None
+
+
+def test_hook_ignores_other_events(client, webhook_secret):
+    response = _post(client, {"eventType": "git.push"}, **{"X-Webhook-Secret": SECRET})
+    assert response.json()["acao"] == "ignorado"
+
+
+@pytest.mark.asyncio
+async def test_timesheet_reads_fresh_mirror(db_session, webhook_secret, no_icons, monkeypatch):
+    """Com a carga em dia, a hierarquia sem iteration vem do espelho, sem WIQL"""
+    repo = WorkItemRepository(db_session)
+    for snapshot in (
+        {"id": 1, "title": "Epic", "work_item_type": "Epic", "assigned_to_email": "outro@x"},
+        {"id": 2, "title": "Story", "work_item_type": "User Story", "parent_id": 1,
+         "assigned_to_email": "maria@sefaz.ce.gov.br"},
+        {"id": 3, "title": "Task", "work_item_type": "Task", "parent_id": 2},
+        {"id": 4, "title": "Outra", "work_item_type": "Task", "assigned_to_email": "outro@x"},
+    ):
+        repo.apply_snapshot(ORG, {**snapshot, "project_id": PROJECT_ID, "state": "Active"})
+    repo.touch_mirror_status(ORG, PROJECT_ID, carga_completa_em=datetime.utcnow())
+    db_session.commit()
+
+    def fail(request):
+        raise AssertionError(f"Azure não deveria ser consultado: {request.url}")
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        timesheet_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(fail), **kwargs),
+    )
+
+    service = TimesheetService(db_session, token="token")
+    items = await service._get_work_items_hierarchy(ORG, PROJECT_ID, "maria@sefaz.ce.gov.br")
+
+    assert [i["id"] for i in items] == [2, 3]
+    assert items[1]["parent_id"] == 2
+    assert items[0]["icon_url"] == "data:icon/User Story"
+
+
+@pytest.mark.asyncio
+async def test_load_mirror_replaces_project_items(db_session, webhook_secret, no_icons, monkeypatch):
+    """A carga completa grava os itens do projeto, remove os excluídos e marca o espelho"""
+    repo = WorkItemRepository(db_session)
+    repo.apply_snapshot(ORG, {"id": 99, "title": "Excluída", "work_item_type": "Task", "project_id": PROJECT_ID})
+    db_session.commit()
+    db_session.query(WorkItem).update({WorkItem.atualizado_em: datetime.utcnow() - timedelta(hours=1)})
+    db_session.commit()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/wiql"):
+            return httpx.Response(200, json={"workItems": [{"id": 10}, {"id": 11}]})
+        return httpx.Response(
+            200,
+            json={
+                "value": [
+                    {"id": 10, "rev": 2, "fields": {"System.Title": "Feature", "System.WorkItemType": "Feature",
+                                                     "System.State": "New", "System.TeamProject": "DEV"}},
+                    {"id": 11, "rev": 5, "fields": {"System.Title": "Task", "System.WorkItemType": "Task",
+                                                     "System.State": "Active", "System.Parent": 10,
+                                                     "System.TeamProject": "DEV"}},
+                ]
+            },
+        )
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        timesheet_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+
+    service = TimesheetService(db_session, token="token")
+    assert await service.load_mirror(ORG, PROJECT_ID) == 2
+
+    db_session.expire_all()
+    ids = [i.id for i in repo.list_by_project(ORG, PROJECT_ID)]
+    assert ids == [10, 11]
+    assert db_session.get(WorkItem, (ORG, 11)).parent_id == 10
+    assert repo.get_mirror_status(ORG, PROJECT_ID).carga_completa_em is not None
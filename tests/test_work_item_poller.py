@@ -0,0 +1,125 @@
+"""
+Testes para o poller incremental do espelho de work items (APIs de reporting).
+"""
+
+import pytest
+import httpx
+
+from app.config import get_settings
+from app.models.work_item import WorkItem
+from app.repositories.work_item import WorkItemRepository
+from app.services import timesheet_service
+from app.services.timesheet_service import TimesheetService
+from app.services.work_item_poller import WorkItemPollScheduler
+from tests.conftest import TestingSessionLocal
+
+ORG = "sefaz-ceara"
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+
+
+def _revision(id, title, type="Task", **fields):
+    return {"id": id, "rev": 1, "fields": {"System.Title": title, "System.WorkItemType": type,
+                                           "System.State": "Active", **fields}}
+
+
+class FakeReporting:
+    """Simula reporting/workitemrevisions e workitemlinks por continuation token."""
+
+    def __init__(self):
+        self.revisions = {
+            None: {"values": [_revision(1, "Feature", "Feature"), _revision(2, "Task A")],
+                   "continuationToken": "r1", "isLastBatch": False},
+            "r1": {"values": [_revision(3, "Task B")], "continuationToken": "r2", "isLastBatch": True},
+            "r2": {"values": [], "continuationToken": "r2", "isLastBatch": True},
+        }
+        self.links = {
+            None: {"values": [
+                {"rel": "System.LinkTypes.Hierarchy-Forward", "sourceId": 1, "targetId": 2, "isActive": True},
+                {"rel": "System.LinkTypes.Hierarchy-Forward", "sourceId": 1, "targetId": 3, "isActive": True},
+            ], "continuationToken": "l1", "isLastBatch": True},
+            "l1": {"values": [], "continuationToken": "l1", "isLastBatch": True},
+        }
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        token = request.url.params.get("continuationToken")
+        api = request.url.path.rsplit("/", 1)[-1]
+        self.requests.append((api, token))
+        pages = self.revisions if api == "workitemrevisions" else self.links
+        return httpx.Response(200, json=pages[token])
+
+
+@pytest.fixture
+def reporting(monkeypatch):
+    fake = FakeReporting()
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        timesheet_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(fake.handler), **kwargs),
+    )
+    monkeypatch.setattr(get_settings(), "work_item_poll_interval_seconds", 300)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_first_poll_loads_project_and_stores_watermarks(db_session, reporting):
+    """A primeira passada percorre todas as páginas e grava os tokens do projeto"""
+    result = await TimesheetService(db_session).poll_mirror(ORG, PROJECT_ID)
+
+    assert result == {"revisoes": 3, "excluidos": 0, "links": 2}
+    repo = WorkItemRepository(db_session)
+    items = {i.id: i for i in repo.list_by_project(ORG, PROJECT_ID)}
+    assert set(items) == {1, 2, 3}
+    assert items[2].parent_id == 1 and items[3].parent_id == 1
+
+    status = repo.get_mirror_status(ORG, PROJECT_ID)
+    assert (status.revisions_token, status.links_token) == ("r2", "l1")
+    assert status.carga_completa_em is not None
+    assert WorkItemRepository(db_session).list_polled_projects()[0].project_id == PROJECT_ID
+
+
+@pytest.mark.asyncio
+async def test_incremental_poll_applies_changes_only(db_session, reporting):
+    """Passadas seguintes partem do watermark e aplicam alterações, exclusões e links removidos"""
+    await TimesheetService(db_session).poll_mirror(ORG, PROJECT_ID)
+    reporting.requests.clear()
+
+    reporting.revisions["r2"] = {
+        "values": [_revision(2, "Task A renomeada"), {"id": 3, "rev": 2, "fields": {"System.IsDeleted": True}}],
+        "continuationToken": "r3",
+        "isLastBatch": True,
+    }
+    reporting.links["l1"] = {
+        "values": [{"rel": "System.LinkTypes.Hierarchy-Forward", "sourceId": 1, "targetId": 2,
+                    "isActive": False, "changedOperation": "remove"}],
+        "continuationToken": "l2",
+        "isLastBatch": True,
+    }
+
+    results = await WorkItemPollScheduler().poll_all(TestingSessionLocal)
+
+    assert results[f"{ORG}/{PROJECT_ID}"] == {"revisoes": 1, "excluidos": 1, "links": 1}
+    assert reporting.requests == [("workitemrevisions", "r2"), ("workitemlinks", "l1")]
+    db_session.expire_all()
+    item = db_session.get(WorkItem, (ORG, 2))
+    assert item.title == "Task A renomeada"
+    assert item.parent_id is None
+    assert db_session.get(WorkItem, (ORG, 3)) is None
+
+
+@pytest.mark.asyncio
+async def test_timesheet_without_iteration_uses_polled_graph(db_session, reporting, monkeypatch):
+    """Com o poller em dia, a hierarquia sem iteration não executa a WIQL recursiva"""
+    await TimesheetService(db_session).poll_mirror(ORG, PROJECT_ID)
+
+    async def icon(org_name, token, work_item_type):
+        return ""
+
+    monkeypatch.setattr(timesheet_service, "get_work_item_icon_data_uri", icon)
+    reporting.requests.clear()
+
+    items = await TimesheetService(db_session)._get_work_items_hierarchy(ORG, PROJECT_ID)
+
+    assert sorted(i["id"] for i in items) == [1, 2, 3]
+    assert reporting.requests == []
@@ -0,0 +1,128 @@
+"""
+Testes para a busca de work items no índice local (tabela work_items).
+"""
+
+import pytest
+from datetime import date
+
+from app.auth import AzureDevOpsUser, get_current_user
+from app.main import app
+from app.models.apontamento import Apontamento
+from app.models.atividade import Atividade
+from app.models.work_item import WorkItem
+from app.repositories.work_item import WorkItemRepository
+from app.services import work_item_search
+from app.services.azure import AzureService
+
+PROJECT_ID = "50a9ca09-710f-4478-8278-2d069902d2af"
+
+
+@pytest.fixture
+def search_client(client, monkeypatch):
+    """Client com usuário autenticado e ícones sem acesso à rede."""
+
+    async def icon(org_name, token, work_item_type):
+        return f"data:icon/{work_item_type}"
+
+    monkeypatch.setattr(work_item_search, "get_work_item_icon_data_uri", icon)
+    app.dependency_overrides[get_current_user] = lambda: AzureDevOpsUser(
+        id="user-1", display_name="Usuário", token="token"
+    )
+    return client
+
+
+@pytest.fixture
+def indexed(db_session):
+    """Três work items de "Login" no índice; o usuário apontou horas no 2."""
+    WorkItemRepository(db_session).upsert_many(
+        "test",
+        [
+            {"id": i, "title": f"Login etapa {i}", "work_item_type": "Task", "state": "Active",
+             "project_id": PROJECT_ID, "project_name": "DEV"}
+            for i in (1, 2, 3)
+        ],
+    )
+    atividade = Atividade(nome="Desenvolvimento", ativo=True)
+    db_session.add(atividade)
+    db_session.commit()
+    db_session.add(
+        Apontamento(
+            work_item_id=2,
+            project_id=PROJECT_ID,
+            organization_name="test",
+            data_apontamento=date(2026, 1, 19),
+            duracao="01:00",
+            id_atividade=atividade.id,
+            usuario_id="user-1",
+            usuario_nome="Usuário",
+        )
+    )
+    db_session.commit()
+
+
+def test_search_served_locally_ranked_by_recent_use(search_client, db_session, indexed, monkeypatch):
+    """Resultados locais não consultam o Azure e priorizam itens já apontados"""
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("Azure não deveria ser consultado")
+
+    monkeypatch.setattr(AzureService, "search_work_items", fail)
+
+    response = search_client.get(
+        "/api/v1/work-items/search", params={"query": "login", "project_id": "DEV"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-data-source"] == "local"
+    ids = [r["id"] for r in response.json()["results"]]
+    assert ids[0] == 2
+    assert sorted(ids) == [1, 2, 3]
+    assert response.json()["results"][0]["iconUrl"] == "data:icon/Task"
+
+    # Busca por ID: o item exato vem antes dos que têm o número no título
+    WorkItemRepository(db_session).upsert_many(
+        "test", [{"id": 12, "title": "Cadastro"}, {"id": 13, "title": "Migração 12"}]
+    )
+    response = search_client.get("/api/v1/work-items/search", params={"query": "12"})
+    assert [r["id"] for r in response.json()["results"]] == [12, 13]
+
+
+def test_local_miss_falls_back_to_azure_and_indexes(search_client, db_session, monkeypatch):
+    """Sem resultados locais, busca no Azure e grava os resultados no índice"""
+    calls = []
+
+    async def search_work_items(self, query, project_id, organization_name, limit=10):
+        calls.append(query)
+        return [
+            {"id": 42, "title": "Relatório mensal", "type": "Bug", "project": "DEV",
+             "url": "https://dev.azure.com/test/_apis/wit/workItems/42", "iconUrl": "x",
+             "state": "New"}
+        ]
+
+    monkeypatch.setattr(AzureService, "search_work_items", search_work_items)
+
+    response = search_client.get("/api/v1/work-items/search", params={"query": "mensal"})
+    assert response.headers["x-data-source"] == "azure"
+    assert [r["id"] for r in response.json()["results"]] == [42]
+
+    item = db_session.get(WorkItem, ("test", 42))
+    assert item.title == "Relatório mensal"
+    assert item.project_name == "DEV"
+
+    # A segunda busca é servida do índice
+    response = search_client.get("/api/v1/work-items/search", params={"query": "mensal"})
+    assert response.headers["x-data-source"] == "local"
+    assert calls == ["mensal"]
+
+
+def test_upsert_keeps_known_optional_fields(db_session):
+    """Campos ausentes na fonte (ex: parent_id da busca WIQL) não apagam os gravados"""
+    repo = WorkItemRepository(db_session)
+    repo.upsert_many("test", [{"id": 7, "title": "Antigo", "parent_id": 5, "project_name": "DEV"}])
+    repo.upsert_many("test", [{"id": 7, "title": "Novo"}, {"id": 7, "title": "Mais novo"}])
+
+    db_session.expire_all()
+    item = db_session.get(WorkItem, ("test", 7))
+    assert item.title == "Mais novo"
+    assert item.parent_id == 5
+    assert item.project_name == "DEV"